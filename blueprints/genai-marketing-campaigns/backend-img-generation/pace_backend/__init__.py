@@ -151,6 +151,14 @@ class PACEBackendStack(Stack):
             "CampaignsTable",
             partition_key=dynamodb.Attribute(name="id", type=dynamodb.AttributeType.STRING),
         )
+        # Campaign listing: the campaigns of a user, newest first, with the summary attributes only
+        self.campaignsTable.add_global_secondary_index(
+            partition_key=dynamodb.Attribute(name="owner", type=dynamodb.AttributeType.STRING),
+            sort_key=dynamodb.Attribute(name="created_at", type=dynamodb.AttributeType.STRING),
+            index_name="owner_created_at",
+            projection_type=dynamodb.ProjectionType.INCLUDE,
+            non_key_attributes=["name", "campaign_description", "objective", "node", "status"],
+        )
 
         self.historicCampaignsTable = pace.PACETable(
             self,
@@ -162,6 +170,13 @@ class PACEBackendStack(Stack):
            sort_key=dynamodb.Attribute(name='objetivo', type=dynamodb.AttributeType.STRING),
            index_name='search_key')
 
+        # Shared Lambda layer with the campaign repository, used by every function that writes campaigns
+        self.campaign_repository_layer = lambda_python.PythonLayerVersion(
+            self,
+            "CampaignRepositoryLayer",
+            entry=os.path.join(os.path.dirname(__file__), "shared"),
+            compatible_runtimes=[lambda_.Runtime.PYTHON_3_13],
+        )
 
         self.presign_s3_fn = lambda_python.PythonFunction(
             self,
@@ -297,6 +312,7 @@ class PACEBackendStack(Stack):
             index="index.py",
             handler="handler",
             runtime=lambda_.Runtime.PYTHON_3_13,
+            layers=[self.campaign_repository_layer],
             timeout=Duration.seconds(90),
             memory_size=128,
             role=oss_data_access_role,
@@ -342,6 +358,7 @@ class PACEBackendStack(Stack):
             index="index.py",
             handler="handler",
             runtime=lambda_.Runtime.PYTHON_3_13,
+            layers=[self.campaign_repository_layer],
             timeout=Duration.seconds(90),
             memory_size=128,
             role=oss_data_access_role,
@@ -402,6 +419,7 @@ class PACEBackendStack(Stack):
             index="index.py",
             handler="handler",
             runtime=lambda_.Runtime.PYTHON_3_13,
+            layers=[self.campaign_repository_layer],
             timeout=Duration.seconds(90),
             memory_size=128,
             environment={
@@ -455,6 +473,7 @@ class PACEBackendStack(Stack):
             index="index.py",
             handler="handler",
             runtime=lambda_.Runtime.PYTHON_3_13,
+            layers=[self.campaign_repository_layer],
             timeout=Duration.seconds(30),
             memory_size=128,
             environment={
@@ -489,8 +508,10 @@ class PACEBackendStack(Stack):
             index="index.py",
             handler="handler",
             runtime=lambda_.Runtime.PYTHON_3_13,
-            timeout=Duration.seconds(30),
-            memory_size=128,
+            layers=[self.campaign_repository_layer],
+            # Up to MAX_IMAGES variants per request
+            timeout=Duration.seconds(90),
+            memory_size=512,
             environment={
                 "LOG_LEVEL": "DEBUG",
                 "CAMPAIGN_TABLE_NAME": self.campaignsTable.table_name,
@@ -18,8 +18,8 @@
 import os
 import logging
 import traceback
-import uuid
 import json
+from datetime import datetime, timezone
 
 import boto3
 
@@ -28,6 +28,8 @@ from langchain_aws import ChatBedrockConverse
 from prompts.create_campaign_concept_prompt_selector import get_ad_concept_prompt_selector
 from structured_output.ad_concept import AdConcept
 
+from campaign_repository import CampaignRepository
+
 
 template = {
    "id": "", #<uuid/cuid/guid>
@@ -39,6 +41,9 @@ template = {
    "objective": "", # Campaign objective
    "node": "", #Campaign node
    "results": 0, #Campaign results (to maximize). Zero when created
+   "owner": "", #Cognito user that created the campaign
+   "created_at": "", #ISO 8601 UTC creation time, campaigns are listed by owner and creation time
+   "status": "created", #created, recommended (image references found) or generated (images generated)
 }
 
 lambda_response = {
@@ -60,6 +65,7 @@ MODEL_ID = os.getenv("MODEL_ID")
 CAMPAIGN_TABLE_NAME = os.getenv("CAMPAIGN_TABLE_NAME")
 HISTORIC_TABLE_NAME = os.getenv("HISTORIC_TABLE_NAME")
 campaignTable = boto3.resource("dynamodb").Table(CAMPAIGN_TABLE_NAME)
+campaigns = CampaignRepository(campaignTable)
 
 def generate_campaign(campaign_description):
     """Given a campaign description, create a campaign concept using LLMs"""
@@ -103,15 +109,6 @@ def handler(event, context):
 
     logger.debug("Generating campaign")
 
-    #Generate new unique id
-    while True:
-        uid = str(uuid.uuid4())
-        resp = campaignTable.get_item(Key={"id": uid})
-        if not "Item" in resp.keys():
-            break
-
-    template["id"] = uid
-
     logger.debug("the body")
     logger.debug(event["body"])
 
@@ -136,21 +133,27 @@ def handler(event, context):
     logger.debug("the campaign concept")
     logger.debug(campaign_concept)
 
-    template["name"] = body["name"]
-    template["campaign_description"] = body["campaign_description"]
-    template["campaign_concept"] = campaign_concept.campaign_concept
-    template["visual_concept"] = campaign_concept.visual_concept
-    template["image_description"] = campaign_concept.image_description
-    template["objective"] = body["objective"].lower()
-    template["node"] = body["node"].lower()
-
-    resp = campaignTable.put_item(Item=template)
+    #A copy, the template is shared by the invocations of a warm Lambda
+    campaign = {key: value for key, value in template.items() if key != "id"}
+    campaign["name"] = body["name"]
+    campaign["campaign_description"] = body["campaign_description"]
+    campaign["campaign_concept"] = campaign_concept.campaign_concept
+    campaign["visual_concept"] = campaign_concept.visual_concept
+    campaign["image_description"] = campaign_concept.image_description
+    campaign["objective"] = body["objective"].lower()
+    campaign["node"] = body["node"].lower()
+    campaign["owner"] = event["requestContext"]["authorizer"]["claims"]["sub"]
+    campaign["created_at"] = datetime.now(timezone.utc).isoformat()
+    campaign["status"] = "created"
+
+    #The id is generated on the put, which only succeeds when no campaign has it
+    uid = campaigns.create(campaign)
 
     answer = {"id" :uid,
-              "name": template["name"],
-              "campaign_description": template["campaign_description"],
-              "objective": template["objective"],
-              "node": template["node"],
+              "name": campaign["name"],
+              "campaign_description": campaign["campaign_description"],
+              "objective": campaign["objective"],
+              "node": campaign["node"],
               }
 
     lambda_response["statusCode"] = 200
@@ -0,0 +1,169 @@
+# MIT No Attribution
+#
+# Copyright 2025 Amazon Web Services
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this
+# software and associated documentation files (the "Software"), to deal in the Software
+# without restriction, including without limitation the rights to use, copy, modify,
+# merge, publish, distribute, sublicense, and/or sell copies of the Software, and to
+# permit persons to whom the Software is furnished to do so.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED,
+# INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A
+# PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT
+# HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE
+# SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+"""
+Offline benchmark of image generation. The campaigns table and the processed bucket are in moto, the image model is
+a fake that sleeps for a fixed latency plus a latency per image and returns 1280x720 PNGs, and every DynamoDB and S3
+call sleeps for the round trip.
+
+    python benchmark_generate_images.py --users 4 --variants 4 --model-ms 600 --per-image-ms 200 --rtt-ms 20
+
+--users users generate --variants images each for the same campaign, at the same time:
+
+- previous: one request per image, decoded and saved to a temporary file with PIL, then the campaign is read and
+  put back whole
+- batch: one request per user, with the variants in calls of up to 5 images to the model
+- fan out: one request per user, with one concurrent call to the model per variant
+
+Lost updates are the generated images missing from generated_images at the end.
+"""
+
+import argparse
+import base64
+import io
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import boto3
+
+from moto import mock_aws
+from PIL import Image
+
+# The campaign repository layer of the function
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "shared"))
+
+REGION = "us-east-1"
+BUCKET = "bench-processed"
+TABLE = "bench-campaigns"
+
+
+class FakeImageModel:
+    """invoke_model of Nova Canvas, with the latency of the call and of each image"""
+
+    def __init__(self, latency: float, per_image_latency: float):
+        self.latency = latency
+        self.per_image_latency = per_image_latency
+        pixels = bytes(random.getrandbits(8) for _ in range(1280 * 72 * 3)) * 10
+        buffer = io.BytesIO()
+        Image.frombytes("RGB", (1280, 720), pixels).save(buffer, format="PNG")
+        self.image = base64.b64encode(buffer.getvalue()).decode()
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def invoke_model(self, body, **kwargs):
+        number_of_images = json.loads(body)["imageGenerationConfig"]["numberOfImages"]
+        with self._lock:
+            self.calls += 1
+        time.sleep(self.latency + self.per_image_latency * number_of_images)
+        return {"body": io.BytesIO(json.dumps({"images": [self.image] * number_of_images}).encode())}
+
+
+def add_rtt(client, rtt):
+    if rtt:
+        client.meta.events.register_first("before-send", lambda **kwargs: time.sleep(rtt))
+
+
+def previous_request(index, uid, prompt):
+    """The request before the batch mode: one image, through PIL and a temporary file, and a put of the campaign"""
+    response = index.bedrock_runtime.invoke_model(body=json.dumps({
+        "taskType": "TEXT_IMAGE", "textToImageParams": {"text": prompt},
+        "imageGenerationConfig": {"numberOfImages": 1},
+    }))
+    image = json.loads(response["body"].read())["images"][0]
+    image_file = str(uuid.uuid4()) + ".jpg"
+    image_path = tempfile.mkdtemp() + "/" + image_file
+    Image.open(io.BytesIO(base64.decodebytes(bytes(image, "utf-8")))).save(image_path)
+
+    campaign = index.campaignTable.get_item(Key={"id": uid})["Item"]
+    fileKey = campaign["id"] + "/" + image_file
+    index.processed_bucket.upload_file(image_path, fileKey)
+    campaign = index.campaignTable.get_item(Key={"id": uid})["Item"]
+    campaign.setdefault("generated_images", []).append({"url": "s3://" + BUCKET + "/" + fileKey})
+    index.campaignTable.put_item(Item=campaign)
+    return 1
+
+
+def request(index, uid, prompt, variants, fan_out):
+    event = {
+        "httpMethod": "POST",
+        "path": f"/generate_images/{uid}",
+        "body": json.dumps({"prompt": prompt, "numberOfImages": variants, "fanOut": fan_out}),
+    }
+    response = index.handler(event, None)
+    assert response["statusCode"] == 200, response
+    return len(json.loads(response["body"])["urls"])
+
+
+def run(name, index, model, args, user_requests):
+    uid = f"campaign-{name.replace(' ', '-')}"
+    index.campaignTable.put_item(Item={"id": uid, "campaign_description": "Summer sale"})
+    calls = model.calls
+    start = time.perf_counter()
+    with ThreadPoolExecutor(args.users) as pool:
+        generated = sum(pool.map(lambda user: user_requests(uid, f"prompt of user {user}"), range(args.users)))
+    elapsed = time.perf_counter() - start
+    recorded = len(index.campaignTable.get_item(Key={"id": uid})["Item"].get("generated_images", []))
+    print(f"{name:<10} {elapsed:6.2f} s  {generated / elapsed:5.2f} images/s  {model.calls - calls:3d} model calls  "
+          f"lost updates {generated - recorded}/{generated} ({(generated - recorded) / generated:.0%})")
+
+
+@mock_aws
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=4)
+    parser.add_argument("--variants", type=int, default=4)
+    parser.add_argument("--model-ms", type=float, default=600.0)
+    parser.add_argument("--per-image-ms", type=float, default=200.0)
+    parser.add_argument("--rtt-ms", type=float, default=20.0)
+    args = parser.parse_args()
+
+    os.environ.update({
+        "AWS_DEFAULT_REGION": REGION, "REGION": REGION, "LOG_LEVEL": "WARNING",
+        "CAMPAIGN_TABLE_NAME": TABLE, "PROCESSED_BUCKET": BUCKET, "IMG_MODEL_ID": "amazon.nova-canvas-v1:0",
+    })
+    boto3.client("s3").create_bucket(Bucket=BUCKET)
+    boto3.client("dynamodb").create_table(
+        TableName=TABLE,
+        KeySchema=[{"AttributeName": "id", "KeyType": "HASH"}],
+        AttributeDefinitions=[{"AttributeName": "id", "AttributeType": "S"}],
+        BillingMode="PAY_PER_REQUEST",
+    )
+
+    import index
+
+    model = FakeImageModel(args.model_ms / 1000, args.per_image_ms / 1000)
+    index.bedrock_runtime = model
+    add_rtt(index.campaignTable.meta.client, args.rtt_ms / 1000)
+    add_rtt(index.processed_bucket.meta.client, args.rtt_ms / 1000)
+    print(f"{args.users} users x {args.variants} variants, model {args.model_ms:.0f} ms + {args.per_image_ms:.0f} ms "
+          f"per image, {args.rtt_ms:.0f} ms round trip")
+
+    run("previous", index, model, args,
+        lambda uid, prompt: sum(previous_request(index, uid, prompt) for _ in range(args.variants)))
+    run("batch", index, model, args, lambda uid, prompt: request(index, uid, prompt, args.variants, False))
+    run("fan out", index, model, args, lambda uid, prompt: request(index, uid, prompt, args.variants, True))
+
+
+if __name__ == "__main__":
+    main()
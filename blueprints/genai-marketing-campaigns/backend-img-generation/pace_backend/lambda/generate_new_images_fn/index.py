@@ -18,35 +18,43 @@
 import os
 import logging
 import base64
-import io
 import uuid
-import tempfile
 import json
+import random
+from concurrent.futures import ThreadPoolExecutor
 
 import boto3
-from PIL import Image
-import random
 
-lambda_response = {
-    "statusCode": 200,
-    "headers": {
-        "Content-Type": "application/json",
-        "Access-Control-Allow-Origin": "*",
-        "Access-Control-Allow-Credentials": True,
-    },
-    "body": {},
-}
+from campaign_repository import CampaignNotFound, CampaignRepository, CampaignUpdate
+
+
+def new_lambda_response():
+    return {
+        "statusCode": 200,
+        "headers": {
+            "Content-Type": "application/json",
+            "Access-Control-Allow-Origin": "*",
+            "Access-Control-Allow-Credentials": True,
+        },
+        "body": {},
+    }
+
 
 logger = logging.getLogger()
 logger.setLevel(os.getenv("LOG_LEVEL"))
 
 CAMPAIGN_TABLE_NAME = os.getenv("CAMPAIGN_TABLE_NAME")
 campaignTable = boto3.resource("dynamodb").Table(CAMPAIGN_TABLE_NAME)
+campaigns = CampaignRepository(campaignTable)
 
 PROCESSED_BUCKET = os.getenv("PROCESSED_BUCKET")
 REGION = os.getenv("REGION")
 MODEL_ID = os.getenv("IMG_MODEL_ID")
 
+# Images of one request, and of one call to the model (the Nova Canvas limit)
+MAX_IMAGES = int(os.getenv("MAX_IMAGES", "10"))
+MODEL_MAX_IMAGES = 5
+
 logger.info(f"REGION: {REGION}")
 
 s3 = boto3.resource("s3")
@@ -57,8 +65,8 @@ bedrock_runtime = boto3.client(
     region_name=REGION
 )
 
-def genImgCanvas(prompt: str):
-    """Generate an image from a prompt using Amazon Titan models"""
+def genImgCanvas(prompt: str, number_of_images: int = 1):
+    """Generate images from a prompt using Amazon Nova Canvas, returns the PNG bytes of each image"""
 
     negative_prompts = "poorly rendered, poor background details, poorly facial details"
 
@@ -74,7 +82,7 @@ def genImgCanvas(prompt: str):
                 "negativeText": negative_prompts   # Optional
             },
             "imageGenerationConfig": {
-                "numberOfImages": 1,  # Range: 1 to 5
+                "numberOfImages": number_of_images,  # Range: 1 to 5
                 "quality": "standard",  # Options: standard or premium
                 "height": 720,  # Supported height list in the docs
                 "width": 1280,  # Supported width list in the docs
@@ -92,19 +100,55 @@ def genImgCanvas(prompt: str):
     )
     response_body = json.loads(response.get("body").read())
 
-    base_64_img_str = response_body["images"][0]
+    return [base64.b64decode(image) for image in response_body["images"]]
+
+
+def generate_images(uid: str, prompt: str, number_of_images: int = 1, fan_out: bool = False):
+    """
+    Generate the variants of a prompt and upload them to the processed bucket.
+
+    The variants are requested in calls of up to 5 images to the model, or with fan_out in one call per image (each
+    with its own seed); the calls and the uploads run concurrently.
 
-    tmpdir = tempfile.mkdtemp()
-    image_file = str(uuid.uuid4()) + ".jpg"
-    image_path = tmpdir + "/" + image_file
-    image_1 = Image.open(io.BytesIO(base64.decodebytes(bytes(base_64_img_str, "utf-8"))))
+    Returns:
+        List of the S3 URLs of the images
+    """
+    per_call = 1 if fan_out else MODEL_MAX_IMAGES
+    calls = [min(per_call, number_of_images - start) for start in range(0, number_of_images, per_call)]
+
+    def upload(image: bytes):
+        # The PNG of the model is uploaded as is, without decoding it or writing it to disk. The images used to be
+        # re-encoded and stored as <id>/<uuid>.jpg JPEGs, they are now <id>/<uuid>.png PNGs
+        fileKey = uid + "/" + str(uuid.uuid4()) + ".png"
+        processed_bucket.put_object(Key=fileKey, Body=image, ContentType="image/png")
+        return "s3://" + PROCESSED_BUCKET + "/" + fileKey
+
+    with ThreadPoolExecutor(max_workers=min(len(calls), MODEL_MAX_IMAGES)) as pool:
+        images = [image for batch in pool.map(lambda n: genImgCanvas(prompt, n), calls) for image in batch]
+        return list(pool.map(upload, images))
+
+
+def record_images(uid: str, urls: list):
+    """
+    Append the images to the generated_images of the campaign, in one unconditional list_append, so concurrent
+    requests for the same campaign neither overwrite each other's images nor retry. "generated" is the last status,
+    setting it can't move a campaign back.
+
+    Returns:
+        False when the campaign doesn't exist
+    """
+    try:
+        campaigns.update(uid, CampaignUpdate(
+            set={"status": "generated"}, append={"generated_images": [{"url": url} for url in urls]}
+        ))
+        return True
+    except CampaignNotFound:
+        return False
 
-    # save
-    image_1.save(image_path)
-    return image_path, image_file
 
 def handler(event, context):
     logger.debug("Received event: " + json.dumps(event))
+    lambda_response = new_lambda_response()
     method = event["httpMethod"]
     path = event["path"]
     pathParts = path.split('/')
@@ -123,47 +167,34 @@ def handler(event, context):
     try:
         body = json.loads(event["body"])
         prompt = body["prompt"]
-    except:
+        number_of_images = int(body.get("numberOfImages", 1))
+        fan_out = bool(body.get("fanOut", False))
+        if not 1 <= number_of_images <= MAX_IMAGES:
+            raise ValueError(f"numberOfImages must be between 1 and {MAX_IMAGES}")
+    except Exception:
         lambda_response["statusCode"] = 400
         lambda_response["body"]["message"] = "Bad Request. Bad body"
 
         return lambda_response
 
-    #Generate an image based on the prompt
-    image_path, image_file = genImgCanvas(prompt)
-
-    #Read dynamo table
-    ans = campaignTable.get_item(Key={'id':uid})
-    if 'Item' in ans:
-        campaign = ans['Item']
-    else:
+    #Check the campaign before paying for the images
+    if campaigns.get(uid, ["id"]) is None:
         lambda_response["statusCode"] = 500
         lambda_response["body"]["message"] = "Campaign not found"
 
         return lambda_response
 
-    fileKey = campaign["id"] + "/" + image_file
-    processed_bucket.upload_file(image_path,fileKey)
-
-    url = "s3://" + PROCESSED_BUCKET + "/" + fileKey
-
+    #Generate the images based on the prompt
+    urls = generate_images(uid, prompt, number_of_images, fan_out)
 
     #Update dynamo table
-    ans = campaignTable.get_item(Key={'id':uid})
-    if 'Item' in ans:
-        campaign = ans['Item']
-    else:
+    if not record_images(uid, urls):
         lambda_response["statusCode"] = 500
         lambda_response["body"]["message"] = "Campaign not found"
 
         return lambda_response
-      
-    if not "generated_images" in campaign:
-      campaign["generated_images"] = []
-    campaign["generated_images"].append({"url":url})
-    campaignTable.put_item(Item=campaign)
 
     lambda_response["statusCode"] = 200
-    lambda_response["body"] = json.dumps({"url":url})
+    lambda_response["body"] = json.dumps({"url": urls[0], "urls": urls})
 
     return lambda_response
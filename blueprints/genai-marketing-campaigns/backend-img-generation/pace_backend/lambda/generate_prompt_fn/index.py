@@ -24,6 +24,8 @@ import boto3
 
 from langchain_aws import ChatBedrockConverse
 
+from campaign_repository import CampaignNotFound, CampaignRepository, CampaignUpdate
+
 from prompts.generate_text_to_image_metaprompt import get_meta_prompt_prompt_selector
 from structured_output.meta_prompt import MetaPrompt
 import langchain_core
@@ -47,6 +49,7 @@ CAMPAIGN_TABLE_NAME = os.getenv("CAMPAIGN_TABLE_NAME")
 MODEL_ID = os.getenv("MODEL_ID")
 
 campaignTable = boto3.resource("dynamodb").Table(CAMPAIGN_TABLE_NAME)
+campaigns = CampaignRepository(campaignTable)
 
 def generate_text_to_image_meta_prompt(campaign_details, with_reference_images=False, reference_image_descriptions=[]):
 
@@ -121,16 +124,11 @@ def handler(event, context):
 
     #Read dynamo table and obtain current campaign
     logger.debug("Querying DynamoDB")
-    ans = campaignTable.get_item(Key={'id':uid})
+    campaign = campaigns.get(uid, ["campaign_description", "image_references"])
     logger.debug("Loaded item")
-    logger.debug(ans)
-
-    if 'Item' in ans:
-        campaign = ans["Item"]
+    logger.debug(campaign)
 
-        #campaign_json = pace_utils.dynamodb_to_json(ans['Item'])
-        #campaign = json.loads(campaign_json)
-    else:
+    if campaign is None:
         logger.error("No id: " + uid)
 
         lambda_response["statusCode"] = 400
@@ -173,12 +171,17 @@ def handler(event, context):
     logger.debug("Generated meta prompt")
     logger.debug(img_meta_prompt)
 
-    #Update dynamo table
-    if not "image_prompt" in campaign:
-      campaign["image_prompt"] = {}
-    campaign["image_prompt"]["ai_prompt"]= img_meta_prompt.prompt
-    campaign["image_prompt"]["ai_reasoning"] = img_meta_prompt.reasoning
-    campaignTable.put_item(Item=campaign)
+    #Update dynamo table, only the AI prompt is written
+    try:
+        campaigns.update(uid, CampaignUpdate(set={
+            "image_prompt.ai_prompt": img_meta_prompt.prompt,
+            "image_prompt.ai_reasoning": img_meta_prompt.reasoning,
+        }))
+    except CampaignNotFound:
+        lambda_response["statusCode"] = 400
+        lambda_response["body"]["message"] = "Campaign not found"
+
+        return lambda_response
 
     lambda_response["statusCode"] = 200
     lambda_response["body"] = json.dumps({
@@ -0,0 +1,161 @@
+# MIT No Attribution
+#
+# Copyright 2025 Amazon Web Services
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this
+# software and associated documentation files (the "Software"), to deal in the Software
+# without restriction, including without limitation the rights to use, copy, modify,
+# merge, publish, distribute, sublicense, and/or sell copies of the Software, and to
+# permit persons to whom the Software is furnished to do so.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED,
+# INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A
+# PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT
+# HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE
+# SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+"""
+Offline benchmark of the recommendation search. The index is a fake OpenSearch with exact cosine kNN over random
+embeddings, where most images belong to a few nodes and objectives; every request sleeps for the round trip and
+building a client sleeps for the TLS handshake and the credentials.
+
+    python benchmark_recommendations.py --images 20000 --queries 200 --rtt-ms 25 --connect-ms 80
+
+- previous: a new client per invocation, one post filtered search per node and objective
+- post filter: the shared client and _msearch, with the oversampled post filter used for nmslib indexes
+- efficient filter: the shared client and _msearch, with the filter inside the knn clause
+
+Completeness is the share of the expected references returned: k per node and objective, or every image of the
+node and objective when it has fewer.
+"""
+
+import argparse
+import itertools
+import time
+
+import numpy as np
+
+from recommendations import RecommendationSearch
+
+NODES = ["followers", "reach", "engagement", "traffic", "awareness"]
+OBJECTIVES = ["clicks", "likes", "shares", "conversions"]
+
+
+class FakeOpenSearch:
+    """search and msearch of the embeddings index, with exact kNN and a sleep per request"""
+
+    def __init__(self, images: int, dimension: int, rtt: float, seed: int = 7):
+        rng = np.random.default_rng(seed)
+        self.vectors = rng.normal(size=(images, dimension)).astype(np.float32)
+        self.vectors /= np.linalg.norm(self.vectors, axis=1, keepdims=True)
+        # Skewed like real campaigns: the first nodes and objectives have most of the images
+        weights = lambda n: np.array([2.0 ** -i for i in range(n)]) / sum(2.0 ** -i for i in range(n))
+        self.nodes = rng.choice(NODES, size=images, p=weights(len(NODES)))
+        self.objectives = rng.choice(OBJECTIVES, size=images, p=weights(len(OBJECTIVES)))
+        self.rtt = rtt
+        self.requests = 0
+
+    def count(self, node, objective):
+        return int(((self.nodes == node) & (self.objectives == objective)).sum())
+
+    def _mask(self, query_filter):
+        mask = np.ones(len(self.vectors), dtype=bool)
+        for term in query_filter["bool"]["filter"]:
+            field, value = next(iter(term["term"].items()))
+            mask &= (self.nodes if field == "node" else self.objectives) == value
+        return mask
+
+    def _search(self, body):
+        knn = body["query"]["knn"]["embeddings"]
+        scores = self.vectors @ np.asarray(knn["vector"], dtype=np.float32)
+        if "filter" in knn:
+            scores = np.where(self._mask(knn["filter"]), scores, -np.inf)
+        top = np.argsort(-scores)[:knn["k"]]
+        top = top[np.isfinite(scores[top])]
+        if "post_filter" in body:
+            top = top[self._mask(body["post_filter"])[top]]
+        hits = [
+            {"_score": float(scores[i]), "_source": {
+                "image_s3_uri": f"s3://imgs/{i}.jpg", "results": int(i % 1000), "node": str(self.nodes[i]),
+                "objective": str(self.objectives[i]), "image_description": "", "img_element_list": ""}}
+            for i in top[:body["size"]]
+        ]
+        return {"hits": {"hits": hits}}
+
+    def search(self, index, body):
+        self.requests += 1
+        time.sleep(self.rtt)
+        return self._search(body)
+
+    def msearch(self, body):
+        self.requests += 1
+        time.sleep(self.rtt)
+        return {"responses": [self._search(query) for query in body[1::2]]}
+
+
+def percentile(values, p):
+    return sorted(values)[min(len(values) - 1, int(len(values) * p / 100))]
+
+
+def run(name, index, queries, pairs_per_query, k, make_search, connect):
+    latencies, returned, expected, requests = [], 0, 0, index.requests
+    for embedding, pairs in queries:
+        start = time.perf_counter()
+        search = make_search()
+        if connect:
+            time.sleep(connect)
+        nodes = list(dict.fromkeys(node for node, _ in pairs))
+        objectives = list(dict.fromkeys(objective for _, objective in pairs))
+        references = search(embedding, nodes, objectives)
+        latencies.append(time.perf_counter() - start)
+        returned += len(references)
+        expected += sum(min(k, index.count(*pair)) for pair in itertools.product(nodes, objectives))
+
+    print(f"{name:<18} {pairs_per_query} pairs  p50 {percentile(latencies, 50) * 1000:6.0f} ms  "
+          f"p95 {percentile(latencies, 95) * 1000:6.0f} ms  complete {returned / expected:6.1%}  "
+          f"{(index.requests - requests) / len(queries):.1f} requests/query")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--images", type=int, default=20_000)
+    parser.add_argument("--dimension", type=int, default=256)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--rtt-ms", type=float, default=25.0)
+    parser.add_argument("--connect-ms", type=float, default=80.0)
+    args = parser.parse_args()
+
+    index = FakeOpenSearch(args.images, args.dimension, args.rtt_ms / 1000)
+    rng = np.random.default_rng(11)
+    print(f"{args.images} images, k={args.k}, {args.rtt_ms:.0f} ms round trip, {args.connect_ms:.0f} ms per new client")
+
+    for pairs_per_query in (1, 4):
+        queries = []
+        for _ in range(args.queries):
+            embedding = index.vectors[rng.integers(len(index.vectors))] + rng.normal(scale=0.5, size=args.dimension)
+            nodes = list(rng.choice(NODES, size=2 if pairs_per_query > 1 else 1, replace=False))
+            objectives = list(rng.choice(OBJECTIVES, size=2 if pairs_per_query > 1 else 1, replace=False))
+            queries.append((embedding.tolist(), list(itertools.product(nodes, objectives))))
+
+        def previous(embedding, nodes, objectives):
+            # One post filtered search per pair, k candidates
+            search = RecommendationSearch(index, "embeddings", k=args.k, efficient_filter=False)
+            references = []
+            for pair in itertools.product(nodes, objectives):
+                body = search._body(embedding, *pair)
+                body["query"]["knn"]["embeddings"]["k"] = args.k
+                hits = index.search(index="embeddings", body=body)["hits"]["hits"]
+                references += [hit["_source"] for hit in hits]
+            return references
+
+        post_filter = RecommendationSearch(index, "embeddings", k=args.k, efficient_filter=False)
+        efficient = RecommendationSearch(index, "embeddings", k=args.k)
+        run("previous", index, queries, pairs_per_query, args.k, lambda: previous, args.connect_ms / 1000)
+        run("post filter", index, queries, pairs_per_query, args.k, lambda: post_filter.search, 0)
+        run("efficient filter", index, queries, pairs_per_query, args.k, lambda: efficient.search, 0)
+
+
+if __name__ == "__main__":
+    main()
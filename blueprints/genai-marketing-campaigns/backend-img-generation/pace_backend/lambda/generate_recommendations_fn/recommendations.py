@@ -0,0 +1,164 @@
+# MIT No Attribution
+#
+# Copyright 2025 Amazon Web Services
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this
+# software and associated documentation files (the "Software"), to deal in the Software
+# without restriction, including without limitation the rights to use, copy, modify,
+# merge, publish, distribute, sublicense, and/or sell copies of the Software, and to
+# permit persons to whom the Software is furnished to do so.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED,
+# INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A
+# PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT
+# HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE
+# SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+import itertools
+import json
+import logging
+import re
+import time
+
+logger = logging.getLogger()
+
+# Candidates per result when the engine can't filter inside the knn clause (nmslib, indexes created before faiss),
+# so that the post filter still keeps k of them
+KNN_OVERSAMPLE = 10
+
+# How the engine rejects a filter inside the knn clause, e.g. "Engine [NMSLIB] does not support filters"
+FILTER_REJECTED = re.compile(r"does not support filter", re.IGNORECASE)
+
+# Throttling and unavailable service. opensearch-py raises its connection errors and timeouts with the status "N/A"
+TRANSIENT_STATUSES = {429, 500, 502, 503, 504, "N/A"}
+MAX_ATTEMPTS = 3
+RETRY_DELAY = 0.2
+
+
+def filter_rejected(error) -> bool:
+    """Whether the error of a search is the engine rejecting the filter inside the knn clause"""
+    return bool(FILTER_REJECTED.search(error if isinstance(error, str) else json.dumps(error, default=str)))
+
+
+def as_list(value):
+    """A node or objective of a campaign, or a list of them"""
+    if value is None:
+        return []
+    return [value] if isinstance(value, str) else list(value)
+
+
+class RecommendationSearch:
+    """
+    kNN search of the reference images of a campaign in the embeddings index, restricted to its nodes and
+    objectives. The filter goes inside the knn clause, so every search returns the k nearest images that match it
+    (a post filter is applied to the k nearest images of the whole index and often keeps fewer). Several nodes or
+    objectives are searched in one _msearch request.
+    """
+
+    def __init__(self, client, index_name: str, k: int = 5, efficient_filter: bool = True,
+                 max_attempts: int = MAX_ATTEMPTS, sleep=time.sleep):
+        self.client = client
+        self.index_name = index_name
+        self.k = k
+        self.efficient_filter = efficient_filter
+        self.max_attempts = max_attempts
+        self.sleep = sleep
+
+    def _filter(self, node: str, objective: str) -> dict:
+        return {"bool": {"filter": [{"term": {"node": node}}, {"term": {"objective": objective}}]}}
+
+    def _body(self, embedding: list, node: str, objective: str) -> dict:
+        body = {"size": self.k, "_source": {"excludes": ["embeddings"]}}
+        if self.efficient_filter:
+            knn = {"vector": embedding, "k": self.k, "filter": self._filter(node, objective)}
+            body["query"] = {"knn": {"embeddings": knn}}
+        else:
+            body["query"] = {"knn": {"embeddings": {"vector": embedding, "k": self.k * KNN_OVERSAMPLE}}}
+            body["post_filter"] = self._filter(node, objective)
+        return body
+
+    def _run(self, embedding: list, pairs: list) -> list:
+        """One response per pair, a failed search is an error response ({"error": ..., "status": ...})"""
+        try:
+            if len(pairs) == 1:
+                return [self.client.search(index=self.index_name, body=self._body(embedding, *pairs[0]))]
+            lines = []
+            for node, objective in pairs:
+                lines += [{"index": self.index_name}, self._body(embedding, node, objective)]
+            return self.client.msearch(body=lines)["responses"]
+        except Exception as e:
+            status = getattr(e, "status_code", None)
+            if status != 400 and status not in TRANSIENT_STATUSES:
+                raise
+            return [{"error": getattr(e, "info", None) or str(e), "status": status}] * len(pairs)
+
+    def _run_with_retries(self, embedding: list, pairs: list) -> list:
+        """Searches throttled or failed by an unavailable service are run again, with a backoff"""
+        responses = self._run(embedding, pairs)
+        for attempt in range(1, self.max_attempts):
+            retry = [i for i, response in enumerate(responses) if response.get("status") in TRANSIENT_STATUSES
+                     and "error" in response]
+            if not retry:
+                break
+            logger.warning(f"Retrying {len(retry)} searches: {responses[retry[0]]['error']}")
+            self.sleep(RETRY_DELAY * 2 ** (attempt - 1))
+            for i, response in zip(retry, self._run(embedding, [pairs[i] for i in retry])):
+                responses[i] = response
+        return responses
+
+    def _responses(self, embedding: list, pairs: list) -> list:
+        responses = self._run_with_retries(embedding, pairs)
+
+        # Only an index whose engine can't filter in the knn clause switches the container to the post filter
+        if self.efficient_filter and any(filter_rejected(r["error"]) for r in responses if "error" in r):
+            logger.warning("The index rejected the knn filter, searching with a post filter")
+            self.efficient_filter = False
+            responses = self._run_with_retries(embedding, pairs)
+
+        errors = [response["error"] for response in responses if "error" in response]
+        if errors:
+            raise RuntimeError(f"Search failed: {errors[0]}")
+        return responses
+
+    def search(self, embedding: list, nodes, objectives, rank_by: str = "results") -> list:
+        """
+        Search the reference images of every node and objective.
+
+        Args:
+            embedding: Embedding of the image description of the campaign. It doesn't need to be a unit vector as the
+                indexed ones, its length scales the inner product with every image the same and keeps their order
+            nodes: Node, or list of nodes
+            objectives: Objective, or list of objectives
+            rank_by: "results" to sort by the stored results of the image campaign, "similarity" to keep the order
+                of the kNN search
+
+        Returns:
+            List of image references (url, metric, score, description, img_elements), one per image
+        """
+        pairs = list(dict.fromkeys(itertools.product(as_list(nodes), as_list(objectives))))
+        if not pairs:
+            return []
+
+        hits = {}
+        for response in self._responses(embedding, pairs):
+            for hit in response["hits"]["hits"]:
+                url = hit["_source"]["image_s3_uri"]
+                # An image found for several nodes or objectives is kept once, with its best similarity
+                if url not in hits or hit["_score"] > hits[url]["_score"]:
+                    hits[url] = hit
+
+        ranked = sorted(hits.values(), key=lambda hit: -hit["_score"])
+        if rank_by == "results":
+            ranked.sort(key=lambda hit: -hit["_source"]["results"])
+
+        return [
+            {
+                "url": hit["_source"]["image_s3_uri"],
+                "metric": hit["_source"]["objective"],
+                "score": hit["_source"]["results"],
+                "description": hit["_source"]["image_description"],
+                "img_elements": hit["_source"]["img_element_list"],
+            }
+            for hit in ranked
+        ]
@@ -0,0 +1,150 @@
+# MIT No Attribution
+#
+# Copyright 2025 Amazon Web Services
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this
+# software and associated documentation files (the "Software"), to deal in the Software
+# without restriction, including without limitation the rights to use, copy, modify,
+# merge, publish, distribute, sublicense, and/or sell copies of the Software, and to
+# permit persons to whom the Software is furnished to do so.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED,
+# INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A
+# PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT
+# HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE
+# SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+import unittest
+
+from recommendations import RecommendationSearch
+
+
+class TransportError(Exception):
+    def __init__(self, status_code, info):
+        super().__init__(status_code, info)
+        self.status_code = status_code
+        self.info = info
+
+
+THROTTLED = {"error": {"type": "status_exception", "reason": "Request throttled"}, "status": 429}
+
+
+class FakeIndex:
+    """
+    Exact kNN over documents with a one dimensional embedding, the similarity is -|a - b|. The first `throttled`
+    searches fail with a 429.
+    """
+
+    def __init__(self, documents, efficient_filter=True, throttled=0):
+        self.documents = documents
+        self.efficient_filter = efficient_filter
+        self.throttled = throttled
+        self.requests = []
+
+    def _matches(self, document, query_filter):
+        return all(document[field] == value for term in query_filter["bool"]["filter"]
+                   for field, value in term["term"].items())
+
+    def _search(self, body):
+        if self.throttled:
+            self.throttled -= 1
+            return THROTTLED
+        knn = body["query"]["knn"]["embeddings"]
+        if "filter" in knn and not self.efficient_filter:
+            return {"error": {"type": "illegal_argument_exception", "reason": "Engine [NMSLIB] does not support filters"},
+                    "status": 400}
+        candidates = [d for d in self.documents if "filter" not in knn or self._matches(d, knn["filter"])]
+        candidates = sorted(candidates, key=lambda d: abs(d["embeddings"] - knn["vector"]))[:knn["k"]]
+        if "post_filter" in body:
+            candidates = [d for d in candidates if self._matches(d, body["post_filter"])]
+        hits = [{"_score": -abs(d["embeddings"] - knn["vector"]), "_source": d} for d in candidates[:body["size"]]]
+        return {"hits": {"hits": hits}}
+
+    def search(self, index, body):
+        self.requests.append("search")
+        response = self._search(body)
+        if "error" in response:
+            raise TransportError(response["status"], response)
+        return response
+
+    def msearch(self, body):
+        self.requests.append("msearch")
+        return {"responses": [self._search(query) for query in body[1::2]]}
+
+
+def documents():
+    # The nearest images of the embedding 0.0 are of other nodes
+    return [
+        {"image_s3_uri": f"s3://imgs/{node}_{objective}_{i}.jpg", "embeddings": i + offset, "results": 100 - i,
+         "node": node, "objective": objective, "image_description": "", "img_element_list": ""}
+        for node, objective, offset in (("followers", "clicks", 50), ("reach", "clicks", 0), ("reach", "likes", 10))
+        for i in range(20)
+    ]
+
+
+class TestRecommendationSearch(unittest.TestCase):
+    def test_filter_inside_knn_returns_k_images(self):
+        index = FakeIndex(documents())
+        references = RecommendationSearch(index, "embeddings", k=5).search(0.0, "followers", "clicks")
+
+        self.assertEqual(len(references), 5)
+        self.assertEqual(index.requests, ["search"])
+        self.assertEqual([r["score"] for r in references], [100, 99, 98, 97, 96])
+
+    def test_several_nodes_and_objectives_in_one_msearch(self):
+        index = FakeIndex(documents())
+        search = RecommendationSearch(index, "embeddings", k=3)
+        references = search.search(0.0, ["followers", "reach"], ["clicks", "likes"], rank_by="similarity")
+
+        self.assertEqual(index.requests, ["msearch"])
+        # followers-likes has no images
+        self.assertEqual(len(references), 9)
+        self.assertEqual(references[0]["url"], "s3://imgs/reach_clicks_0.jpg")
+        self.assertEqual({r["metric"] for r in references}, {"clicks", "likes"})
+
+    def test_falls_back_to_post_filter_when_the_engine_rejects_it(self):
+        for nodes in ("followers", ["followers", "reach"]):
+            index = FakeIndex(documents(), efficient_filter=False)
+            search = RecommendationSearch(index, "embeddings", k=5)
+
+            references = search.search(0.0, nodes, "clicks")
+            self.assertFalse(search.efficient_filter)
+            self.assertEqual(len(index.requests), 2)
+            self.assertTrue(references)
+
+            # Remembered for the next invocations of the container
+            search.search(0.0, nodes, "clicks")
+            self.assertEqual(len(index.requests), 3)
+
+    def test_throttled_searches_are_retried_without_leaving_the_knn_filter(self):
+        for nodes in ("followers", ["followers", "reach"]):
+            index = FakeIndex(documents(), throttled=2)
+            search = RecommendationSearch(index, "embeddings", k=5, sleep=lambda _: None)
+
+            references = search.search(0.0, nodes, "clicks")
+            self.assertTrue(search.efficient_filter)
+            self.assertEqual(len(references), 5 * (1 if isinstance(nodes, str) else 2))
+
+    def test_persistent_throttling_fails_the_search(self):
+        index = FakeIndex(documents(), throttled=10)
+        search = RecommendationSearch(index, "embeddings", k=5, max_attempts=3, sleep=lambda _: None)
+
+        with self.assertRaises(RuntimeError):
+            search.search(0.0, "followers", "clicks")
+        self.assertEqual(len(index.requests), 3)
+        self.assertTrue(search.efficient_filter)
+
+    def test_other_errors_keep_the_knn_filter(self):
+        index = FakeIndex(documents())
+        index.msearch = lambda body: {"responses": [
+            {"error": {"type": "index_not_found_exception", "reason": "no such index [embeddings]"}, "status": 404}
+        ] * 2}
+        search = RecommendationSearch(index, "embeddings", k=5, sleep=lambda _: None)
+
+        with self.assertRaises(RuntimeError):
+            search.search(0.0, ["followers", "reach"], "clicks")
+        self.assertTrue(search.efficient_filter)
+
+if __name__ == "__main__":
+    unittest.main()
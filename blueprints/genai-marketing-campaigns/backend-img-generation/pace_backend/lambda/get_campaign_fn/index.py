@@ -17,10 +17,14 @@
 
 import os
 import logging
+import base64
 import boto3
 import json
 import decimal
 
+from boto3.dynamodb.conditions import Attr, Key
+from botocore.exceptions import ClientError, ParamValidationError
+
 logger = logging.getLogger()
 logger.setLevel(os.getenv("LOG_LEVEL"))
 
@@ -28,24 +32,71 @@ CAMPAIGN_TABLE_NAME = os.getenv("CAMPAIGN_TABLE_NAME")
 HISTORIC_TABLE_NAME = os.getenv("HISTORIC_TABLE_NAME")
 campaignTable = boto3.resource("dynamodb").Table(CAMPAIGN_TABLE_NAME)
 
+# Campaigns of an owner by creation date, with the summary attributes only
+OWNER_INDEX = "owner_created_at"
+SUMMARY_ATTRIBUTES = ["id", "#name", "campaign_description", "objective", "#node", "#status", "created_at"]
+SUMMARY_NAMES = {"#name": "name", "#node": "node", "#status": "status"}
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 100
+
 class DecimalEncoder(json.JSONEncoder):
     def default(self, o):
         if isinstance(o, decimal.Decimal):
             return str(o)
         return super().default(o)
 
-lambda_response = {
-    "statusCode": 200,
-    "headers": {
-        "Content-Type": "application/json",
-        "Access-Control-Allow-Origin": "*",
-        "Access-Control-Allow-Credentials": True,
-    },
-    "body": {},
-}
+def new_lambda_response():
+    return {
+        "statusCode": 200,
+        "headers": {
+            "Content-Type": "application/json",
+            "Access-Control-Allow-Origin": "*",
+            "Access-Control-Allow-Credentials": True,
+        },
+        "body": {},
+    }
+
+def encode_cursor(last_evaluated_key):
+    if not last_evaluated_key:
+        return None
+    return base64.urlsafe_b64encode(json.dumps(last_evaluated_key).encode()).decode()
+
+def decode_cursor(cursor):
+    return json.loads(base64.urlsafe_b64decode(cursor.encode()))
+
+def get_owner(event):
+    """The Cognito user of the request"""
+    return event["requestContext"]["authorizer"]["claims"]["sub"]
+
+def list_campaigns(owner, limit=DEFAULT_PAGE_SIZE, cursor=None, status=None):
+    """
+    A page of the campaigns of an owner, newest first, with the summary attributes only.
+
+    With a status, the page only has the campaigns in that status, and can have fewer than limit campaigns even
+    when there are more pages.
+
+    Returns:
+        Dict with the campaigns of the page as items, and the next_cursor of the next page (None on the last page)
+    """
+    kwargs = dict(
+        IndexName=OWNER_INDEX,
+        KeyConditionExpression=Key("owner").eq(owner),
+        ProjectionExpression=", ".join(SUMMARY_ATTRIBUTES),
+        ExpressionAttributeNames=SUMMARY_NAMES,
+        ScanIndexForward=False,
+        Limit=limit,
+    )
+    if cursor:
+        kwargs["ExclusiveStartKey"] = decode_cursor(cursor)
+    if status:
+        kwargs["FilterExpression"] = Attr("status").eq(status)
+
+    ans = campaignTable.query(**kwargs)
+    return {"items": ans["Items"], "next_cursor": encode_cursor(ans.get("LastEvaluatedKey"))}
 
 def handler(event, context):
     logger.debug("Received event: " + json.dumps(event))
+    lambda_response = new_lambda_response()
     method = event["httpMethod"]
     path = event["path"]
     pathParts = path.split('/')
@@ -63,11 +114,18 @@ def handler(event, context):
 
     result = None
     if uid == None:
-      ans = campaignTable.scan()
-      result = ans['Items']
-      while "LastEvaluatedKey" in ans.keys() and ans['LastEvaluatedKey'] != []:
-        ans = campaignTable.scan(ExclusiveStartKey = ans['LastEvaluatedKey'])
-        result.extend(ans['Items'])
+      params = event.get("queryStringParameters") or {}
+      try:
+        limit = max(1, min(int(params.get("limit", DEFAULT_PAGE_SIZE)), MAX_PAGE_SIZE))
+        result = list_campaigns(get_owner(event), limit, params.get("cursor"), params.get("status"))
+      except (ValueError, TypeError, ClientError, ParamValidationError) as e:
+        # A cursor that is not a next_cursor of this owner is rejected by DynamoDB (or by boto3)
+        if isinstance(e, ClientError) and e.response["Error"]["Code"] != "ValidationException":
+          raise
+        lambda_response["statusCode"] = 400
+        lambda_response["body"]["message"] = "Bad Request. Bad query parameters"
+
+        return lambda_response
 
     else:
       ans = campaignTable.get_item(Key={'id':uid})
@@ -20,12 +20,15 @@ import logging
 import json
 import boto3
 
+from campaign_repository import CampaignNotFound, CampaignRepository, CampaignUpdate
+
 logger = logging.getLogger()
 logger.setLevel(os.getenv("LOG_LEVEL"))
 
 CAMPAIGN_TABLE_NAME = os.getenv("CAMPAIGN_TABLE_NAME")
 HISTORIC_TABLE_NAME = os.getenv("HISTORIC_TABLE_NAME")
 campaignTable = boto3.resource("dynamodb").Table(CAMPAIGN_TABLE_NAME)
+campaigns = CampaignRepository(campaignTable)
 
 lambda_response = {
     "statusCode": 200,
@@ -52,13 +55,11 @@ def handler(event, context):
 
     uid = pathParts[-1]
 
-    ans = campaignTable.get_item(Key={'id':uid})
     # Get attributes for campaign
 
     try:
         body = json.loads(event["body"])
         prompt = body["user_prompt"]
-        campaign = ans["Item"]
     except:
 
         lambda_response["statusCode"] = 200
@@ -69,11 +70,15 @@ def handler(event, context):
 
     answer = {"user_prompt": prompt}
 
-    #Update dynamo table
-    if not "image_prompt" in campaign:
-      campaign["image_prompt"] = {}
-    campaign["image_prompt"]["user_prompt"] = prompt
-    campaignTable.put_item(Item=campaign)
+    #Update dynamo table, only the user prompt is written
+    try:
+        campaigns.update(uid, CampaignUpdate(set={"image_prompt.user_prompt": prompt}))
+    except CampaignNotFound:
+
+        lambda_response["statusCode"] = 200
+        lambda_response["body"]["message"] = "Bad request. Malformed request"
+
+        return lambda_response
 
     lambda_response["statusCode"] = 200
     lambda_response["body"] = json.dumps(answer)
@@ -0,0 +1,216 @@
+# MIT No Attribution
+#
+# Copyright 2025 Amazon Web Services
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this
+# software and associated documentation files (the "Software"), to deal in the Software
+# without restriction, including without limitation the rights to use, copy, modify,
+# merge, publish, distribute, sublicense, and/or sell copies of the Software, and to
+# permit persons to whom the Software is furnished to do so.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED,
+# INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A
+# PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT
+# HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE
+# SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+"""
+Campaign reads and writes shared by the campaign functions, through the campaign repository layer. Every write is an
+UpdateExpression of the attributes that change, so concurrent steps of a campaign don't overwrite each other, and
+increments the version of the campaign for the optimistic locking of modify.
+"""
+
+import json
+import logging
+import random
+import time
+import uuid
+from dataclasses import dataclass, field
+from decimal import Decimal
+from typing import Callable, Optional
+
+from botocore.exceptions import ClientError
+
+logger = logging.getLogger()
+
+# Campaign steps, in order. A step never moves a campaign back to a previous status.
+STATUSES = ["created", "recommended", "generated"]
+
+
+class CampaignNotFound(Exception):
+    pass
+
+
+class ConcurrentUpdateError(Exception):
+    pass
+
+
+@dataclass
+class CampaignUpdate:
+    """
+    Attributes to change in a campaign. Names with dots are attributes of a map (image_prompt.user_prompt), the map
+    is created when the campaign doesn't have it.
+    """
+    set: dict = field(default_factory=dict)
+    # Lists appended to the current list, which is created when the campaign doesn't have it
+    append: dict = field(default_factory=dict)
+
+    def __bool__(self):
+        return bool(self.set or self.append)
+
+
+def to_dynamodb(value):
+    """Floats (scores from OpenSearch or model responses) as the Decimals DynamoDB accepts"""
+    return json.loads(json.dumps(value), parse_float=Decimal)
+
+
+def with_status(campaign: dict, status: str, changes: Optional[CampaignUpdate] = None) -> CampaignUpdate:
+    """For modify: the changes, and the status when it is later than the status of the campaign"""
+    changes = changes or CampaignUpdate()
+    current = campaign.get("status")
+    if current in STATUSES and STATUSES.index(current) >= STATUSES.index(status):
+        return changes
+    return CampaignUpdate(set={**changes.set, "status": status}, append=changes.append)
+
+
+class CampaignRepository:
+    def __init__(self, table, max_attempts: int = 8, base_delay: float = 0.05):
+        self.table = table
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+
+    def create(self, campaign: dict) -> str:
+        """
+        Store a new campaign with version 1, with a new id when the campaign doesn't have one.
+
+        Returns:
+            The id of the campaign
+        """
+        for _ in range(self.max_attempts):
+            item = {**to_dynamodb(campaign), "version": 1}
+            item.setdefault("id", str(uuid.uuid4()))
+            try:
+                self.table.put_item(Item=item, ConditionExpression="attribute_not_exists(id)")
+                return item["id"]
+            except ClientError as e:
+                if e.response["Error"]["Code"] != "ConditionalCheckFailedException" or "id" in campaign:
+                    raise
+        raise ConcurrentUpdateError("No free campaign id")
+
+    def get(self, uid: str, attributes: Optional[list] = None) -> Optional[dict]:
+        """
+        Read a campaign, or only some of its attributes (and its version).
+
+        Returns:
+            The campaign, None when it doesn't exist
+        """
+        kwargs = {"Key": {"id": uid}}
+        if attributes:
+            names = {f"#a{i}": name for i, name in enumerate(dict.fromkeys(["id", "version", *attributes]))}
+            kwargs["ProjectionExpression"] = ", ".join(names)
+            kwargs["ExpressionAttributeNames"] = names
+        return self.table.get_item(**kwargs).get("Item")
+
+    def _expression(self, changes: CampaignUpdate):
+        names, values, actions = {"#version": "version"}, {":one": 1, ":zero": 0}, []
+
+        def path(name):
+            parts = []
+            for part in name.split("."):
+                placeholder = f"#n{len(names)}"
+                names[placeholder] = part
+                parts.append(placeholder)
+            return ".".join(parts)
+
+        for name, value in changes.set.items():
+            values[f":v{len(values)}"] = to_dynamodb(value)
+            actions.append(f"{path(name)} = :v{len(values) - 1}")
+        if changes.append:
+            values[":empty"] = []
+        for name, value in changes.append.items():
+            values[f":v{len(values)}"] = to_dynamodb(list(value))
+            attribute = path(name)
+            actions.append(f"{attribute} = list_append(if_not_exists({attribute}, :empty), :v{len(values) - 1})")
+        actions.append("#version = if_not_exists(#version, :zero) + :one")
+        return "SET " + ", ".join(actions), names, values
+
+    def _create_maps(self, uid: str, changes: CampaignUpdate):
+        """Create the maps of the dotted attributes that the campaign doesn't have"""
+        for name in {name.split(".")[0] for name in [*changes.set, *changes.append] if "." in name}:
+            try:
+                self.table.update_item(
+                    Key={"id": uid},
+                    UpdateExpression="SET #map = :map",
+                    ConditionExpression="attribute_exists(id) AND attribute_not_exists(#map)",
+                    ExpressionAttributeNames={"#map": name},
+                    ExpressionAttributeValues={":map": {}},
+                )
+            except ClientError as e:
+                if e.response["Error"]["Code"] != "ConditionalCheckFailedException":
+                    raise
+
+    def update(self, uid: str, changes: CampaignUpdate, expected_version: Optional[int] = None) -> dict:
+        """
+        Write the changes of a campaign in one UpdateItem, only when it exists and, with expected_version, when
+        nobody changed it since it was read.
+
+        Returns:
+            The new values of the changed attributes and the new version
+
+        Raises:
+            CampaignNotFound: the campaign doesn't exist
+            ConcurrentUpdateError: the version of the campaign is not expected_version
+        """
+        expression, names, values = self._expression(changes)
+        condition = "attribute_exists(id)"
+        if expected_version == 0:
+            # Campaigns written before the versions
+            condition += " AND attribute_not_exists(#version)"
+        elif expected_version is not None:
+            condition += " AND #version = :expected"
+            values[":expected"] = expected_version
+
+        for attempt in range(2):
+            try:
+                return self.table.update_item(
+                    Key={"id": uid},
+                    UpdateExpression=expression,
+                    ConditionExpression=condition,
+                    ExpressionAttributeNames=names,
+                    ExpressionAttributeValues=values,
+                    ReturnValues="UPDATED_NEW",
+                )["Attributes"]
+            except ClientError as e:
+                code = e.response["Error"]["Code"]
+                # A map of a dotted attribute is missing
+                if code == "ValidationException" and "document path" in e.response["Error"]["Message"] and attempt == 0:
+                    self._create_maps(uid, changes)
+                    continue
+                if code != "ConditionalCheckFailedException":
+                    raise
+                if expected_version is None or not self.get(uid, ["id"]):
+                    raise CampaignNotFound(uid)
+                raise ConcurrentUpdateError(f"Campaign {uid} changed since version {expected_version}")
+
+    def modify(self, uid: str, fn: Callable[[dict], CampaignUpdate], attributes: Optional[list] = None) -> dict:
+        """
+        Read a campaign (or some of its attributes), compute its changes with fn, and write them if the campaign
+        didn't change in between; otherwise read it again and retry, with backoff.
+
+        Returns:
+            The new values of the changed attributes and the new version
+        """
+        for attempt in range(self.max_attempts):
+            campaign = self.get(uid, attributes)
+            if campaign is None:
+                raise CampaignNotFound(uid)
+            changes = fn(campaign)
+            if not changes:
+                return {}
+            try:
+                return self.update(uid, changes, expected_version=int(campaign.get("version", 0)))
+            except ConcurrentUpdateError:
+                logger.info(f"Campaign {uid} changed while updating it, attempt {attempt + 1}")
+                time.sleep(min(1.0, self.base_delay * 2 ** attempt) * random.uniform(0.5, 1.0))  # nosec B311
+        raise ConcurrentUpdateError(f"Campaign {uid} still changing after {self.max_attempts} attempts")
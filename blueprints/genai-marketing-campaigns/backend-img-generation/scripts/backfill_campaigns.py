@@ -0,0 +1,80 @@
+# MIT No Attribution
+#
+# Copyright 2025 Amazon Web Services
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this
+# software and associated documentation files (the "Software"), to deal in the Software
+# without restriction, including without limitation the rights to use, copy, modify,
+# merge, publish, distribute, sublicense, and/or sell copies of the Software, and to
+# permit persons to whom the Software is furnished to do so.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED,
+# INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A
+# PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT
+# HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE
+# SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+"""
+Gives the campaigns created before the listing index an owner, a creation time and a status, so that they are
+listed. Run it once with the Cognito user (sub) that will own them:
+
+    python scripts/backfill_campaigns.py --table <CampaignsTableName> --owner <cognito sub>
+"""
+
+import argparse
+from datetime import datetime, timezone
+
+import boto3
+from botocore.exceptions import ClientError
+
+
+def status_of(campaign):
+    if campaign.get("generated_images"):
+        return "generated"
+    if "image_references" in campaign:
+        return "recommended"
+    return "created"
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--table", required=True)
+    parser.add_argument("--owner", required=True)
+    args = parser.parse_args()
+
+    table = boto3.resource("dynamodb").Table(args.table)
+    created_at = datetime.now(timezone.utc).isoformat()
+    kwargs = dict(
+        FilterExpression="attribute_not_exists(#owner)",
+        ProjectionExpression="id, image_references, generated_images",
+        ExpressionAttributeNames={"#owner": "owner"},
+    )
+    updated = 0
+    while True:
+        ans = table.scan(**kwargs)
+        for campaign in ans["Items"]:
+            try:
+                table.update_item(
+                    Key={"id": campaign["id"]},
+                    UpdateExpression="SET #owner = :owner, created_at = :created_at, #status = :status",
+                    # Not a campaign that got an owner since the scan
+                    ConditionExpression="attribute_not_exists(#owner)",
+                    ExpressionAttributeNames={"#owner": "owner", "#status": "status"},
+                    ExpressionAttributeValues={
+                        ":owner": args.owner, ":created_at": created_at, ":status": status_of(campaign),
+                    },
+                )
+                updated += 1
+            except ClientError as e:
+                if e.response["Error"]["Code"] != "ConditionalCheckFailedException":
+                    raise
+        if "LastEvaluatedKey" not in ans:
+            break
+        kwargs["ExclusiveStartKey"] = ans["LastEvaluatedKey"]
+
+    print(f"{updated} campaigns updated")
+
+
+if __name__ == "__main__":
+    main()
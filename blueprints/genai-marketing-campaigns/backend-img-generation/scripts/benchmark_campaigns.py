@@ -0,0 +1,188 @@
+# MIT No Attribution
+#
+# Copyright 2025 Amazon Web Services
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this
+# software and associated documentation files (the "Software"), to deal in the Software
+# without restriction, including without limitation the rights to use, copy, modify,
+# merge, publish, distribute, sublicense, and/or sell copies of the Software, and to
+# permit persons to whom the Software is furnished to do so.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED,
+# INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A
+# PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT
+# HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE
+# SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+"""
+Offline benchmark of the campaign listing against a moto campaigns table with the owner_created_at index of the
+stack, filled with --campaigns campaigns of --owners users, each with image references and generated images.
+
+    python scripts/benchmark_campaigns.py --campaigns 50000 --owners 50 --rtt-ms 10
+
+- scan: the previous listing, every page of a scan of the table with all the attributes
+- query: the first page of the campaigns of a user, the same with a status filter, and every page of a user
+
+moto answers in memory, --rtt-ms adds the round trip of a real DynamoDB endpoint to every call. moto walks the
+whole table on every scan page and query, so its latencies grow with the table more than DynamoDB's would. The read
+units are estimated as DynamoDB bills scans and queries: the size of the items read (the projected size for the
+index), in 4 KB units, halved for eventually consistent reads.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+import boto3
+
+from moto import mock_aws
+
+# The listing function
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "pace_backend", "lambda", "get_campaign_fn"))
+
+REGION = "us-east-1"
+TABLE = "bench-campaigns"
+STATUSES = ["created", "recommended", "generated"]
+
+
+def campaign(i, owners, start):
+    status = STATUSES[i % len(STATUSES)]
+    item = {
+        "id": f"{i:08d}-campaign",
+        "name": f"Campaign {i}",
+        "campaign_description": "Summer sale of the new collection for young adults in the city",
+        "campaign_concept": "Bright colors and outdoor scenes that show the freedom of summer " * 3,
+        "visual_concept": "A group of friends at the beach at sunset wearing the collection " * 2,
+        "image_description": "Friends at the beach at sunset",
+        "objective": "clicks",
+        "node": "followers",
+        "results": 0,
+        "owner": f"user-{i % owners:04d}",
+        "created_at": (start + timedelta(minutes=i)).isoformat(),
+        "status": status,
+    }
+    if status != "created":
+        item["image_references"] = [
+            {"url": f"s3://imgs/{i}_{n}.jpg", "metric": "clicks", "score": 100 - n,
+             "description": "A person smiling in front of a colorful wall " * 3, "img_elements": "person,wall,smile"}
+            for n in range(5)
+        ]
+    if status == "generated":
+        item["generated_images"] = [{"url": f"s3://processed/{i}/{n}.png"} for n in range(4)]
+    return item
+
+
+def create_table(client):
+    client.create_table(
+        TableName=TABLE,
+        KeySchema=[{"AttributeName": "id", "KeyType": "HASH"}],
+        AttributeDefinitions=[
+            {"AttributeName": "id", "AttributeType": "S"},
+            {"AttributeName": "owner", "AttributeType": "S"},
+            {"AttributeName": "created_at", "AttributeType": "S"},
+        ],
+        GlobalSecondaryIndexes=[{
+            "IndexName": "owner_created_at",
+            "KeySchema": [
+                {"AttributeName": "owner", "KeyType": "HASH"},
+                {"AttributeName": "created_at", "KeyType": "RANGE"},
+            ],
+            "Projection": {
+                "ProjectionType": "INCLUDE",
+                "NonKeyAttributes": ["name", "campaign_description", "objective", "node", "status"],
+            },
+        }],
+        BillingMode="PAY_PER_REQUEST",
+    )
+
+
+def size(item):
+    return len(json.dumps(item, default=str))
+
+
+def read_units(page_sizes):
+    return sum(-(-total // 4096) for total in page_sizes) / 2
+
+
+def report(name, elapsed, calls, items, page_sizes, body):
+    print(f"{name:<26} {elapsed * 1000:9.0f} ms  {calls:4d} calls  {items:6d} items  "
+          f"~{read_units(page_sizes):8.1f} RCU  response {len(body) / 1024:9.1f} KB")
+
+
+@mock_aws
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--campaigns", type=int, default=50_000)
+    parser.add_argument("--owners", type=int, default=50)
+    parser.add_argument("--rtt-ms", type=float, default=10.0)
+    args = parser.parse_args()
+
+    os.environ.update({"AWS_DEFAULT_REGION": REGION, "LOG_LEVEL": "WARNING", "CAMPAIGN_TABLE_NAME": TABLE})
+    create_table(boto3.client("dynamodb"))
+
+    import index
+
+    table = index.campaignTable
+    start = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    load_start = time.perf_counter()
+    with table.batch_writer() as writer:
+        for i in range(args.campaigns):
+            writer.put_item(Item=campaign(i, args.owners, start))
+    print(f"{args.campaigns} campaigns of {args.owners} users loaded in {time.perf_counter() - load_start:.0f} s, "
+          f"{args.rtt_ms:.0f} ms round trip")
+
+    calls, page_sizes = [], []
+    client = table.meta.client
+    client.meta.events.register("before-call.dynamodb", lambda **kwargs: calls.append(1))
+    if args.rtt_ms:
+        client.meta.events.register_first("before-send.dynamodb", lambda **kwargs: time.sleep(args.rtt_ms / 1000))
+
+    def measure(name, fn):
+        del calls[:], page_sizes[:]
+        started = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - started
+        items = result if isinstance(result, list) else result["items"]
+        if not page_sizes:
+            page_sizes.append(sum(size(item) for item in items))
+        report(name, elapsed, len(calls), len(items), page_sizes, json.dumps(result, cls=index.DecimalEncoder))
+
+    def scan():
+        ans = table.scan()
+        result = ans["Items"]
+        page_sizes.append(sum(size(item) for item in ans["Items"]))
+        while "LastEvaluatedKey" in ans:
+            ans = table.scan(ExclusiveStartKey=ans["LastEvaluatedKey"])
+            result.extend(ans["Items"])
+            page_sizes.append(sum(size(item) for item in ans["Items"]))
+        return result
+
+    # The filter runs after the read: a filtered page is billed for every campaign the query went through
+    first_page = sum(size(item) for item in index.list_campaigns("user-0007")["items"])
+
+    def page(status=None):
+        page_sizes.append(first_page)
+        return index.list_campaigns("user-0007", status=status)
+
+    def every_page():
+        result, cursor = [], None
+        while True:
+            ans = index.list_campaigns("user-0007", limit=index.MAX_PAGE_SIZE, cursor=cursor)
+            result.extend(ans["items"])
+            page_sizes.append(sum(size(item) for item in ans["items"]))
+            cursor = ans["next_cursor"]
+            if not cursor:
+                return result
+
+    measure("scan (previous)", scan)
+    measure("query, first page", page)
+    measure("query, status generated", lambda: page("generated"))
+    measure("query, every page of user", every_page)
+
+
+if __name__ == "__main__":
+    main()
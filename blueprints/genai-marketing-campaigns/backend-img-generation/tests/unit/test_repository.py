@@ -0,0 +1,124 @@
+# MIT No Attribution
+#
+# Copyright 2025 Amazon Web Services
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this
+# software and associated documentation files (the "Software"), to deal in the Software
+# without restriction, including without limitation the rights to use, copy, modify,
+# merge, publish, distribute, sublicense, and/or sell copies of the Software, and to
+# permit persons to whom the Software is furnished to do so.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED,
+# INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A
+# PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT
+# HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE
+# SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+import os
+import sys
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+import boto3
+
+from moto import mock_aws
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "pace_backend", "shared"))
+
+from campaign_repository import (
+    CampaignNotFound, CampaignRepository, CampaignUpdate, ConcurrentUpdateError, with_status
+)
+
+TABLE = "test-campaigns"
+
+
+@mock_aws
+class TestCampaignRepository(unittest.TestCase):
+    def setUp(self):
+        dynamodb = boto3.resource("dynamodb", region_name="us-east-1")
+        self.table = dynamodb.create_table(
+            TableName=TABLE,
+            KeySchema=[{"AttributeName": "id", "KeyType": "HASH"}],
+            AttributeDefinitions=[{"AttributeName": "id", "AttributeType": "S"}],
+            BillingMode="PAY_PER_REQUEST",
+        )
+        self.repository = CampaignRepository(self.table, max_attempts=12, base_delay=0.005)
+        self.uid = self.repository.create({"name": "Summer", "status": "created"})
+        # DynamoDB applies every request atomically, moto doesn't lock its tables: one request at a time, after a
+        # round trip that lets concurrent steps interleave
+        lock = threading.Lock()
+
+        def send(**kwargs):
+            time.sleep(0.002)
+            lock.acquire()
+
+        events = self.table.meta.client.meta.events
+        events.register_first("before-send.dynamodb", send)
+        events.register_first("needs-retry.dynamodb", lambda **kwargs: lock.release())
+
+    def test_concurrent_steps_keep_every_change(self):
+        def step(i):
+            if i % 4 == 0:
+                self.repository.update(self.uid, CampaignUpdate(set={"image_prompt.user_prompt": f"user {i}"}))
+            elif i % 4 == 1:
+                self.repository.update(self.uid, CampaignUpdate(set={"image_prompt.ai_prompt": f"ai {i}"}))
+            elif i % 4 == 2:
+                self.repository.modify(self.uid, lambda campaign: with_status(
+                    campaign, "recommended", CampaignUpdate(set={"image_references": [{"url": f"s3://r/{i}", "score": 1.5}]})
+                ), ["status"])
+            else:
+                self.repository.modify(self.uid, lambda campaign: with_status(
+                    campaign, "generated", CampaignUpdate(append={"generated_images": [{"url": f"s3://g/{i}"}]})
+                ), ["status"])
+
+        with ThreadPoolExecutor(8) as pool:
+            list(pool.map(step, range(40)))
+
+        campaign = self.repository.get(self.uid)
+        self.assertEqual(campaign["name"], "Summer")
+        self.assertEqual(len(campaign["generated_images"]), 10)
+        self.assertEqual(len({image["url"] for image in campaign["generated_images"]}), 10)
+        self.assertEqual(set(campaign["image_prompt"]), {"user_prompt", "ai_prompt"})
+        self.assertEqual(campaign["status"], "generated")
+        # One version per write
+        self.assertEqual(campaign["version"], 41)
+
+    def test_modify_retries_when_the_campaign_changes_in_between(self):
+        calls = []
+
+        def fn(campaign):
+            calls.append(campaign["version"])
+            if len(calls) == 1:
+                self.repository.update(self.uid, CampaignUpdate(set={"status": "generated"}))
+            return with_status(campaign, "recommended", CampaignUpdate(set={"image_references": []}))
+
+        self.repository.modify(self.uid, fn, ["status"])
+
+        campaign = self.repository.get(self.uid)
+        self.assertEqual(calls, [1, 2])
+        # The status read by the retry is kept
+        self.assertEqual((campaign["status"], campaign["image_references"]), ("generated", []))
+
+    def test_stale_versions_and_missing_campaigns_are_rejected(self):
+        self.repository.update(self.uid, CampaignUpdate(set={"name": "Winter"}), expected_version=1)
+        with self.assertRaises(ConcurrentUpdateError):
+            self.repository.update(self.uid, CampaignUpdate(set={"name": "Spring"}), expected_version=1)
+        with self.assertRaises(CampaignNotFound):
+            self.repository.update("missing", CampaignUpdate(set={"name": "Spring"}))
+        with self.assertRaises(CampaignNotFound):
+            self.repository.modify("missing", lambda campaign: CampaignUpdate(set={"name": "Spring"}))
+
+        self.assertEqual(self.repository.get(self.uid, ["name"]), {"id": self.uid, "version": 2, "name": "Winter"})
+        self.assertIsNone(self.table.get_item(Key={"id": "missing"}).get("Item"))
+
+    def test_campaigns_without_version(self):
+        self.table.put_item(Item={"id": "legacy", "name": "Old"})
+        self.repository.modify("legacy", lambda campaign: CampaignUpdate(set={"name": "Old!"}))
+        self.assertEqual(self.repository.get("legacy"), {"id": "legacy", "name": "Old!", "version": 1})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -102,7 +102,7 @@ class PACEBackendStack(Stack):
             imgs_bucket=self.imgs_bucket,
             oss_data_indexing_role=oss_data_indexing_role,
             oss_host=self.oss_embeddings_index.oss_embeddings_collection.attr_collection_endpoint,
-            oss_index_name=oss_embeddings_index_name.value_as_string,
+            oss_index_name=self.oss_embeddings_index.index_name,
         )
 
         #Create API to index images
@@ -148,9 +148,16 @@ class PACEBackendStack(Stack):
             export_name=f"{Stack.of(self).stack_name}ImagesBucketName",
         )
 
+        CfnOutput(
+            self,
+            "BulkIndexFunctionName",
+            value=self.img_index_workflow.bulk_index_fn.function_name,
+            export_name=f"{Stack.of(self).stack_name}BulkIndexFunctionName",
+        )
+
         CfnOutput(
             self,
             "EmbeddingsIndexName",
-            value=oss_embeddings_index_name.value_as_string,
+            value=self.oss_embeddings_index.index_name,
             export_name=f"{Stack.of(self).stack_name}EmbeddingsIndexName",
         )
@@ -54,6 +54,14 @@ class IndexImgWorkflow(Construct):
             retention=logs.RetentionDays.ONE_MONTH,
         )
 
+        # Code shared by the functions of the workflow
+        shared_layer = lambda_python.PythonLayerVersion(
+            self,
+            "SharedLayer",
+            entry=os.path.join(os.path.dirname(os.path.dirname(os.path.realpath(__file__))), "shared"),
+            compatible_runtimes=[lambda_.Runtime.PYTHON_3_13],
+        )
+
         # A lambda function to extract the elements of the image
         describe_img_fn = lambda_python.PythonFunction(
             self,
@@ -62,12 +70,15 @@ class IndexImgWorkflow(Construct):
             index="index.py",
             handler="lambda_handler",
             runtime=lambda_.Runtime.PYTHON_3_13,
+            layers=[shared_layer],
             timeout=Duration.seconds(30),
-            memory_size=128,
+            # Images are decoded and scaled down in the function
+            memory_size=512,
             environment={
                 "LOG_LEVEL": "DEBUG",
                 "IMG_BUCKET": imgs_bucket.bucket_name,
-                "MODEL_ID": "us.amazon.nova-pro-v1:0"
+                "MODEL_ID": "us.amazon.nova-pro-v1:0",
+                "MAX_IMAGE_SIDE": "1024",
             },
         )
 
@@ -80,7 +91,8 @@ class IndexImgWorkflow(Construct):
             )
         )
 
-        imgs_bucket.grant_read(describe_img_fn)
+        # The prepared image is stored for the embeddings step
+        imgs_bucket.grant_read_write(describe_img_fn)
 
         NagSuppressions.add_resource_suppressions(
             describe_img_fn,
@@ -105,12 +117,14 @@ class IndexImgWorkflow(Construct):
             index="index.py",
             handler="lambda_handler",
             runtime=lambda_.Runtime.PYTHON_3_13,
+            layers=[shared_layer],
             timeout=Duration.seconds(60),
-            memory_size=128,
+            memory_size=512,
             environment={
                 "LOG_LEVEL": "DEBUG",
                 "IMG_BUCKET": imgs_bucket.bucket_name,
-                "REGION":  Stack.of(self).region
+                "REGION":  Stack.of(self).region,
+                "MAX_IMAGE_SIDE": "1024",
             },
         )
 
@@ -147,6 +161,7 @@ class IndexImgWorkflow(Construct):
             index="index.py",
             handler="lambda_handler",
             runtime=lambda_.Runtime.PYTHON_3_13,
+            layers=[shared_layer],
             timeout=Duration.seconds(10),
             environment={
                 "LOG_LEVEL": "INFO",
@@ -172,6 +187,61 @@ class IndexImgWorkflow(Construct):
             True
         )
 
+        # A lambda function to index a whole prefix or manifest of images: resize, embed and describe in
+        # parallel, bulk index and checkpoint the progress in the images bucket
+        self.bulk_index_fn = lambda_python.PythonFunction(
+            self,
+            "BulkIndexImgsFunction",
+            entry=f"{os.path.dirname(os.path.realpath(__file__))}/bulk_index_imgs_fn",
+            index="index.py",
+            handler="lambda_handler",
+            runtime=lambda_.Runtime.PYTHON_3_13,
+            layers=[shared_layer],
+            timeout=Duration.minutes(15),
+            memory_size=1024,
+            environment={
+                "LOG_LEVEL": "INFO",
+                "IMG_BUCKET": imgs_bucket.bucket_name,
+                "REGION": Stack.of(self).region,
+                "MODEL_ID": "us.amazon.nova-pro-v1:0",
+                "OSS_HOST": oss_host,
+                "OSS_EMBEDDINGS_INDEX_NAME": oss_index_name,
+                "RESIZE_CONCURRENCY": "8",
+                "EMBED_CONCURRENCY": "4",
+                "DESCRIBE_CONCURRENCY": "4",
+                "BULK_BATCH_SIZE": "50",
+                "MAX_IMAGE_SIDE": "1024",
+                "CHECKPOINT_PREFIX": "checkpoints/",
+            },
+            role=oss_data_indexing_role,
+        )
+
+        self.bulk_index_fn.add_to_role_policy(
+            iam.PolicyStatement(
+                effect=iam.Effect.ALLOW,
+                actions=["bedrock:InvokeModel"],
+                resources=[f"arn:aws:bedrock:*::foundation-model/*",
+                           f"arn:aws:bedrock:{Stack.of(self).region}:{Stack.of(self).account}:inference-profile/*"],
+            )
+        )
+
+        imgs_bucket.grant_read_write(self.bulk_index_fn)
+
+        NagSuppressions.add_resource_suppressions(
+            self.bulk_index_fn,
+            [
+                {
+                    "id": "AwsSolutions-IAM4",
+                    "reason": """Service role created by CDK""",
+                },
+                {
+                    "id": "AwsSolutions-IAM5",
+                    "reason": """Service role created by CDK""",
+                },
+            ],
+            True
+        )
+
         #Lambda step functions workflow definition
 
         describe_image_task = tasks.LambdaInvoke(
@@ -180,7 +250,8 @@ class IndexImgWorkflow(Construct):
             lambda_function=describe_img_fn,
             result_selector={
               "labels_list.$": "$.Payload.body.labels_list",
-              "description.$": "$.Payload.body.description"
+              "description.$": "$.Payload.body.description",
+              "prepared_key.$": "$.Payload.body.prepared_key"
             },
             result_path="$.img_desc",
         )
@@ -190,7 +261,8 @@ class IndexImgWorkflow(Construct):
             "EmbedImgTask",
             lambda_function=embed_img_fn,
             payload=sfn.TaskInput.from_object({
-              "img_key.$":"$.img_key"
+              "img_key.$":"$.img_key",
+              "prepared_key.$":"$.img_desc.prepared_key"
             }),
             result_selector={
               "embedding.$": "$.Payload.body.embedding.embedding"
@@ -0,0 +1,222 @@
+# MIT No Attribution
+#
+# Copyright 2025 Amazon Web Services
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this
+# software and associated documentation files (the "Software"), to deal in the Software
+# without restriction, including without limitation the rights to use, copy, modify,
+# merge, publish, distribute, sublicense, and/or sell copies of the Software, and to
+# permit persons to whom the Software is furnished to do so.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED,
+# INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A
+# PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT
+# HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE
+# SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+"""
+Offline benchmark of the bulk indexing pipeline. Synthetic camera sized JPEGs are stored in a moto bucket, the
+embedding and description models are fakes that sleep for their latency, and the index is a fake bulk API that
+sleeps per request and per document.
+
+    python benchmark_bulk.py --images 40 --concurrency 1 4 8 --batch-sizes 10 50
+
+- serial: one image at a time, the original image sent to both models and one index request (with a new client)
+  per image, as the Step Functions workflow does
+- bulk: the pipeline, for every concurrency and batch size
+- resume: a bulk run stopped half way, then run again with the same checkpoint
+"""
+
+import argparse
+import io
+import json
+import os
+import random
+import sys
+import threading
+import time
+
+import boto3
+
+from moto import mock_aws
+from PIL import Image
+
+# The shared layer of the function
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "shared"))
+
+from pipeline import BulkIndexPipeline, CheckpointStore, Stage, iter_manifest, iter_prefix
+from stages import make_download_and_resize, make_to_document
+
+REGION = "us-east-1"
+BUCKET = "bench-imgs"
+METADATA = {"results": 1000, "node": "Followers", "objective": "Clicks"}
+
+
+class FakeModels:
+    """Embedding and description models with a fixed latency, counting the calls and the image bytes sent"""
+
+    def __init__(self, embed_latency: float, describe_latency: float):
+        self.embed_latency = embed_latency
+        self.describe_latency = describe_latency
+        self.calls = 0
+        self.image_bytes = 0
+        self._lock = threading.Lock()
+
+    def _count(self, task):
+        with self._lock:
+            self.calls += 1
+            self.image_bytes += len(task["image_bytes"])
+
+    def embed(self, task: dict) -> dict:
+        self._count(task)
+        time.sleep(self.embed_latency)
+        task["embedding"] = [random.random() for _ in range(1024)]
+        return task
+
+    def describe(self, task: dict) -> dict:
+        self._count(task)
+        time.sleep(self.describe_latency)
+        task["description"] = "A synthetic image"
+        task["labels_list"] = ["noise", "gradient"]
+        task.pop("image_bytes")
+        return task
+
+
+class FakeBulkIndex:
+    """Bulk API with a latency per request and per document"""
+
+    def __init__(self, request_latency: float, document_latency: float, client_latency: float):
+        self.request_latency = request_latency
+        self.document_latency = document_latency
+        self.client_latency = client_latency
+        self.requests = 0
+        self.documents = []
+
+    def index_documents(self, documents):
+        self.requests += 1
+        time.sleep(self.request_latency + self.document_latency * len(documents))
+        self.documents.extend(documents)
+        return []
+
+    def index_one_with_new_client(self, document):
+        time.sleep(self.client_latency)
+        return self.index_documents([document])
+
+
+def synthetic_jpeg(seed: int, width: int, height: int) -> bytes:
+    # Smooth gradients with some grain, closer to the size and decoding cost of a photo than pure noise
+    gradient = Image.radial_gradient("L").resize((width, height))
+    noise = Image.effect_noise((width, height), 20 + seed % 10)
+    image = Image.merge("RGB", (gradient, Image.blend(gradient, noise, 0.3), noise))
+    buffer = io.BytesIO()
+    image.save(buffer, format="JPEG", quality=90)
+    return buffer.getvalue()
+
+
+def upload_images(s3, n_images: int, width: int, height: int):
+    template = synthetic_jpeg(0, width, height)
+    lines = []
+    for i in range(n_images):
+        key = f"original/img_{i:05d}.jpg"
+        s3.put_object(Bucket=BUCKET, Key=key, Body=template)
+        lines.append(json.dumps({"key": key, "metadata": METADATA}))
+    s3.put_object(Bucket=BUCKET, Key="manifests/bench.jsonl", Body="\n".join(lines))
+    return len(template)
+
+
+def run_serial(s3, args):
+    models = FakeModels(args.embed_latency, args.describe_latency)
+    index = FakeBulkIndex(args.request_latency, args.document_latency, args.client_latency)
+    to_document = make_to_document(BUCKET)
+
+    start = time.perf_counter()
+    for task in iter_prefix(s3, BUCKET, "original/", METADATA):
+        image_bytes = s3.get_object(Bucket=BUCKET, Key=task["img_key"])["Body"].read()
+        task["image_bytes"] = image_bytes
+        task = models.describe(task)
+        task["image_bytes"] = image_bytes
+        task = models.embed(task)
+        index.index_one_with_new_client(to_document(task))
+    return time.perf_counter() - start, models, index
+
+
+def bulk_pipeline(s3, args, concurrency, batch_size, checkpoint_key):
+    models = FakeModels(args.embed_latency, args.describe_latency)
+    index = FakeBulkIndex(args.request_latency, args.document_latency, args.client_latency)
+    pipeline = BulkIndexPipeline(
+        stages=[
+            Stage("resize", make_download_and_resize(s3, BUCKET), concurrency),
+            Stage("embed", models.embed, concurrency),
+            Stage("describe", models.describe, concurrency),
+        ],
+        to_document=make_to_document(BUCKET),
+        index_documents=index.index_documents,
+        checkpoint=CheckpointStore(s3, BUCKET, checkpoint_key),
+        workers=concurrency,
+        batch_size=batch_size,
+    )
+    return pipeline, models, index
+
+
+def report(name, seconds, n_images, models, index, extra=""):
+    print(
+        f"{name:<22} {seconds:>8.2f}s {n_images / seconds:>9.1f} img/s {index.requests:>6} index requests "
+        f"{models.image_bytes / max(models.calls, 1) / 1024:>8.0f} KB/model call {extra}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--images", type=int, default=40)
+    parser.add_argument("--width", type=int, default=3000)
+    parser.add_argument("--height", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 8])
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[10, 50])
+    parser.add_argument("--embed-latency", type=float, default=0.05)
+    parser.add_argument("--describe-latency", type=float, default=0.2)
+    parser.add_argument("--request-latency", type=float, default=0.03)
+    parser.add_argument("--document-latency", type=float, default=0.001)
+    parser.add_argument("--client-latency", type=float, default=0.05)
+    args = parser.parse_args()
+
+    with mock_aws():
+        s3 = boto3.client("s3", region_name=REGION)
+        s3.create_bucket(Bucket=BUCKET)
+        image_size = upload_images(s3, args.images, args.width, args.height)
+        print(f"{args.images} images of {args.width}x{args.height}, {image_size / 1024:.0f} KB each\n")
+
+        seconds, models, index = run_serial(s3, args)
+        report("serial", seconds, args.images, models, index)
+
+        for concurrency in args.concurrency:
+            for batch_size in args.batch_sizes:
+                pipeline, models, index = bulk_pipeline(
+                    s3, args, concurrency, batch_size, f"checkpoints/bench-{concurrency}-{batch_size}.json"
+                )
+                start = time.perf_counter()
+                stats = pipeline.run(iter_manifest(s3, BUCKET, "manifests/bench.jsonl"))
+                report(
+                    f"bulk c={concurrency} b={batch_size}", time.perf_counter() - start, args.images, models, index,
+                    f"stage seconds {stats.stage_seconds}",
+                )
+
+        # Stopped after half of the images, then resumed
+        concurrency, batch_size = max(args.concurrency), min(args.batch_sizes)
+        pipeline, models, index = bulk_pipeline(s3, args, concurrency, batch_size, "checkpoints/bench-resume.json")
+        submitted = iter(range(args.images))
+        first = pipeline.run(
+            iter_manifest(s3, BUCKET, "manifests/bench.jsonl"),
+            should_stop=lambda: next(submitted, args.images) >= args.images // 2,
+        )
+        images_first = models.calls // 2
+        second = pipeline.run(iter_manifest(s3, BUCKET, "manifests/bench.jsonl"))
+        print(
+            f"\nresume: first run indexed {first.indexed} (done={first.done}), second run skipped {second.skipped} "
+            f"and indexed {second.indexed} (done={second.done}); images sent to the models {images_first} + "
+            f"{models.calls // 2 - images_first} of {args.images}, {len(index.documents)} documents indexed"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+# MIT No Attribution
+#
+# Copyright 2025 Amazon Web Services
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this
+# software and associated documentation files (the "Software"), to deal in the Software
+# without restriction, including without limitation the rights to use, copy, modify,
+# merge, publish, distribute, sublicense, and/or sell copies of the Software, and to
+# permit persons to whom the Software is furnished to do so.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED,
+# INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A
+# PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT
+# HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE
+# SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+import hashlib
+import logging
+import os
+
+import boto3
+
+from botocore.config import Config
+from langchain_aws import ChatBedrockConverse
+from opensearchpy import OpenSearch, RequestsHttpConnection, AWSV4SignerAuth
+from opensearchpy.helpers import streaming_bulk
+
+from pipeline import BulkIndexPipeline, CheckpointStore, Stage, iter_manifest, iter_prefix
+from stages import ResultCache, make_describe, make_download_and_resize, make_embed, make_to_document
+
+logger = logging.getLogger()
+logger.setLevel(os.getenv("LOG_LEVEL"))
+
+IMG_BUCKET = os.getenv("IMG_BUCKET")
+REGION = os.getenv("REGION")
+MODEL_ID = os.getenv("MODEL_ID")
+OSS_HOST = os.getenv("OSS_HOST").replace("https://", "")
+OSS_EMBEDDINGS_INDEX_NAME = os.getenv("OSS_EMBEDDINGS_INDEX_NAME")
+
+RESIZE_CONCURRENCY = int(os.getenv("RESIZE_CONCURRENCY", 8))
+EMBED_CONCURRENCY = int(os.getenv("EMBED_CONCURRENCY", 4))
+DESCRIBE_CONCURRENCY = int(os.getenv("DESCRIBE_CONCURRENCY", 4))
+BULK_BATCH_SIZE = int(os.getenv("BULK_BATCH_SIZE", 50))
+MAX_IMAGE_SIDE = int(os.getenv("MAX_IMAGE_SIDE", 1024))
+CHECKPOINT_PREFIX = os.getenv("CHECKPOINT_PREFIX", "checkpoints/")
+
+# Stop taking new images when less than this is left of the Lambda timeout
+STOP_MARGIN_MS = 90 * 1000
+
+workers = max(RESIZE_CONCURRENCY, EMBED_CONCURRENCY, DESCRIBE_CONCURRENCY)
+client_config = Config(max_pool_connections=workers * 2, retries={"max_attempts": 8, "mode": "adaptive"})
+
+s3 = boto3.client("s3", config=client_config)
+bedrock_runtime = boto3.client(service_name="bedrock-runtime", region_name=REGION, config=client_config)
+
+img_desc_llm = ChatBedrockConverse(
+    model=MODEL_ID,
+    temperature=1,
+    max_tokens=500,
+    client=bedrock_runtime,
+)
+
+# One OpenSearch client per container
+oss_client = OpenSearch(
+    hosts=[{"host": OSS_HOST, "port": 443}],
+    http_auth=AWSV4SignerAuth(boto3.Session().get_credentials(), boto3.session.Session().region_name, "aoss"),
+    use_ssl=True,
+    verify_certs=True,
+    connection_class=RequestsHttpConnection,
+    pool_maxsize=workers,
+    timeout=300,
+)
+
+
+def index_documents(documents):
+    """
+    Bulk index, returns the positions of the documents that failed. Without retries the results come in the
+    order of the documents; failed images are not checkpointed and are retried by the next invocation.
+    """
+    actions = ({"_index": OSS_EMBEDDINGS_INDEX_NAME, "_source": document} for document in documents)
+    failed = []
+    for position, (ok, item) in enumerate(streaming_bulk(oss_client, actions, chunk_size=len(documents),
+                                                         raise_on_error=False, raise_on_exception=False)):
+        if not ok:
+            logger.error(f"Could not index {documents[position]['image_s3_uri']}: {item}")
+            failed.append(position)
+    return failed
+
+
+# Embeddings and descriptions of the images already processed by the container, by content hash
+result_cache = ResultCache()
+
+pipeline = BulkIndexPipeline(
+    stages=[
+        Stage("resize", make_download_and_resize(s3, IMG_BUCKET, MAX_IMAGE_SIDE), RESIZE_CONCURRENCY),
+        Stage("embed", make_embed(bedrock_runtime, cache=result_cache), EMBED_CONCURRENCY),
+        Stage("describe", make_describe(img_desc_llm, MODEL_ID, cache=result_cache), DESCRIBE_CONCURRENCY),
+    ],
+    to_document=make_to_document(IMG_BUCKET),
+    index_documents=index_documents,
+    workers=workers,
+    batch_size=BULK_BATCH_SIZE,
+)
+
+
+def lambda_handler(event, context):
+    """
+    Index every image of {"prefix": "original/", "metadata": {...}} or {"manifest_key": "manifests/batch.jsonl"}.
+    When the time runs out, or some images failed, the response has "done": false. Invoking the function again
+    with the same event resumes from the checkpoint and retries the failed images.
+    """
+
+    logger.info(event)
+
+    if "manifest_key" in event:
+        source = event["manifest_key"]
+        tasks = iter_manifest(s3, IMG_BUCKET, event["manifest_key"])
+    elif "prefix" in event and "metadata" in event:
+        source = event["prefix"]
+        tasks = iter_prefix(s3, IMG_BUCKET, event["prefix"], event["metadata"])
+    else:
+        raise ValueError("The event needs a manifest_key, or a prefix and metadata")
+
+    # Per index as well: the images of a source are indexed again into a new version of the index
+    source_id = hashlib.sha256(f"{OSS_EMBEDDINGS_INDEX_NAME}/{source}".encode()).hexdigest()[:16]
+    checkpoint_key = event.get("checkpoint_key", f"{CHECKPOINT_PREFIX}{source_id}.json")
+    pipeline.checkpoint = CheckpointStore(s3, IMG_BUCKET, checkpoint_key)
+
+    stats = pipeline.run(tasks, should_stop=lambda: context.get_remaining_time_in_millis() < STOP_MARGIN_MS)
+
+    logger.info(stats)
+    if stats.failed:
+        logger.error(f"{len(stats.failed)} images failed, invoke the function again to retry them")
+
+    return {
+        "statusCode": 200,
+        "body": {
+            "done": stats.done,
+            "indexed": stats.indexed,
+            "skipped": stats.skipped,
+            "failed": stats.failed,
+            "bulk_requests": stats.bulk_requests,
+            "stage_seconds": stats.stage_seconds,
+            "checkpoint_key": checkpoint_key,
+        },
+    }
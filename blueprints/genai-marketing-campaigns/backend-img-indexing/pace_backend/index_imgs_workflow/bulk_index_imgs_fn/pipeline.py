@@ -0,0 +1,251 @@
+# MIT No Attribution
+#
+# Copyright 2025 Amazon Web Services
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this
+# software and associated documentation files (the "Software"), to deal in the Software
+# without restriction, including without limitation the rights to use, copy, modify,
+# merge, publish, distribute, sublicense, and/or sell copies of the Software, and to
+# permit persons to whom the Software is furnished to do so.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED,
+# INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A
+# PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT
+# HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE
+# SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+"""
+Batch ingestion of images into the embeddings index.
+
+Images listed under an S3 prefix or in a JSON lines manifest are streamed through a sequence of stages
+(resize, embed, describe). Every stage has its own concurrency limit, so each model is called within its quota,
+and the documents are indexed in bulk requests. The keys indexed by every bulk request are added to a checkpoint,
+and a run that stops (time limit, failure) resumes where it left off.
+"""
+
+import json
+import logging
+import threading
+import time
+
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Set
+
+from botocore.exceptions import ClientError
+
+logger = logging.getLogger(__name__)
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png")
+
+
+def iter_prefix(s3_client, bucket: str, prefix: str, metadata: dict) -> Iterator[dict]:
+    """Every image under the prefix, with the same metadata"""
+    paginator = s3_client.get_paginator("list_objects_v2")
+    for page in paginator.paginate(Bucket=bucket, Prefix=prefix):
+        for obj in page.get("Contents", []):
+            if obj["Key"].lower().endswith(IMAGE_EXTENSIONS):
+                yield {"img_key": obj["Key"], "metadata": metadata}
+
+
+def iter_manifest(s3_client, bucket: str, manifest_key: str) -> Iterator[dict]:
+    """
+    A JSON lines manifest, read as a stream. Every line has the fields of the index image API:
+    {"key": "original/img.jpg", "metadata": {"results": 10, "node": "followers", "objective": "clicks"}}
+    """
+    body = s3_client.get_object(Bucket=bucket, Key=manifest_key)["Body"]
+    for line in body.iter_lines():
+        if line.strip():
+            item = json.loads(line)
+            yield {"img_key": item["key"], "metadata": item["metadata"]}
+
+
+class CheckpointStore:
+    """
+    Keys of the images already indexed, kept in S3. Every bulk request adds an object with its keys only, under
+    `<key>.batches/`. load() merges them into the `<key>` snapshot, so a run reads and writes all the keys once.
+    """
+
+    def __init__(self, s3_client, bucket: str, key: str):
+        self.s3_client = s3_client
+        self.bucket = bucket
+        self.key = key
+        self.batch_prefix = f"{key}.batches/"
+        self.next_batch = 0
+
+    def _read(self, key: str) -> List[str]:
+        try:
+            body = self.s3_client.get_object(Bucket=self.bucket, Key=key)["Body"].read()
+        except ClientError as e:
+            if e.response["Error"]["Code"] in ("NoSuchKey", "404"):
+                return []
+            raise
+        return json.loads(body)["completed"]
+
+    def _write(self, key: str, completed: Iterable[str]):
+        self.s3_client.put_object(
+            Bucket=self.bucket, Key=key, Body=json.dumps({"completed": list(completed)}),
+            ContentType="application/json",
+        )
+
+    def load(self) -> Set[str]:
+        completed = set(self._read(self.key))
+
+        paginator = self.s3_client.get_paginator("list_objects_v2")
+        batch_keys = [obj["Key"] for page in paginator.paginate(Bucket=self.bucket, Prefix=self.batch_prefix)
+                      for obj in page.get("Contents", [])]
+        if batch_keys:
+            for batch_key in batch_keys:
+                completed.update(self._read(batch_key))
+
+            # The snapshot is written before the batches are deleted, a failure in between only leaves duplicates
+            self._write(self.key, sorted(completed))
+            for start in range(0, len(batch_keys), 1000):
+                self.s3_client.delete_objects(
+                    Bucket=self.bucket,
+                    Delete={"Objects": [{"Key": batch_key} for batch_key in batch_keys[start:start + 1000]]},
+                )
+
+        self.next_batch = 0
+        return completed
+
+    def add(self, keys: List[str]):
+        """Record the keys indexed by one bulk request"""
+        self._write(f"{self.batch_prefix}{self.next_batch:08d}.json", keys)
+        self.next_batch += 1
+
+
+@dataclass
+class Stage:
+    """A step of the pipeline: fn receives and returns the task, at most `concurrency` run at the same time"""
+    name: str
+    fn: Callable[[dict], dict]
+    concurrency: int
+
+    def __post_init__(self):
+        self._slots = threading.BoundedSemaphore(self.concurrency)
+        self._lock = threading.Lock()
+        self.seconds = 0.0
+
+    def __call__(self, task: dict) -> dict:
+        with self._slots:
+            start = time.perf_counter()
+            try:
+                return self.fn(task)
+            finally:
+                with self._lock:
+                    self.seconds += time.perf_counter() - start
+
+
+@dataclass
+class RunStats:
+    indexed: int = 0
+    skipped: int = 0
+    failed: List[str] = field(default_factory=list)
+    bulk_requests: int = 0
+    # False when the run stopped before the end of the tasks, or some of them failed
+    done: bool = True
+    stage_seconds: Dict[str, float] = field(default_factory=dict)
+
+
+class BulkIndexPipeline:
+    """
+    @param stages: applied in order to every task ({"img_key", "metadata"})
+    @param to_document: builds the index document of a processed task
+    @param index_documents: indexes a batch of documents, returns the positions of the documents that failed
+    @param checkpoint: where the keys of the indexed images are kept
+    @param workers: images processed at the same time, the stages limit each step further
+    @param batch_size: documents per bulk request
+    """
+
+    def __init__(
+            self,
+            stages: List[Stage],
+            to_document: Callable[[dict], dict],
+            index_documents: Callable[[List[dict]], List[int]],
+            checkpoint: Optional[CheckpointStore] = None,
+            workers: int = 8,
+            batch_size: int = 50,
+    ):
+        self.stages = stages
+        self.to_document = to_document
+        self.index_documents = index_documents
+        self.checkpoint = checkpoint
+        self.workers = workers
+        self.batch_size = batch_size
+
+    def _process(self, task: dict) -> dict:
+        for stage in self.stages:
+            task = stage(task)
+        return task
+
+    def run(self, tasks: Iterable[dict], should_stop: Callable[[], bool] = lambda: False) -> RunStats:
+        """
+        Process and index the tasks not in the checkpoint. Stops taking new tasks once should_stop() is true;
+        the tasks in flight are still indexed and checkpointed, and RunStats.done is False. Failed tasks are not
+        checkpointed, they are listed in RunStats.failed and RunStats.done is False too.
+        """
+        stats = RunStats()
+        for stage in self.stages:
+            stage.seconds = 0.0
+        completed = self.checkpoint.load() if self.checkpoint else set()
+        batch = []  # (key, document)
+
+        def flush():
+            if not batch:
+                return
+            failed_positions = set(self.index_documents([document for _, document in batch]))
+            stats.bulk_requests += 1
+            indexed = []
+            for position, (key, _) in enumerate(batch):
+                if position in failed_positions:
+                    stats.failed.append(key)
+                else:
+                    indexed.append(key)
+            completed.update(indexed)
+            stats.indexed += len(indexed)
+            batch.clear()
+            if self.checkpoint and indexed:
+                self.checkpoint.add(indexed)
+
+        def collect(futures):
+            for future in futures:
+                key = in_flight.pop(future)
+                try:
+                    batch.append((key, self.to_document(future.result())))
+                except Exception as e:
+                    logger.error(f"Could not process {key}: {e}")
+                    stats.failed.append(key)
+                if len(batch) >= self.batch_size:
+                    flush()
+
+        in_flight = {}
+        pending = iter(tasks)
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            for task in pending:
+                if task["img_key"] in completed:
+                    stats.skipped += 1
+                    continue
+
+                if should_stop():
+                    stats.done = False
+                    break
+
+                # Bounded: the listing is only read as fast as images are processed
+                while len(in_flight) >= self.workers * 2:
+                    finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                    collect(finished)
+
+                in_flight[executor.submit(self._process, task)] = task["img_key"]
+
+            while in_flight:
+                finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                collect(finished)
+
+        flush()
+        if stats.failed:
+            stats.done = False
+        stats.stage_seconds = {stage.name: round(stage.seconds, 3) for stage in self.stages}
+        return stats
@@ -0,0 +1,144 @@
+# MIT No Attribution
+#
+# Copyright 2025 Amazon Web Services
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this
+# software and associated documentation files (the "Software"), to deal in the Software
+# without restriction, including without limitation the rights to use, copy, modify,
+# merge, publish, distribute, sublicense, and/or sell copies of the Software, and to
+# permit persons to whom the Software is furnished to do so.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED,
+# INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A
+# PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT
+# HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE
+# SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+"""
+The stages of the bulk indexing pipeline: the same steps as the DescribeImg, EmbedImg and IndexData functions,
+for an image kept in memory instead of a temporary file. The image is prepared once (image_preprocessing) and
+its bytes are shared by the embed and describe stages; identical copies of an image reuse its model results.
+"""
+
+import base64
+import json
+import threading
+
+from collections import OrderedDict
+
+from embedding_vectors import unit_vector
+from image_preprocessing import MAX_IMAGE_SIDE, prepare_image
+from prompts.describe_image_prompt_selector import get_describe_image_prompt_selector
+from structured_output.img_description import ImageDescription
+
+DESCRIBE_IMAGE_PROMPT_SELECTOR = get_describe_image_prompt_selector("en")
+
+
+class ResultCache:
+    """
+    Model results of the images already processed by the container, by the sha256 of the prepared image: identical
+    copies share them, different images with the same perceptual hash don't
+    """
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self.hits = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+        return None
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            if len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+def make_download_and_resize(s3_client, bucket: str, max_side: int = MAX_IMAGE_SIDE):
+    def download_and_resize(task: dict) -> dict:
+        image = prepare_image(s3_client.get_object(Bucket=bucket, Key=task["img_key"])["Body"].read(), max_side)
+        task["image_bytes"] = image.data
+        task["image_format"] = image.format
+        task["sha256"] = image.sha256
+        return task
+
+    return download_and_resize
+
+
+def make_embed(bedrock_runtime, model_id: str = "amazon.titan-embed-image-v1", dimension: int = 1024,
+               cache: ResultCache = None):
+    def embed(task: dict) -> dict:
+        cached = cache.get(("embed", task["sha256"])) if cache else None
+        if cached is not None:
+            task["embedding"] = cached
+            return task
+
+        response = bedrock_runtime.invoke_model(
+            body=json.dumps({
+                "inputImage": base64.b64encode(task["image_bytes"]).decode("utf8"),
+                "embeddingConfig": {"outputEmbeddingLength": dimension},
+            }),
+            modelId=model_id,
+            accept="application/json",
+            contentType="application/json",
+        )
+        task["embedding"] = json.loads(response.get("body").read())["embedding"]
+        if cache:
+            cache.put(("embed", task["sha256"]), task["embedding"])
+        return task
+
+    return embed
+
+
+def make_describe(llm, model_id: str, cache: ResultCache = None):
+    structured_img_desc = llm.with_structured_output(ImageDescription)
+    prompt = DESCRIBE_IMAGE_PROMPT_SELECTOR.get_prompt(model_id).format(
+        json_schema=ImageDescription.model_json_schema()
+    )
+
+    def describe(task: dict) -> dict:
+        cached = cache.get(("describe", task["sha256"])) if cache else None
+        if cached is None:
+            img_description = structured_img_desc.invoke([
+                {"role": "user", "content": [{"text": prompt}]},
+                {"role": "user", "content": [
+                    {"image": {"format": task["image_format"], "source": {"bytes": task["image_bytes"]}}}
+                ]},
+            ])
+            cached = (img_description.description, img_description.elements)
+            if cache:
+                cache.put(("describe", task["sha256"]), cached)
+
+        task["description"], task["labels_list"] = cached
+        # The image is not needed anymore, release it before the document waits for its bulk request
+        task.pop("image_bytes")
+        return task
+
+    return describe
+
+
+def make_to_document(bucket: str):
+    def to_document(task: dict) -> dict:
+        """Same document as the IndexData function"""
+        metadata = task["metadata"]
+        return {
+            "id": task["img_key"].split("/")[-1].split(".")[0],
+            "results": metadata["results"],
+            "node": metadata["node"].lower(),
+            "objective": metadata["objective"].lower(),
+            "image_s3_uri": "s3://" + bucket + "/" + task["img_key"],
+            "image_description": task["description"],
+            "img_element_list": ",".join(task["labels_list"]),
+            "embeddings": unit_vector(task["embedding"]),
+        }
+
+    return to_document
@@ -0,0 +1,134 @@
+# MIT No Attribution
+#
+# Copyright 2025 Amazon Web Services
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this
+# software and associated documentation files (the "Software"), to deal in the Software
+# without restriction, including without limitation the rights to use, copy, modify,
+# merge, publish, distribute, sublicense, and/or sell copies of the Software, and to
+# permit persons to whom the Software is furnished to do so.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED,
+# INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A
+# PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT
+# HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE
+# SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+import json
+import unittest
+
+import boto3
+
+from moto import mock_aws
+
+from pipeline import BulkIndexPipeline, CheckpointStore, Stage, iter_manifest, iter_prefix
+
+BUCKET = "test-imgs"
+METADATA = {"results": 10, "node": "followers", "objective": "clicks"}
+
+
+def tasks(n):
+    return [{"img_key": f"original/img_{i}.jpg", "metadata": METADATA} for i in range(n)]
+
+
+class FakeIndex:
+    def __init__(self, failing=()):
+        self.failing = set(failing)
+        self.batches = []
+
+    def index_documents(self, documents):
+        self.batches.append([document["key"] for document in documents])
+        return [position for position, document in enumerate(documents) if document["key"] in self.failing]
+
+
+@mock_aws
+class TestBulkIndexPipeline(unittest.TestCase):
+    def setUp(self):
+        self.s3 = boto3.client("s3", region_name="us-east-1")
+        self.s3.create_bucket(Bucket=BUCKET)
+        self.checkpoint = CheckpointStore(self.s3, BUCKET, "checkpoints/test.json")
+        self.processed = []
+
+    def pipeline(self, index, fn=None, batch_size=3):
+        def process(task):
+            self.processed.append(task["img_key"])
+            return task
+
+        return BulkIndexPipeline(
+            stages=[Stage("process", fn or process, 2)],
+            to_document=lambda task: {"key": task["img_key"]},
+            index_documents=index.index_documents,
+            checkpoint=self.checkpoint,
+            workers=2,
+            batch_size=batch_size,
+        )
+
+    def test_indexes_in_batches_and_checkpoints(self):
+        index = FakeIndex()
+        stats = self.pipeline(index).run(tasks(7))
+
+        self.assertTrue(stats.done)
+        self.assertEqual(stats.indexed, 7)
+        self.assertEqual([len(batch) for batch in index.batches], [3, 3, 1])
+        self.assertEqual(self.checkpoint.load(), {task["img_key"] for task in tasks(7)})
+
+    def test_resumes_from_the_checkpoint(self):
+        submitted = iter(range(100))
+        first = self.pipeline(FakeIndex()).run(tasks(6), should_stop=lambda: next(submitted) >= 4)
+        self.assertFalse(first.done)
+        self.assertEqual(first.indexed, 4)
+
+        self.processed.clear()
+        second = self.pipeline(FakeIndex()).run(tasks(6))
+        self.assertTrue(second.done)
+        self.assertEqual(second.skipped, 4)
+        self.assertEqual(sorted(self.processed), ["original/img_4.jpg", "original/img_5.jpg"])
+
+    def test_failures_are_not_checkpointed(self):
+        def process(task):
+            if task["img_key"] == "original/img_1.jpg":
+                raise ValueError("Corrupt image")
+            return task
+
+        stats = self.pipeline(FakeIndex(failing={"original/img_2.jpg"}), fn=process).run(tasks(4))
+
+        self.assertFalse(stats.done)
+        self.assertEqual(sorted(stats.failed), ["original/img_1.jpg", "original/img_2.jpg"])
+        self.assertEqual(stats.indexed, 2)
+        self.assertEqual(self.checkpoint.load(), {"original/img_0.jpg", "original/img_3.jpg"})
+
+        # The next run retries the failed images only
+        self.processed.clear()
+        stats = self.pipeline(FakeIndex()).run(tasks(4))
+        self.assertTrue(stats.done)
+        self.assertEqual(sorted(self.processed), ["original/img_1.jpg", "original/img_2.jpg"])
+
+    def test_checkpoint_writes_the_keys_of_each_batch_only(self):
+        self.pipeline(FakeIndex()).run(tasks(7))
+
+        batches = self.s3.list_objects_v2(Bucket=BUCKET, Prefix="checkpoints/test.json.batches/")["Contents"]
+        bodies = [json.loads(self.s3.get_object(Bucket=BUCKET, Key=obj["Key"])["Body"].read()) for obj in batches]
+        self.assertEqual([len(body["completed"]) for body in bodies], [3, 3, 1])
+
+        # Loading merges the batches into the snapshot
+        self.assertEqual(self.checkpoint.load(), {task["img_key"] for task in tasks(7)})
+        self.assertNotIn("Contents", self.s3.list_objects_v2(Bucket=BUCKET, Prefix="checkpoints/test.json.batches/"))
+        self.assertEqual(CheckpointStore(self.s3, BUCKET, "checkpoints/test.json").load(),
+                         {task["img_key"] for task in tasks(7)})
+
+    def test_sources(self):
+        for key in ["original/a.jpg", "original/b.PNG", "original/notes.txt"]:
+            self.s3.put_object(Bucket=BUCKET, Key=key, Body=b"")
+        self.assertEqual(
+            [task["img_key"] for task in iter_prefix(self.s3, BUCKET, "original/", METADATA)],
+            ["original/a.jpg", "original/b.PNG"],
+        )
+
+        manifest = "\n".join(json.dumps({"key": task["img_key"], "metadata": METADATA}) for task in tasks(2))
+        self.s3.put_object(Bucket=BUCKET, Key="manifests/test.jsonl", Body=manifest + "\n")
+        self.assertEqual(list(iter_manifest(self.s3, BUCKET, "manifests/test.jsonl")), tasks(2))
+
+
+if __name__ == "__main__":
+    unittest.main()
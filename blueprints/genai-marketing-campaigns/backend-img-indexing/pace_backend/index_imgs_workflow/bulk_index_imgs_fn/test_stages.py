@@ -0,0 +1,82 @@
+# MIT No Attribution
+#
+# Copyright 2025 Amazon Web Services
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this
+# software and associated documentation files (the "Software"), to deal in the Software
+# without restriction, including without limitation the rights to use, copy, modify,
+# merge, publish, distribute, sublicense, and/or sell copies of the Software, and to
+# permit persons to whom the Software is furnished to do so.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED,
+# INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A
+# PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT
+# HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE
+# SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+import io
+import json
+import os
+import sys
+import unittest
+
+from PIL import Image, ImageDraw
+
+# The shared layer of the function
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "shared"))
+
+from image_preprocessing import prepare_image
+from stages import ResultCache, make_download_and_resize, make_embed
+
+
+def png(image) -> bytes:
+    buffer = io.BytesIO()
+    image.save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+class FakeS3:
+    def __init__(self, objects):
+        self.objects = objects
+
+    def get_object(self, Bucket, Key):
+        return {"Body": io.BytesIO(self.objects[Key])}
+
+
+class FakeEmbeddings:
+    """A different embedding per call"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def invoke_model(self, **kwargs):
+        self.calls += 1
+        return {"body": io.BytesIO(json.dumps({"embedding": [float(self.calls)]}).encode())}
+
+
+class TestStages(unittest.TestCase):
+    def test_model_results_are_cached_by_content_not_perceptual_hash(self):
+        plain = Image.new("RGB", (800, 600), (40, 90, 160))
+        ImageDraw.Draw(plain).ellipse((100, 100, 400, 400), fill=(230, 180, 40))
+        ImageDraw.Draw(plain).rectangle((450, 250, 750, 550), fill=(20, 140, 60))
+        # The same picture with a small overlay text: same perceptual hash, different image
+        overlay = plain.copy()
+        ImageDraw.Draw(overlay).text((20, 20), "SALE -20%", fill=(255, 255, 255))
+        s3 = FakeS3({"plain.png": png(plain), "copy.png": png(plain), "overlay.png": png(overlay)})
+
+        resize = make_download_and_resize(s3, "imgs")
+        bedrock = FakeEmbeddings()
+        embed = make_embed(bedrock, cache=ResultCache())
+        tasks = [resize({"img_key": key}) for key in ("plain.png", "copy.png", "overlay.png")]
+        self.assertEqual(prepare_image(png(plain)).phash, prepare_image(png(overlay)).phash)
+
+        embeddings = [embed(task)["embedding"] for task in tasks]
+
+        self.assertEqual(bedrock.calls, 2)
+        self.assertEqual(embeddings[0], embeddings[1])
+        self.assertNotEqual(embeddings[0], embeddings[2])
+
+
+if __name__ == "__main__":
+    unittest.main()
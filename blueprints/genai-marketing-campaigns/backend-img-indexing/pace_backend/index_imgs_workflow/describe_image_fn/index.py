@@ -19,12 +19,11 @@ import logging
 
 import boto3
 import os
-import base64
-
-#from PIL import Image
 
+from botocore.exceptions import ClientError
 from langchain_aws import ChatBedrockConverse
 
+from image_preprocessing import prepare_image, prepared_key
 from prompts.describe_image_prompt_selector import get_describe_image_prompt_selector
 from structured_output.img_description import ImageDescription
 import langchain_core
@@ -36,6 +35,7 @@ logger.setLevel(os.getenv("LOG_LEVEL"))
 
 IMG_BUCKET = os.getenv("IMG_BUCKET")
 MODEL_ID = os.getenv("MODEL_ID")
+MAX_IMAGE_SIDE = int(os.getenv("MAX_IMAGE_SIDE", 1024))
 
 DESCRIBE_IMAGE_PROMPT_SELECTOR = get_describe_image_prompt_selector("en")
 
@@ -51,36 +51,45 @@ img_desc_llm = ChatBedrockConverse(
     # other params...
 )
 
-lambda_response = {
-    "statusCode": 200,
-    "headers": {
-        "Content-Type": "application/json",
-        "Access-Control-Allow-Origin": "*",
-        "Access-Control-Allow-Credentials": True,
-    },
-    "body": {},
-}
+def new_lambda_response():
+    return {
+        "statusCode": 200,
+        "headers": {
+            "Content-Type": "application/json",
+            "Access-Control-Allow-Origin": "*",
+            "Access-Control-Allow-Credentials": True,
+        },
+        "body": {},
+    }
+
+def store_prepared_image(key, image):
+    try:
+        s3_client.head_object(Bucket=IMG_BUCKET, Key=key)
+        return
+    except ClientError as e:
+        if e.response['Error']['Code'] not in ('404', 'NoSuchKey'):
+            raise
+    s3_client.put_object(Bucket=IMG_BUCKET, Key=key, Body=image.data, ContentType=f"image/{image.format}")
+
 
 """Describe image using LLM"""
 def lambda_handler(event, context):
 
+    lambda_response = new_lambda_response()
+
     try:
 
         img_key = event['img_key']
 
-        #download image from S3 given bucket name and key
-        s3_response = s3_client.get_object(Bucket=IMG_BUCKET, Key=img_key)
-
-        image_bytes = s3_response['Body'].read()
-
-        #transform image to base64
-        image_b64 = base64.b64encode(s3_response['Body'].read()).decode('utf8')
+        #download image from S3 given bucket name and key, and prepare it for the models
+        image = prepare_image(s3_client.get_object(Bucket=IMG_BUCKET, Key=img_key)['Body'].read(), MAX_IMAGE_SIDE)
 
-        logger.info("image in bytes:\n")
-        logger.info(image_bytes)
+        logger.info(f"image {img_key}: {image.original_size} bytes, prepared {image.width}x{image.height} "
+                    f"{image.format} of {len(image.data)} bytes, phash {image.phash}")
 
-        logger.info("image in base64:\n")
-        logger.info(image_b64)
+        # The embeddings step reads the prepared image, identical copies of the image share it
+        image_key = prepared_key(image.sha256, image.format, MAX_IMAGE_SIDE)
+        store_prepared_image(image_key, image)
 
         # Ask the LLM to describe the image
         describe_image_prompt_template = DESCRIBE_IMAGE_PROMPT_SELECTOR.get_prompt(MODEL_ID)
@@ -101,9 +110,9 @@ def lambda_handler(event, context):
             "content": [
                 {
                     "image": {
-                        "format": 'jpeg',
+                        "format": image.format,
                         "source": {
-                            "bytes": image_bytes
+                            "bytes": image.data
                         }
                     }
                 }
@@ -118,6 +127,8 @@ def lambda_handler(event, context):
         lambda_response['statusCode'] = 201
         lambda_response['body']['labels_list'] = img_description.elements
         lambda_response['body']['description'] = img_description.description
+        lambda_response['body']['prepared_key'] = image_key
+        lambda_response['body']['phash'] = image.phash
         lambda_response['body']['msg'] = 'success'
 
     except Exception as e:
@@ -18,17 +18,18 @@
 import json
 import boto3
 import os
-import json
 import logging
-import tempfile
 import base64
 
+from image_preprocessing import prepare_image
+
 logger = logging.getLogger()
 logger.setLevel(os.getenv("LOG_LEVEL"))
 
 IMG_BUCKET = os.getenv("IMG_BUCKET")
 
 REGION = os.getenv("REGION")
+MAX_IMAGE_SIDE = int(os.getenv("MAX_IMAGE_SIDE", 1024))
 
 logger.info(f"REGION: {REGION}")
 
@@ -38,35 +39,31 @@ bedrock_runtime = boto3.client(
     region_name=REGION
 )
 
-lambda_response = {
-    "statusCode": 200,
-    "headers": {
-        "Content-Type": "application/json",
-        "Access-Control-Allow-Origin": "*",
-        "Access-Control-Allow-Credentials": True,
-    },
-    "body": {},
-}
-
-def encode_image(image_path: str = None,  # maximum 2048 x 2048 pixels
+def new_lambda_response():
+    return {
+        "statusCode": 200,
+        "headers": {
+            "Content-Type": "application/json",
+            "Access-Control-Allow-Origin": "*",
+            "Access-Control-Allow-Credentials": True,
+        },
+        "body": {},
+    }
+
+def encode_image(image_b64: str,  # maximum 2048 x 2048 pixels
             dimension: int = 1024,  # 1,024 (default), 384, 256
             model_id: str = "amazon.titan-embed-image-v1"
                  ):
     "Get img embedding using embeddings model"
 
-    payload_body = {}
+    payload_body = {"inputImage": image_b64}
     embedding_config = {
         "embeddingConfig": {
             "outputEmbeddingLength": dimension
         }
     }
 
-    with open(image_path, "rb") as image_file:
-        input_image = base64.b64encode(image_file.read()).decode('utf8')
-    payload_body["inputImage"] = input_image
-
     logger.debug("embedding image")
-    logger.debug(payload_body)
 
     response = bedrock_runtime.invoke_model(
         body=json.dumps({**payload_body, **embedding_config}),
@@ -85,14 +82,19 @@ def encode_image(image_path: str = None,  # maximum 2048 x 2048 pixels
 def lambda_handler(event, context):
 
     img_key = event["img_key"]
+    lambda_response = new_lambda_response()
 
     try:
-      
-        tmp_file = tempfile.mkdtemp() + '/img.jpg'
-        with open(tmp_file , 'wb') as f:
-            s3.download_fileobj(IMG_BUCKET, img_key, f)
 
-        feature_vector = encode_image(image_path=tmp_file, dimension=1024)
+        if event.get("prepared_key"):
+            # Already prepared by the describe step
+            image_bytes = s3.get_object(Bucket=IMG_BUCKET, Key=event["prepared_key"])['Body'].read()
+            image_b64 = base64.b64encode(image_bytes).decode('utf8')
+        else:
+            image = prepare_image(s3.get_object(Bucket=IMG_BUCKET, Key=img_key)['Body'].read(), MAX_IMAGE_SIDE)
+            image_b64 = image.b64()
+
+        feature_vector = encode_image(image_b64, dimension=1024)
 
         lambda_response['statusCode'] = 201
         lambda_response['body']['embedding'] = feature_vector
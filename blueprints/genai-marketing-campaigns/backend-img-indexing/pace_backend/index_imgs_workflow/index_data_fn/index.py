@@ -21,6 +21,8 @@ import logging
 
 from opensearchpy import OpenSearch, RequestsHttpConnection, AWSV4SignerAuth
 
+from embedding_vectors import unit_vector
+
 logger = logging.getLogger()
 logger.setLevel(os.getenv("LOG_LEVEL"))
 
@@ -33,21 +35,35 @@ service = 'aoss'
 OSS_HOST = os.getenv("OSS_HOST").replace("https://", "")
 OSS_EMBEDDINGS_INDEX_NAME = os.getenv("OSS_EMBEDDINGS_INDEX_NAME")
 
-lambda_response = {
-    "statusCode": 200,
-    "headers": {
-        "Content-Type": "application/json",
-        "Access-Control-Allow-Origin": "*",
-        "Access-Control-Allow-Credentials": True,
-    },
-    "body": {},
-}
+def new_lambda_response():
+    return {
+        "statusCode": 200,
+        "headers": {
+            "Content-Type": "application/json",
+            "Access-Control-Allow-Origin": "*",
+            "Access-Control-Allow-Credentials": True,
+        },
+        "body": {},
+    }
+
+
+# Built once per container, the connection is reused by the next invocations
+oss_client = OpenSearch(
+    hosts=[{'host': OSS_HOST, 'port': 443}],
+    http_auth=AWSV4SignerAuth(boto3.Session().get_credentials(), region, service),
+    use_ssl=True,
+    verify_certs=True,
+    connection_class=RequestsHttpConnection,
+    timeout=300
+)
 
 def lambda_handler(event, context):
 
     logger.debug("Received event")
     logger.debug(event)
 
+    lambda_response = new_lambda_response()
+
     try:
 
         photo_img_url = "s3://" + IMG_BUCKET + "/" + event['img_key']
@@ -63,22 +79,9 @@ def lambda_handler(event, context):
             "image_s3_uri": photo_img_url,
             "image_description": event["img_desc"],
             "img_element_list": labels_list_str,
-            "embeddings": embedding
+            "embeddings": unit_vector(embedding)
         }
 
-        credentials = boto3.Session().get_credentials()
-        auth = AWSV4SignerAuth(credentials, region, service)
-
-        # Build the OpenSearch client
-        oss_client = OpenSearch(
-            hosts=[{'host': OSS_HOST, 'port': 443}],
-            http_auth=auth,
-            use_ssl=True,
-            verify_certs=True,
-            connection_class=RequestsHttpConnection,
-            timeout=300
-        )
-
         oss_response = oss_client.index(
             index=OSS_EMBEDDINGS_INDEX_NAME,
             body=document,
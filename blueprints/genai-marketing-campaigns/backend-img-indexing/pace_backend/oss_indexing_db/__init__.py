@@ -30,12 +30,16 @@ from aws_cdk import (
     Names,
     Duration,
     CfnParameter,
+    Fn,
 )
 
 from constructs import Construct
 
 from cdk_nag import NagSuppressions
 
+# Version of the index mapping, v2 is the faiss engine (v1, the unversioned name, was nmslib)
+EMBEDDINGS_INDEX_VERSION = "faiss-v2"
+
 class OpenSearchServerlessEmbeddingsIndex(Construct):
     """A Construct to create an OpenSearch Serverless instance."""
 
@@ -112,6 +116,10 @@ class OpenSearchServerlessEmbeddingsIndex(Construct):
             )
         )
 
+        # The name of the index has the version of its mapping: a new mapping creates a new index next to the
+        # previous one, which can't be changed in place
+        self.index_name = Fn.join("-", [oss_embeddings_index_name.value_as_string, EMBEDDINGS_INDEX_VERSION])
+
         # Create OpenSearch Vector Index for storing the image embeddings
         create_open_search_index_fn = lambda_python.PythonFunction(
             self,
@@ -163,7 +171,7 @@ class OpenSearchServerlessEmbeddingsIndex(Construct):
             "CreateOpenSearchIndexCustomResource",
             service_token=create_open_search_index_provider.service_token,
             properties={
-                "IndexName": oss_embeddings_index_name.value_as_string,
+                "IndexName": self.index_name,
                 "Endpoint": self.oss_embeddings_collection.attr_collection_endpoint,
                 "Region": Stack.of(self).region,
             },
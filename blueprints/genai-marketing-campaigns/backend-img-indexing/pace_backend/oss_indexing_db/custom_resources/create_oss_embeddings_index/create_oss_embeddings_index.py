@@ -79,13 +79,17 @@ def handler(event, context: LambdaContext):
             raise e
 
     elif request_type == "Update":
-        logger.info(f"Updating index {index_name}")
+        # An index can't be changed in place (e.g. its knn engine), a new mapping comes with a new index name.
+        # The previous index is kept with its documents: the readers keep using it until they are configured
+        # with the new name, once the images are indexed again
+        old_index_name = event.get("OldResourceProperties", {}).get("IndexName")
+        logger.info(f"Updating index {old_index_name} to {index_name}")
         try:
-            delete_index(oss_client, index_name)
-            create_index(
-                oss_client,
-                index_name,
-            )
+            if not oss_client.indices.exists(index_name):
+                create_index(
+                    oss_client,
+                    index_name,
+                )
             cfnresponse.send(event, context, cfnresponse.SUCCESS, {"ok": True})
         except Exception as e:
             logger.error(e)
@@ -135,9 +139,11 @@ def create_index(
                 "embeddings": {
                     "type": "knn_vector",
                     "dimension": 1024,
+                    # faiss filters inside the knn clause (efficient filtering), nmslib only after it. faiss has
+                    # no cosine space: the documents and queries are unit vectors, so inner product is the cosine
                     "method": {
-                        "engine": "nmslib",
-                        "space_type": "cosinesimil",
+                        "engine": "faiss",
+                        "space_type": "innerproduct",
                         "name": "hnsw",
                         "parameters": {"ef_construction": 512, "m": 16}
                     }
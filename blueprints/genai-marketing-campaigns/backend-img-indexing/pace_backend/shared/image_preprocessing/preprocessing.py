@@ -0,0 +1,144 @@
+# MIT No Attribution
+#
+# Copyright 2025 Amazon Web Services
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this
+# software and associated documentation files (the "Software"), to deal in the Software
+# without restriction, including without limitation the rights to use, copy, modify,
+# merge, publish, distribute, sublicense, and/or sell copies of the Software, and to
+# permit persons to whom the Software is furnished to do so.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED,
+# INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A
+# PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT
+# HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE
+# SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+"""
+Preparation of the images sent to the embedding and description models.
+
+The image is decoded once, rotated as its EXIF orientation says, scaled down to fit in `max_side` pixels (keeping
+the aspect ratio) and re-encoded. Both models downsample large images internally, sending them at full resolution
+only adds payload and latency. The prepared image is stored and cached by the sha256 of its bytes; its perceptual
+hash only hints at near duplicates, different images can have the same perceptual hash.
+"""
+
+import base64
+import hashlib
+import io
+import math
+
+from dataclasses import dataclass
+
+from PIL import Image, ImageOps
+
+# Within the limits of Titan multimodal embeddings (2048 x 2048) and of the image inputs of Nova
+MAX_IMAGE_SIDE = 1024
+JPEG_QUALITY = 90
+
+HASH_SIZE = 8
+HASH_SAMPLE_SIZE = 32
+
+ORIENTATION_TAG = 0x0112
+
+# Formats sent as they are when they do not need to be scaled down or rotated
+MODEL_FORMATS = {"JPEG": "jpeg", "PNG": "png"}
+
+
+@dataclass
+class PreparedImage:
+    data: bytes
+    format: str  # "jpeg" or "png"
+    width: int
+    height: int
+    original_size: int
+    phash: str
+
+    def b64(self) -> str:
+        return base64.b64encode(self.data).decode("utf8")
+
+    @property
+    def sha256(self) -> str:
+        return hashlib.sha256(self.data).hexdigest()
+
+
+# Cosines of the 2D DCT, only the HASH_SIZE lowest frequencies are computed
+_DCT = [
+    [math.cos(math.pi * (2 * x + 1) * u / (2 * HASH_SAMPLE_SIZE)) for x in range(HASH_SAMPLE_SIZE)]
+    for u in range(HASH_SIZE)
+]
+
+
+def perceptual_hash(image: Image.Image) -> str:
+    """
+    DCT perceptual hash (pHash): 64 bits, one per low frequency coefficient of the 32 x 32 grayscale image, set
+    when the coefficient is above the median. Resized or re-encoded copies of an image have the same or a close
+    hash (see hamming_distance).
+    """
+    sample = image.convert("L").resize((HASH_SAMPLE_SIZE, HASH_SAMPLE_SIZE), Image.Resampling.LANCZOS)
+    pixels = list(sample.tobytes())
+    rows = [pixels[y * HASH_SAMPLE_SIZE:(y + 1) * HASH_SAMPLE_SIZE] for y in range(HASH_SAMPLE_SIZE)]
+
+    # Separable DCT: along the rows, then along the columns
+    row_coefficients = [[sum(c * p for c, p in zip(cosines, row)) for cosines in _DCT] for row in rows]
+    coefficients = [
+        sum(_DCT[v][y] * row_coefficients[y][u] for y in range(HASH_SAMPLE_SIZE))
+        for v in range(HASH_SIZE) for u in range(HASH_SIZE)
+    ]
+
+    # The DC coefficient (average brightness) is left out of the median
+    median = sorted(coefficients[1:])[len(coefficients[1:]) // 2]
+    bits = 0
+    for coefficient in coefficients:
+        bits = (bits << 1) | (coefficient > median)
+    return f"{bits:016x}"
+
+
+def hamming_distance(hash_a: str, hash_b: str) -> int:
+    return bin(int(hash_a, 16) ^ int(hash_b, 16)).count("1")
+
+
+def prepare_image(image_bytes: bytes, max_side: int = MAX_IMAGE_SIDE, quality: int = JPEG_QUALITY) -> PreparedImage:
+    """Decode, orient, scale down and re-encode an image, computing its perceptual hash on the way"""
+    with Image.open(io.BytesIO(image_bytes)) as image:
+        source_format = image.format
+        scale = max_side / max(image.size)
+        if scale < 1:
+            # JPEGs are decoded already scaled down (by 1/2, 1/4 or 1/8), most of the resize cost
+            image.draft("RGB", (math.ceil(image.width * scale), math.ceil(image.height * scale)))
+
+        rotated = image.getexif().get(ORIENTATION_TAG, 1) != 1
+        prepared = ImageOps.exif_transpose(image) if rotated else image
+        if max(prepared.size) > max_side:
+            prepared.thumbnail((max_side, max_side), Image.Resampling.LANCZOS)
+
+        phash = perceptual_hash(prepared)
+
+        if source_format in MODEL_FORMATS and scale >= 1 and not rotated and prepared.mode != "CMYK":
+            return PreparedImage(
+                data=image_bytes, format=MODEL_FORMATS[source_format], width=prepared.width,
+                height=prepared.height, original_size=len(image_bytes), phash=phash,
+            )
+
+        if prepared.mode in ("RGBA", "LA", "P"):
+            # Transparent areas are white, as an image viewer shows them
+            background = Image.new("RGB", prepared.size, (255, 255, 255))
+            background.paste(prepared, mask=prepared.convert("RGBA").getchannel("A"))
+            prepared = background
+
+        buffer = io.BytesIO()
+        prepared.convert("RGB").save(buffer, format="JPEG", quality=quality, optimize=True)
+
+        return PreparedImage(
+            data=buffer.getvalue(), format="jpeg", width=prepared.width, height=prepared.height,
+            original_size=len(image_bytes), phash=phash,
+        )
+
+
+def prepared_key(content_hash: str, image_format: str, max_side: int = MAX_IMAGE_SIDE) -> str:
+    """
+    S3 key of a prepared image, by the sha256 of its bytes: shared by the workflow steps and by identical copies of
+    the image, never by a different image with the same perceptual hash
+    """
+    return f"prepared/{max_side}/{content_hash}.{'png' if image_format == 'png' else 'jpg'}"
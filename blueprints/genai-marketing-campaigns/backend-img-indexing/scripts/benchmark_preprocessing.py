@@ -0,0 +1,103 @@
+# MIT No Attribution
+#
+# Copyright 2025 Amazon Web Services
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this
+# software and associated documentation files (the "Software"), to deal in the Software
+# without restriction, including without limitation the rights to use, copy, modify,
+# merge, publish, distribute, sublicense, and/or sell copies of the Software, and to
+# permit persons to whom the Software is furnished to do so.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED,
+# INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A
+# PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT
+# HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE
+# SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+"""
+Bytes sent to the models and request latency, with and without image preparation, across image sizes. Each image
+goes to a description model (raw bytes, Converse) and to an embedding model (base64, InvokeModel). The models are
+fakes whose simulated latency grows with the payload (upload) and with the pixels they have to downsample; the
+preparation time is measured.
+
+    python benchmark_preprocessing.py --sizes 640x480 1280x960 2048x1536 4032x3024 6000x4000
+
+- original: the image as stored, as describe_image_fn and get_img_embeddings_fn sent it
+- prepared: prepare_image once, the same bytes for both models
+"""
+
+import argparse
+import os
+import sys
+import time
+
+# The shared layer of the functions, and the test images
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.append(os.path.join(ROOT, "pace_backend", "shared"))
+sys.path.append(os.path.join(ROOT, "tests", "unit"))
+
+from image_preprocessing import MAX_IMAGE_SIDE, prepare_image
+from test_image_preprocessing import scene
+
+
+class FakeModel:
+    """
+    Simulated latency of a model call: a fixed part, the upload of the payload and the resize done by the service
+    """
+
+    def __init__(self, base_seconds: float, upload_mb_per_second: float, seconds_per_megapixel: float):
+        self.base_seconds = base_seconds
+        self.upload_mb_per_second = upload_mb_per_second
+        self.seconds_per_megapixel = seconds_per_megapixel
+
+    def latency(self, payload_bytes: int, width: int, height: int) -> float:
+        return (
+            self.base_seconds
+            + payload_bytes / (self.upload_mb_per_second * 1024 * 1024)
+            + width * height / 1e6 * self.seconds_per_megapixel
+        )
+
+
+def base64_size(n_bytes: int) -> int:
+    return 4 * ((n_bytes + 2) // 3)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", nargs="+", default=["640x480", "1280x960", "2048x1536", "4032x3024", "6000x4000"])
+    parser.add_argument("--max-side", type=int, default=MAX_IMAGE_SIDE)
+    parser.add_argument("--upload-mb-per-second", type=float, default=20.0)
+    parser.add_argument("--seconds-per-megapixel", type=float, default=0.01)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    describe = FakeModel(1.5, args.upload_mb_per_second, args.seconds_per_megapixel)
+    embed = FakeModel(0.1, args.upload_mb_per_second, args.seconds_per_megapixel)
+
+    print(f"{'size':>10} {'mode':>9} {'sent KB':>9} {'prepare ms':>11} {'model s':>8} {'total s':>8}")
+    for size in args.sizes:
+        width, height = (int(value) for value in size.split("x"))
+        original = scene(0, width, height, grain=0.15)
+
+        sent = len(original) + base64_size(len(original))
+        model_seconds = describe.latency(len(original), width, height) + \
+            embed.latency(base64_size(len(original)), width, height)
+        print(f"{size:>10} {'original':>9} {sent / 1024:>9.0f} {0:>11.1f} {model_seconds:>8.2f} {model_seconds:>8.2f}")
+
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            prepared = prepare_image(original, args.max_side)
+        prepare_seconds = (time.perf_counter() - start) / args.repeat
+
+        sent = len(prepared.data) + base64_size(len(prepared.data))
+        model_seconds = describe.latency(len(prepared.data), prepared.width, prepared.height) + \
+            embed.latency(base64_size(len(prepared.data)), prepared.width, prepared.height)
+        print(
+            f"{'':>10} {'prepared':>9} {sent / 1024:>9.0f} {prepare_seconds * 1000:>11.1f} {model_seconds:>8.2f} "
+            f"{model_seconds + prepare_seconds:>8.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+# MIT No Attribution
+#
+# Copyright 2025 Amazon Web Services
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this
+# software and associated documentation files (the "Software"), to deal in the Software
+# without restriction, including without limitation the rights to use, copy, modify,
+# merge, publish, distribute, sublicense, and/or sell copies of the Software, and to
+# permit persons to whom the Software is furnished to do so.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED,
+# INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A
+# PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT
+# HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE
+# SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+import io
+import os
+import random
+import sys
+import unittest
+
+from PIL import Image, ImageDraw
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "..", "pace_backend", "shared"))
+
+from image_preprocessing import hamming_distance, prepare_image, prepared_key
+
+
+def scene(seed: int, width: int, height: int, image_format: str = "JPEG", mode: str = "RGB", grain: float = 0.0) \
+        -> bytes:
+    """Gradient with random discs, and optionally some noise, closer to a photo"""
+    rnd = random.Random(seed)
+    image = Image.radial_gradient("L").resize((width, height)).convert(mode)
+    draw = ImageDraw.Draw(image)
+    for _ in range(12):
+        x, y, r = rnd.randrange(width), rnd.randrange(height), rnd.randrange(width // 30 + 1, width // 5 + 2)
+        draw.ellipse((x - r, y - r, x + r, y + r), fill=tuple(rnd.randrange(256) for _ in mode))
+    if grain:
+        image = Image.blend(image, Image.effect_noise((width, height), 30).convert(mode), grain)
+    buffer = io.BytesIO()
+    image.save(buffer, format=image_format)
+    return buffer.getvalue()
+
+
+def encode(image: Image.Image, image_format: str = "JPEG", **kwargs) -> bytes:
+    buffer = io.BytesIO()
+    image.save(buffer, format=image_format, **kwargs)
+    return buffer.getvalue()
+
+
+class TestPrepareImage(unittest.TestCase):
+    def test_scales_down_keeping_the_aspect_ratio(self):
+        prepared = prepare_image(scene(1, 3000, 2000), max_side=1024)
+
+        self.assertEqual((prepared.width, prepared.height), (1024, 683))
+        self.assertEqual(prepared.format, "jpeg")
+        self.assertLess(len(prepared.data), prepared.original_size)
+        with Image.open(io.BytesIO(prepared.data)) as image:
+            self.assertEqual(image.size, (1024, 683))
+
+    def test_images_scaled_down_while_decoding_are_re_encoded(self):
+        original = scene(1, 2048, 1536)
+        prepared = prepare_image(original, max_side=1024)
+
+        self.assertEqual((prepared.width, prepared.height), (1024, 768))
+        self.assertIsNot(prepared.data, original)
+
+    def test_small_images_are_sent_as_they_are(self):
+        original = scene(1, 800, 600, "PNG")
+        prepared = prepare_image(original, max_side=1024)
+
+        self.assertIs(prepared.data, original)
+        self.assertEqual(prepared.format, "png")
+
+    def test_exif_orientation_is_applied(self):
+        with Image.open(io.BytesIO(scene(1, 400, 200))) as image:
+            exif = image.getexif()
+            exif[0x0112] = 6  # Rotated 90 degrees
+            original = encode(image, exif=exif)
+
+        prepared = prepare_image(original, max_side=1024)
+        self.assertEqual((prepared.width, prepared.height), (200, 400))
+
+    def test_transparent_images_become_jpeg(self):
+        prepared = prepare_image(scene(1, 2000, 1000, "PNG", mode="RGBA"), max_side=500)
+
+        self.assertEqual(prepared.format, "jpeg")
+        self.assertEqual((prepared.width, prepared.height), (500, 250))
+
+    def test_perceptual_hash_identifies_copies(self):
+        original = scene(1, 3000, 2000)
+        prepared = prepare_image(original)
+
+        with Image.open(io.BytesIO(original)) as image:
+            copy = encode(image.resize((800, 533)), quality=60)
+
+        self.assertLessEqual(hamming_distance(prepared.phash, prepare_image(copy).phash), 4)
+        self.assertLessEqual(hamming_distance(prepared.phash, prepare_image(prepared.data).phash), 4)
+        self.assertGreater(hamming_distance(prepared.phash, prepare_image(scene(2, 3000, 2000)).phash), 12)
+
+    def test_prepared_key(self):
+        content_hash = "9f86d081884c7d659a2feaa0c55ad015a3bf4f1b2b0b822cd15d6c15b0f00a08"
+        self.assertEqual(prepared_key(content_hash, "jpeg", 1024), f"prepared/1024/{content_hash}.jpg")
+
+    def test_images_with_the_same_perceptual_hash_are_stored_apart(self):
+        with Image.open(io.BytesIO(scene(1, 800, 600))) as image:
+            plain = image.convert("RGB")
+        # The same photo with a small overlay text
+        overlay = plain.copy()
+        ImageDraw.Draw(overlay).text((20, 20), "SALE -20%", fill=(255, 255, 255))
+        first, second = prepare_image(encode(plain, "PNG")), prepare_image(encode(overlay, "PNG"))
+
+        self.assertEqual(first.phash, second.phash)
+        self.assertNotEqual(prepared_key(first.sha256, first.format), prepared_key(second.sha256, second.format))
+
+
+if __name__ == "__main__":
+    unittest.main()
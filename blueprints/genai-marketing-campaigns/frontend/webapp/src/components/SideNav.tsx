@@ -24,8 +24,11 @@ import { Skeleton } from "./ui/skeleton";
 type SideNavState = {
   loading: boolean;
   list: Campaign[];
+  nextCursor?: string;
 };
 
+type CampaignPage = { items: Campaign[]; next_cursor?: string | null };
+
 export default function SideNav() {
   const [items, setItems] = useState<SideNavState>({
     loading: true,
@@ -36,11 +39,24 @@ export default function SideNav() {
 
   const { toast } = useToast();
 
+  const [loadingMore, setLoadingMore] = useState<boolean>(false);
+
+  // The newest campaigns of the user first, the next pages are requested with the next_cursor of the previous one
+  const fetchPage = async (cursor?: string) => {
+    const page = (await getCampaigns(cursor)) as CampaignPage | undefined;
+    if (!page) throw new Error("Campaigns could not be loaded");
+    setItems((prev) => ({
+      ...prev,
+      loading: false,
+      list: cursor ? [...prev.list, ...page.items] : page.items,
+      nextCursor: page.next_cursor ?? undefined,
+    }));
+  };
+
   useEffect(() => {
     const fetchItems = async () => {
       try {
-        const campaigns = (await getCampaigns()) as Campaign[];
-        setItems((prev) => ({ ...prev, loading: false, list: campaigns }));
+        await fetchPage();
       } catch (error) {
         console.error(error);
       }
@@ -50,6 +66,17 @@ export default function SideNav() {
     // eslint-disable-next-line react-hooks/exhaustive-deps
   }, []);
 
+  const loadMore = async () => {
+    setLoadingMore(true);
+    try {
+      await fetchPage(items.nextCursor);
+    } catch (error) {
+      console.error(error);
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   const confirmCampaignDeletion = async (campaign: Campaign) => {
     try {
       if (campaign.id) {
@@ -138,6 +165,12 @@ export default function SideNav() {
               </a>
             );
           })}
+
+        {!items.loading && items.nextCursor && (
+          <Button variant={"ghost"} disabled={loadingMore} onClick={loadMore}>
+            {loadingMore ? "Loading..." : "Load more"}
+          </Button>
+        )}
       </div>
     </div>
   );
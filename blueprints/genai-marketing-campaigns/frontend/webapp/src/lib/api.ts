@@ -45,11 +45,15 @@ const defaultRestInput = {
   },
 };
 
-export async function getCampaigns() {
+export async function getCampaigns(cursor?: string) {
   try {
     const restOperation = get({
       ...defaultRestInput,
       path: "/campaigns",
+      options: {
+        ...defaultRestInput.options,
+        queryParams: cursor ? { cursor } : {},
+      },
     });
     const response = await restOperation.response;
     return response.body.json();
@@ -26,8 +26,12 @@ import json
 import random
 import argparse
 
+from concurrent.futures import ThreadPoolExecutor
+
 import fiftyone.zoo as foz
 
+from botocore.config import Config
+
 CampaignObjective = [
     "clicks",
     "awareness",
@@ -42,6 +46,8 @@ CampaignNode = [
 
 
 s3 = boto3.client ('s3')
+# The bulk indexing function runs for up to 15 minutes per invocation
+lambda_client = boto3.client('lambda', config=Config(read_timeout=900, retries={'max_attempts': 0}))
 
 def put_img(url, local_path, filename, token):
 
@@ -83,11 +89,7 @@ def process_img(url, filename, token):
 
     data = {
       "key": f"original/{filename}",
-      "metadata": {
-        "results": random.randint(0, 1000000),
-        "objective": CampaignObjective[random.randint(0, len(CampaignObjective)-1)],
-        "node": CampaignNode[random.randint(0, len(CampaignNode)-1)]
-      }
+      "metadata": random_metadata()
     }
 
     print(data)
@@ -103,6 +105,41 @@ def process_img(url, filename, token):
     return response
 
 
+def random_metadata():
+    return {
+        "results": random.randint(0, 1000000),
+        "objective": CampaignObjective[random.randint(0, len(CampaignObjective)-1)],
+        "node": CampaignNode[random.randint(0, len(CampaignNode)-1)]
+    }
+
+
+def bulk_index(img_routes, bucket, function_name, max_workers=16):
+    """Upload the images and a manifest to the images bucket, then index them with the bulk indexing function"""
+
+    def upload(image_file):
+        key = f"original/{image_file.split('/')[-1]}"
+        s3.upload_file(image_file, bucket, key, ExtraArgs={"ContentType": "image/jpeg"})
+        return {"key": key, "metadata": random_metadata()}
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        manifest = list(executor.map(upload, img_routes))
+
+    manifest_key = f"manifests/sample-{int(time.time())}.jsonl"
+    s3.put_object(Bucket=bucket, Key=manifest_key, Body="\n".join(json.dumps(line) for line in manifest))
+    print(f"Uploaded {len(manifest)} images, manifest {manifest_key}")
+
+    # Every invocation resumes from the checkpoint of the previous one
+    while True:
+        response = lambda_client.invoke(
+            FunctionName=function_name,
+            Payload=json.dumps({"manifest_key": manifest_key}),
+        )
+        body = json.loads(response["Payload"].read())["body"]
+        print(body)
+        if body["done"]:
+            return body
+
+
 if __name__ == '__main__':
 
     parser = argparse.ArgumentParser(description='Sample program to call image indexing API')
@@ -110,6 +147,8 @@ if __name__ == '__main__':
     #parser.add_argument('--imgs-local-folder', help='Local folder where the images are stored')
     parser.add_argument('--api-url', help='URL of the API to invoke')
     parser.add_argument('--bearer-token', help='Bearer token used for authentication')
+    parser.add_argument('--imgs-bucket', help='Images bucket, to index with the bulk indexing function instead')
+    parser.add_argument('--bulk-function-name', help='Name of the bulk indexing function')
 
     print("before parsing args")
 
@@ -128,6 +167,11 @@ if __name__ == '__main__':
 
     print(img_routes)
 
+    if args.bulk_function_name:
+        bulk_index(img_routes, args.imgs_bucket, args.bulk_function_name)
+        print('done')
+        exit()
+
     for image_file in img_routes:
 
         print(image_file)
@@ -28,12 +28,26 @@ from aws_lambda_powertools import Logger
 from botocore.exceptions import ClientError
 
 from status_info_layer.StatusEnum import ComplianceReportStatusEnum
+from job_status import conditional_read, get_status_reader, request_conditions
 
 logger = Logger()
 
 TABLE_NAME = os.getenv("JOBS_DYNAMO_DB_TABLE_NAME")
 table = boto3.resource("dynamodb").Table(TABLE_NAME)
 
+# Only the attributes returned to the frontend are read from the table
+ITEM_ATTRIBUTES = [
+    "country",
+    "industry",
+    "workload",
+    "analysis_name",
+    "status",
+    "report_with_questions",
+    "analysis_section",
+    "analysis_timestamp",
+]
+status_reader = get_status_reader(table, ITEM_ATTRIBUTES)
+
 GET_TABLE_QUESTIONS_PATTERN = re.compile("(/[a-zA-Z0-9-]*)*/jobs/query/[A-Za-z0-9-]*")
 
 # TODO: use aws_lambda_powertools.event_handler import APIGatewayRestResolver and CORSConfig to avoid having to
@@ -58,19 +72,12 @@ def _format_response(handler):
 
         logger.info(lambda_response)
 
+        if lambda_response["statusCode"] in (200, 304):
+            response["headers"].update(lambda_response["headers"])
+
         if lambda_response["statusCode"] == 200:
-            response["body"] = json.dumps({
-                    "job_id": lambda_response["job_id"],
-                    "country": lambda_response["country"],
-                    "industry": lambda_response["industry"],
-                    "workload": lambda_response["workload"],
-                    "template_with_questions": lambda_response["template_with_questions"],
-                    "analysis_name": lambda_response["analysis_name"],
-                    "analysis_section": lambda_response["analysis_section"],
-                    "analysis_timestamp": lambda_response["analysis_timestamp"],
-                    "status": lambda_response["status"],
-                })
-        else:
+            response["body"] = json.dumps(lambda_response["body"])
+        elif lambda_response["statusCode"] != 304:
             response["body"] = json.dumps({
                 "message": f"Error retrieving results for job {lambda_response['job_id']}"
             })
@@ -86,20 +93,11 @@ def get_job_by_id(
     """
     Given an analysis job id, obtain its details
     @param analysis_job_id
-    @return:
+    @return: the job item, None if it does not exist
     """
 
     try:
-        response = table.get_item(
-            Key={
-                "job_id": job_id
-            }
-        )
-
-        if "Item" in response:
-            return response["Item"]
-        else:
-            return ""
+        return status_reader.get_item({"job_id": job_id})
     except ClientError as ex:
         logger.error(f"Job {job_id} does not exist")
         raise ex
@@ -124,27 +122,38 @@ def lambda_handler(event, _context: LambdaContext):
     logger.info(method)
     logger.info(path)
 
-    item = get_job_by_id(id)
-
-    print(item)
-
     if method == "GET" and GET_TABLE_QUESTIONS_PATTERN.match(path):
+        result = conditional_read(lambda: _job_details(id, get_job_by_id(id)), **request_conditions(event))
+        if result.body is None:
+            return {
+                "statusCode": 500,
+                "job_id": id,
+            }
         return {
-            "statusCode": 200,
-            "job_id": id,
-            "country": item["country"],
-            "industry": item["industry"],
-            "workload": item["workload"],
-            "analysis_name": item["analysis_name"],
-            "status": item["status"],
-            "timestamp": int(item.get("timestamp", 0)),
-            "template_with_questions": json.loads(item.get("report_with_questions", "{}")) if ComplianceReportStatusEnum[item[
-                "status"]].value >= ComplianceReportStatusEnum.READY.value else json.loads("{}"),
-            "analysis_section": item.get("analysis_section", ""),
-            "analysis_timestamp": int(item.get("analysis_timestamp", 0))
+            "statusCode": result.status_code,
+            "headers": result.headers(),
+            "body": result.body,
         }
     else:
         return {
             "statusCode": 500,
             "items": "Not implemented"
         }
+
+
+def _job_details(id, item):
+    if not item:
+        return None
+
+    return {
+        "job_id": id,
+        "country": item["country"],
+        "industry": item["industry"],
+        "workload": item["workload"],
+        "template_with_questions": json.loads(item.get("report_with_questions", "{}")) if ComplianceReportStatusEnum[item[
+            "status"]].value >= ComplianceReportStatusEnum.READY.value else json.loads("{}"),
+        "analysis_name": item["analysis_name"],
+        "analysis_section": item.get("analysis_section", ""),
+        "analysis_timestamp": int(item.get("analysis_timestamp", 0)),
+        "status": item["status"],
+    }
@@ -17,7 +17,6 @@
 
 import json
 import traceback
-import tempfile
 
 import boto3
 import os
@@ -69,6 +68,16 @@ s3 = boto3.client('s3')
 #documentsTable = boto3.resource("dynamodb").Table(DOCUMENTS_DYNAMODB_TABLE_NAME)
 jobsTable = boto3.resource("dynamodb").Table(JOBS_DYNAMODB_TABLE_NAME)
 
+# Created once per container and reused by every invocation
+metadata_llm = ChatBedrockConverse(
+    model=MODEL_ID,
+    client=bedrock_runtime,
+    temperature=0.1,
+    max_tokens=700,
+    top_p=0.9
+    # other params...
+)
+
 # TODO: use aws_lambda_powertools.event_handler import APIGatewayRestResolver and CORSConfig to avoid having to
 #  know about API GW response formats
 def _format_response(handler):
@@ -96,14 +105,6 @@ def extract_metadata(
         document_name:str,
         text:str
 ):
-    metadata_llm = ChatBedrockConverse(
-        model=MODEL_ID,
-        temperature=0.1,
-        max_tokens=700,
-        top_p=0.9
-        # other params...
-    )
-
     LLM_GENERATE_METADATA_PROMPT_SELECTOR = get_metadata_prompt_selector(lang="en")
 
     gen_medatata_prompt = LLM_GENERATE_METADATA_PROMPT_SELECTOR.get_prompt(MODEL_ID)
@@ -123,9 +124,6 @@ def extract_metadata(
                 {
                     "type": "text",
                     "text": messages[0].content,
-                },
-                {
-                    "cachePoint": {"type": "default"}   # Need to create messages for prompt caching
                 }
             ],
         },
@@ -172,10 +170,18 @@ def extract_metadata(
         raise
 
 
+def update_job_status(document_key, status):
+    jobsTable.update_item(
+        Key={"document_key": document_key},
+        UpdateExpression="SET #status = :status",
+        ExpressionAttributeNames={"#status": "status"},
+        ExpressionAttributeValues={":status": status.name},
+    )
+
+
 def handler(event, context):
     """
-    Lambda function to extract metadata from document
-    Lambda function to chunk a multipage text document
+    Lambda function to extract metadata from a chunk of a document
     @param event:
     @param context:
     @return:
@@ -191,27 +197,12 @@ def handler(event, context):
 
     try:
 
-        # Download file from S3 using secure temporary file
-        with tempfile.NamedTemporaryFile(mode='w+', suffix='.txt', delete=False) as temp_file:
-            temp_filename = temp_file.name
-        
-        try:
-            s3.download_file(DOCUMENTS_BUCKET_NAME, chunk_s3_key, temp_filename)
-            
-            with open(temp_filename, "r") as f:
-                text_chunk = f.read()
-        finally:
-            # Clean up temporary file
-            if os.path.exists(temp_filename):
-                os.unlink(temp_filename)
+        # Read the chunk from S3 in memory
+        text_chunk = s3.get_object(Bucket=DOCUMENTS_BUCKET_NAME, Key=chunk_s3_key)["Body"].read().decode("utf-8")
+
     except Exception as e:
         logger.error(f"Error downloading chunk: {e}")
-        jobsTable.update_item(
-            Key={"document_key": document_key},
-            UpdateExpression="SET #status = :status",
-            ExpressionAttributeNames={"#status": "status"},
-            ExpressionAttributeValues={":status": IndexingStatusEnum.ERROR.name},
-        )
+        update_job_status(document_key, IndexingStatusEnum.ERROR)
         raise
 
     try:
@@ -224,27 +215,18 @@ def handler(event, context):
         metadata = llm_metadata_completion.content
 
         logger.info(f"Extracted metadata: {metadata}")
+        logger.info(f"Token usage: {llm_metadata_completion.usage_metadata}")
 
     except Exception as e:
         logger.error(f"Error extracting metadata: {e}")
         traceback.print_exc()
-        jobsTable.update_item(
-            Key={"document_key": document_key},
-            UpdateExpression="SET #status = :status",
-            ExpressionAttributeNames={"#status": "status"},
-            ExpressionAttributeValues={":status": IndexingStatusEnum.ERROR.name},
-        )
+        update_job_status(document_key, IndexingStatusEnum.ERROR)
         raise
 
     # Update job status in DynamoDB table
     try:
 
-        jobsTable.update_item(
-            Key={"document_key": document_key},
-            UpdateExpression="SET #status = :status",
-            ExpressionAttributeNames={"#status": "status"},
-            ExpressionAttributeValues={":status": IndexingStatusEnum.METADATA_EXTRACTION.name},
-        )
+        update_job_status(document_key, IndexingStatusEnum.METADATA_EXTRACTION)
 
     except Exception as e:
 
@@ -260,4 +242,4 @@ def handler(event, context):
             "document_name": document_name,
             "chunk_index": chunk_index
         }
-    }
\ No newline at end of file
+    }
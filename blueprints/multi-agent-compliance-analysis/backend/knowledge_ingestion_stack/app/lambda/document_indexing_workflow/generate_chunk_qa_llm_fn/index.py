@@ -25,13 +25,10 @@ import functools
 import pydantic
 import langchain_core
 
-from retrying import retry
-
 from aws_lambda_powertools import Logger
 
 from langchain_aws import ChatBedrockConverse
 
-from botocore.exceptions import ClientError
 from botocore.config import Config
 
 from prompt_selector.generate_qa_prompt import get_qa_prompt_selector, get_structured_qa_prompt_selector
@@ -39,14 +36,7 @@ from structured_output.question_answers import QA_pairs
 
 from status_info_layer.StatusEnum import IndexingStatusEnum
 from analysis_lenses.user_analysis_mapping import AnalysisPersonas
-
-class BedrockRetryableError(Exception):
-    """Class to identify a Bedrock throttling error"""
-
-    def __init__(self, msg):
-        super().__init__(self)
-
-        self.message = msg
+from bedrock_governor import get_governor
 
 langchain_core.globals.set_debug(True)
 logger = Logger()
@@ -67,10 +57,13 @@ MAX_INPUT_TOKEN_COUNT = 5000
 bedrock_runtime = boto3.client(
     service_name="bedrock-runtime",
     region_name=BEDROCK_REGION,
-    config=Config(retries={'max_attempts': 20})
+    config=Config(retries={'max_attempts': 1, 'mode': 'standard'})  # Retries, connection errors included, are handled by the governor
 )
 s3 = boto3.client('s3')
 
+# Rate limiting, retries and circuit breaking shared by every Bedrock call of this container
+governor = get_governor()
+
 #documentsTable = boto3.resource("dynamodb").Table(DOCUMENTS_DYNAMODB_TABLE_NAME)
 jobsTable = boto3.resource("dynamodb").Table(JOBS_DYNAMODB_TABLE_NAME)
 
@@ -99,89 +92,44 @@ def _format_response(handler):
 
 
 # A function to generate questions as Pydantic object
-@retry(wait_exponential_multiplier=10000, wait_exponential_max=500000, stop_max_attempt_number=4,
-       retry_on_exception=lambda ex: isinstance(ex, BedrockRetryableError))
 def generate_structured_qa_set(
         qa_text: str,
 ):
-    global STRUCTURED_OUTPUT_MODEL_TEMP
-
-    questions_llm = ChatBedrockConverse(
-        model=STRUCTURED_MODEL_ID,
-        temperature=STRUCTURED_OUTPUT_MODEL_TEMP,
-        max_tokens=int(MAX_INPUT_TOKEN_COUNT*1.15),
-        # other params...
-    )
-
     LLM_GENERATE_STRUCTURED_QUESTIONS_PROMPT_SELECTOR = get_structured_qa_prompt_selector(lang="en")
     gen_structured_questions_prompt = LLM_GENERATE_STRUCTURED_QUESTIONS_PROMPT_SELECTOR.get_prompt(MODEL_ID)
-    structured_questions = questions_llm.with_structured_output(QA_pairs)
 
-    structured_questions_llm = gen_structured_questions_prompt | structured_questions
+    def invoke(state):
+        questions_llm = ChatBedrockConverse(
+            model=STRUCTURED_MODEL_ID,
+            client=bedrock_runtime,
+            temperature=state.temperature(STRUCTURED_OUTPUT_MODEL_TEMP),
+            max_tokens=int(MAX_INPUT_TOKEN_COUNT*1.15),
+            # other params...
+        )
 
-    try:
-        response = structured_questions_llm.invoke(
+        structured_questions_llm = gen_structured_questions_prompt | questions_llm.with_structured_output(QA_pairs)
+
+        return structured_questions_llm.invoke(
             {
                 "qa_text": qa_text,
             }
         )
 
-        logger.info("The extracted Q&A set is:")
-        logger.info(response)
-
-        return response
-    except ClientError as exc:
-        if exc.response['Error']['Code'] == 'ThrottlingException':
-            logger.error("Bedrock throttling. To try again")
-            raise BedrockRetryableError(str(exc))
-        elif exc.response['Error']['Code'] == 'ModelTimeoutException':
-            logger.error("Bedrock ModelTimeoutException. To try again")
-            raise BedrockRetryableError(str(exc))
-        elif exc.response['Error']['Code'] == 'ModelErrorException':
-            STRUCTURED_OUTPUT_MODEL_TEMP = STRUCTURED_OUTPUT_MODEL_TEMP + 0.1
-            logger.error("Bedrock ModelErrorException. To try again")
-            raise BedrockRetryableError(str(exc))
-        else:
-            raise
-    except bedrock_runtime.exceptions.ThrottlingException as throttlingExc:
-        logger.error("Bedrock ThrottlingException. To try again")
-        raise BedrockRetryableError(str(throttlingExc))
-    except bedrock_runtime.exceptions.ModelTimeoutException as timeoutExc:
-        logger.error("Bedrock ModelTimeoutException. To try again")
-        raise BedrockRetryableError(str(timeoutExc))
-    except bedrock_runtime.exceptions.ModelErrorException as modelErrExc:
-        STRUCTURED_OUTPUT_MODEL_TEMP = STRUCTURED_OUTPUT_MODEL_TEMP + 0.1
-        logger.error("Bedrock ModelErrorException. To try again")
-        raise BedrockRetryableError(str(modelErrExc))
-    except Exception as e:
-        template = "An exception of type {0} occurred. Arguments:\n{1!r}"
-        message = template.format(type(e).__name__, e.args)
-        logger.error(message)
-        raise
+    # Throttling, retries and temperature increase on model errors are handled by the governor
+    response = governor.run(invoke, estimated_tokens=len(qa_text) // 4, retry_on=(pydantic.ValidationError,))
+
+    logger.info("The extracted Q&A set is:")
+    logger.info(response)
+
+    return response
 
 # A function to generate questions from the document
-@retry(wait_exponential_multiplier=10000, wait_exponential_max=900000, stop_max_attempt_number=8,
-       retry_on_exception=lambda ex: isinstance(ex, BedrockRetryableError))
 def generate_questions(
         document_name:str,
         analysis_perspective:str,
         user_type:str,
         text:str
 ):
-
-    global STRUCTURED_OUTPUT_MODEL_TEMP
-
-    print("\n\nModel temp\n\n")
-    print(STRUCTURED_OUTPUT_MODEL_TEMP)
-
-    qa_llm = ChatBedrockConverse(
-        model=MODEL_ID,
-        temperature=STRUCTURED_OUTPUT_MODEL_TEMP if STRUCTURED_OUTPUT_MODEL_TEMP < 1 else 1,
-        max_tokens=7000,
-        top_p=0.9
-        # other params...
-    )
-
     logger.info(f"Generating questions for {document_name} with {analysis_perspective} perspective")
 
     LLM_GENERATE_QA_PROMPT_SELECTOR = get_qa_prompt_selector(lang="en")
@@ -220,41 +168,20 @@ def generate_questions(
         }
     ]
 
-    try:
-        qa_set = qa_llm.with_structured_output(QA_pairs).invoke(msgs)
-
-        return qa_set
-
-    except ClientError as exc:
-        if exc.response['Error']['Code'] == 'ThrottlingException':
-            logger.error("Bedrock throttling. To try again")
-            raise BedrockRetryableError(str(exc))
-        elif exc.response['Error']['Code'] == 'ModelTimeoutException':
-            logger.error("Bedrock ModelTimeoutException. To try again")
-            raise BedrockRetryableError(str(exc))
-        elif exc.response['Error']['Code'] == 'ModelErrorException':
-            logger.error("Bedrock ModelErrorException. To try again")
-            raise BedrockRetryableError(str(exc))
-        else:
-            raise
-    except bedrock_runtime.exceptions.ThrottlingException as throttlingExc:
-        logger.error("Bedrock ThrottlingException. To try again")
-        raise BedrockRetryableError(str(throttlingExc))
-    except bedrock_runtime.exceptions.ModelTimeoutException as timeoutExc:
-        logger.error("Bedrock ModelTimeoutException. To try again")
-        raise BedrockRetryableError(str(timeoutExc))
-    except bedrock_runtime.exceptions.ModelErrorException as modelErrExc:
-        logger.error("Bedrock ModelErrorException. To try again")
-        raise BedrockRetryableError(str(modelErrExc))
-    except pydantic.ValidationError as dataTypeValError:
-        STRUCTURED_OUTPUT_MODEL_TEMP = STRUCTURED_OUTPUT_MODEL_TEMP + 0.1
-        logger.error("Pydantic Validation Error. To try again")
-        raise BedrockRetryableError(str(dataTypeValError))
-    except Exception as e:
-        template = "An exception of type {0} occurred. Arguments:\n{1!r}"
-        message = template.format(type(e).__name__, e.args)
-        logger.error(message)
-        raise
+    def invoke(state):
+        qa_llm = ChatBedrockConverse(
+            model=MODEL_ID,
+            client=bedrock_runtime,
+            temperature=state.temperature(STRUCTURED_OUTPUT_MODEL_TEMP),
+            max_tokens=7000,
+            top_p=0.9
+            # other params...
+        )
+
+        return qa_llm.with_structured_output(QA_pairs).invoke(msgs)
+
+    # Throttling, retries and temperature increase on validation errors are handled by the governor
+    return governor.run(invoke, estimated_tokens=len(text) // 4, retry_on=(pydantic.ValidationError,))
 
 def handler(event, context):
     """
@@ -0,0 +1,124 @@
+# MIT No Attribution
+#
+# Copyright 2025 Amazon Web Services
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this
+# software and associated documentation files (the "Software"), to deal in the Software
+# without restriction, including without limitation the rights to use, copy, modify,
+# merge, publish, distribute, sublicense, and/or sell copies of the Software, and to
+# permit persons to whom the Software is furnished to do so.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED,
+# INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A
+# PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT
+# HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE
+# SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+import threading
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterator, List
+
+
+def format_qa_pair(qa_pair: dict) -> str:
+    """Format a question and answer pair the way the QA consolidation prompt expects it"""
+    return (
+        f"\n<qa_pair>\n"
+        f"Question: {qa_pair['question']}\n\n"
+        f"Answer: {qa_pair['answer']}\n"
+        f"</qa_pair>\n"
+    )
+
+
+def count_tokens(text: str) -> int:
+    """Assume 1 word = 1 token"""
+    return len(text.split())
+
+
+def pack_windows(qa_pairs: List[dict], max_tokens: int) -> Iterator[str]:
+    """
+    Pack question and answer pairs into windows of at most max_tokens.
+
+    The token count of the window is kept as a running total, each pair is counted once,
+    and the last window is always flushed. A pair larger than max_tokens goes alone in its window.
+    """
+    window = []
+    window_tokens = 0
+
+    for qa_pair in qa_pairs:
+        qa_str = format_qa_pair(qa_pair)
+        qa_tokens = count_tokens(qa_str)
+
+        if window and window_tokens + qa_tokens > max_tokens:
+            yield "".join(window)
+            window = []
+            window_tokens = 0
+
+        window.append(qa_str)
+        window_tokens += qa_tokens
+
+    if window:
+        yield "".join(window)
+
+
+class QAConsolidationEngine:
+    """
+    Derives a unique set of questions and answers for every persona and perspective of a document.
+
+    The question and answer pairs of each persona/perspective are packed into windows of at most
+    `max_window_tokens`, and each window is deduplicated with a single structured LLM call
+    `consolidate_window(persona, perspective, qa_window_str) -> list of {"question", "answer"}`.
+    Persona/perspective pairs are processed concurrently with up to `max_workers` threads.
+    """
+
+    def __init__(
+            self,
+            consolidate_window: Callable[[str, str, str], List[dict]],
+            max_window_tokens: int = 4000,
+            max_workers: int = 4
+    ):
+        self.consolidate_window = consolidate_window
+        self.max_window_tokens = max_window_tokens
+        self.max_workers = max_workers
+        self.llm_calls = 0
+        self._lock = threading.Lock()
+
+    def consolidate_qa_set(self, persona: str, perspective: str, qa_pairs: List[dict]) -> List[dict]:
+        """Unique question and answer pairs of a single persona and perspective"""
+        consolidated = []
+
+        for qa_window_str in pack_windows(qa_pairs, self.max_window_tokens):
+            with self._lock:
+                self.llm_calls += 1
+            consolidated.extend(self.consolidate_window(persona, perspective, qa_window_str))
+
+        return consolidated
+
+    def consolidate(self, qa_by_persona_perspective: dict) -> dict:
+        """Same structure as the input, {persona: {perspective: [qa_pair, ...]}}, with unique pairs"""
+        tasks = [
+            (persona, perspective, qa_pairs)
+            for persona, perspectives in qa_by_persona_perspective.items()
+            for perspective, qa_pairs in perspectives.items()
+            if qa_pairs
+        ]
+
+        consolidated = {
+            persona: {perspective: [] for perspective in perspectives}
+            for persona, perspectives in qa_by_persona_perspective.items()
+        }
+
+        if not tasks:
+            return consolidated
+
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(tasks))) as executor:
+            futures = [
+                (persona, perspective, executor.submit(self.consolidate_qa_set, persona, perspective, qa_pairs))
+                for persona, perspective, qa_pairs in tasks
+            ]
+
+            for persona, perspective, future in futures:
+                consolidated[persona][perspective] = future.result()
+
+        return consolidated
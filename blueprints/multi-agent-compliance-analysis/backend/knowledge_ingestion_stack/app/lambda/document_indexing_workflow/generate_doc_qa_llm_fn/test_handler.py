@@ -0,0 +1,145 @@
+# MIT No Attribution
+#
+# Copyright 2025 Amazon Web Services
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this
+# software and associated documentation files (the "Software"), to deal in the Software
+# without restriction, including without limitation the rights to use, copy, modify,
+# merge, publish, distribute, sublicense, and/or sell copies of the Software, and to
+# permit persons to whom the Software is furnished to do so.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED,
+# INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A
+# PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT
+# HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE
+# SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+import importlib
+import json
+import os
+import sys
+import unittest
+
+import boto3
+from botocore.stub import Stubber
+from moto import mock_aws
+
+# Layers of the function
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "..", "..", "..", "..", "shared"))
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "..", "..", "..", "..", "..", "..", "shared", "layer"))
+
+BUCKET = "documents"
+TABLE = "jobs"
+DOCUMENT_KEY = "doc-1"
+
+os.environ.update({
+    "AWS_ACCESS_KEY_ID": "testing",
+    "AWS_SECRET_ACCESS_KEY": "testing",
+    "AWS_DEFAULT_REGION": "us-east-1",
+    "REGION": "us-east-1",
+    "BEDROCK_REGION": "us-east-1",
+    "BEDROCK_MODEL_ID": "us.anthropic.claude-3-5-haiku-20241022-v1:0",
+    "JOBS_DYNAMO_DB_TABLE_NAME": TABLE,
+    "DOCUMENT_BUCKET_NAME": BUCKET,
+})
+
+
+def chunk_qa(questions):
+    return {"auditor": {"security": {"qa_pairs": [{"question": q, "answer": f"{q} answer"} for q in questions]}}}
+
+
+def converse_response(qa_pairs):
+    """Converse response of the structured output (tool use) call"""
+    return {
+        "output": {
+            "message": {
+                "role": "assistant",
+                "content": [{"toolUse": {"toolUseId": "tool-1", "name": "QA_pairs", "input": {"qa_pairs": qa_pairs}}}],
+            }
+        },
+        "stopReason": "tool_use",
+        "usage": {"inputTokens": 100, "outputTokens": 20, "totalTokens": 120},
+        "metrics": {"latencyMs": 10},
+    }
+
+
+class TestGenerateDocQAHandler(unittest.TestCase):
+    def setUp(self):
+        self.mock = mock_aws()
+        self.mock.start()
+
+        s3 = boto3.client("s3")
+        s3.create_bucket(Bucket=BUCKET)
+        for i, questions in enumerate([["q1", "q2"], ["q2", "q3"]]):
+            s3.put_object(Bucket=BUCKET, Key=f"chunks/{DOCUMENT_KEY}/qa_chunk_{i}.json", Body=json.dumps(chunk_qa(questions)))
+
+        boto3.client("dynamodb").create_table(
+            TableName=TABLE,
+            KeySchema=[{"AttributeName": "document_key", "KeyType": "HASH"}],
+            AttributeDefinitions=[{"AttributeName": "document_key", "AttributeType": "S"}],
+            BillingMode="PAY_PER_REQUEST",
+        )
+
+        self.event = [{"document_key": DOCUMENT_KEY, "document_name": "doc.pdf"} for _ in range(2)]
+
+    def tearDown(self):
+        self.mock.stop()
+        os.environ.pop("CONSOLIDATE_QA", None)
+
+    def load_handler(self, consolidate_qa=None):
+        """Imports the function with its configuration, its clients are created within the mock"""
+        if consolidate_qa is not None:
+            os.environ["CONSOLIDATE_QA"] = consolidate_qa
+        sys.modules.pop("index", None)
+        index = importlib.import_module("index")
+
+        # Bedrock is not in moto, its calls are answered by the stubber
+        self.bedrock = Stubber(index.bedrock_runtime)
+        self.bedrock.activate()
+        self.addCleanup(self.bedrock.deactivate)
+        return index
+
+    def stored_result(self):
+        response = boto3.client("s3").get_object(Bucket=BUCKET, Key=f"qa/{DOCUMENT_KEY}/qa_doc.json")
+        status = boto3.resource("dynamodb").Table(TABLE).get_item(Key={"document_key": DOCUMENT_KEY})["Item"]["status"]
+        return json.loads(response["Body"].read()), status
+
+    def test_pairs_are_merged_without_bedrock_by_default(self):
+        index = self.load_handler()
+
+        response = index.handler(self.event, None)
+
+        self.assertEqual(response["statusCode"], 200)
+        qa_doc, status = self.stored_result()
+        questions = [qa["question"] for qa in qa_doc["auditor"]["security"]]
+        self.assertEqual(questions, ["q1", "q2", "q2", "q3"])
+        self.assertEqual(status, "QA_CONSOLIDATION")
+        self.bedrock.assert_no_pending_responses()
+
+    def test_consolidation_makes_one_structured_call_per_window(self):
+        index = self.load_handler(consolidate_qa="true")
+        unique = [{"question": q, "answer": f"{q} answer"} for q in ["q1", "q2", "q3"]]
+        self.bedrock.add_response("converse", converse_response(unique))
+
+        response = index.handler(self.event, None)
+
+        self.assertEqual(response["statusCode"], 200)
+        qa_doc, status = self.stored_result()
+        self.assertEqual(qa_doc, {"auditor": {"security": unique}})
+        self.assertEqual(status, "QA_CONSOLIDATION")
+        self.bedrock.assert_no_pending_responses()
+
+    def test_bedrock_error_sets_the_job_in_error(self):
+        index = self.load_handler(consolidate_qa="true")
+        self.bedrock.add_client_error("converse", service_error_code="AccessDeniedException", http_status_code=403)
+
+        with self.assertRaises(Exception):
+            index.handler(self.event, None)
+
+        status = boto3.resource("dynamodb").Table(TABLE).get_item(Key={"document_key": DOCUMENT_KEY})["Item"]["status"]
+        self.assertEqual(status, "ERROR")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,80 @@
+# MIT No Attribution
+#
+# Copyright 2025 Amazon Web Services
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this
+# software and associated documentation files (the "Software"), to deal in the Software
+# without restriction, including without limitation the rights to use, copy, modify,
+# merge, publish, distribute, sublicense, and/or sell copies of the Software, and to
+# permit persons to whom the Software is furnished to do so.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED,
+# INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A
+# PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT
+# HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE
+# SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+
+import re
+import unittest
+
+from qa_consolidation import QAConsolidationEngine, count_tokens, pack_windows
+
+
+def fake_consolidate_window(persona, perspective, qa_window_str):
+    """Fake structured Converse call: keeps the first pair of every repeated question"""
+    questions = re.findall(r"Question: (.*)\n", qa_window_str)
+    answers = re.findall(r"Answer: (.*)\n", qa_window_str)
+    unique = {}
+    for question, answer in zip(questions, answers):
+        unique.setdefault(question, {"question": question, "answer": answer})
+    return list(unique.values())
+
+
+def make_qa_pairs(n, repeat=2):
+    return [
+        {"question": f"What does article {i // repeat} require?", "answer": f"Article {i // repeat} requires controls"}
+        for i in range(n)
+    ]
+
+
+class TestQAConsolidation(unittest.TestCase):
+    def test_last_window_is_flushed(self):
+        qa_pairs = make_qa_pairs(25, repeat=1)
+        windows = list(pack_windows(qa_pairs, max_tokens=100))
+
+        self.assertGreater(len(windows), 1)
+        self.assertEqual(sum(w.count("<qa_pair>") for w in windows), 25)
+        self.assertIn("article 24", windows[-1])
+        for window in windows:
+            self.assertLessEqual(count_tokens(window), 100)
+
+    def test_oversized_pair_gets_its_own_window(self):
+        qa_pairs = [{"question": "q " * 50, "answer": "a"}, {"question": "short", "answer": "a"}]
+        windows = list(pack_windows(qa_pairs, max_tokens=20))
+
+        self.assertEqual(len(windows), 2)
+
+    def test_one_call_per_window_for_every_persona_and_perspective(self):
+        qa_by_persona_perspective = {
+            "auditor": {"security": make_qa_pairs(40), "privacy": make_qa_pairs(10)},
+            "lawyer": {"security": make_qa_pairs(40), "privacy": []},
+        }
+        engine = QAConsolidationEngine(fake_consolidate_window, max_window_tokens=200, max_workers=3)
+
+        consolidated = engine.consolidate(qa_by_persona_perspective)
+
+        expected_windows = sum(
+            len(list(pack_windows(qa_pairs, 200)))
+            for perspectives in qa_by_persona_perspective.values()
+            for qa_pairs in perspectives.values()
+        )
+        self.assertEqual(engine.llm_calls, expected_windows)
+        self.assertEqual(len(consolidated["auditor"]["privacy"]), 5)
+        self.assertEqual(consolidated["lawyer"]["privacy"], [])
+        self.assertEqual(len({qa["question"] for qa in consolidated["auditor"]["security"]}), 20)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -57,6 +57,7 @@ class ComplianceReportsAPI(Construct):
             start_analysis_sqs_queue: sqs.Queue,
             report_layout_workflow_machine: sfn.IStateMachine,
             shared_utils_layer: lambda_python.PythonLayerVersion,
+            common_layer: lambda_python.PythonLayerVersion,
             cognitoUserPool: cognito.IUserPool,
     ) -> None:
 
@@ -89,7 +90,7 @@ class ComplianceReportsAPI(Construct):
             default_cors_preflight_options=apigw.CorsOptions(
                 allow_origins=apigw.Cors.ALL_ORIGINS,
                 allow_methods=apigw.Cors.ALL_METHODS,
-                allow_headers=apigw.Cors.DEFAULT_HEADERS,
+                allow_headers=apigw.Cors.DEFAULT_HEADERS + ["If-None-Match"],
             ),
         )
 
@@ -186,8 +187,12 @@ class ComplianceReportsAPI(Construct):
             index="index.py",
             handler="lambda_handler",
             runtime=lambda_.Runtime.PYTHON_3_13,
+            layers=[shared_utils_layer, common_layer],
             environment={
                 "JOBS_DYNAMO_DB_TABLE_NAME": compliance_analysis_jobs_table.table_name,
+                "STATUS_CACHE_TTL": "2",
+                "STATUS_MAX_WAIT": "20",
+                "STATUS_POLL_INTERVAL": "5",
             },
             timeout=Duration.seconds(60),
         )
@@ -216,9 +221,12 @@ class ComplianceReportsAPI(Construct):
             index="index.py",
             handler="lambda_handler",
             runtime=lambda_.Runtime.PYTHON_3_13,
-            layers=[shared_utils_layer],
+            layers=[shared_utils_layer, common_layer],
             environment={
                 "JOBS_DYNAMO_DB_TABLE_NAME": compliance_analysis_jobs_table.table_name,
+                "STATUS_CACHE_TTL": "2",
+                "STATUS_MAX_WAIT": "20",
+                "STATUS_POLL_INTERVAL": "2",
             },
             timeout=Duration.seconds(60),
         )
@@ -52,6 +52,7 @@ class IndexDocumentAPI(Construct):
             sns_textract_topic: sns.ITopic,
             sns_textract_role: iam.IRole,
             shared_utils_layer: lambda_python.PythonLayerVersion,
+            common_layer: lambda_python.PythonLayerVersion,
             cognitoUserPool: cognito.IUserPool,
     ) -> None:
 
@@ -84,7 +85,7 @@ class IndexDocumentAPI(Construct):
             default_cors_preflight_options=apigw.CorsOptions(
                 allow_origins=apigw.Cors.ALL_ORIGINS,
                 allow_methods=apigw.Cors.ALL_METHODS,
-                allow_headers=apigw.Cors.DEFAULT_HEADERS,
+                allow_headers=apigw.Cors.DEFAULT_HEADERS + ["If-None-Match"],
             ),
         )
 
@@ -158,8 +159,12 @@ class IndexDocumentAPI(Construct):
             index="index.py",
             handler="lambda_handler",
             runtime=lambda_.Runtime.PYTHON_3_13,
+            layers=[shared_utils_layer, common_layer],
             environment={
                 "JOBS_DYNAMO_DB_TABLE_NAME": jobs_table.table_name,
+                "STATUS_CACHE_TTL": "2",
+                "STATUS_MAX_WAIT": "20",
+                "STATUS_POLL_INTERVAL": "5",
             },
             timeout=Duration.seconds(60),
         )
@@ -215,6 +215,14 @@ class BackendStack(Stack):
             compatible_runtimes=[lambda_.Runtime.PYTHON_3_13],
         )
 
+        # Lambda layer with the packages shared by the blueprints: the Bedrock governor and the job status reads
+        self.common_layer = lambda_python.PythonLayerVersion(
+            self,
+            "ComplianceReportsCommonLayer",
+            entry=os.path.join(APP_DIR, "../../../../", "shared", "layer"),
+            compatible_runtimes=[lambda_.Runtime.PYTHON_3_13],
+        )
+
         # KMS keys for this app
         self.sqs_kms_key = kms.Key(self,
                                    "ComplianceAnalysis-SQS-KMSKey",
@@ -267,7 +275,8 @@ class BackendStack(Stack):
             oss_data_indexing_role=self.vectorCollectionRole,
             oss_host=self.vectorCollection.collection_endpoint,
             oss_index_name=self.vectorIndex.index_name,
-            shared_utils_layer=self.shared_utils_layer
+            shared_utils_layer=self.shared_utils_layer,
+            common_layer=self.common_layer
         )
 
         kb_summaries_table_ssm_param = ssm.StringParameter(
@@ -309,6 +318,7 @@ class BackendStack(Stack):
             sns_textract_topic=document_indexing_workflow.sns_topic,
             sns_textract_role=document_indexing_workflow.textract_sns_role,
             shared_utils_layer=self.shared_utils_layer,
+            common_layer=self.common_layer,
             cognitoUserPool=self.cognito.user_pool
         )
 
@@ -321,6 +331,7 @@ class BackendStack(Stack):
             sns_textract_topic=regulation_docs_processing_workflow.sns_topic,
             sns_textract_role=regulation_docs_processing_workflow.textract_sns_role,
             shared_utils_layer=self.shared_utils_layer,
+            common_layer=self.common_layer,
             main_jobs_table=self.jobsTable,
             cognitoUserPool=self.cognito.user_pool
         )
@@ -334,6 +345,7 @@ class BackendStack(Stack):
             start_analysis_sqs_queue=self.analysis_sqs_queue,
             report_layout_workflow_machine=compliance_report_generation.compliance_report_pipeline_sfn,
             shared_utils_layer=self.shared_utils_layer,
+            common_layer=self.common_layer,
             cognitoUserPool=self.cognito.user_pool
         )
 
@@ -63,6 +63,7 @@ class DocumentIndexingStack(Construct):
             oss_host: str,
             oss_index_name: str,
             shared_utils_layer: lambda_python.PythonLayerVersion,
+            common_layer: lambda_python.PythonLayerVersion,
             **kwargs
     ) -> None:
 
@@ -358,7 +359,7 @@ class DocumentIndexingStack(Construct):
             index="index.py",
             handler="handler",
             runtime=lambda_.Runtime.PYTHON_3_13,
-            layers=[shared_utils_layer],
+            layers=[shared_utils_layer, common_layer],
             environment={
                 "POWERTOOLS_LOG_LEVEL": "DEBUG",
                 "POWERTOOLS_SERVICE_NAME": "qa_gen_lambda",
@@ -410,7 +411,7 @@ class DocumentIndexingStack(Construct):
             index="index.py",
             handler="handler",
             runtime=lambda_.Runtime.PYTHON_3_13,
-            layers=[shared_utils_layer],
+            layers=[shared_utils_layer, common_layer],
             environment={
                 "POWERTOOLS_LOG_LEVEL": "DEBUG",
                 "POWERTOOLS_SERVICE_NAME": "doc_qa_gen_lambda",
@@ -421,7 +422,9 @@ class DocumentIndexingStack(Construct):
                 "LANGUAGE_ID": language_code,
                 "MAX_N_QUESTIONS": questions_per_chunk,
                 "JOBS_DYNAMO_DB_TABLE_NAME": self.jobs_table.table_name,
-                "DOCUMENT_BUCKET_NAME": self.docs_bucket.bucket_name
+                "DOCUMENT_BUCKET_NAME": self.docs_bucket.bucket_name,
+                "CONSOLIDATE_QA": "false",  # Set to "true" to deduplicate the Q&A of each persona and perspective with the LLM
+                "MAX_CONSOLIDATION_WORKERS": "4"
             },
             timeout=Duration.minutes(15),  # MAX VALUE, DO NOT INCREASE
             memory_size=1024
@@ -0,0 +1,132 @@
+# MIT No Attribution
+#
+# Copyright 2025 Amazon Web Services
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this
+# software and associated documentation files (the "Software"), to deal in the Software
+# without restriction, including without limitation the rights to use, copy, modify,
+# merge, publish, distribute, sublicense, and/or sell copies of the Software, and to
+# permit persons to whom the Software is furnished to do so.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED,
+# INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A
+# PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT
+# HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE
+# SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+"""
+Offline benchmark of the few-shot example selection, with the deterministic HashingEmbeddings.
+
+A synthetic examples directory holds `--examples` examples written in `--styles` different drafting styles
+(e.g. a board of directors vs a sole administrator). Every query chunk is written in one of the styles, and
+a selected example is relevant when it shares the style of the query. For each strategy the benchmark reports
+the tokens the examples add to the prompt, the share of relevant examples, and the time to build the selector
+and select examples for one chunk. "first-n" is the selection used before example_index: every example read
+from disk on each call and the first n examples returned.
+
+    python benchmark_examples.py --examples 40 --k 3 --budget 4000
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "..", "pace_backend", "text_analysis_workflow",
+    "extract_data_to_schema_fn", "prompt_selector",
+))
+
+from example_index import HashingEmbeddings, example_tokens, get_example_index, load_examples
+
+STYLES = [
+    "el consejo de administracion estara integrado por consejeros propietarios y suplentes designados por la asamblea",
+    "la administracion de la sociedad estara a cargo de un administrador unico con facultades de dominio",
+    "la sociedad sera administrada por uno o mas gerentes socios o personas extranas a la sociedad",
+    "los accionistas suscriben y pagan las acciones ordinarias nominativas de la serie a del capital fijo",
+    "el comisario tendra a su cargo la vigilancia de las operaciones sociales y rendira un informe anual",
+    "ante mi licenciado notario publico titular de la notaria comparecen para constituir la sociedad",
+]
+FILLER = "que se protocoliza en los terminos de la escritura publica y de acuerdo a los estatutos sociales vigentes"
+
+
+def synthetic_text(style, words, rng):
+    sentences = []
+    while sum(len(sentence.split()) for sentence in sentences) < words:
+        sentences.append(STYLES[style] if rng.random() < 0.5 else FILLER)
+        sentences.append(f"clausula {rng.randint(1, 99)}")
+    return " ".join(sentences)
+
+
+def write_examples(directory, count, styles, rng):
+    labels = []
+    for i in range(count):
+        style = i % styles
+        with open(os.path.join(directory, f"example_chunk_{i + 1}.txt"), "w", encoding="utf-8") as file:
+            file.write(synthetic_text(style, rng.randint(200, 2000), rng))
+        with open(os.path.join(directory, f"example_chunk_{i + 1}.json"), "w", encoding="utf-8") as file:
+            json.dump({"style": style, "managers": [{"name": f"Persona {i}"}]}, file)
+        labels.append(style)
+    return labels
+
+
+def first_n(directory, k):
+    """Selection before example_index"""
+    return load_examples(directory)[:k]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--examples", type=int, default=40)
+    parser.add_argument("--styles", type=int, default=len(STYLES))
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--k", type=int, default=3)
+    parser.add_argument("--budget", type=int, default=4000)
+    parser.add_argument("--mmr-lambda", type=float, default=0.7)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    embeddings = HashingEmbeddings()
+
+    with tempfile.TemporaryDirectory() as directory:
+        write_examples(directory, args.examples, args.styles, rng)
+        queries = [(style, synthetic_text(style, 1500, rng))
+                   for style in (rng.randrange(args.styles) for _ in range(args.queries))]
+
+        start = time.perf_counter()
+        index = get_example_index(directory, embeddings)
+        build_ms = (time.perf_counter() - start) * 1000
+
+        strategies = {
+            "first-n": lambda text: first_n(directory, args.k),
+            "similarity": lambda text: index.select(embeddings.embed_query(text), args.k),
+            "mmr": lambda text: index.select(embeddings.embed_query(text), args.k, mmr_lambda=args.mmr_lambda),
+            "mmr+budget": lambda text: index.select(
+                embeddings.embed_query(text), args.k, token_budget=args.budget, mmr_lambda=args.mmr_lambda
+            ),
+        }
+
+        print(f"index built once per container in {build_ms:.1f} ms ({args.examples} examples)")
+        print(f"{'strategy':>11s} {'examples':>8s} {'tokens':>7s} {'max tokens':>10s} {'relevant':>8s} {'ms/chunk':>8s}")
+        for name, select in strategies.items():
+            counts, tokens, relevant, elapsed = [], [], [], 0.0
+            for style, text in queries:
+                start = time.perf_counter()
+                selected = select(text)
+                elapsed += time.perf_counter() - start
+
+                counts.append(len(selected))
+                tokens.append(sum(example_tokens(example) for example in selected))
+                relevant.extend(example["extraction"]["style"] == style for example in selected)
+
+            print(f"{name:>11s} {sum(counts) / len(counts):8.2f} {sum(tokens) / len(tokens):7.0f} {max(tokens):10d} "
+                  f"{sum(relevant) / max(len(relevant), 1):8.0%} {elapsed / len(queries) * 1000:8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+# MIT No Attribution
+#
+# Copyright 2025 Amazon Web Services
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this
+# software and associated documentation files (the "Software"), to deal in the Software
+# without restriction, including without limitation the rights to use, copy, modify,
+# merge, publish, distribute, sublicense, and/or sell copies of the Software, and to
+# permit persons to whom the Software is furnished to do so.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED,
+# INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A
+# PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT
+# HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE
+# SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+"""
+Compares the json_report attribute used before with the report store, for reports of growing size, against
+moto S3 and DynamoDB. Reports the job item size (which is what every GetItem and Scan of the jobs table pays
+for), the bytes stored and the time of writes, full reads, single section reads and conditional reads.
+
+    python benchmark_store.py --managers 5 50 500 2000
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+import boto3
+
+from boto3.dynamodb.types import Binary
+from moto import mock_aws
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(BENCHMARKS_DIR, "..", "pace_backend", "shared"))
+sys.path.append(os.path.join(BENCHMARKS_DIR, "..", "..", "..", "shared", "layer"))
+
+from report_store import ReportStore
+
+REGION = "us-east-1"
+BUCKET = "reports"
+SECTION = "notary_information"
+
+
+def synthetic_report(managers):
+    powers = [
+        "Poder general para pleitos y cobranzas",
+        "Poder general para actos de administracion",
+        "Poder en materia laboral con facultades expresas para articular y absolver posiciones",
+    ]
+    return {
+        "general_information": {
+            "name": "ANYCOMPANY PETROL, S.A.P.I. DE C.V.",
+            "social_object": ["Aperturar, instalar, desarrollar y explotar negociaciones del ramo"] * 10,
+        },
+        "shareholders": {"shareholders": [
+            {"shareholder_name": f"Accionista {i}", "stock_units": "12500", "stocks_value": "12500.00"}
+            for i in range(managers)
+        ]},
+        "administration": {"managers": [
+            {"name": f"Administrador {i}", "position": "Consejero", "powers": powers} for i in range(managers)
+        ]},
+        "legal_representative": {"name": "Carlos Salazar", "position": "Comisario", "powers": powers},
+        "notary_information": {"document_number": "12345", "notary_name": "John Doe", "notary_number": "1"},
+    }
+
+
+def item_size(table, job_id):
+    """Approximate DynamoDB item size: attribute names plus values"""
+    def value_size(value):
+        return "x" * len(bytes(value)) if isinstance(value, Binary) else str(value)
+
+    item = table.get_item(Key={"id": job_id})["Item"]
+    return len(json.dumps(item, default=value_size).encode())
+
+
+def timed(fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = fn()
+    return (time.perf_counter() - start) / repeat * 1000, result
+
+
+def legacy_write(table, job_id, report):
+    table.update_item(
+        Key={"id": job_id},
+        UpdateExpression="SET #json_report = :json_report",
+        ExpressionAttributeNames={"#json_report": "json_report"},
+        ExpressionAttributeValues={":json_report": json.dumps(report)},
+    )
+    table.update_item(
+        Key={"id": job_id},
+        UpdateExpression="SET #status = :status",
+        ExpressionAttributeNames={"#status": "status"},
+        ExpressionAttributeValues={":status": "PDF_GENERATION"},
+    )
+
+
+def legacy_read(table, job_id):
+    return json.loads(table.get_item(Key={"id": job_id})["Item"]["json_report"])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--managers", type=int, nargs="+", default=[5, 50, 500, 2000])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    os.environ.setdefault("AWS_DEFAULT_REGION", REGION)
+
+    print(f"{'report':>10s} {'storage':>9s} {'item KB':>8s} {'stored KB':>9s} {'write ms':>8s} "
+          f"{'read ms':>8s} {'section ms':>10s} {'304 ms':>7s}")
+
+    for managers in args.managers:
+        report = synthetic_report(managers)
+        report_kb = len(json.dumps(report).encode()) / 1024
+
+        with mock_aws():
+            table = boto3.resource("dynamodb", region_name=REGION).create_table(
+                TableName="documents",
+                KeySchema=[{"AttributeName": "id", "KeyType": "HASH"}],
+                AttributeDefinitions=[{"AttributeName": "id", "AttributeType": "S"}],
+                BillingMode="PAY_PER_REQUEST",
+            )
+            s3 = boto3.client("s3", region_name=REGION)
+            s3.create_bucket(Bucket=BUCKET)
+
+            table.put_item(Item={"id": "legacy", "status": "INFORMATION_CONSOLIDATION"})
+            try:
+                write_ms, _ = timed(lambda: legacy_write(table, "legacy", report), args.repeat)
+                read_ms, _ = timed(lambda: legacy_read(table, "legacy"), args.repeat)
+                section_ms, _ = timed(lambda: legacy_read(table, "legacy")[SECTION], args.repeat)
+                size_kb = item_size(table, "legacy") / 1024
+                print(f"{report_kb:8.1f}KB {'legacy':>9s} {size_kb:8.1f} {size_kb:9.1f} {write_ms:8.2f} "
+                      f"{read_ms:8.2f} {section_ms:10.2f} {'-':>7s}")
+            except Exception as e:
+                # Reports beyond the 400KB item limit cannot be stored in json_report
+                print(f"{report_kb:8.1f}KB {'legacy':>9s} failed: {type(e).__name__}")
+
+            for storage in ("s3", "dynamodb"):
+                job_id = f"job-{storage}"
+                table.put_item(Item={"id": job_id, "status": "INFORMATION_CONSOLIDATION"})
+                store = ReportStore(table, s3_client=s3, bucket=BUCKET, storage=storage)
+
+                write_ms, manifest = timed(lambda: store.save(job_id, report, "PDF_GENERATION"), args.repeat)
+                read_ms, _ = timed(lambda: store.load(job_id), args.repeat)
+                section_ms, _ = timed(lambda: store.load(job_id, sections=[SECTION]), args.repeat)
+                not_modified_ms, _ = timed(
+                    lambda: store.load(job_id, if_none_match=manifest["etag"]), args.repeat
+                )
+                stored_kb = sum(section["compressed_size"] for section in manifest["sections"].values()) / 1024
+                print(f"{report_kb:8.1f}KB {manifest['storage']:>9s} {item_size(table, job_id) / 1024:8.1f} "
+                      f"{stored_kb:9.1f} {write_ms:8.2f} {read_ms:8.2f} {section_ms:10.2f} {not_modified_ms:7.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,230 @@
+# MIT No Attribution
+#
+# Copyright 2025 Amazon Web Services
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this
+# software and associated documentation files (the "Software"), to deal in the Software
+# without restriction, including without limitation the rights to use, copy, modify,
+# merge, publish, distribute, sublicense, and/or sell copies of the Software, and to
+# permit persons to whom the Software is furnished to do so.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED,
+# INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A
+# PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT
+# HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE
+# SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+"""
+Offline stand-ins for Amazon Textract and ChatBedrock used by the benchmark driver.
+"""
+
+import random
+import threading
+import time
+import typing
+import uuid
+
+from langchain_core.runnables import RunnableLambda
+from pydantic import BaseModel
+
+CHARS_PER_TOKEN = 4
+
+VOCABULARY = (
+    "la sociedad anonima denominada tendra por objeto social la compra venta distribucion "
+    "de bienes muebles e inmuebles el consejo de administracion estara integrado por un "
+    "presidente un secretario y un tesorero quienes tendran poder general para pleitos y "
+    "cobranzas actos de administracion y de dominio ante el notario publico numero del estado"
+).split()
+
+
+class FakeTextract:
+    """
+    Deterministic Textract client for get_document_text_detection.
+
+    Every document gets `pages` PAGE blocks, `lines_per_page` LINE blocks per page and their WORD blocks,
+    returned in pages of at most `max_results` blocks with NextToken, like the real API.
+    """
+
+    def __init__(self, pages: int, lines_per_page: int = 40, words_per_line: int = 10,
+                 max_results: int = 1000, seed: int = 7):
+        self.pages = pages
+        self.lines_per_page = lines_per_page
+        self.words_per_line = words_per_line
+        self.max_results = max_results
+        self.seed = seed
+        self.calls = 0
+        self._blocks = None
+
+    def _geometry(self, left, top, width, height):
+        return {
+            "BoundingBox": {"Width": width, "Height": height, "Left": left, "Top": top},
+            "Polygon": [
+                {"X": left, "Y": top},
+                {"X": left + width, "Y": top},
+                {"X": left + width, "Y": top + height},
+                {"X": left, "Y": top + height},
+            ],
+        }
+
+    def blocks(self):
+        if self._blocks is not None:
+            return self._blocks
+
+        rng = random.Random(self.seed)
+        blocks = []
+        line_height = 0.9 / self.lines_per_page
+
+        for page in range(1, self.pages + 1):
+            page_block = {
+                "BlockType": "PAGE",
+                "Id": str(uuid.UUID(int=rng.getrandbits(128))),
+                "Page": page,
+                "Geometry": self._geometry(0, 0, 1, 1),
+                "Relationships": [{"Type": "CHILD", "Ids": []}],
+            }
+            blocks.append(page_block)
+
+            for line in range(self.lines_per_page):
+                top = 0.05 + line * line_height
+                words = [rng.choice(VOCABULARY) for _ in range(self.words_per_line)]
+                word_ids = []
+                word_blocks = []
+                for i, word in enumerate(words):
+                    word_id = str(uuid.UUID(int=rng.getrandbits(128)))
+                    word_ids.append(word_id)
+                    word_blocks.append({
+                        "BlockType": "WORD",
+                        "Id": word_id,
+                        "Page": page,
+                        "Text": word,
+                        "TextType": "PRINTED",
+                        "Confidence": 99.0,
+                        "Geometry": self._geometry(0.05 + i * 0.09, top, 0.08, line_height * 0.8),
+                    })
+                line_id = str(uuid.UUID(int=rng.getrandbits(128)))
+                page_block["Relationships"][0]["Ids"].append(line_id)
+                blocks.append({
+                    "BlockType": "LINE",
+                    "Id": line_id,
+                    "Page": page,
+                    "Text": " ".join(words),
+                    "Confidence": 99.0,
+                    "Geometry": self._geometry(0.05, top, 0.9, line_height * 0.8),
+                    "Relationships": [{"Type": "CHILD", "Ids": word_ids}],
+                })
+                blocks.extend(word_blocks)
+
+        self._blocks = blocks
+        return blocks
+
+    def get_document_text_detection(self, JobId, NextToken=None, MaxResults=None):
+        self.calls += 1
+        blocks = self.blocks()
+        start = int(NextToken) if NextToken else 0
+        end = start + (MaxResults or self.max_results)
+
+        response = {
+            "DocumentMetadata": {"Pages": self.pages},
+            "JobStatus": "SUCCEEDED",
+            "DetectDocumentTextModelVersion": "1.0",
+            "Blocks": blocks[start:end],
+        }
+        if end < len(blocks):
+            response["NextToken"] = str(end)
+        return response
+
+
+def synthetic_value(annotation, list_items=2):
+    """A deterministic value for a pydantic field annotation"""
+    origin = typing.get_origin(annotation)
+    if origin in (list, typing.List):
+        (item,) = typing.get_args(annotation) or (str,)
+        return [synthetic_value(item, list_items) for _ in range(list_items)]
+    if origin is typing.Union:
+        return synthetic_value(next(a for a in typing.get_args(annotation) if a is not type(None)), list_items)
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return synthetic_instance(annotation, list_items)
+    if annotation is bool:
+        return True
+    if annotation in (int, float):
+        return annotation(1)
+    return "Lorem ipsum dolor sit amet"
+
+
+def synthetic_instance(schema: typing.Type[BaseModel], list_items: int = 2) -> BaseModel:
+    """Fill every field of `schema`, so the downstream handlers see a realistic report"""
+    return schema(**{
+        name: synthetic_value(field.annotation, list_items) for name, field in schema.model_fields.items()
+    })
+
+
+class LLMStats:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.calls = {}
+        self.input_tokens = 0
+        self.output_tokens = 0
+
+    def record(self, schema_name, input_tokens, output_tokens):
+        with self.lock:
+            self.calls[schema_name] = self.calls.get(schema_name, 0) + 1
+            self.input_tokens += input_tokens
+            self.output_tokens += output_tokens
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                "calls": sum(self.calls.values()),
+                "calls_by_schema": dict(self.calls),
+                "input_tokens": self.input_tokens,
+                "output_tokens": self.output_tokens,
+            }
+
+
+class FakeChatBedrock:
+    """
+    Drop-in replacement for langchain_aws.ChatBedrock in the pipeline handlers.
+
+    `with_structured_output(schema)` returns a runnable that waits `latency + output_tokens * latency_per_token`
+    seconds and returns a valid synthetic `schema` instance. Token usage is
+    estimated from the prompt size and recorded in `stats`.
+    """
+
+    stats = LLMStats()
+    latency = 0.0
+    latency_per_token = 0.0
+    output_tokens = 400
+    confidence_level = 90
+
+    def __init__(self, *args, **kwargs):
+        self.kwargs = kwargs
+
+    @classmethod
+    def configure(cls, latency=0.0, latency_per_token=0.0, output_tokens=400, confidence_level=90):
+        cls.stats = LLMStats()
+        cls.latency = latency
+        cls.latency_per_token = latency_per_token
+        cls.output_tokens = output_tokens
+        cls.confidence_level = confidence_level
+
+    def with_structured_output(self, schema):
+        def invoke(prompt_value):
+            prompt_text = prompt_value.to_string() if hasattr(prompt_value, "to_string") else str(prompt_value)
+            input_tokens = len(prompt_text) // CHARS_PER_TOKEN
+            time.sleep(self.latency + self.output_tokens * self.latency_per_token)
+            self.stats.record(schema.__name__, input_tokens, self.output_tokens)
+
+            if "extracted_information" not in schema.model_fields:
+                # Report consolidation
+                return synthetic_instance(schema)
+
+            # Information extraction: the section is always found, with a fixed size payload
+            return schema(
+                thinking="The text contains the requested information",
+                confidence_level=self.confidence_level,
+                conclusion=True,
+                extracted_information="Lorem ipsum dolor sit amet " * (self.output_tokens // 6),
+            )
+
+        return RunnableLambda(invoke)
@@ -0,0 +1,250 @@
+# MIT No Attribution
+#
+# Copyright 2025 Amazon Web Services
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this
+# software and associated documentation files (the "Software"), to deal in the Software
+# without restriction, including without limitation the rights to use, copy, modify,
+# merge, publish, distribute, sublicense, and/or sell copies of the Software, and to
+# permit persons to whom the Software is furnished to do so.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED,
+# INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A
+# PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT
+# HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE
+# SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+"""
+Local driver for the text analysis workflow. Loads the Lambda handlers of pace_backend/text_analysis_workflow
+against moto S3 and DynamoDB, replaces Textract and ChatBedrock with the fakes, and chains the handlers with the
+same event shapes as the ExtractionWorkflow state machine:
+
+    ChunkDocumentTask -> ChunkIteratorMap(ExtractData2Schema) -> ConsolidateReport -> PersistResults -> GeneratePDFReport
+"""
+
+import contextlib
+import importlib.util
+import json
+import os
+import sys
+import time
+import tracemalloc
+import uuid
+
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+from fakes import FakeChatBedrock, FakeTextract
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+WORKFLOW_DIR = os.path.join(BACKEND_DIR, "pace_backend", "text_analysis_workflow")
+LAYER_DIRS = [
+    os.path.join(BACKEND_DIR, "pace_backend", "shared"),
+    os.path.join(WORKFLOW_DIR, "shared"),
+    os.path.join(BACKEND_DIR, "..", "..", "shared", "layer"),
+]
+
+TABLE_NAME = "benchmark-documents"
+OUTPUT_BUCKET_NAME = "benchmark-output"
+REGION = "us-east-1"
+
+# Same values as the CDK defaults of the stack
+ENVIRONMENT = {
+    "AWS_DEFAULT_REGION": REGION,
+    "AWS_ACCESS_KEY_ID": "testing",
+    "AWS_SECRET_ACCESS_KEY": "testing",
+    "REGION": REGION,
+    "BEDROCK_REGION": REGION,
+    "BEDROCK_MODEL_ID": "anthropic.claude-3-haiku-20240307-v1:0",
+    "LANGUAGE_ID": "es",
+    "USE_EXAMPLES": "False",
+    "PAGE_CHUNK_SIZE": "5",
+    "EXTRACTION_CONFIDENCE_LEVEL": "85",
+    "DOCUMENTS_DYNAMO_DB_TABLE_NAME": TABLE_NAME,
+    "OUTPUT_BUCKET_NAME": OUTPUT_BUCKET_NAME,
+    "POWERTOOLS_LOG_LEVEL": "WARNING",
+    "POWERTOOLS_SERVICE_NAME": "benchmark",
+}
+
+# Concurrency of the ChunkIteratorMap state
+MAP_MAX_CONCURRENCY = 5
+
+# Packages that more than one Lambda ships with the same name
+LAMBDA_LOCAL_PACKAGES = ("prompt_selector", "structured_output", "TextractorHandler")
+
+
+def load_handler(function_dir: str):
+    """Import the index.py of a Lambda function as its own module, with its directory first on sys.path"""
+    path = os.path.join(WORKFLOW_DIR, function_dir)
+
+    for name in list(sys.modules):
+        if name.split(".")[0] in LAMBDA_LOCAL_PACKAGES:
+            del sys.modules[name]
+
+    sys.path.insert(0, path)
+    try:
+        spec = importlib.util.spec_from_file_location(f"benchmark_{function_dir}", os.path.join(path, "index.py"))
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+    finally:
+        sys.path.remove(path)
+
+    return module
+
+
+def lambda_context(function_name: str):
+    return SimpleNamespace(
+        function_name=function_name,
+        function_version="$LATEST",
+        memory_limit_in_mb=1024,
+        invoked_function_arn=f"arn:aws:lambda:{REGION}:123456789012:function:{function_name}",
+        aws_request_id=str(uuid.uuid4()),
+    )
+
+
+class Pipeline:
+    """
+    The five workflow handlers wired to moto and the fakes. Must be created and run inside moto.mock_aws().
+    """
+
+    def __init__(self, textract: FakeTextract):
+        import boto3
+        import langchain_core
+
+        os.environ.update(ENVIRONMENT)
+        for layer_dir in LAYER_DIRS:
+            if layer_dir not in sys.path:
+                sys.path.append(layer_dir)
+
+        boto3.resource("dynamodb", region_name=REGION).create_table(
+            TableName=TABLE_NAME,
+            KeySchema=[{"AttributeName": "id", "KeyType": "HASH"}],
+            AttributeDefinitions=[{"AttributeName": "id", "AttributeType": "S"}],
+            BillingMode="PAY_PER_REQUEST",
+        )
+        boto3.client("s3", region_name=REGION).create_bucket(Bucket=OUTPUT_BUCKET_NAME)
+
+        self.chunk_document = load_handler("chunk_textract_document_fn")
+        self.extract_data = load_handler("extract_data_to_schema_fn")
+        self.consolidate_report = load_handler("consolidate_report_fn")
+        self.persist_results = load_handler("persist_results_fn")
+        self.generate_pdf = load_handler("generate_pdf_fn")
+
+        # The handlers turn on langchain debug tracing at import time, which would dominate the timings
+        langchain_core.globals.set_debug(False)
+
+        self.chunk_document.textract_client = textract
+        self.extract_data.ChatBedrock = FakeChatBedrock
+        self.consolidate_report.ChatBedrock = FakeChatBedrock
+
+        self.table = boto3.resource("dynamodb", region_name=REGION).Table(TABLE_NAME)
+
+    def _invoke(self, module, event, name):
+        response = module.lambda_handler(event, lambda_context(name))
+        if response["statusCode"] != 200:
+            raise RuntimeError(f"{name} failed: {response.get('error')}")
+        return response
+
+    def _stage(self, name, fn, *args):
+        llm_before = FakeChatBedrock.stats.snapshot()
+        tracemalloc.reset_peak()
+        start_memory, _ = tracemalloc.get_traced_memory()
+        start = time.perf_counter()
+
+        output = fn(*args)
+
+        latency = time.perf_counter() - start
+        _, peak_memory = tracemalloc.get_traced_memory()
+        llm_after = FakeChatBedrock.stats.snapshot()
+
+        return output, {
+            "stage": name,
+            "latency_s": round(latency, 4),
+            "peak_memory_mb": round(max(0, peak_memory - start_memory) / 2 ** 20, 3),
+            "llm_calls": llm_after["calls"] - llm_before["calls"],
+            "llm_input_tokens": llm_after["input_tokens"] - llm_before["input_tokens"],
+            "llm_output_tokens": llm_after["output_tokens"] - llm_before["output_tokens"],
+        }
+
+    def _chunk(self, job_id):
+        message = {"Message": json.dumps({"Status": "SUCCEEDED", "JobId": job_id})}
+        response = self._invoke(self.chunk_document, [{"body": json.dumps(message)}], "ChunkDocument")
+        # ChunkDocumentTask result_selector
+        return {"body": response["body"], "statusCode": response["statusCode"], "job_id": response["job_id"]}
+
+    def _extract(self, chunk_output):
+        # ChunkIteratorMap item_selector, ExtractData2Schema result_path="$.TaskResult"
+        items = [
+            {"chunk_index": index, "text": text, "job_id": chunk_output["job_id"]}
+            for index, text in enumerate(chunk_output["body"]["results"]["text"])
+        ]
+
+        def run_item(item):
+            response = self._invoke(self.extract_data, dict(item), "ExtractData2Schema")
+            return {**item, "TaskResult": {"body": response["body"], "statusCode": response["statusCode"]}}
+
+        with ThreadPoolExecutor(max_workers=MAP_MAX_CONCURRENCY) as executor:
+            return list(executor.map(run_item, items))
+
+    def _consolidate(self, map_output):
+        return {"Payload": self._invoke(self.consolidate_report, map_output, "ConsolidateReport")}
+
+    def _persist(self, consolidate_output):
+        return {"Payload": self._invoke(self.persist_results, consolidate_output, "PersistResults")}
+
+    def _generate_pdf(self, persist_output):
+        return {"Payload": self._invoke(self.generate_pdf, persist_output, "GeneratePDFReport")}
+
+    def run(self):
+        """Process one document end to end and return the number of chunks and the metrics of every stage"""
+        job_id = str(uuid.uuid4())
+        self.table.put_item(Item={"id": job_id, "status": "TEXT_EXTRACTION"})
+
+        # The handlers print the Textract pages and log through stdout. Redirected once for the whole run since
+        # redirect_stdout is not thread safe and the Map stage runs handlers concurrently
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            return self._run_stages(job_id)
+
+    def _run_stages(self, output):
+        chunks = 0
+        stages = []
+        for name, fn in [
+            ("chunk_textract_document", self._chunk),
+            ("extract_data_to_schema", self._extract),
+            ("consolidate_report", self._consolidate),
+            ("persist_results", self._persist),
+            ("generate_pdf", self._generate_pdf),
+        ]:
+            output, metrics = self._stage(name, fn, output)
+            stages.append(metrics)
+            if name == "chunk_textract_document":
+                chunks = len(output["body"]["results"]["text"])
+
+        return chunks, stages
+
+
+def run_document(pages: int, lines_per_page: int = 40):
+    """Benchmark one synthetic document of `pages` pages in a fresh moto account"""
+    from moto import mock_aws
+
+    textract = FakeTextract(pages, lines_per_page=lines_per_page)
+    textract.blocks()  # Build the synthetic document outside of the measurements
+
+    with mock_aws():
+        pipeline = Pipeline(textract)
+
+        tracemalloc.start()
+        try:
+            chunks, stages = pipeline.run()
+        finally:
+            tracemalloc.stop()
+
+    return {
+        "pages": pages,
+        "chunks": chunks,
+        "textract_calls": textract.calls,
+        "total_latency_s": round(sum(stage["latency_s"] for stage in stages), 4),
+        "total_llm_calls": sum(stage["llm_calls"] for stage in stages),
+        "stages": stages,
+    }
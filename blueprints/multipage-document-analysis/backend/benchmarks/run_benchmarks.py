@@ -0,0 +1,107 @@
+# MIT No Attribution
+#
+# Copyright 2025 Amazon Web Services
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this
+# software and associated documentation files (the "Software"), to deal in the Software
+# without restriction, including without limitation the rights to use, copy, modify,
+# merge, publish, distribute, sublicense, and/or sell copies of the Software, and to
+# permit persons to whom the Software is furnished to do so.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED,
+# INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A
+# PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT
+# HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE
+# SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+"""
+Runs the text analysis workflow offline for synthetic documents of several sizes and writes per-stage latency,
+peak memory and LLM usage to a JSON file. With --baseline, prints the change against a previous results file.
+
+    python run_benchmarks.py --pages 5 50 500 --output results/current.json
+    python run_benchmarks.py --pages 5 50 500 --baseline results/current.json --output results/candidate.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+
+from fakes import FakeChatBedrock
+from pipeline import ENVIRONMENT, run_document
+
+DEFAULT_PAGES = [5, 25, 100, 500]
+
+
+def print_results(document, baseline=None):
+    print(f"\n{document['pages']} pages, {document['chunks']} chunks, "
+          f"{document['total_llm_calls']} LLM calls, {document['total_latency_s']:.2f}s")
+
+    baseline_stages = {stage["stage"]: stage for stage in baseline["stages"]} if baseline else {}
+
+    for stage in document["stages"]:
+        line = (f"  {stage['stage']:26s} {stage['latency_s']:8.3f}s  {stage['peak_memory_mb']:9.2f} MB  "
+                f"llm calls {stage['llm_calls']:5d}  input tokens {stage['llm_input_tokens']:9d}")
+
+        previous = baseline_stages.get(stage["stage"])
+        if previous and previous["latency_s"]:
+            line += (f"  | latency {(stage['latency_s'] / previous['latency_s'] - 1) * 100:+6.1f}%"
+                     f"  memory {stage['peak_memory_mb'] - previous['peak_memory_mb']:+8.2f} MB"
+                     f"  llm calls {stage['llm_calls'] - previous['llm_calls']:+5d}")
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, nargs="+", default=DEFAULT_PAGES, help="document sizes to run")
+    parser.add_argument("--lines-per-page", type=int, default=40)
+    parser.add_argument("--llm-latency", type=float, default=0.0, help="fixed seconds per LLM call")
+    parser.add_argument("--llm-latency-per-token", type=float, default=0.0,
+                        help="seconds per generated token of each LLM call")
+    parser.add_argument("--llm-output-tokens", type=int, default=400, help="tokens generated per LLM call")
+    parser.add_argument("--output", default=os.path.join(os.path.dirname(__file__), "results", "latest.json"))
+    parser.add_argument("--baseline", help="previous results file to compare against")
+    args = parser.parse_args()
+
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = {document["pages"]: document for document in json.load(f)["documents"]}
+
+    documents = []
+    for pages in args.pages:
+        FakeChatBedrock.configure(
+            latency=args.llm_latency,
+            latency_per_token=args.llm_latency_per_token,
+            output_tokens=args.llm_output_tokens,
+        )
+        document = run_document(pages, lines_per_page=args.lines_per_page)
+        document["llm_calls_by_schema"] = FakeChatBedrock.stats.snapshot()["calls_by_schema"]
+        documents.append(document)
+        print_results(document, baseline.get(pages))
+
+    results = {
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "config": {
+            "lines_per_page": args.lines_per_page,
+            "llm_latency": args.llm_latency,
+            "llm_latency_per_token": args.llm_latency_per_token,
+            "llm_output_tokens": args.llm_output_tokens,
+            "page_chunk_size": int(ENVIRONMENT["PAGE_CHUNK_SIZE"]),
+        },
+        "documents": documents,
+    }
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"\nResults written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
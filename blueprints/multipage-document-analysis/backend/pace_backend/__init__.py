@@ -226,6 +226,14 @@ class PACEBackendStack(Stack):
             compatible_runtimes=[lambda_.Runtime.PYTHON_3_13],
         )
 
+        # Lambda layer with the packages shared by the blueprints: the Bedrock governor and the job status reads
+        self.common_lambda_layer = lambda_python.PythonLayerVersion(
+            self,
+            "CommonLayer",
+            entry=os.path.join(os.path.dirname(__file__), "..", "..", "..", "shared", "layer"),
+            compatible_runtimes=[lambda_.Runtime.PYTHON_3_13],
+        )
+
         # Create API from construct
         self.api = DocumentAPI(
             self,
@@ -235,7 +243,8 @@ class PACEBackendStack(Stack):
             documents_table=self.documents_table,
             sns_textract_topic=self.sns_topic,
             sns_textract_role=self.textract_sns_role,
-            shared_status_lambda_layer=self.shared_status_lambda_layer
+            shared_status_lambda_layer=self.shared_status_lambda_layer,
+            common_lambda_layer=self.common_lambda_layer
         )
 
         # Create step functions document analysis workflow
@@ -245,6 +254,7 @@ class PACEBackendStack(Stack):
             dynamo_docs_table=self.documents_table,
             output_s3_bucket=self.reports_bucket,
             shared_status_lambda_layer=self.shared_status_lambda_layer,
+            common_lambda_layer=self.common_lambda_layer,
             language_code=language_code.value_as_string,
             pages_chunk=pages_chunk.value_as_string,
             use_examples=True if include_examples.value_as_string == "true" else False,
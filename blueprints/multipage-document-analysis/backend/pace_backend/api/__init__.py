@@ -51,6 +51,7 @@ class DocumentAPI(Construct):
             sns_textract_topic: sns.ITopic,
             sns_textract_role: iam.IRole,
             shared_status_lambda_layer: lambda_python.PythonLayerVersion,
+            common_lambda_layer: lambda_python.PythonLayerVersion,
     ) -> None:
 
         super().__init__(scope, construct_id)
@@ -94,7 +95,7 @@ class DocumentAPI(Construct):
             default_cors_preflight_options=apigw.CorsOptions(
                 allow_origins=apigw.Cors.ALL_ORIGINS,
                 allow_methods=apigw.Cors.ALL_METHODS,
-                allow_headers=apigw.Cors.DEFAULT_HEADERS,
+                allow_headers=apigw.Cors.DEFAULT_HEADERS + ["If-None-Match"],
             ),
         )
 
@@ -161,8 +162,12 @@ class DocumentAPI(Construct):
             index="index.py",
             handler="lambda_handler",
             runtime=lambda_.Runtime.PYTHON_3_13,
+            layers=[shared_status_lambda_layer, common_lambda_layer],
             environment={
                 "DOCUMENTS_DYNAMO_DB_TABLE_NAME": documents_table.table_name,
+                "STATUS_CACHE_TTL": "2",
+                "STATUS_MAX_WAIT": "20",
+                "STATUS_POLL_INTERVAL": "5",
             },
             timeout=Duration.seconds(60),
         )
@@ -191,9 +196,12 @@ class DocumentAPI(Construct):
             index="index.py",
             handler="lambda_handler",
             runtime=lambda_.Runtime.PYTHON_3_13,
-            layers=[shared_status_lambda_layer],
+            layers=[shared_status_lambda_layer, common_lambda_layer],
             environment={
                 "DOCUMENTS_DYNAMO_DB_TABLE_NAME": documents_table.table_name,
+                "STATUS_CACHE_TTL": "2",
+                "STATUS_MAX_WAIT": "20",
+                "STATUS_POLL_INTERVAL": "2",
             },
             timeout=Duration.seconds(60),
         )
@@ -222,13 +230,16 @@ class DocumentAPI(Construct):
             index="index.py",
             handler="lambda_handler",
             runtime=lambda_.Runtime.PYTHON_3_13,
-            layers=[shared_status_lambda_layer],
+            layers=[shared_status_lambda_layer, common_lambda_layer],
             environment={
                 "DOCUMENTS_DYNAMO_DB_TABLE_NAME": documents_table.table_name,
+                "OUTPUT_BUCKET_NAME": report_bucket.bucket_name,
+                "REPORT_STORAGE": "s3",
             },
             timeout=Duration.seconds(60),
         )
         documents_table.grant_read_data(self.lambda_get_results)
+        report_bucket.grant_read(self.lambda_get_results)
 
         NagSuppressions.add_resource_suppressions(
             self.lambda_get_results,
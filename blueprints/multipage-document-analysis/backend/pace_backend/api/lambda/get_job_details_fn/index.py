@@ -23,6 +23,7 @@ import functools
 import boto3
 
 from status_info_layer.StatusEnum import StatusEnum
+from job_status import conditional_read, get_status_reader, request_conditions
 
 from aws_lambda_powertools.utilities.typing import LambdaContext
 from aws_lambda_powertools import Logger
@@ -34,6 +35,10 @@ logger = Logger()
 TABLE_NAME = os.getenv("DOCUMENTS_DYNAMO_DB_TABLE_NAME")
 table = boto3.resource("dynamodb").Table(TABLE_NAME)
 
+# Only the attributes returned to the frontend are read from the table, never the stored report
+ITEM_ATTRIBUTES = ["document_name", "document_key", "report_key", "status"]
+status_reader = get_status_reader(table, ITEM_ATTRIBUTES)
+
 GET_TABLE_ITEM_BY_ID_PATTERN = re.compile("(/[a-zA-Z0-9-]*)*/jobs/query/[A-Za-z0-9-]*")
 
 # TODO: use aws_lambda_powertools.event_handler import APIGatewayRestResolver and CORSConfig to avoid having to
@@ -56,18 +61,12 @@ def _format_response(handler):
 
         logger.info(lambda_response)
 
+        if lambda_response["statusCode"] in (200, 304):
+            response["headers"].update(lambda_response["headers"])
+
         if lambda_response["statusCode"] == 200:
-            response["body"] = json.dumps({
-                "job_id": lambda_response["job_id"],
-                "status":  lambda_response["status"],
-                "document_name":  lambda_response["document_name"],
-                "source_doc_key": lambda_response["document_key"],
-                "report_doc_key": lambda_response["report_key"],
-                "metric_1": "-",
-                "metric_2": "-",
-                "metric_3": "-"
-            })
-        else:
+            response["body"] = json.dumps(lambda_response["body"])
+        elif lambda_response["statusCode"] != 304:
             response["body"] = json.dumps({
                 "message": f"Error retrieving results for job {lambda_response['job_id']}"
             })
@@ -90,33 +89,42 @@ def lambda_handler(event, _context: LambdaContext):
     path = event["path"]
     id = event["pathParameters"]["id"]
     if method == "GET" and GET_TABLE_ITEM_BY_ID_PATTERN.match(path):
-        return _get_item_by_id(id)
+        return _get_item_by_id(id, event)
     else:
         return {
             "statusCode": 500,
             "items": "Not implemented"
         }
 
-def _get_item_by_id(id: str):
+def _get_item_by_id(id: str, event):
     """Given the ID of an item retrieve from DynamoDb and return it"""
 
-    item = table.get_item(Key={"id": id})
-
-    logger.info("Received item")
-    logger.info(item)
+    result = conditional_read(lambda: _job_details(id, status_reader.get_item({"id": id})), **request_conditions(event))
 
-    if "Item" not in item:
+    if result.body is None:
         return {
             "statusCode": 500,
             "message": "Not found",
             "job_id":  id,
         }
     return {
-        "statusCode": 200,
-        "job_id": id,
-        "document_name": item["Item"]["document_name"],
-        "document_key": item["Item"]["document_key"],
-        "report_key": item["Item"].get("report_key", "") if StatusEnum[item["Item"]["status"]].value == StatusEnum.PDF_GENERATION.value else "",
-        "status": item["Item"]["status"],
+        "statusCode": result.status_code,
+        "headers": result.headers(),
+        "body": result.body,
     }
 
+
+def _job_details(id: str, item):
+    if not item:
+        return None
+
+    return {
+        "job_id": id,
+        "status": item["status"],
+        "document_name": item["document_name"],
+        "source_doc_key": item["document_key"],
+        "report_doc_key": item.get("report_key", "") if StatusEnum[item["status"]].value == StatusEnum.PDF_GENERATION.value else "",
+        "metric_1": "-",
+        "metric_2": "-",
+        "metric_3": "-"
+    }
@@ -23,6 +23,7 @@ import functools
 import boto3
 
 from status_info_layer.StatusEnum import StatusEnum
+from report_store import ReportNotFoundError, get_report_store
 
 from aws_lambda_powertools.utilities.typing import LambdaContext
 from aws_lambda_powertools import Logger
@@ -33,6 +34,7 @@ logger = Logger()
 
 TABLE_NAME = os.getenv("DOCUMENTS_DYNAMO_DB_TABLE_NAME")
 table = boto3.resource("dynamodb").Table(TABLE_NAME)
+report_store = get_report_store(table, boto3.client("s3"))
 
 GET_TABLE_RESULTS_BY_ID_PATTERN = re.compile("(/[a-zA-Z0-9-]*)*/jobs/results/[A-Za-z0-9-]*")
 
@@ -56,12 +58,17 @@ def _format_response(handler):
 
         logger.info(lambda_response)
 
+        if "etag" in lambda_response:
+            response["headers"]["ETag"] = lambda_response["etag"]
+            response["headers"]["Cache-Control"] = "private, no-cache"
+            response["headers"]["Access-Control-Expose-Headers"] = "ETag"
+
         if lambda_response["statusCode"] == 200:
             response["body"] = json.dumps({
                 "job_id": lambda_response["job_id"],
                 "json_report":  lambda_response["json_report"],
             })
-        else:
+        elif lambda_response["statusCode"] != 304:  # Not modified responses have no body
             response["body"] = json.dumps({
                 "message": f"Error retrieving results for job {lambda_response['job_id']}"
             })
@@ -83,39 +90,52 @@ def lambda_handler(event, _context: LambdaContext):
     method = event["httpMethod"]
     path = event["path"]
     id = event["pathParameters"]["id"]
+
+    # Optional ?sections=general_information,shareholders projection
+    query_parameters = event.get("queryStringParameters") or {}
+    sections = [section for section in query_parameters.get("sections", "").split(",") if section] or None
+
+    headers = {key.lower(): value for key, value in (event.get("headers") or {}).items()}
+
     if method == "GET" and GET_TABLE_RESULTS_BY_ID_PATTERN.match(path):
-        return _get_item_by_id(id)
+        return _get_item_by_id(id, sections, headers.get("if-none-match"))
     else:
         return {
             "statusCode": 500,
             "items": "Not implemented"
         }
 
-def _get_item_by_id(id: str):
-    """Given the ID of an item retrieve from DynamoDb and return it"""
-
-    item = table.get_item(Key={"id": id})
-
-    logger.info("Received item")
-    logger.info(item)
+def _get_item_by_id(id: str, sections=None, if_none_match=None):
+    """Given the ID of an item retrieve its report, or only the requested sections, from the report store"""
 
-    if "Item" not in item:
+    try:
+        report = report_store.load(id, sections=sections, if_none_match=if_none_match)
+    except ReportNotFoundError as e:
+        logger.info(str(e))
         return {
             "statusCode": 500,
             "message": "Not found",
             "job_id":  id,
         }
 
-    if StatusEnum[item["Item"]["status"]].value < StatusEnum.REPORT_PERSISTANCE.value:
+    logger.info(f"Report of job {id} with status {report.status} and ETag {report.etag}")
+
+    if StatusEnum[report.status].value < StatusEnum.REPORT_PERSISTANCE.value:
         return {
             "statusCode": 500,
             "message": "Report unavailable",
             "job_id":  id,
         }
+    elif report.not_modified:
+        return {
+            "statusCode": 304,
+            "job_id": id,
+            "etag": report.etag,
+        }
     else:
         return {
             "statusCode": 200,
             "job_id": id,
-            "json_report": json.loads(item["Item"]["json_report"])
+            "etag": report.etag,
+            "json_report": report.sections
         }
-
@@ -27,11 +27,23 @@ from aws_lambda_powertools import Logger
 
 from botocore.exceptions import ClientError
 
+from job_status import conditional_read, get_status_reader, request_conditions
+
 logger = Logger()
 
 TABLE_NAME = os.getenv("DOCUMENTS_DYNAMO_DB_TABLE_NAME")
 table = boto3.resource("dynamodb").Table(TABLE_NAME)
 
+# Only the attributes returned to the frontend are read from the table, never the stored report
+ITEM_ATTRIBUTES = [
+    "document_name",
+    "document_key",
+    "id",
+    "report_key",
+    "status",
+]
+status_reader = get_status_reader(table, ITEM_ATTRIBUTES)
+
 GET_TABLE_ITEMS_PATTERN = re.compile("(/[a-zA-Z0-9-]*)*/jobs/query")
 
 # TODO: use aws_lambda_powertools.event_handler import APIGatewayRestResolver and CORSConfig to avoid having to
@@ -56,25 +68,12 @@ def _format_response(handler):
 
         logger.info(lambda_response)
 
-        if lambda_response["statusCode"] == 200:
-
-            items = []
+        if lambda_response["statusCode"] in (200, 304):
+            response["headers"].update(lambda_response["headers"])
 
-            for item in lambda_response["items"]:
-                item_response = {
-                    "document_name": item["document_name"],
-                    "document_key": item["document_key"],
-                    "id": item["id"],
-                    "report_key": item.get("report_key", ""),
-                    "status": item["status"],
-                }
-
-                items.append(item_response)
-
-            response["body"] = json.dumps({
-                "items": items,
-            })
-        else:
+        if lambda_response["statusCode"] == 200:
+            response["body"] = json.dumps(lambda_response["body"])
+        elif lambda_response["statusCode"] != 304:
             response["body"] = json.dumps({
                 "message": "Error retrieving jobs"
             })
@@ -103,7 +102,7 @@ def lambda_handler(event, _context: LambdaContext):
     logger.info(path)
 
     if method == "GET" and GET_TABLE_ITEMS_PATTERN.match(path):
-        return _get_items()
+        return _get_items(event)
     else:
         return {
             "statusCode": 500,
@@ -111,9 +110,23 @@ def lambda_handler(event, _context: LambdaContext):
         }
 
 
-def _get_items():
-    items = table.scan()
+def _item_response(item):
+    return {
+        "document_name": item["document_name"],
+        "document_key": item["document_key"],
+        "id": item["id"],
+        "report_key": item.get("report_key", ""),
+        "status": item["status"],
+    }
+
+
+def _get_items(event):
+    result = conditional_read(
+        lambda: {"items": [_item_response(item) for item in status_reader.scan()]},
+        **request_conditions(event),
+    )
     return {
-        "statusCode": 200,
-        "items": items.get("Items", [])
+        "statusCode": result.status_code,
+        "headers": result.headers(),
+        "body": result.body,
     }
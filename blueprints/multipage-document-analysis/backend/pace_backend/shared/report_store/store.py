@@ -0,0 +1,287 @@
+# MIT No Attribution
+#
+# Copyright 2025 Amazon Web Services
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this
+# software and associated documentation files (the "Software"), to deal in the Software
+# without restriction, including without limitation the rights to use, copy, modify,
+# merge, publish, distribute, sublicense, and/or sell copies of the Software, and to
+# permit persons to whom the Software is furnished to do so.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED,
+# INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A
+# PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT
+# HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE
+# SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+"""
+Storage of the consolidated reports outside of the `json_report` attribute of the jobs table.
+
+Every report section is serialized and gzip compressed on its own, so readers can fetch only the sections they
+need. Section bodies are stored either as S3 objects (default) or as binary attributes of the job item. The job
+item only keeps a small manifest under `report` with the location, size and ETag of every section, which is
+written together with the job status in a single update_item call.
+"""
+
+import gzip
+import hashlib
+import json
+import logging
+import os
+
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional
+
+from job_status import etag_matches
+
+logger = logging.getLogger(__name__)
+
+STORAGE_S3 = "s3"
+STORAGE_DYNAMODB = "dynamodb"
+
+# Inline reports must leave room for the rest of the job item within the 400KB item limit
+MAX_INLINE_BYTES = 350 * 1024
+
+
+class ReportNotFoundError(Exception):
+    """Raised when the job or its report do not exist"""
+
+
+def section_etag(body: bytes) -> str:
+    return hashlib.sha256(body).hexdigest()[:32]
+
+
+def projection_etag(section_etags: Dict[str, str]) -> str:
+    """Strong ETag of a set of sections, independent of the order in which they are requested"""
+    digest = hashlib.sha256()
+    for name in sorted(section_etags):
+        digest.update(f"{name}:{section_etags[name]};".encode())
+    return f'"{digest.hexdigest()[:32]}"'
+
+
+def serialize_section(section) -> bytes:
+    return json.dumps(section, separators=(",", ":"), sort_keys=True, ensure_ascii=False).encode("utf-8")
+
+
+@dataclass
+class StoredReport:
+    job_id: str
+    status: str
+    etag: str
+    not_modified: bool = False
+    sections: Dict[str, object] = field(default_factory=dict)
+
+
+class ReportStore:
+    """
+    Reads and writes job reports.
+
+    @param table: boto3 DynamoDB Table of the jobs
+    @param s3_client: boto3 S3 client, required for the S3 storage
+    @param bucket: bucket for the section objects
+    @param storage: "s3" or "dynamodb". Inline reports bigger than MAX_INLINE_BYTES go to S3 when a bucket is set
+    """
+
+    def __init__(self, table, s3_client=None, bucket: Optional[str] = None, storage: str = STORAGE_S3,
+                 prefix: str = "reports", max_workers: int = 8):
+        if storage not in (STORAGE_S3, STORAGE_DYNAMODB):
+            raise ValueError(f"Unknown report storage {storage}")
+        if storage == STORAGE_S3 and not bucket:
+            raise ValueError("A bucket is required for the S3 report storage")
+
+        self.table = table
+        self.s3_client = s3_client
+        self.bucket = bucket
+        self.storage = storage
+        self.prefix = prefix
+        self.max_workers = max_workers
+
+    def _section_key(self, job_id: str, name: str, etag: str) -> str:
+        # Content addressed, so a new version never overwrites the objects a reader may be fetching
+        return f"{self.prefix}/{job_id}/{name}/{etag}.json.gz"
+
+    def _map(self, fn, items):
+        items = list(items)
+        if len(items) <= 1:
+            return [fn(item) for item in items]
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(items))) as executor:
+            return list(executor.map(fn, items))
+
+    def save(self, job_id: str, report: Dict[str, object], status: str) -> dict:
+        """Store the report sections and atomically point the job to them while updating its status"""
+        bodies = {}
+        manifest_sections = {}
+        for name, section in report.items():
+            raw = serialize_section(section)
+            body = gzip.compress(raw, compresslevel=6, mtime=0)
+            bodies[name] = body
+            manifest_sections[name] = {"etag": section_etag(raw), "size": len(raw), "compressed_size": len(body)}
+
+        storage = self.storage
+        if storage == STORAGE_DYNAMODB and sum(len(body) for body in bodies.values()) > MAX_INLINE_BYTES:
+            if not self.bucket:
+                raise ValueError(f"Report of job {job_id} is too large to be stored in DynamoDB")
+            logger.info(f"Report of job {job_id} exceeds {MAX_INLINE_BYTES} bytes, storing it in S3")
+            storage = STORAGE_S3
+
+        manifest = {
+            "storage": storage,
+            "etag": projection_etag({name: section["etag"] for name, section in manifest_sections.items()}),
+            "sections": manifest_sections,
+        }
+
+        names = {"#status": "status", "#report": "report", "#json_report": "json_report"}
+        values = {":status": status, ":report": manifest}
+        update = "SET #status = :status, #report = :report"
+
+        if storage == STORAGE_S3:
+            manifest["bucket"] = self.bucket
+            for name, section in manifest_sections.items():
+                section["key"] = self._section_key(job_id, name, section["etag"])
+
+            self._map(
+                lambda name: self.s3_client.put_object(
+                    Bucket=self.bucket,
+                    Key=manifest_sections[name]["key"],
+                    Body=bodies[name],
+                    ContentType="application/json",
+                    ContentEncoding="gzip",
+                ),
+                bodies,
+            )
+            update += " REMOVE #json_report, #report_data"
+        else:
+            values[":report_data"] = bodies
+            update += ", #report_data = :report_data REMOVE #json_report"
+        names["#report_data"] = "report_data"
+
+        self.table.update_item(
+            Key={"id": job_id},
+            UpdateExpression=update,
+            ExpressionAttributeNames=names,
+            ExpressionAttributeValues=values,
+        )
+
+        return manifest
+
+    def _not_modified(self, job_id: str, requested: Optional[List[str]],
+                      if_none_match: str) -> Optional[StoredReport]:
+        """
+        Conditional read of the ETags only, without the inline section bodies. None when the report changed or
+        was persisted before the report store.
+        """
+        names = {"#status": "status", "#report": "report", "#etag": "etag"}
+        if requested is None:
+            projection = ["#status", "#report.#etag"]
+        else:
+            names["#sections"] = "sections"
+            projection = ["#status"]
+            for i, name in enumerate(requested):
+                names[f"#s{i}"] = name
+                projection.append(f"#report.#sections.#s{i}.#etag")
+
+        item = self.table.get_item(
+            Key={"id": job_id},
+            ProjectionExpression=", ".join(projection),
+            ExpressionAttributeNames=names,
+        ).get("Item")
+
+        if not item or "report" not in item:
+            return None
+
+        if requested is None:
+            etag = item["report"]["etag"]
+        else:
+            section_etags = item["report"].get("sections", {})
+            etag = projection_etag({name: section_etags[name]["etag"] for name in requested if name in section_etags})
+
+        if not etag_matches(if_none_match, etag):
+            return None
+
+        return StoredReport(job_id=job_id, status=item["status"], etag=etag, not_modified=True)
+
+    def load(self, job_id: str, sections: Optional[Iterable[str]] = None,
+             if_none_match: Optional[str] = None) -> StoredReport:
+        """
+        Read the report of a job, or only the given sections. Section bodies are not read when the ETag of the
+        requested sections matches `if_none_match`.
+        """
+        requested = list(dict.fromkeys(sections)) if sections else None
+
+        if if_none_match and self.storage == STORAGE_DYNAMODB:
+            # The section bodies are in the job item, only the ETags are read first
+            report = self._not_modified(job_id, requested, if_none_match)
+            if report:
+                return report
+
+        names = {"#status": "status", "#report": "report", "#json_report": "json_report", "#report_data": "report_data"}
+        projection = ["#status", "#report", "#json_report"]
+        if requested is None:
+            projection.append("#report_data")
+        else:
+            # Only the requested inline sections are returned (and unmarshalled)
+            for i, name in enumerate(requested):
+                names[f"#s{i}"] = name
+                projection.append(f"#report_data.#s{i}")
+
+        item = self.table.get_item(
+            Key={"id": job_id},
+            ProjectionExpression=", ".join(projection),
+            ExpressionAttributeNames=names,
+        ).get("Item")
+
+        if not item:
+            raise ReportNotFoundError(f"Job {job_id} not found")
+
+        if "report" not in item:
+            return self._load_legacy(job_id, item, requested, if_none_match)
+
+        manifest = item["report"]
+        selected = [name for name in (requested or manifest["sections"]) if name in manifest["sections"]]
+        etag = projection_etag({name: manifest["sections"][name]["etag"] for name in selected})
+
+        report = StoredReport(job_id=job_id, status=item["status"], etag=etag)
+        if etag_matches(if_none_match, etag):
+            report.not_modified = True
+            return report
+
+        if manifest["storage"] == STORAGE_S3:
+            bodies = self._map(
+                lambda name: self.s3_client.get_object(
+                    Bucket=manifest["bucket"], Key=manifest["sections"][name]["key"]
+                )["Body"].read(),
+                selected,
+            )
+        else:
+            bodies = [bytes(item["report_data"][name]) for name in selected]
+
+        report.sections = {name: json.loads(gzip.decompress(body)) for name, body in zip(selected, bodies)}
+        return report
+
+    def _load_legacy(self, job_id, item, requested: Optional[List[str]], if_none_match) -> StoredReport:
+        """Reports persisted before the report store, as a JSON string in `json_report`"""
+        if "json_report" not in item:
+            raise ReportNotFoundError(f"Job {job_id} has no report")
+
+        full_report = json.loads(item["json_report"])
+        selected = [name for name in (requested or full_report) if name in full_report]
+        etag = projection_etag({name: section_etag(serialize_section(full_report[name])) for name in selected})
+
+        report = StoredReport(job_id=job_id, status=item["status"], etag=etag)
+        if etag_matches(if_none_match, etag):
+            report.not_modified = True
+        else:
+            report.sections = {name: full_report[name] for name in selected}
+        return report
+
+
+def get_report_store(table, s3_client=None) -> ReportStore:
+    """ReportStore configured from the REPORT_STORAGE and OUTPUT_BUCKET_NAME environment variables"""
+    return ReportStore(
+        table,
+        s3_client=s3_client,
+        bucket=os.environ.get("OUTPUT_BUCKET_NAME"),
+        storage=os.environ.get("REPORT_STORAGE", STORAGE_S3),
+    )
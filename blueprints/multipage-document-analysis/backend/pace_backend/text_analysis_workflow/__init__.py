@@ -43,6 +43,7 @@ class DocAnalysisSFNPipeline(NestedStack):
             dynamo_docs_table: dynamodb.Table,
             output_s3_bucket: s3.Bucket,
             shared_status_lambda_layer: lambda_python.PythonLayerVersion,
+            common_lambda_layer: lambda_python.PythonLayerVersion,
             language_code: str,
             pages_chunk: str,
             use_examples: bool,
@@ -121,11 +122,14 @@ class DocAnalysisSFNPipeline(NestedStack):
             index="index.py",
             handler="lambda_handler",
             runtime=lambda_.Runtime.PYTHON_3_13,
-            layers=[self.shared_doc_info_layer, shared_status_lambda_layer],
+            layers=[self.shared_doc_info_layer, shared_status_lambda_layer, common_lambda_layer],
             environment={
                 "POWERTOOLS_LOG_LEVEL": "DEBUG",
                 "POWERTOOLS_SERVICE_NAME": "information_extraction_lambda",
                 "USE_EXAMPLES": str(use_examples),
+                "MAX_EXAMPLES": "3",
+                "EXAMPLES_TOKEN_BUDGET": "8000",
+                "EXAMPLES_MMR_LAMBDA": "0.7",
                 "REGION": Stack.of(self).region,
                 "BEDROCK_REGION": Stack.of(self).region,
                 "BEDROCK_MODEL_ID": "us.anthropic.claude-3-haiku-20240307-v1:0", #Inference profile instead of model Id
@@ -170,7 +174,7 @@ class DocAnalysisSFNPipeline(NestedStack):
             index="index.py",
             handler="lambda_handler",
             runtime=lambda_.Runtime.PYTHON_3_13,
-            layers=[self.shared_doc_info_layer, shared_status_lambda_layer],
+            layers=[self.shared_doc_info_layer, shared_status_lambda_layer, common_lambda_layer],
             environment={
                 "POWERTOOLS_LOG_LEVEL": "DEBUG",
                 "POWERTOOLS_SERVICE_NAME": "consolidate_report_lambda",
@@ -217,16 +221,19 @@ class DocAnalysisSFNPipeline(NestedStack):
             index="index.py",
             handler="lambda_handler",
             runtime=lambda_.Runtime.PYTHON_3_13,
-            layers=[shared_status_lambda_layer],
+            layers=[shared_status_lambda_layer, common_lambda_layer],
             environment={
                 "POWERTOOLS_LOG_LEVEL": "DEBUG",
                 "POWERTOOLS_SERVICE_NAME": "persist_results_lambda",
                 "DOCUMENTS_DYNAMO_DB_TABLE_NAME": dynamo_docs_table.table_name,
+                "OUTPUT_BUCKET_NAME": output_s3_bucket.bucket_name,
+                "REPORT_STORAGE": "s3",  # "s3" or "dynamodb" (compressed sections in the job item)
             },
             timeout=Duration.seconds(30),
         )
 
         dynamo_docs_table.grant_write_data(self.persist_results_lambda)
+        output_s3_bucket.grant_write(self.persist_results_lambda)
 
         NagSuppressions.add_resource_suppressions(
             self.persist_results_lambda,
@@ -251,13 +258,15 @@ class DocAnalysisSFNPipeline(NestedStack):
             index="index.py",
             handler="lambda_handler",
             runtime=lambda_.Runtime.PYTHON_3_13,
-            layers=[self.shared_doc_info_layer, shared_status_lambda_layer],
+            layers=[self.shared_doc_info_layer, shared_status_lambda_layer, common_lambda_layer],
             environment={
                 "POWERTOOLS_LOG_LEVEL": "DEBUG",
                 "POWERTOOLS_SERVICE_NAME": "generate_pdf_report_lambda",
                 "REGION": Stack.of(self).region,
                 "DOCUMENTS_DYNAMO_DB_TABLE_NAME": dynamo_docs_table.table_name,
                 "OUTPUT_BUCKET_NAME": output_s3_bucket.bucket_name,
+                "REPORT_STORAGE": "s3",
+                "PDF_RENDER_PROCESSES": "1",  # Sections rendered in parallel, only useful with more than one vCPU
             },
             timeout=Duration.seconds(300),
         )
@@ -24,8 +24,6 @@ from aws_lambda_powertools import Logger
 
 from langchain_aws import ChatBedrock
 
-from retrying import retry
-
 from prompt_selector.report_consolidation_prompt_selector import get_information_consolidation_prompt_selector
 
 from doc_info_layer.section_definition import info_to_output_mapping
@@ -33,18 +31,10 @@ from doc_info_layer.section_definition import info_to_output_mapping
 from aws_lambda_powertools.utilities.typing import LambdaContext
 
 from status_info_layer.StatusEnum import StatusEnum
+from bedrock_governor import get_governor
 
-from botocore.exceptions import ClientError
 from botocore.config import Config
 
-class BedrockRetryableError(Exception):
-    """Class to identify a Bedrock throttling error"""
-
-    def __init__(self, msg):
-        super().__init__(self)
-
-        self.message = msg
-
 langchain_core.globals.set_debug(True)
 
 AWS_REGION = os.environ.get("REGION")
@@ -64,13 +54,14 @@ REPORT_CONSOLIDATION_MODEL_PARAMETERS = {
 bedrock_runtime = boto3.client(
     service_name="bedrock-runtime",
     region_name=BEDROCK_REGION,
-    config=Config(retries={'max_attempts': 20})
+    config=Config(retries={'max_attempts': 1, 'mode': 'standard'})  # Retries, connection errors included, are handled by the governor
 )
 
+# Rate limiting, retries and circuit breaking shared by every Bedrock call of this container
+governor = get_governor()
+
 table = boto3.resource("dynamodb").Table(DYNAMODB_TABLE_NAME)
 
-@retry(wait_exponential_multiplier=10000, wait_exponential_max=60000, stop_max_attempt_number=10,
-       retry_on_exception=lambda ex: isinstance(ex, BedrockRetryableError))
 def consolidate_section(section_name, section):
 
     logger.debug(f"Consolidating section: {section_name}")
@@ -92,28 +83,13 @@ def consolidate_section(section_name, section):
 
     structured_llm = bedrock_llm.with_structured_output(info_to_output_mapping[section_name])
 
-    structured_chain = claude_information_consolidation_prompt_template | structured_llm
+    # Throttling and retries are handled by the governor
+    structured_chain = governor.wrap(claude_information_consolidation_prompt_template | structured_llm)
 
-    # Retry mechanism to workaround Bedrock Throttling
     try:
         information_consolidation_obj = structured_chain.invoke({
             "information": section,
         })
-    except ClientError as exc:
-        if exc.response['Error']['Code'] == 'ThrottlingException':
-            logger.error("Bedrock throttling. To try again")
-            raise BedrockRetryableError(str(exc))
-        elif exc.response['Error']['Code'] == 'ModelTimeoutException':
-            logger.error("Bedrock ModelTimeoutException. To try again")
-            raise BedrockRetryableError(str(exc))
-        else:
-            raise
-    except bedrock_runtime.exceptions.ThrottlingException as throttlingExc:
-        logger.error("Bedrock ThrottlingException. To try again")
-        raise BedrockRetryableError(str(throttlingExc))
-    except bedrock_runtime.exceptions.ModelTimeoutException as timeoutExc:
-        logger.error("Bedrock ModelTimeoutException. To try again")
-        raise BedrockRetryableError(str(timeoutExc))
     except Exception as e:
 
         template = "An exception of type {0} occurred. Arguments:\n{1!r}"
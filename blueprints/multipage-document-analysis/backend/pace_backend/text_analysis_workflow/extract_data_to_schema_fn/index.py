@@ -18,37 +18,26 @@
 import boto3
 import os
 import langchain_core
-import re
 import functools
 import pydantic
 
-from retrying import retry
-
 from aws_lambda_powertools import Logger
 
 from langchain_aws import ChatBedrock
 
 from pydantic import BaseModel
 
-from prompt_selector.information_extraction_prompt_selector import get_information_extraction_prompt_selector
+from prompt_selector.information_extraction_prompt_selector import count_selected_examples, get_information_extraction_prompt_selector
 from structured_output.InformationExtraction import InformationExtraction
 
 from doc_info_layer.section_definition import info_to_output_mapping, report_sections
 from status_info_layer.StatusEnum import StatusEnum
+from bedrock_governor import get_governor
 
 from aws_lambda_powertools.utilities.typing import LambdaContext
 
-from botocore.exceptions import ClientError
 from botocore.config import Config
 
-class BedrockRetryableError(Exception):
-    """Class to identify a Bedrock throttling error"""
-
-    def __init__(self, msg):
-        super().__init__(self)
-
-        self.message = msg
-
 langchain_core.globals.set_debug(True)
 
 logger = Logger()
@@ -56,6 +45,9 @@ logger = Logger()
 
 EXAMPLE_USE = os.environ.get("USE_EXAMPLES", "False")
 USE_EXAMPLES = True if EXAMPLE_USE=="True" else False
+MAX_EXAMPLES = int(os.environ.get("MAX_EXAMPLES", 3))
+EXAMPLES_TOKEN_BUDGET = int(os.environ.get("EXAMPLES_TOKEN_BUDGET", 8000))
+EXAMPLES_MMR_LAMBDA = float(os.environ.get("EXAMPLES_MMR_LAMBDA", 0.7))
 AWS_REGION = os.environ.get("REGION")
 BEDROCK_REGION = os.environ.get("BEDROCK_REGION")
 MODEL_ID = os.environ.get("BEDROCK_MODEL_ID")
@@ -78,9 +70,12 @@ FORMAT_RESPONSES_CLAUDE_PARAMETERS = {
 bedrock_runtime = boto3.client(
     service_name="bedrock-runtime",
     region_name=BEDROCK_REGION,
-    config=Config(retries={'max_attempts': 20})
+    config=Config(retries={'max_attempts': 1, 'mode': 'standard'})  # Retries, connection errors included, are handled by the governor
 )
 
+# Rate limiting, retries and circuit breaking shared by every Bedrock call of this container
+governor = get_governor()
+
 table = boto3.resource("dynamodb").Table(DYNAMODB_TABLE_NAME)
 
 # TODO: use aws_lambda_powertools.event_handler import APIGatewayRestResolver and CORSConfig to avoid having to
@@ -104,8 +99,6 @@ def _format_response(handler):
     return wrapper
 
 
-@retry(wait_exponential_multiplier=10000, wait_exponential_max=60000, stop_max_attempt_number=10,
-       retry_on_exception=lambda ex: isinstance(ex, BedrockRetryableError))
 def text_information_extraction(
         text: str,
         information_type: str,
@@ -119,7 +112,9 @@ def text_information_extraction(
     )
 
     if n_examples > 0:
-        INFORMATION_EXTRACTION_PROMPT_SELECTOR = get_information_extraction_prompt_selector(LANGUAGE_ID, information_type)
+        INFORMATION_EXTRACTION_PROMPT_SELECTOR = get_information_extraction_prompt_selector(
+            LANGUAGE_ID, information_type, EXAMPLES_TOKEN_BUDGET, EXAMPLES_MMR_LAMBDA
+        )
     else:
         INFORMATION_EXTRACTION_PROMPT_SELECTOR = get_information_extraction_prompt_selector(LANGUAGE_ID)
 
@@ -127,9 +122,9 @@ def text_information_extraction(
 
     structured_llm = bedrock_llm.with_structured_output(InformationExtraction)
 
-    structured_chain = claude_information_extraction_prompt_template | structured_llm
+    # Throttling and retries are handled by the governor
+    structured_chain = governor.wrap(claude_information_extraction_prompt_template | structured_llm)
 
-    # Retry mechanism to workaround Bedrock Throttling
     try:
         if  n_examples > 0:
             logger.info(f"Extracting {information_type} information with {n_examples} examples")
@@ -144,21 +139,6 @@ def text_information_extraction(
                 "json_schema": info_to_output_mapping[information_type].model_json_schema(),
                 "text": text
             })
-    except ClientError as exc:
-        if exc.response['Error']['Code'] == 'ThrottlingException':
-            logger.error("Bedrock throttling. To try again")
-            raise BedrockRetryableError(str(exc))
-        elif exc.response['Error']['Code'] == 'ModelTimeoutException':
-            logger.error("Bedrock ModelTimeoutException. To try again")
-            raise BedrockRetryableError(str(exc))
-        else:
-            raise
-    except bedrock_runtime.exceptions.ThrottlingException as throttlingExc:
-        logger.error("Bedrock ThrottlingException. To try again")
-        raise BedrockRetryableError(str(throttlingExc))
-    except bedrock_runtime.exceptions.ModelTimeoutException as timeoutExc:
-        logger.error("Bedrock ModelTimeoutException. To try again")
-        raise BedrockRetryableError(str(timeoutExc))
     except Exception as e:
 
         template = "An exception of type {0} occurred. Arguments:\n{1!r}"
@@ -199,11 +179,12 @@ def lambda_handler(event, _context: LambdaContext):
             logger.info(f"Extracting {section} information")
 
             if USE_EXAMPLES:
-                # Use all the examples for the few shot prompt
-                all_files = os.listdir(os.path.join('prompt_selector/examples', LANGUAGE_ID, section))
-                txt_example_files = [file for file in all_files if re.match("^.*\.txt$", file)]
+                # The examples most similar to the chunk, up to MAX_EXAMPLES within the token budget
+                n_examples = count_selected_examples(
+                    LANGUAGE_ID, section, doc_text, MAX_EXAMPLES, EXAMPLES_TOKEN_BUDGET, EXAMPLES_MMR_LAMBDA
+                )
 
-                section_information = text_information_extraction(doc_text, section, len(txt_example_files))
+                section_information = text_information_extraction(doc_text, section, n_examples)
             else:
                 section_information = text_information_extraction(doc_text, section)  # Do not use examples
 
@@ -0,0 +1,257 @@
+# MIT No Attribution
+#
+# Copyright 2025 Amazon Web Services
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this
+# software and associated documentation files (the "Software"), to deal in the Software
+# without restriction, including without limitation the rights to use, copy, modify,
+# merge, publish, distribute, sublicense, and/or sell copies of the Software, and to
+# permit persons to whom the Software is furnished to do so.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED,
+# INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A
+# PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT
+# HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE
+# SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+"""
+Few-shot example index.
+
+Examples are read and embedded once per container (or loaded from a prebuilt index file) and selected by
+similarity to the text being processed, within a token budget. Maximal Marginal Relevance (MMR) can be used
+to avoid near duplicate examples. A prebuilt index is only used while the examples it was built from are
+unchanged. To prebuild the index of an examples directory:
+
+    python example_index.py examples/es/administration
+"""
+
+import hashlib
+import json
+import math
+import os
+import re
+import threading
+
+from typing import Dict, List, Optional
+
+from langchain_core.embeddings import Embeddings
+
+CHARS_PER_TOKEN = 4
+INDEX_FILE_NAME = "index.json"
+
+
+class HashingEmbeddings(Embeddings):
+    """
+    Deterministic embeddings: hashed words and word bigrams. They need no model call, which makes the selection
+    reproducible offline. Any langchain Embeddings (e.g. BedrockEmbeddings) can be used instead.
+    """
+
+    def __init__(self, dimensions: int = 1024):
+        self.dimensions = dimensions
+
+    @property
+    def name(self) -> str:
+        return f"hashing-{self.dimensions}"
+
+    def _embed(self, text: str) -> List[float]:
+        words = re.findall(r"\w+", text.lower())
+        vector = [0.0] * self.dimensions
+        for feature in words + [f"{a} {b}" for a, b in zip(words, words[1:])]:
+            digest = hashlib.md5(feature.encode("utf-8")).digest()
+            vector[int.from_bytes(digest[:4], "little") % self.dimensions] += 1.0 if digest[4] & 1 else -1.0
+        return vector
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return [self._embed(text) for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._embed(text)
+
+
+def embeddings_name(embeddings: Embeddings) -> str:
+    return getattr(embeddings, "name", None) or getattr(embeddings, "model_id", None) or type(embeddings).__name__
+
+
+def normalize(vector: List[float]) -> List[float]:
+    norm = math.sqrt(sum(x * x for x in vector))
+    return [x / norm for x in vector] if norm else vector
+
+
+def dot(a: List[float], b: List[float]) -> float:
+    return sum(x * y for x, y in zip(a, b))
+
+
+def example_text(example: dict) -> str:
+    """Text of an example used for similarity"""
+    return example.get("text", "")
+
+
+def examples_hash(examples: List[dict]) -> str:
+    """Hash of the content of the examples, in order"""
+    return hashlib.sha256(json.dumps(examples, ensure_ascii=False, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def example_tokens(example: dict) -> int:
+    """Approximate tokens an example adds to the prompt"""
+    return (len(example_text(example)) + len(json.dumps(example.get("extraction", ""), ensure_ascii=False))) \
+        // CHARS_PER_TOKEN
+
+
+def load_examples(examples_location: str, source_extension: str = ".txt", prefix: str = "example_chunk_") \
+        -> List[dict]:
+    """Read the <prefix>N<source_extension> / <prefix>N.json pairs of a directory, in N order"""
+    pattern = re.compile(f"^{re.escape(prefix)}(\\d+){re.escape(source_extension)}$")
+    numbers = sorted(
+        int(match.group(1)) for match in (pattern.match(file) for file in os.listdir(examples_location)) if match
+    )
+
+    examples = []
+    for number in numbers:
+        extraction_file = os.path.join(examples_location, f"{prefix}{number}.json")
+        if not os.path.exists(extraction_file):
+            raise Exception(f"Example {prefix}{number}{source_extension} has no {prefix}{number}.json")
+
+        example = {}
+        if source_extension == ".txt":
+            with open(os.path.join(examples_location, f"{prefix}{number}.txt"), "r", encoding="utf-8") as file:
+                example["text"] = file.read()
+        else:
+            example["source_file"] = os.path.join(examples_location, f"{prefix}{number}{source_extension}")
+
+        with open(extraction_file, "r", encoding="utf-8") as file:
+            example["extraction"] = json.load(file)
+
+        examples.append(example)
+
+    if len(examples) <= 0:
+        raise Exception("No examples found")
+
+    return examples
+
+
+class ExampleIndex:
+    """Examples with their normalized embeddings and prompt size"""
+
+    def __init__(self, examples: List[dict], vectors: List[List[float]], embeddings_id: str,
+                 content_hash: Optional[str] = None):
+        self.examples = examples
+        self.vectors = [normalize(vector) for vector in vectors]
+        self.tokens = [example_tokens(example) for example in examples]
+        self.embeddings_id = embeddings_id
+        self.content_hash = content_hash or examples_hash(examples)
+
+    @classmethod
+    def build(cls, examples: List[dict], embeddings: Embeddings) -> "ExampleIndex":
+        vectors = embeddings.embed_documents([example_text(example) for example in examples])
+        return cls(examples, vectors, embeddings_name(embeddings))
+
+    @classmethod
+    def load(cls, path: str) -> "ExampleIndex":
+        with open(path, "r", encoding="utf-8") as file:
+            data = json.load(file)
+        return cls(data["examples"], data["vectors"], data["embeddings"], data.get("content_hash"))
+
+    def save(self, path: str):
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump(
+                {"embeddings": self.embeddings_id, "content_hash": self.content_hash, "examples": self.examples,
+                 "vectors": self.vectors},
+                file, ensure_ascii=False,
+            )
+
+    def add(self, example: dict, embeddings: Embeddings):
+        self.examples.append(example)
+        self.vectors.append(normalize(embeddings.embed_documents([example_text(example)])[0]))
+        self.tokens.append(example_tokens(example))
+        self.content_hash = examples_hash(self.examples)
+
+    def select(
+            self,
+            query_vector: Optional[List[float]],
+            k: int,
+            token_budget: Optional[int] = None,
+            mmr_lambda: float = 1.0,
+            fetch_k: int = 20,
+    ) -> List[dict]:
+        """
+        Up to k examples, most similar to the query first. With mmr_lambda < 1 each next example trades
+        similarity to the query for dissimilarity to the examples already selected. Examples that do not fit in
+        what is left of token_budget are skipped. Without a query the examples keep their stored order.
+        """
+        if query_vector is None:
+            ranked = list(range(len(self.examples)))
+            relevance = {i: 0.0 for i in ranked}
+            mmr_lambda = 1.0
+        else:
+            query_vector = normalize(query_vector)
+            relevance = {i: dot(query_vector, vector) for i, vector in enumerate(self.vectors)}
+            ranked = sorted(relevance, key=lambda i: relevance[i], reverse=True)[:max(fetch_k, k)]
+
+        selected = []
+        remaining = token_budget if token_budget is not None else math.inf
+        candidates = list(ranked)
+        # Highest similarity of every candidate to the examples already selected, updated incrementally
+        redundancy = {i: -math.inf for i in candidates}
+
+        while len(selected) < k:
+            candidates = [i for i in candidates if self.tokens[i] <= remaining]
+            if not candidates:
+                break
+
+            if mmr_lambda < 1.0 and selected:
+                best = max(candidates, key=lambda i: mmr_lambda * relevance[i] - (1 - mmr_lambda) * redundancy[i])
+            else:
+                best = candidates[0]
+
+            candidates.remove(best)
+            selected.append(best)
+            remaining -= self.tokens[best]
+
+            if mmr_lambda < 1.0:
+                for i in candidates:
+                    redundancy[i] = max(redundancy[i], dot(self.vectors[i], self.vectors[best]))
+
+        return [self.examples[i] for i in selected]
+
+
+_indexes: Dict[tuple, ExampleIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_example_index(
+        examples_location: str,
+        embeddings: Embeddings,
+        source_extension: str = ".txt",
+        prefix: str = "example_chunk_",
+) -> ExampleIndex:
+    """
+    Index of an examples directory, built once per container. A prebuilt index.json in the directory is used
+    when it was built with the same embeddings from the same example content.
+    """
+    key = (os.path.realpath(examples_location), embeddings_name(embeddings))
+
+    with _indexes_lock:
+        if key not in _indexes:
+            examples = load_examples(examples_location, source_extension, prefix)
+            index_file = os.path.join(examples_location, INDEX_FILE_NAME)
+            index = ExampleIndex.load(index_file) if os.path.exists(index_file) else None
+            if index is None or index.embeddings_id != key[1] or index.content_hash != examples_hash(examples):
+                index = ExampleIndex.build(examples, embeddings)
+            _indexes[key] = index
+
+        return _indexes[key]
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("examples_location")
+    parser.add_argument("--source-extension", default=".txt")
+    parser.add_argument("--prefix", default="example_chunk_")
+    args = parser.parse_args()
+
+    examples = load_examples(args.examples_location, args.source_extension, args.prefix)
+    ExampleIndex.build(examples, HashingEmbeddings()).save(os.path.join(args.examples_location, INDEX_FILE_NAME))
+    print(f"Indexed {len(examples)} examples in {os.path.join(args.examples_location, INDEX_FILE_NAME)}")
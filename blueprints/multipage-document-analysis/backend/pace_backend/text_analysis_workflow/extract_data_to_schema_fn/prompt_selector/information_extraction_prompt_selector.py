@@ -15,6 +15,7 @@
 # OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE
 # SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
 
+import functools
 import os
 
 from langchain.chains.prompt_selector import ConditionalPromptSelector
@@ -71,9 +72,51 @@ def is_en_titan(language: str) -> Callable[[str], bool]:
     return lambda model_id: is_en(language) and is_titan(model_id)
 
 
-def get_information_extraction_prompt_selector(lang: str, example_type: str=None) -> ConditionalPromptSelector:
+@functools.lru_cache(maxsize=None)
+def get_example_selector(
+        lang: str,
+        example_type: str,
+        example_token_budget: int=None,
+        example_mmr_lambda: float=1.0,
+) -> CharterReportsExampleSelector:
+    """Example selector of example_type, the examples most similar to the text within the token budget"""
     dir_path = os.path.dirname(os.path.realpath(__file__))
 
+    return CharterReportsExampleSelector(
+        examples_location=os.path.join(dir_path, "examples", lang, example_type),
+        token_budget=example_token_budget,
+        mmr_lambda=example_mmr_lambda,
+    )
+
+
+def count_selected_examples(
+        lang: str,
+        example_type: str,
+        text: str,
+        max_examples: int,
+        example_token_budget: int=None,
+        example_mmr_lambda: float=1.0,
+) -> int:
+    """
+    Number of examples the prompt selector includes for text. The token budget can leave fewer than max_examples,
+    and the prompt states the number of examples that follow.
+    """
+    example_selector = get_example_selector(lang, example_type, example_token_budget, example_mmr_lambda)
+
+    return len(example_selector.select_examples({"text": text, "n_examples": max_examples}))
+
+
+@functools.lru_cache(maxsize=None)
+def get_information_extraction_prompt_selector(
+        lang: str,
+        example_type: str=None,
+        example_token_budget: int=None,
+        example_mmr_lambda: float=1.0,
+) -> ConditionalPromptSelector:
+    """
+    Prompt selector for the extraction of information, with few-shot examples of example_type when given.
+    Built once per container for each combination of arguments.
+    """
     if example_type:
 
         # Prompt template for the examples
@@ -86,13 +129,10 @@ def get_information_extraction_prompt_selector(lang: str, example_type: str=None
             ]
         )
 
-        # Example selector
-        # print(f"Searching for files in {os.path.join(dir_path, 'examples', lang)}")
-        charter_reports_example_selector = CharterReportsExampleSelector(
-            examples_location=os.path.join(dir_path, "examples", lang, example_type))
-
-        # print(f"selecting {3} examples")
-        # print(charter_reports_example_selector.select_examples({"n_examples":3}))
+        # Example selector, the examples most similar to the text within the token budget
+        charter_reports_example_selector = get_example_selector(
+            lang, example_type, example_token_budget, example_mmr_lambda
+        )
 
         # Few-shot prompt with prompt selector.
         few_shot_chat_prompt_template = FewShotChatMessagePromptTemplate(
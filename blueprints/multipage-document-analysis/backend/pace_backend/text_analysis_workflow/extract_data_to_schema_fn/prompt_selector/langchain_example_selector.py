@@ -15,73 +15,66 @@
 # OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE
 # SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
 
-import json
-import os
-import re
+from typing import Optional
 
+from langchain_core.embeddings import Embeddings
 from langchain_core.example_selectors.base import BaseExampleSelector
 
+from .example_index import HashingEmbeddings, get_example_index
 
-class CharterReportsExampleSelector(BaseExampleSelector):
-
-    def __init__(self, examples_location: str):
-
-        self.examples = []
-
-        all_files = os.listdir(examples_location)
-
-        txt_example_files = [file for file in all_files if re.match("^.*\.txt$", file)]
-        json_example_files = [file for file in all_files if re.match("^.*\.json$", file)]
-
-        if len(txt_example_files) == len(json_example_files):
-            files_samples_dict = {i + 1: {
-                "text_chunk_file": f"{examples_location}/example_chunk_{i + 1}.txt",
-                "extraction_example_file": f"{examples_location}/example_chunk_{i + 1}.json"
-            } for i in range(len(txt_example_files))
-            }
-
-        else:
-
-            raise Exception("Number of chunks does not match number of samples")
-
-        for i in files_samples_dict.keys():
-            example = {}
-
-            with open(files_samples_dict[i]["text_chunk_file"], "r", encoding="utf-8") as file:
-                example["text"] = file.read()
 
-            with open(files_samples_dict[i]["extraction_example_file"], "r", encoding="utf-8") as file:
-                example["extraction"] = json.load(file)
-
-            self.examples.append(example)
-
-        if len(self.examples) <= 0:
-            raise Exception("No examples found")
-
-    def aadd_example(self, example: dict[str, str]) -> any:
+class CharterReportsExampleSelector(BaseExampleSelector):
+    """
+    Selects the examples most similar to the text to extract information from.
+
+    @param examples_location: directory with the example_chunk_N.txt / example_chunk_N.json pairs
+    @param embeddings: embeddings used for similarity, HashingEmbeddings by default
+    @param token_budget: maximum approximate tokens of the selected examples, None for no limit
+    @param mmr_lambda: 1 ranks by similarity only, lower values favour diverse examples
+    """
+
+    def __init__(
+            self,
+            examples_location: str,
+            embeddings: Optional[Embeddings] = None,
+            token_budget: Optional[int] = None,
+            mmr_lambda: float = 1.0,
+    ):
+        self.embeddings = embeddings or HashingEmbeddings()
+        self.token_budget = token_budget
+        self.mmr_lambda = mmr_lambda
+
+        # Read and embedded once per container
+        self.index = get_example_index(examples_location, self.embeddings)
+        self.examples = self.index.examples
+
+    async def aadd_example(self, example: dict[str, str]) -> any:
         """Asynchronously insert an example"""
 
-        self.examples.append(example)
-
-        return None
+        return self.add_example(example)
 
     def add_example(self, example: dict[str, str]) -> any:
         """Synchronously insert an example"""
 
-        self.examples.append(example)
+        self.index.add(example, self.embeddings)
 
         return None
 
-    def aselect_examples(self, input_variables: dict[str, str]) -> list[dict]:
+    async def aselect_examples(self, input_variables: dict[str, str]) -> list[dict]:
         """Asynchronously return a list of examples"""
 
-        # We dont care about input variables for now
-
-        return self.examples[:input_variables["n_examples"]]
+        return self.select_examples(input_variables)
 
     def select_examples(self, input_variables: dict[str, str]) -> list[dict]:
-        """Synchronously return a list of examples"""
-
-        # We dont care about input variables for now
-
-        return self.examples[:input_variables["n_examples"]]
+        """Synchronously return up to n_examples examples, the most similar to the text first"""
+
+        text = input_variables.get("text")
+        k = int(input_variables.get("n_examples", len(self.examples)))
+
+        # With no more examples than requested there is nothing to rank, they are used in file order
+        return self.index.select(
+            self.embeddings.embed_query(text) if text and k < len(self.examples) else None,
+            k=k,
+            token_budget=self.token_budget,
+            mmr_lambda=self.mmr_lambda,
+        )
@@ -0,0 +1,151 @@
+# MIT No Attribution
+#
+# Copyright 2025 Amazon Web Services
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this
+# software and associated documentation files (the "Software"), to deal in the Software
+# without restriction, including without limitation the rights to use, copy, modify,
+# merge, publish, distribute, sublicense, and/or sell copies of the Software, and to
+# permit persons to whom the Software is furnished to do so.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED,
+# INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A
+# PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT
+# HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE
+# SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+"""
+Render time and peak RSS of the report PDF for synthetic reports with 10 to 1000 rows in the shareholders and
+administration tables. Every measurement runs in a fresh interpreter so peak RSS is not shared between runs.
+"legacy" is the tempfile based rendering used before pdf_renderer.
+
+    python benchmark_pdf.py --rows 10 100 1000 --processes 2
+
+The parallel mode is capped to the number of CPUs and falls back to sequential rendering on a single CPU.
+"""
+
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "shared"))
+
+POWERS = [
+    "Poder general para pleitos y cobranzas",
+    "Poder general para actos de administracion",
+    "Poder en materia laboral con facultades expresas para articular y absolver posiciones",
+]
+
+
+def synthetic_report(rows):
+    return {
+        "general_information": {
+            "name": "ANYCOMPANY PETROL, S.A.P.I. DE C.V.",
+            "expedition_city": "Ciudad de Mexico",
+            "duration": "Indefinida",
+            "social_object": ["Aperturar, instalar, desarrollar y explotar negociaciones del ramo"] * 10,
+        },
+        "shareholders": {"shareholders": [
+            {"shareholder_name": f"Accionista {i}", "stock_units": "12500", "stocks_value": "12500.00"}
+            for i in range(rows)
+        ]},
+        "administration": {"managers": [
+            {"name": f"Administrador {i}", "position": "Consejero", "powers": POWERS} for i in range(rows)
+        ]},
+        "legal_representative": {"name": "Carlos Salazar", "position": "Comisario", "powers": POWERS},
+        "notary_information": {
+            "document_number": "12345", "notary_name": "John Doe", "notary_number": "1",
+            "entity_of_creation": "Ciudad de Mexico",
+        },
+    }
+
+
+def legacy_render(report):
+    from fpdf import FPDF
+    from pydantic import TypeAdapter
+    from doc_info_layer.section_definition import info_to_output_mapping, report_sections
+
+    pdf = FPDF()
+    pdf.set_font("Times", size=16)
+    pdf.add_page()
+    pdf.cell(200, 10, text="Resumen de Documento", new_x="LMARGIN", new_y="NEXT", align="C")
+
+    for i, section in enumerate(report_sections):
+        if section in report:
+            pdf.cell(200, 10, text="", new_x="LMARGIN", new_y="NEXT", align="C")
+            pydantic_section = TypeAdapter(info_to_output_mapping[section]).validate_python(report[section])
+            with pdf.table() as table:
+                for data_row in pydantic_section.to_tuples_table():
+                    row = table.row()
+                    for datum in data_row:
+                        row.cell(datum)
+            if i < len(report_sections) - 1:
+                pdf.add_page()
+
+    path = os.path.join(tempfile.mkdtemp(), "document_report.pdf")
+    pdf.output(path)
+    with open(path, "rb") as f:  # what upload_file reads back
+        return len(f.read())
+
+
+def measure(mode, rows, processes):
+    """Runs in the child interpreter"""
+    from pdf_renderer import render_report
+
+    report = synthetic_report(rows)
+    baseline_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    start = time.perf_counter()
+    if mode == "legacy":
+        size = legacy_render(report)
+    else:
+        size = render_report(report, processes=processes if mode == "parallel" else 1).getbuffer().nbytes
+    elapsed = time.perf_counter() - start
+
+    peak_kb = max(
+        resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss,
+    )
+    return {
+        "mode": mode,
+        "rows": rows,
+        "processes": min(processes, os.cpu_count() or 1) if mode == "parallel" else 1,
+        "seconds": round(elapsed, 3),
+        "peak_rss_mb": round(peak_kb / 1024, 1),
+        "render_rss_mb": round((peak_kb - baseline_kb) / 1024, 1),
+        "pdf_kb": round(size / 1024, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--processes", type=int, default=2)
+    parser.add_argument("--worker", nargs=2, metavar=("MODE", "ROWS"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(measure(args.worker[0], int(args.worker[1]), args.processes)))
+        return
+
+    print(f"{'rows':>6s} {'mode':>10s} {'procs':>5s} {'seconds':>8s} {'peak RSS MB':>11s} "
+          f"{'render RSS MB':>13s} {'PDF KB':>8s}")
+    for rows in args.rows:
+        for mode in ("legacy", "sequential", "parallel"):
+            output = subprocess.run(
+                [sys.executable, __file__, "--worker", mode, str(rows), "--processes", str(args.processes)],
+                check=True, capture_output=True, text=True,
+            ).stdout
+            result = json.loads(output.strip().splitlines()[-1])
+            print(f"{rows:6d} {mode:>10s} {result['processes']:5d} {result['seconds']:8.3f} "
+                  f"{result['peak_rss_mb']:11.1f} {result['render_rss_mb']:13.1f} {result['pdf_kb']:8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -15,20 +15,16 @@
 # OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE
 # SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
 
-import tempfile
 import os
 import boto3
-import json
 import uuid
 
 import functools
 
-from pydantic import TypeAdapter
-from fpdf import FPDF
-
-from doc_info_layer.section_definition import info_to_output_mapping, report_sections
+from pdf_renderer import render_report, upload_report
 
 from status_info_layer.StatusEnum import StatusEnum
+from report_store import get_report_store
 
 from aws_lambda_powertools import Logger
 from aws_lambda_powertools.utilities.typing import LambdaContext
@@ -38,52 +34,14 @@ logger = Logger()
 S3_BUCKET = os.getenv("OUTPUT_BUCKET_NAME")
 TABLE_NAME = os.getenv("DOCUMENTS_DYNAMO_DB_TABLE_NAME")
 REGION = os.getenv("REGION")
+PDF_RENDER_PROCESSES = int(os.getenv("PDF_RENDER_PROCESSES", 1))
 
 table = boto3.resource("dynamodb").Table(TABLE_NAME)
 s3 = boto3.client('s3')
+report_store = get_report_store(table, s3)
 
 def get_item_by_id(id: str):
-    item = table.get_item(Key={"id": id})
-    if "Item" not in item:
-        raise KeyError("Item not found")
-    return json.loads(item["Item"]["json_report"])
-
-def create_pdf(report):
-    ### Create PDF
-
-    pdf = FPDF()
-    pdf.set_font("Times", size=16)
-
-    pdf.add_page()
-
-    pdf.cell(200, 10, txt="Resumen de Documento", ln=1, align="C")
-
-    ### Create section table
-    for i, section in zip(range(len(report_sections)), report_sections):
-        if section in report.keys():
-
-            pdf.cell(200, 10, txt="", ln=1, align="C")
-
-            logger.info(f"Creating section {section}")
-            logger.info(report[section])
-
-            pydantic_section = TypeAdapter(info_to_output_mapping[section]).validate_python(report[section])
-
-            section_tuples = pydantic_section.to_tuples_table()
-
-            logger.info(f"Section tuples {section}")
-            logger.info(section_tuples)
-
-            with pdf.table() as table:
-                for data_row in section_tuples:
-                    row = table.row()
-                    for datum in data_row:
-                        row.cell(datum)
-
-            if i < len(report_sections) - 1:
-                pdf.add_page()
-
-    return pdf
+    return report_store.load(id).sections
 
 def _format_response(handler):
     @functools.wraps(handler)
@@ -139,15 +97,10 @@ def lambda_handler(event, _context: LambdaContext):
 
     # Attempt to generate PDF report
     try:
-        report_pdf = create_pdf(doc_report)
+        report_pdf = render_report(doc_report, processes=PDF_RENDER_PROCESSES)
 
-        #Save a file to the lambda local filesystem
-        tmpdir = tempfile.mkdtemp()
-        tmpfile_path = os.path.join(tmpdir,filename)
-        report_pdf.output(tmpfile_path)
-
-        #Upload the file to S3
-        s3.upload_file(tmpfile_path, S3_BUCKET, s3_key)
+        # Upload from memory, no copy in the Lambda local filesystem
+        upload_report(s3, report_pdf, S3_BUCKET, s3_key)
     except  Exception as e:
         logger.error(f"Error creating PDF: {e}")
 
@@ -163,20 +116,13 @@ def lambda_handler(event, _context: LambdaContext):
             "error": "Failed to create PDF"
         }
 
-    # Update status in DynamoDB table
+    # Update status and report key in DynamoDB table
     try:
         table.update_item(
             Key={"id": job_id},
-            UpdateExpression="SET #status = :status",
-            ExpressionAttributeNames={"#status": "status"},
-            ExpressionAttributeValues={":status": StatusEnum.PDF_GENERATION.name},
-        )
-
-        table.update_item(
-            Key={"id": job_id},
-            UpdateExpression="SET #report_key = :report_key",
-            ExpressionAttributeNames={"#report_key": "report_key"},
-            ExpressionAttributeValues={":report_key": s3_key},
+            UpdateExpression="SET #status = :status, #report_key = :report_key",
+            ExpressionAttributeNames={"#status": "status", "#report_key": "report_key"},
+            ExpressionAttributeValues={":status": StatusEnum.PDF_GENERATION.name, ":report_key": s3_key},
         )
     except Exception as e:
         logger.error(f"Error updating DynamoDB: {e}")
@@ -0,0 +1,151 @@
+# MIT No Attribution
+#
+# Copyright 2025 Amazon Web Services
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this
+# software and associated documentation files (the "Software"), to deal in the Software
+# without restriction, including without limitation the rights to use, copy, modify,
+# merge, publish, distribute, sublicense, and/or sell copies of the Software, and to
+# permit persons to whom the Software is furnished to do so.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED,
+# INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A
+# PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT
+# HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE
+# SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+"""
+In-memory rendering of the document report.
+
+The first present section shares the page of the report title and every other section starts a new page.
+Sections can be rendered in separate processes and concatenated with pypdf, which pays off for reports with
+large tables on Lambda functions with more than one vCPU.
+"""
+
+import io
+import json
+import logging
+import multiprocessing
+import multiprocessing.connection
+import os
+
+from typing import Dict, List
+
+from boto3.s3.transfer import TransferConfig
+from fpdf import FPDF
+from pydantic import TypeAdapter
+
+from doc_info_layer.section_definition import info_to_output_mapping, report_sections
+
+try:
+    from pypdf import PdfWriter
+except ImportError:  # Parallel rendering is disabled without pypdf
+    PdfWriter = None
+
+logger = logging.getLogger(__name__)
+
+REPORT_TITLE = "Resumen de Documento"
+FONT_FAMILY = "Times"
+FONT_SIZE = 16
+
+# Validators of every section, built once per container
+SECTION_ADAPTERS = {section: TypeAdapter(model) for section, model in info_to_output_mapping.items()}
+
+# Reports above 8MB are uploaded in 8MB parts
+TRANSFER_CONFIG = TransferConfig(multipart_threshold=8 * 2 ** 20, multipart_chunksize=8 * 2 ** 20, max_concurrency=4)
+
+
+def section_rows(section: str, data) -> List[tuple]:
+    return SECTION_ADAPTERS[section].validate_python(data).to_tuples_table()
+
+
+def _render_chunk(report: Dict[str, object], sections: List[str], with_title: bool) -> bytearray:
+    pdf = FPDF()
+    pdf.set_font(FONT_FAMILY, size=FONT_SIZE)
+    pdf.add_page()
+
+    if with_title:
+        pdf.cell(200, 10, text=REPORT_TITLE, new_x="LMARGIN", new_y="NEXT", align="C")
+
+    for i, section in enumerate(sections):
+        if i > 0:
+            pdf.add_page()
+
+        pdf.cell(200, 10, text="", new_x="LMARGIN", new_y="NEXT", align="C")
+
+        logger.debug(f"Rendering section {section}")
+        with pdf.table() as table:
+            for data_row in section_rows(section, report[section]):
+                row = table.row()
+                for datum in data_row:
+                    row.cell(datum)
+
+    return pdf.output()
+
+
+def _render_chunk_in_process(connection, report, sections, with_title):
+    try:
+        connection.send_bytes(_render_chunk(report, sections, with_title))
+    finally:
+        connection.close()
+
+
+def _render_parallel(report: Dict[str, object], sections: List[str], processes: int) -> io.BytesIO:
+    # multiprocessing.Pool needs /dev/shm, which Lambda does not provide. Process and Pipe work everywhere
+    context = multiprocessing.get_context("fork")
+    chunks = [None] * len(sections)
+
+    # Biggest sections first, so a large table does not start last
+    pending = sorted(
+        range(len(sections)), key=lambda index: len(json.dumps(report[sections[index]])), reverse=True
+    )
+    running = {}
+
+    while pending or running:
+        while pending and len(running) < processes:
+            index = pending.pop(0)
+            receiver, sender = context.Pipe(duplex=False)
+            process = context.Process(
+                target=_render_chunk_in_process, args=(sender, report, [sections[index]], index == 0)
+            )
+            process.start()
+            sender.close()
+            running[receiver] = (index, process)
+
+        for receiver in multiprocessing.connection.wait(list(running)):
+            index, process = running.pop(receiver)
+            try:
+                chunks[index] = receiver.recv_bytes()
+            except EOFError:
+                raise RuntimeError(f"Rendering of section {sections[index]} failed")
+            finally:
+                receiver.close()
+                process.join()
+
+    writer = PdfWriter()
+    for chunk in chunks:
+        writer.append(io.BytesIO(chunk))
+
+    buffer = io.BytesIO()
+    writer.write(buffer)
+    buffer.seek(0)
+    return buffer
+
+
+def render_report(report: Dict[str, object], processes: int = 1) -> io.BytesIO:
+    """Render the report sections, in the order of report_sections, to an in-memory PDF"""
+    sections = [section for section in report_sections if section in report]
+    processes = min(processes, os.cpu_count() or 1)
+
+    if processes > 1 and len(sections) > 1 and PdfWriter is not None:
+        return _render_parallel(report, sections, processes)
+
+    return io.BytesIO(_render_chunk(report, sections, with_title=True))
+
+
+def upload_report(s3_client, buffer: io.BytesIO, bucket: str, key: str):
+    """Upload from memory, in parts for large reports"""
+    s3_client.upload_fileobj(
+        buffer, bucket, key, ExtraArgs={"ContentType": "application/pdf"}, Config=TRANSFER_CONFIG
+    )
@@ -16,15 +16,12 @@
 # SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
 
 import os
-import logging
-import uuid
-import json
-import decimal
 import functools
 
 import boto3
 
 from status_info_layer.StatusEnum import StatusEnum
+from report_store import get_report_store
 
 from aws_lambda_powertools import Logger
 from aws_lambda_powertools.utilities.typing import LambdaContext
@@ -35,6 +32,9 @@ TABLE_NAME = os.getenv("DOCUMENTS_DYNAMO_DB_TABLE_NAME")
 
 table = boto3.resource("dynamodb").Table(TABLE_NAME)
 
+# Report sections are stored compressed outside of the job item, see REPORT_STORAGE
+report_store = get_report_store(table, boto3.client("s3"))
+
 # TODO: use aws_lambda_powertools.event_handler import APIGatewayRestResolver and CORSConfig to avoid having to
 #  know about API GW response formats
 def _format_response(handler):
@@ -71,26 +71,15 @@ def lambda_handler(event, _context: LambdaContext):
     job_id = event['Payload']['body']['job_id']
     report = event['Payload']['body']['report']
 
-    # Update status in DynamoDB table
+    # Store the report and update the status in a single DynamoDB write
     try:
-        table.update_item(
-            Key={"id": job_id},
-            UpdateExpression="SET #json_report = :json_report",
-            ExpressionAttributeNames={"#json_report": "json_report"},
-            ExpressionAttributeValues={":json_report": json.dumps(report)},
-        )
-
-        table.update_item(
-            Key={"id": job_id},
-            UpdateExpression="SET #status = :status",
-            ExpressionAttributeNames={"#status": "status"},
-            ExpressionAttributeValues={":status": StatusEnum.PDF_GENERATION.name},
-        )
+        manifest = report_store.save(job_id, report, StatusEnum.PDF_GENERATION.name)
+        logger.info(f"Report stored in {manifest['storage']} with ETag {manifest['etag']}")
     except Exception as e:
-        logger.error(f"Error updating DynamoDB: {e}")
+        logger.error(f"Error storing report: {e}")
         return {
             "statusCode": 500,
-            "error": "Failed to update DynamoDB"
+            "error": "Failed to store report"
         }
 
     return {
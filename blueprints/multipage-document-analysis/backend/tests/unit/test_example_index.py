@@ -0,0 +1,149 @@
+# MIT No Attribution
+#
+# Copyright 2025 Amazon Web Services
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this
+# software and associated documentation files (the "Software"), to deal in the Software
+# without restriction, including without limitation the rights to use, copy, modify,
+# merge, publish, distribute, sublicense, and/or sell copies of the Software, and to
+# permit persons to whom the Software is furnished to do so.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED,
+# INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A
+# PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT
+# HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE
+# SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+import json
+import os
+import sys
+import tempfile
+import unittest
+
+from unittest import mock
+
+PROMPT_SELECTOR_DIR = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "..", "..", "pace_backend", "text_analysis_workflow",
+    "extract_data_to_schema_fn", "prompt_selector",
+)
+sys.path.append(PROMPT_SELECTOR_DIR)
+sys.path.append(os.path.dirname(PROMPT_SELECTOR_DIR))
+
+from langchain_core.messages import AIMessage, SystemMessage
+
+from prompt_selector.information_extraction_prompt_selector import (
+    count_selected_examples,
+    get_information_extraction_prompt_selector,
+)
+from example_index import (
+    INDEX_FILE_NAME,
+    ExampleIndex,
+    HashingEmbeddings,
+    example_tokens,
+    examples_hash,
+    get_example_index,
+    load_examples,
+)
+
+EXAMPLES_DIR = os.path.join(PROMPT_SELECTOR_DIR, "examples")
+
+EXAMPLES = [
+    {"text": "El consejo de administracion estara integrado por tres consejeros", "extraction": {"managers": []}},
+    {"text": "El consejo de administracion estara integrado por cinco consejeros", "extraction": {"managers": []}},
+    {"text": "Los accionistas suscriben acciones de la serie A por un valor de", "extraction": {"shareholders": []}},
+    {"text": "Ante mi, notario publico numero 12 de la Ciudad de Mexico", "extraction": {"notary_name": ""}},
+]
+
+
+class TestExampleIndex(unittest.TestCase):
+    def setUp(self):
+        self.embeddings = HashingEmbeddings()
+        self.index = ExampleIndex.build([dict(example) for example in EXAMPLES], self.embeddings)
+
+    def query(self, text):
+        return self.embeddings.embed_query(text)
+
+    def test_embeddings_are_deterministic(self):
+        self.assertEqual(HashingEmbeddings().embed_query("Notario publico"), self.embeddings.embed_query("Notario publico"))
+
+    def test_selects_the_most_similar_examples(self):
+        selected = self.index.select(self.query("Comparecio ante el notario publico numero 12"), k=1)
+        self.assertEqual(selected, [EXAMPLES[3]])
+
+        selected = self.index.select(self.query("Los accionistas de la sociedad suscriben acciones"), k=2)
+        self.assertEqual(selected[0], EXAMPLES[2])
+
+    def test_mmr_avoids_near_duplicates(self):
+        query = self.query("El consejo de administracion estara integrado por consejeros y accionistas")
+
+        self.assertEqual(self.index.select(query, k=2), [EXAMPLES[0], EXAMPLES[1]])
+        self.assertNotIn(EXAMPLES[1], self.index.select(query, k=2, mmr_lambda=0.3))
+
+    def test_token_budget(self):
+        query = self.query("El consejo de administracion")
+        budget = example_tokens(EXAMPLES[0]) + 1
+
+        self.assertEqual(len(self.index.select(query, k=3, token_budget=budget)), 1)
+        self.assertEqual(self.index.select(query, k=3, token_budget=0), [])
+
+    def test_without_query_keeps_the_stored_order(self):
+        self.assertEqual(self.index.select(None, k=2), EXAMPLES[:2])
+
+    def write_pairs(self, directory, examples):
+        for i, example in enumerate(examples):
+            with open(os.path.join(directory, f"example_chunk_{i + 1}.txt"), "w", encoding="utf-8") as file:
+                file.write(example["text"])
+            with open(os.path.join(directory, f"example_chunk_{i + 1}.json"), "w", encoding="utf-8") as file:
+                json.dump(example["extraction"], file)
+
+    def test_prebuilt_index_file(self):
+        with tempfile.TemporaryDirectory() as directory:
+            self.write_pairs(directory, EXAMPLES[:2])
+            self.assertEqual(load_examples(directory), EXAMPLES[:2])
+
+            ExampleIndex.build(load_examples(directory), self.embeddings).save(os.path.join(directory, INDEX_FILE_NAME))
+            with mock.patch.object(ExampleIndex, "build", side_effect=AssertionError("index.json not used")):
+                index = get_example_index(directory, self.embeddings)
+
+            self.assertEqual(index.examples, EXAMPLES[:2])
+            self.assertIs(get_example_index(directory, self.embeddings), index)
+
+    def test_prebuilt_index_of_other_examples_is_rebuilt(self):
+        with tempfile.TemporaryDirectory() as directory:
+            self.write_pairs(directory, EXAMPLES[:2])
+
+            # Built from other examples, with the same embeddings
+            self.index.save(os.path.join(directory, INDEX_FILE_NAME))
+            index = get_example_index(directory, self.embeddings)
+
+            self.assertEqual(index.examples, EXAMPLES[:2])
+            self.assertEqual(index.content_hash, examples_hash(EXAMPLES[:2]))
+
+    def test_repository_examples_load(self):
+        for section in os.listdir(os.path.join(EXAMPLES_DIR, "es")):
+            index = get_example_index(os.path.join(EXAMPLES_DIR, "es", section), self.embeddings)
+            self.assertGreater(len(index.examples), 0)
+
+
+
+class TestPromptExamples(unittest.TestCase):
+    TEXT = "El consejo de administracion estara integrado por tres consejeros"
+
+    def test_count_within_the_token_budget(self):
+        self.assertEqual(count_selected_examples("es", "administration", self.TEXT, 3, 8000), 1)
+        self.assertEqual(count_selected_examples("es", "administration", self.TEXT, 3, 1), 0)
+
+    def test_prompt_states_the_number_of_examples_it_includes(self):
+        n_examples = count_selected_examples("es", "administration", self.TEXT, 3, 8000)
+        prompt = get_information_extraction_prompt_selector("es", "administration", 8000).get_prompt("anthropic.claude")
+
+        messages = prompt.format_messages(json_schema="{}", text=self.TEXT, n_examples=n_examples)
+
+        system = next(message for message in messages if isinstance(message, SystemMessage))
+        self.assertIn(f"{n_examples} ejemplos", system.content)
+        self.assertEqual(sum(isinstance(message, AIMessage) for message in messages), n_examples)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,141 @@
+# MIT No Attribution
+#
+# Copyright 2025 Amazon Web Services
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this
+# software and associated documentation files (the "Software"), to deal in the Software
+# without restriction, including without limitation the rights to use, copy, modify,
+# merge, publish, distribute, sublicense, and/or sell copies of the Software, and to
+# permit persons to whom the Software is furnished to do so.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED,
+# INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A
+# PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT
+# HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE
+# SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+
+import json
+import os
+import sys
+import unittest
+
+from unittest import mock
+
+import boto3
+
+from moto import mock_aws
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(TESTS_DIR, "..", "..", "pace_backend", "shared"))
+sys.path.append(os.path.join(TESTS_DIR, "..", "..", "..", "..", "shared", "layer"))
+
+from report_store import MAX_INLINE_BYTES, ReportNotFoundError, ReportStore
+
+REGION = "us-east-1"
+BUCKET = "reports"
+
+REPORT = {
+    "general_information": {"name": "ANYCOMPANY PETROL", "social_object": ["Venta de combustibles"]},
+    "shareholders": {"shareholders": [{"shareholder_name": "Mateo Jackson", "stock_units": "12500"}]},
+    "notary_information": {"notary_name": "John Doe", "notary_number": "1"},
+}
+
+
+@mock_aws
+class TestReportStore(unittest.TestCase):
+    def setUp(self):
+        os.environ.setdefault("AWS_DEFAULT_REGION", REGION)
+        dynamodb = boto3.resource("dynamodb", region_name=REGION)
+        self.table = dynamodb.create_table(
+            TableName="documents",
+            KeySchema=[{"AttributeName": "id", "KeyType": "HASH"}],
+            AttributeDefinitions=[{"AttributeName": "id", "AttributeType": "S"}],
+            BillingMode="PAY_PER_REQUEST",
+        )
+        self.s3 = boto3.client("s3", region_name=REGION)
+        self.s3.create_bucket(Bucket=BUCKET)
+        self.table.put_item(Item={"id": "job-1", "status": "INFORMATION_CONSOLIDATION"})
+
+    def store(self, storage):
+        return ReportStore(self.table, s3_client=self.s3, bucket=BUCKET, storage=storage)
+
+    def test_round_trip_and_single_write(self):
+        for storage in ("s3", "dynamodb"):
+            with self.subTest(storage=storage):
+                store = self.store(storage)
+                store.save("job-1", REPORT, "REPORT_PERSISTANCE")
+
+                item = self.table.get_item(Key={"id": "job-1"})["Item"]
+                self.assertEqual(item["status"], "REPORT_PERSISTANCE")
+                self.assertEqual(item["report"]["storage"], storage)
+                self.assertNotIn("json_report", item)
+
+                self.assertEqual(store.load("job-1").sections, REPORT)
+
+    def test_section_projection(self):
+        store = self.store("s3")
+        store.save("job-1", REPORT, "REPORT_PERSISTANCE")
+
+        report = store.load("job-1", sections=["notary_information", "unknown"])
+        self.assertEqual(report.sections, {"notary_information": REPORT["notary_information"]})
+
+    def test_if_none_match(self):
+        store = self.store("s3")
+        store.save("job-1", REPORT, "REPORT_PERSISTANCE")
+        etag = store.load("job-1").etag
+
+        self.assertTrue(store.load("job-1", if_none_match=etag).not_modified)
+        self.assertTrue(store.load("job-1", if_none_match=f'"other", W/{etag}').not_modified)
+
+        # Each projection has its own ETag
+        self.assertFalse(store.load("job-1", sections=["shareholders"], if_none_match=etag).not_modified)
+
+        # A new report changes the ETag
+        store.save("job-1", {**REPORT, "notary_information": {"notary_name": "Jane Roe"}}, "REPORT_PERSISTANCE")
+        self.assertFalse(store.load("job-1", if_none_match=etag).not_modified)
+
+    def test_large_inline_reports_go_to_s3(self):
+        big_report = {"shareholders": [os.urandom(64).hex() for _ in range(MAX_INLINE_BYTES // 64)]}
+        store = self.store("dynamodb")
+        manifest = store.save("job-1", big_report, "REPORT_PERSISTANCE")
+
+        self.assertEqual(manifest["storage"], "s3")
+        self.assertEqual(store.load("job-1").sections, big_report)
+
+    def test_legacy_reports(self):
+        self.table.put_item(Item={"id": "job-2", "status": "PDF_GENERATION", "json_report": json.dumps(REPORT)})
+        store = self.store("s3")
+
+        report = store.load("job-2", sections=["shareholders"])
+        self.assertEqual(report.sections, {"shareholders": REPORT["shareholders"]})
+        self.assertTrue(store.load("job-2", sections=["shareholders"], if_none_match=report.etag).not_modified)
+
+        with self.assertRaises(ReportNotFoundError):
+            store.load("job-1")
+        with self.assertRaises(ReportNotFoundError):
+            store.load("missing")
+
+    def test_inline_not_modified_reads_only_etags(self):
+        store = self.store("dynamodb")
+        store.save("job-1", REPORT, "REPORT_PERSISTANCE")
+        etag = store.load("job-1").etag
+        section_etag = store.load("job-1", sections=["shareholders"]).etag
+
+        with mock.patch.object(self.table, "get_item", wraps=self.table.get_item) as get_item:
+            self.assertTrue(store.load("job-1", if_none_match=etag).not_modified)
+            self.assertTrue(store.load("job-1", sections=["shareholders"], if_none_match=section_etag).not_modified)
+
+        self.assertEqual(get_item.call_count, 2)
+        for call in get_item.call_args_list:
+            self.assertNotIn("report_data", call.kwargs["ExpressionAttributeNames"].values())
+
+        # A changed report is read in full
+        report = store.load("job-1", sections=["shareholders"], if_none_match=etag)
+        self.assertFalse(report.not_modified)
+        self.assertEqual(report.sections, {"shareholders": REPORT["shareholders"]})
+
+
+if __name__ == "__main__":
+    unittest.main()
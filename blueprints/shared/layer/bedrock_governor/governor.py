@@ -0,0 +1,493 @@
+# MIT No Attribution
+#
+# Copyright 2025 Amazon Web Services
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this
+# software and associated documentation files (the "Software"), to deal in the Software
+# without restriction, including without limitation the rights to use, copy, modify,
+# merge, publish, distribute, sublicense, and/or sell copies of the Software, and to
+# permit persons to whom the Software is furnished to do so.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED,
+# INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A
+# PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT
+# HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE
+# SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+import logging
+import os
+import random
+import threading
+import time
+
+from dataclasses import dataclass, field
+from typing import Any, Callable, List, Optional, Tuple, Type
+
+logger = logging.getLogger(__name__)
+
+# Error codes returned by Bedrock when a quota is exceeded
+THROTTLING_CODES = {
+    "ThrottlingException",
+    "TooManyRequestsException",
+    "ServiceQuotaExceededException",
+}
+
+# Transient error codes worth retrying, including the ones botocore standard retries would have retried
+TRANSIENT_CODES = {
+    "ModelTimeoutException",
+    "ModelNotReadyException",
+    "ModelErrorException",
+    "ServiceUnavailableException",
+    "InternalServerException",
+    "InternalFailure",
+    "ServiceUnavailable",
+    "RequestTimeout",
+    "RequestTimeoutException",
+    "PriorRequestNotComplete",
+    "ConnectionError",
+}
+
+# Base classes of the botocore exceptions raised when the endpoint cannot be reached or the connection
+# drops (EndpointConnectionError, ConnectTimeoutError, ReadTimeoutError, ConnectionClosedError...)
+CONNECTION_ERRORS = {"ConnectionError", "HTTPClientError"}
+
+
+class CircuitOpenError(Exception):
+    """Raised without calling Bedrock while the circuit breaker is open"""
+
+
+def error_code(exc: BaseException) -> Optional[str]:
+    """
+    Bedrock error code of an exception, if any.
+
+    botocore raises ClientError (exc.response["Error"]["Code"]), while ChatBedrock wraps it in a
+    ValueError, so the exception chain and the message are inspected as well. Connection errors,
+    which have no response, are reported as "ConnectionError".
+    """
+    seen = set()
+    while exc is not None and id(exc) not in seen:
+        seen.add(id(exc))
+        response = getattr(exc, "response", None)
+        if isinstance(response, dict) and response.get("Error", {}).get("Code"):
+            return response["Error"]["Code"]
+        if any(cls.__name__ in CONNECTION_ERRORS for cls in type(exc).__mro__):
+            return "ConnectionError"
+        message = str(exc)
+        for code in THROTTLING_CODES | TRANSIENT_CODES:
+            if code in message or type(exc).__name__ == code:
+                return code
+        exc = exc.__cause__ or exc.__context__
+    return None
+
+
+class TokenBucket:
+    """
+    Token bucket refilled at `rate` units per second up to `capacity`.
+
+    `acquire` blocks until the units are available. `consume` debits units without waiting and can
+    leave the bucket negative, e.g. to account for the actual tokens of a response once known.
+    """
+
+    def __init__(self, rate: float, capacity: float, clock: Callable[[], float] = time.monotonic):
+        self.rate = rate
+        self.capacity = capacity
+        self.clock = clock
+        self.tokens = capacity
+        self.updated = clock()
+        self.lock = threading.Lock()
+
+    @classmethod
+    def per_minute(cls, quota: float, **kwargs) -> "TokenBucket":
+        return cls(rate=quota / 60.0, capacity=quota, **kwargs)
+
+    def _refill(self) -> None:
+        now = self.clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float) -> float:
+        with self.lock:
+            self._refill()
+            amount = min(amount, self.capacity)
+            return 0.0 if self.tokens >= amount else (amount - self.tokens) / self.rate
+
+    def acquire(self, amount: float = 1, sleep: Callable[[float], None] = time.sleep) -> None:
+        amount = min(amount, self.capacity)
+        while True:
+            with self.lock:
+                self._refill()
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return
+                wait = (amount - self.tokens) / self.rate
+            sleep(wait)
+
+    def consume(self, amount: float) -> None:
+        with self.lock:
+            self._refill()
+            self.tokens -= amount
+
+
+class AIMDLimiter:
+    """
+    Concurrency limit with additive increase / multiplicative decrease.
+
+    Every `limit` consecutive successes raise the limit by one; a throttle cuts it by `decrease_factor`,
+    at most once per `cooldown` seconds so a burst of throttles from the same window counts once.
+    """
+
+    def __init__(
+            self,
+            initial: int = 4,
+            minimum: int = 1,
+            maximum: int = 32,
+            decrease_factor: float = 0.5,
+            cooldown: float = 1.0,
+            clock: Callable[[], float] = time.monotonic
+    ):
+        self.limit = float(initial)
+        self.minimum = minimum
+        self.maximum = maximum
+        self.decrease_factor = decrease_factor
+        self.cooldown = cooldown
+        self.clock = clock
+        self.in_flight = 0
+        self.successes = 0
+        self.last_decrease = float("-inf")
+        self.condition = threading.Condition()
+
+    def acquire(self) -> None:
+        with self.condition:
+            while self.in_flight >= int(self.limit):
+                self.condition.wait()
+            self.in_flight += 1
+
+    def release(self) -> None:
+        with self.condition:
+            self.in_flight -= 1
+            self.condition.notify_all()
+
+    def on_success(self) -> None:
+        with self.condition:
+            self.successes += 1
+            if self.successes >= int(self.limit):
+                self.successes = 0
+                self.limit = min(self.maximum, self.limit + 1)
+                self.condition.notify_all()
+
+    def on_throttle(self) -> None:
+        with self.condition:
+            now = self.clock()
+            if now - self.last_decrease >= self.cooldown:
+                self.limit = max(self.minimum, self.limit * self.decrease_factor)
+                self.last_decrease = now
+            self.successes = 0
+
+
+class CircuitBreaker:
+    """
+    Opens after `failure_threshold` consecutive failed attempts and rejects calls for `reset_timeout`
+    seconds. Then a single probe call is let through (half-open); its outcome closes or re-opens it.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+            self,
+            failure_threshold: int = 10,
+            reset_timeout: float = 30.0,
+            clock: Callable[[], float] = time.monotonic
+    ):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.probing = False
+        self.lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self.lock:
+            if self.state == self.OPEN and self.clock() - self.opened_at >= self.reset_timeout:
+                self.state = self.HALF_OPEN
+                self.probing = False
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.HALF_OPEN and not self.probing:
+                self.probing = True
+                return True
+            return False
+
+    def on_success(self) -> None:
+        with self.lock:
+            self.state = self.CLOSED
+            self.failures = 0
+            self.probing = False
+
+    def on_failure(self) -> None:
+        with self.lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                self.state = self.OPEN
+                self.opened_at = self.clock()
+                self.probing = False
+
+
+@dataclass
+class RetryPolicy:
+    """Bounded retries with full jitter: sleep uniform(0, min(max_delay, base_delay * 2 ** attempt))"""
+
+    max_attempts: int = 6
+    base_delay: float = 1.0
+    max_delay: float = 20.0
+    retryable_exceptions: Tuple[Type[BaseException], ...] = ()
+
+    def delay(self, attempt: int) -> float:
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+
+@dataclass
+class CallState:
+    """State of a single governed call, shared by its attempts"""
+
+    attempt: int = 0
+    errors: List[str] = field(default_factory=list)
+
+    @property
+    def model_errors(self) -> int:
+        return sum(1 for code in self.errors if code in ("ModelErrorException", "ValidationError"))
+
+    def temperature(self, base: float, step: float = 0.1, maximum: float = 1.0) -> float:
+        """Sampling temperature for this attempt, raised by `step` after each model/validation error"""
+        return min(maximum, base + step * self.model_errors)
+
+
+@dataclass
+class GovernorStats:
+    calls: int = 0
+    attempts: int = 0
+    successes: int = 0
+    throttles: int = 0
+    retries: int = 0
+    failures: int = 0
+    rejected: int = 0
+
+
+class BedrockGovernor:
+    """
+    Admission control for Bedrock calls made from one Lambda container.
+
+    Each attempt waits for the requests-per-minute and tokens-per-minute buckets, then for a slot of
+    the AIMD concurrency limiter. Throttles shrink the concurrency limit, successes grow it back.
+    Throttling and transient errors (plus `retry.retryable_exceptions`) are retried with jittered,
+    bounded backoff, and the circuit breaker fails fast while Bedrock keeps failing.
+
+    Quotas are per container: with N concurrent containers size them as quota / N.
+    """
+
+    def __init__(
+            self,
+            requests_per_minute: Optional[float] = None,
+            tokens_per_minute: Optional[float] = None,
+            limiter: Optional[AIMDLimiter] = None,
+            breaker: Optional[CircuitBreaker] = None,
+            retry: Optional[RetryPolicy] = None,
+            sleep: Callable[[float], None] = time.sleep,
+    ):
+        self.request_bucket = TokenBucket.per_minute(requests_per_minute) if requests_per_minute else None
+        self.token_bucket = TokenBucket.per_minute(tokens_per_minute) if tokens_per_minute else None
+        self.limiter = limiter or AIMDLimiter()
+        self.breaker = breaker or CircuitBreaker()
+        self.retry = retry or RetryPolicy()
+        self.sleep = sleep
+        self.stats = GovernorStats()
+        self.stats_lock = threading.Lock()
+
+    def _count(self, **increments) -> None:
+        with self.stats_lock:
+            for name, value in increments.items():
+                setattr(self.stats, name, getattr(self.stats, name) + value)
+
+    def _is_retryable(self, exc: BaseException, code: Optional[str], retry_on: Tuple[Type[BaseException], ...]) -> bool:
+        if code in THROTTLING_CODES or code in TRANSIENT_CODES:
+            return True
+        retryable = self.retry.retryable_exceptions + tuple(retry_on)
+        return bool(retryable) and isinstance(exc, retryable)
+
+    def run(
+            self,
+            fn: Callable[[CallState], Any],
+            estimated_tokens: int = 0,
+            retry_on: Tuple[Type[BaseException], ...] = ()
+    ) -> Any:
+        """
+        Call `fn(state)` under the governor, retrying it with the same per-call `state`.
+
+        `retry_on` adds exception types retried for this call only, e.g. pydantic.ValidationError
+        for structured output calls.
+        """
+        state = CallState()
+        self._count(calls=1)
+
+        while True:
+            if not self.breaker.allow():
+                self._count(rejected=1)
+                raise CircuitOpenError("Bedrock circuit breaker is open")
+
+            if self.request_bucket:
+                self.request_bucket.acquire(1, sleep=self.sleep)
+            if self.token_bucket and estimated_tokens:
+                self.token_bucket.acquire(estimated_tokens, sleep=self.sleep)
+
+            self.limiter.acquire()
+            self._count(attempts=1)
+            try:
+                result = fn(state)
+                error = None
+            except Exception as exc:
+                error = exc
+            finally:
+                self.limiter.release()
+
+            if error is None:
+                break
+
+            code = error_code(error)
+            if code is None and type(error).__name__ == "ValidationError":
+                code = "ValidationError"
+            state.errors.append(code or type(error).__name__)
+
+            if code in THROTTLING_CODES:
+                self._count(throttles=1)
+                self.limiter.on_throttle()
+
+            if code in THROTTLING_CODES or code in TRANSIENT_CODES:
+                self.breaker.on_failure()
+            else:
+                # Bedrock answered (bad request, invalid output...), it is not unavailable
+                self.breaker.on_success()
+
+            state.attempt += 1
+            if not self._is_retryable(error, code, retry_on) or state.attempt >= self.retry.max_attempts:
+                self._count(failures=1)
+                raise error
+
+            # back off without holding a concurrency slot
+            delay = self.retry.delay(state.attempt)
+            logger.warning(f"Bedrock call failed with {state.errors[-1]}, retry {state.attempt} in {delay:.2f}s")
+            self._count(retries=1)
+            self.sleep(delay)
+
+        self.limiter.on_success()
+        self.breaker.on_success()
+        self._count(successes=1)
+        self._record_usage(result, estimated_tokens)
+        return result
+
+    def call(
+            self,
+            fn: Callable[..., Any],
+            *args,
+            estimated_tokens: int = 0,
+            retry_on: Tuple[Type[BaseException], ...] = (),
+            **kwargs
+    ) -> Any:
+        """Call `fn(*args, **kwargs)` under the governor"""
+        return self.run(lambda state: fn(*args, **kwargs), estimated_tokens=estimated_tokens, retry_on=retry_on)
+
+    def _record_usage(self, result: Any, estimated_tokens: int) -> None:
+        """Debit the tokens actually used beyond the estimate from the tokens-per-minute bucket"""
+        if not self.token_bucket:
+            return
+        usage = getattr(result, "usage_metadata", None)
+        if isinstance(result, dict):
+            usage = result.get("usage_metadata") or usage
+        if usage and usage.get("total_tokens"):
+            extra = usage["total_tokens"] - estimated_tokens
+            if extra > 0:
+                self.token_bucket.consume(extra)
+
+    def invoke_model(self, client, estimated_tokens: int = 0, **kwargs) -> Any:
+        """bedrock-runtime invoke_model under the governor"""
+        return self.call(client.invoke_model, estimated_tokens=estimated_tokens, **kwargs)
+
+    def converse(self, client, estimated_tokens: int = 0, **kwargs) -> Any:
+        """bedrock-runtime converse under the governor"""
+        return self.call(client.converse, estimated_tokens=estimated_tokens, **kwargs)
+
+    def wrap(
+            self,
+            runnable,
+            estimated_tokens: int = 0,
+            retry_on: Tuple[Type[BaseException], ...] = ()
+    ) -> "GovernedRunnable":
+        """Wrap a ChatBedrock / ChatBedrockConverse model or a LangChain chain such as prompt | model"""
+        return GovernedRunnable(self, runnable, estimated_tokens, retry_on)
+
+
+class GovernedRunnable:
+    """
+    A LangChain runnable (ChatBedrock, ChatBedrockConverse, a prompt | model chain, ...) whose
+    `invoke` goes through a BedrockGovernor. `with_structured_output` and `bind_tools` return
+    governed runnables as well. Compose the chain first, then wrap it.
+    """
+
+    def __init__(self, governor: BedrockGovernor, runnable, estimated_tokens: int = 0, retry_on=()):
+        self.governor = governor
+        self.runnable = runnable
+        self.estimated_tokens = estimated_tokens
+        self.retry_on = tuple(retry_on)
+
+    def invoke(self, input, config=None, **kwargs):
+        return self.governor.call(
+            self.runnable.invoke, input, config,
+            estimated_tokens=self.estimated_tokens, retry_on=self.retry_on, **kwargs
+        )
+
+    def batch(self, inputs, config=None, **kwargs):
+        return [self.invoke(input, config, **kwargs) for input in inputs]
+
+    def with_structured_output(self, *args, **kwargs) -> "GovernedRunnable":
+        return GovernedRunnable(
+            self.governor, self.runnable.with_structured_output(*args, **kwargs), self.estimated_tokens, self.retry_on
+        )
+
+    def bind_tools(self, *args, **kwargs) -> "GovernedRunnable":
+        return GovernedRunnable(
+            self.governor, self.runnable.bind_tools(*args, **kwargs), self.estimated_tokens, self.retry_on
+        )
+
+    def __getattr__(self, name):
+        return getattr(self.runnable, name)
+
+
+_default_governor = None
+_default_governor_lock = threading.Lock()
+
+
+def get_governor() -> BedrockGovernor:
+    """
+    Governor shared by every Bedrock call of the Lambda container, configured from the environment:
+    BEDROCK_RPM, BEDROCK_TPM, BEDROCK_MAX_CONCURRENCY, BEDROCK_MAX_ATTEMPTS and BEDROCK_MAX_RETRY_DELAY
+    """
+    global _default_governor
+
+    with _default_governor_lock:
+        if _default_governor is None:
+            rpm = os.environ.get("BEDROCK_RPM")
+            tpm = os.environ.get("BEDROCK_TPM")
+            max_concurrency = int(os.environ.get("BEDROCK_MAX_CONCURRENCY", 8))
+            _default_governor = BedrockGovernor(
+                requests_per_minute=float(rpm) if rpm else None,
+                tokens_per_minute=float(tpm) if tpm else None,
+                limiter=AIMDLimiter(initial=max(1, max_concurrency // 2), maximum=max_concurrency),
+                retry=RetryPolicy(
+                    max_attempts=int(os.environ.get("BEDROCK_MAX_ATTEMPTS", 6)),
+                    max_delay=float(os.environ.get("BEDROCK_MAX_RETRY_DELAY", 20)),
+                ),
+            )
+        return _default_governor
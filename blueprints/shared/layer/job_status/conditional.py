@@ -0,0 +1,201 @@
+# MIT No Attribution
+#
+# Copyright 2025 Amazon Web Services
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this
+# software and associated documentation files (the "Software"), to deal in the Software
+# without restriction, including without limitation the rights to use, copy, modify,
+# merge, publish, distribute, sublicense, and/or sell copies of the Software, and to
+# permit persons to whom the Software is furnished to do so.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED,
+# INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A
+# PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT
+# HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE
+# SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+"""
+Conditional and cacheable reads for the job status APIs polled by the frontend.
+
+- StatusReader reads only the attributes an endpoint returns (ProjectionExpression) and keeps them in an
+  optional in-container TTL cache.
+- conditional_read computes the ETag of the response body, answers If-None-Match with 304, and supports long
+  polling: with `?wait=<seconds>` and an If-None-Match header the request is held until the body changes or the
+  wait time passes.
+
+The jobs tables do not record when an item was last modified ("timestamp" is the creation time), so the ETag is
+the only validator and no Last-Modified header is sent.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Hashable, List, Optional
+
+
+class TTLCache:
+    """Thread safe cache whose entries expire `ttl` seconds after being stored"""
+
+    def __init__(self, ttl: float, clock: Callable[[], float] = time.monotonic):
+        self.ttl = ttl
+        self.clock = clock
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, load: Callable[[], Any]):
+        if self.ttl <= 0:
+            return load()
+
+        now = self.clock()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[0] > now:
+                return entry[1]
+
+        value = load()
+        with self._lock:
+            self._entries[key] = (now + self.ttl, value)
+        return value
+
+
+class StatusReader:
+    """
+    Projected reads of the jobs table.
+
+    @param table: boto3 DynamoDB Table
+    @param attributes: attributes returned by the endpoint, the only ones read from the table
+    @param ttl: seconds a read is served from the in-container cache, 0 disables the cache
+    """
+
+    def __init__(self, table, attributes: List[str], ttl: float = 0, clock: Callable[[], float] = time.monotonic):
+        self.table = table
+        self.cache = TTLCache(ttl, clock)
+        self.reads = 0
+
+        # Placeholders for every attribute, "status", "name" or "timestamp" are reserved words
+        self._names = {f"#a{i}": attribute for i, attribute in enumerate(attributes)}
+        self._projection = ", ".join(self._names)
+
+    def get_item(self, key: Dict[str, str]) -> Optional[dict]:
+        def load():
+            self.reads += 1
+            return self.table.get_item(
+                Key=key, ProjectionExpression=self._projection, ExpressionAttributeNames=self._names
+            ).get("Item")
+
+        return self.cache.get(("item", tuple(sorted(key.items()))), load)
+
+    def scan(self) -> List[dict]:
+        def load():
+            items = []
+            kwargs = {"ProjectionExpression": self._projection, "ExpressionAttributeNames": self._names}
+            while True:
+                self.reads += 1
+                response = self.table.scan(**kwargs)
+                items.extend(response.get("Items", []))
+                if "LastEvaluatedKey" not in response:
+                    return items
+                kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+
+        return self.cache.get(("scan",), load)
+
+
+def body_etag(body) -> str:
+    canonical = json.dumps(body, sort_keys=True, separators=(",", ":"), default=str)
+    return f'"{hashlib.sha256(canonical.encode()).hexdigest()[:32]}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match evaluation (RFC 9110, weak comparison)"""
+    if not if_none_match:
+        return False
+    candidates = [candidate.strip() for candidate in if_none_match.split(",")]
+    return "*" in candidates or etag in [candidate.removeprefix("W/") for candidate in candidates]
+
+
+@dataclass
+class ConditionalResult:
+    body: Any
+    etag: str
+    not_modified: bool = False
+
+    @property
+    def status_code(self) -> int:
+        return 304 if self.not_modified else 200
+
+    def headers(self) -> Dict[str, str]:
+        # no-cache: browsers keep the body but revalidate it on every poll
+        return {
+            "ETag": self.etag,
+            "Cache-Control": "private, no-cache",
+            "Access-Control-Expose-Headers": "ETag",
+        }
+
+
+@dataclass
+class LongPollSettings:
+    max_wait: float = 20.0
+    interval: float = 1.0
+
+    @classmethod
+    def from_env(cls):
+        # A poll shorter than the cache TTL would only rebuild the body from the same cached read
+        return cls(
+            max_wait=float(os.environ.get("STATUS_MAX_WAIT", 20)),
+            interval=max(
+                float(os.environ.get("STATUS_POLL_INTERVAL", 1)), float(os.environ.get("STATUS_CACHE_TTL", 0))
+            ),
+        )
+
+
+def request_conditions(event) -> Dict[str, Any]:
+    """If-None-Match header and ?wait= parameter of an API Gateway proxy event"""
+    headers = {key.lower(): value for key, value in (event.get("headers") or {}).items()}
+    query = event.get("queryStringParameters") or {}
+    try:
+        wait = max(0.0, float(query.get("wait", 0)))
+    except ValueError:
+        wait = 0.0
+    return {
+        "if_none_match": headers.get("if-none-match"),
+        "wait": wait,
+    }
+
+
+def conditional_read(
+        read: Callable[[], Any],
+        if_none_match: Optional[str] = None,
+        wait: float = 0,
+        settings: Optional[LongPollSettings] = None,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+) -> ConditionalResult:
+    """
+    Build the response body with `read` and evaluate the request conditions against it. If the client already
+    has the current body and asked to wait, `read` is repeated every `settings.interval` seconds until the body
+    changes or `wait` (capped to `settings.max_wait`) seconds pass. Every repetition can be a full table scan, so
+    the list endpoints poll less often than the single item ones (STATUS_POLL_INTERVAL).
+    """
+    settings = settings or LongPollSettings.from_env()
+    deadline = clock() + min(wait, settings.max_wait)
+
+    while True:
+        body = read()
+        etag = body_etag(body)
+        result = ConditionalResult(body=body, etag=etag, not_modified=etag_matches(if_none_match, etag))
+
+        remaining = deadline - clock()
+        if not result.not_modified or remaining <= 0:
+            return result
+
+        sleep(min(settings.interval, remaining))
+
+
+def get_status_reader(table, attributes: List[str]) -> StatusReader:
+    """StatusReader with the cache TTL of the STATUS_CACHE_TTL environment variable (seconds, 0 to disable)"""
+    return StatusReader(table, attributes, ttl=float(os.environ.get("STATUS_CACHE_TTL", 0)))
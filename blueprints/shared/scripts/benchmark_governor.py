@@ -0,0 +1,129 @@
+# MIT No Attribution
+#
+# Copyright 2025 Amazon Web Services
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this
+# software and associated documentation files (the "Software"), to deal in the Software
+# without restriction, including without limitation the rights to use, copy, modify,
+# merge, publish, distribute, sublicense, and/or sell copies of the Software, and to
+# permit persons to whom the Software is furnished to do so.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED,
+# INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A
+# PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT
+# HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE
+# SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+"""
+Goodput under contention: many threads calling a fake Bedrock that throttles whenever more than
+`capacity` requests are in flight. Compares the @retry(wait_exponential_multiplier=10000, ...)
+pattern used by the Lambdas with the BedrockGovernor. Delays are scaled by --time-scale.
+
+    python scripts/benchmark_governor.py --workers 32 --calls 10 --capacity 4
+"""
+
+import argparse
+import logging
+import os
+import sys
+import threading
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "layer"))
+
+from bedrock_governor import AIMDLimiter, BedrockGovernor, CircuitBreaker, RetryPolicy
+
+
+class ThrottlingError(Exception):
+    def __init__(self):
+        super().__init__("An error occurred (ThrottlingException) when calling the InvokeModel operation")
+        self.response = {"Error": {"Code": "ThrottlingException"}}
+
+
+class ContendedBedrock:
+    def __init__(self, capacity, latency):
+        self.capacity = capacity
+        self.latency = latency
+        self.in_flight = 0
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.throttles = 0
+
+    def invoke_model(self, **kwargs):
+        with self.lock:
+            self.requests += 1
+            self.in_flight += 1
+            throttled = self.in_flight > self.capacity
+            if throttled:
+                self.throttles += 1
+        try:
+            if throttled:
+                time.sleep(self.latency / 10)
+                raise ThrottlingError()
+            time.sleep(self.latency)
+            return {"body": "ok"}
+        finally:
+            with self.lock:
+                self.in_flight -= 1
+
+
+def legacy_call(bedrock, scale, multiplier=10000, maximum=500000, attempts=4):
+    """Same schedule as retrying's wait_exponential: multiplier * 2 ** n ms, no jitter"""
+    for attempt in range(1, attempts + 1):
+        try:
+            return bedrock.invoke_model(modelId="model")
+        except ThrottlingError:
+            if attempt == attempts:
+                raise
+            time.sleep(min(maximum, multiplier * 2 ** attempt) / 1000 * scale)
+
+
+def run(call, workers, calls):
+    ok = failed = 0
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(call) for _ in range(workers * calls)]
+        for future in futures:
+            try:
+                future.result()
+                ok += 1
+            except Exception:
+                failed += 1
+    return ok, failed, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, default=32)
+    parser.add_argument("--calls", type=int, default=10)
+    parser.add_argument("--capacity", type=int, default=4)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--time-scale", type=float, default=0.01, help="scale applied to retry delays")
+    args = parser.parse_args()
+
+    logging.getLogger("governor").setLevel(logging.ERROR)
+
+    bedrock = ContendedBedrock(args.capacity, args.latency)
+    ok, failed, elapsed = run(lambda: legacy_call(bedrock, args.time_scale), args.workers, args.calls)
+    print(f"legacy @retry   ok {ok:4d}  failed {failed:4d}  {elapsed:6.2f}s  goodput {ok / elapsed:6.1f}/s  "
+          f"requests {bedrock.requests:5d}  throttles {bedrock.throttles:5d}")
+
+    bedrock = ContendedBedrock(args.capacity, args.latency)
+    governor = BedrockGovernor(
+        limiter=AIMDLimiter(initial=args.capacity * 2, maximum=args.workers, cooldown=args.latency * 2),
+        breaker=CircuitBreaker(failure_threshold=10_000),
+        retry=RetryPolicy(max_attempts=8, base_delay=1.0 * args.time_scale, max_delay=20 * args.time_scale),
+    )
+    ok, failed, elapsed = run(
+        lambda: governor.invoke_model(bedrock, modelId="model"), args.workers, args.calls
+    )
+    print(f"governor        ok {ok:4d}  failed {failed:4d}  {elapsed:6.2f}s  goodput {ok / elapsed:6.1f}/s  "
+          f"requests {bedrock.requests:5d}  throttles {bedrock.throttles:5d}  "
+          f"final concurrency {int(governor.limiter.limit)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,221 @@
+# MIT No Attribution
+#
+# Copyright 2025 Amazon Web Services
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this
+# software and associated documentation files (the "Software"), to deal in the Software
+# without restriction, including without limitation the rights to use, copy, modify,
+# merge, publish, distribute, sublicense, and/or sell copies of the Software, and to
+# permit persons to whom the Software is furnished to do so.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED,
+# INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A
+# PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT
+# HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE
+# SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+"""
+Load test of the job status endpoint against a moto jobs table: `viewers` browser tabs poll the job list for
+`duration` seconds while the status of one job changes every `change_every` seconds. Time is simulated, so the
+run takes seconds. For every strategy it reports the table reads, the read capacity they consume, the responses
+with a body and the bytes sent.
+
+    python scripts/benchmark_status.py --viewers 1 10 50 --jobs 20 --duration 300
+
+The TTL cache lives in a Lambda container, and concurrent requests are spread over containers, so by default
+every viewer gets its own container and cache (the worst case). --containers N spreads the viewers over N
+containers instead.
+
+With the defaults and 10 viewers, the read capacity only drops (4x) when the viewers share a container. With one
+container per viewer the cache saves no reads, and ETags and long polling only save bodies, bytes and requests.
+
+- full: Scan of whole items on every poll, the behaviour before job_status
+- projected: projected Scan, ETag and 304 responses
+- cached: projected, plus the in-container TTL cache (STATUS_CACHE_TTL)
+- long-poll: cached, and clients wait on the server (?wait=) for up to STATUS_MAX_WAIT seconds
+
+Read capacity is estimated as DynamoDB bills an eventually consistent Scan: half a unit per 4KB of whole items
+read. A ProjectionExpression reduces the bytes returned, not the capacity consumed.
+"""
+
+import argparse
+import json
+import math
+import os
+import sys
+
+import boto3
+
+from moto import mock_aws
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "layer"))
+
+from job_status import StatusReader, conditional_read
+
+REGION = "us-east-1"
+ATTRIBUTES = ["job_id", "country", "industry", "workload", "analysis_name", "timestamp", "status"]
+STATUSES = ["PROCESSING", "GENERATING_QUESTIONS", "READY", "ANALYZING", "COMPLETED"]
+TICK = 1  # simulated seconds between two steps
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class MeteredTable:
+    """Counts the read capacity of the Scan calls made through it"""
+
+    def __init__(self, table, item_sizes):
+        self.table = table
+        self.item_sizes = item_sizes
+        self.scans = 0
+        self.read_units = 0.0
+
+    def scan(self, **kwargs):
+        self.scans += 1
+        response = self.table.scan(**kwargs)
+        scanned = sum(self.item_sizes[item["job_id"]] for item in response.get("Items", []))
+        self.read_units += math.ceil(scanned / 4096) * 0.5
+        return response
+
+
+def create_table(jobs, report_kb):
+    table = boto3.resource("dynamodb", region_name=REGION).create_table(
+        TableName="jobs",
+        KeySchema=[{"AttributeName": "job_id", "KeyType": "HASH"}],
+        AttributeDefinitions=[{"AttributeName": "job_id", "AttributeType": "S"}],
+        BillingMode="PAY_PER_REQUEST",
+    )
+    item_sizes = {}
+    for i in range(jobs):
+        item = {
+            "job_id": f"job-{i:04d}", "country": "Chile", "industry": "Banking", "workload": "Analytics",
+            "analysis_name": f"Analysis {i}", "timestamp": i, "status": "COMPLETED",
+            "report_with_questions": "x" * report_kb * 1024,
+        }
+        table.put_item(Item=item)
+        item_sizes[item["job_id"]] = sum(len(key) + len(str(value)) for key, value in item.items())
+    return table, item_sizes
+
+
+def full_scan(table):
+    items = []
+    kwargs = {}
+    while True:
+        response = table.scan(**kwargs)
+        items.extend(response.get("Items", []))
+        if "LastEvaluatedKey" not in response:
+            return items
+        kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+
+
+def body_of(items):
+    return {"items": [{attribute: item.get(attribute) for attribute in ATTRIBUTES} for item in items]}
+
+
+def simulate(strategy, table, item_sizes, viewer_count, args):
+    clock = FakeClock()
+    metered = MeteredTable(table, item_sizes)
+    containers = min(args.containers or viewer_count, viewer_count)
+    readers = [
+        StatusReader(metered, ATTRIBUTES, ttl=args.cache_ttl if strategy in ("cached", "long-poll") else 0, clock=clock)
+        for _ in range(containers)
+    ]
+
+    def reader_of(viewer):
+        if strategy == "full":
+            return lambda: body_of(full_scan(metered))
+        reader = readers[viewer["container"]]
+        return lambda: body_of(reader.scan())
+
+    # Every viewer keeps the ETag of its last body, the time of its next request and the container it reaches
+    viewers = [
+        {"etag": None, "next": (i * args.poll) / viewer_count, "deadline": None, "container": i % containers}
+        for i in range(viewer_count)
+    ]
+    stats = {"requests": 0, "bodies": 0, "bytes": 0}
+
+    def respond(viewer, result):
+        stats["requests"] += 1
+        if not result.not_modified:
+            stats["bodies"] += 1
+            stats["bytes"] += len(json.dumps(result.body, default=str))
+        viewer["etag"] = result.etag
+
+    # As LongPollSettings.from_env, the server never polls faster than the cache TTL
+    interval = max(args.interval, args.cache_ttl)
+
+    for tick in range(int(args.duration / TICK)):
+        clock.now = tick * TICK
+
+        if clock.now and clock.now % args.change_every == 0:
+            table.update_item(
+                Key={"job_id": "job-0000"}, UpdateExpression="SET #s = :s", ExpressionAttributeNames={"#s": "status"},
+                ExpressionAttributeValues={":s": STATUSES[int(clock.now // args.change_every) % len(STATUSES)]},
+            )
+
+        for viewer in viewers:
+            if viewer["next"] > clock.now:
+                continue
+            read = reader_of(viewer)
+
+            if strategy == "full":
+                respond(viewer, conditional_read(read))
+                viewer["next"] = clock.now + args.poll
+            elif strategy in ("projected", "cached"):
+                respond(viewer, conditional_read(read, if_none_match=viewer["etag"]))
+                viewer["next"] = clock.now + args.poll
+            else:
+                # One iteration of the server side wait loop per tick
+                if viewer["deadline"] is None:
+                    viewer["deadline"] = clock.now + args.max_wait
+                result = conditional_read(read, if_none_match=viewer["etag"])
+                if not result.not_modified or clock.now >= viewer["deadline"]:
+                    respond(viewer, result)
+                    viewer["deadline"] = None
+                viewer["next"] = clock.now + interval
+
+    return {
+        "scans": metered.scans,
+        "read_units": metered.read_units,
+        **stats,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--viewers", type=int, nargs="+", default=[1, 10, 50])
+    parser.add_argument("--jobs", type=int, default=20)
+    parser.add_argument("--report-kb", type=int, default=8, help="size of the attributes not shown in the list")
+    parser.add_argument("--duration", type=float, default=300, help="simulated seconds")
+    parser.add_argument("--poll", type=float, default=5, help="seconds between polls of a viewer")
+    parser.add_argument("--change-every", type=float, default=60, help="seconds between status changes")
+    parser.add_argument("--cache-ttl", type=float, default=2)
+    parser.add_argument("--max-wait", type=float, default=20)
+    parser.add_argument("--interval", type=float, default=5, help="server side poll interval of long polling "
+                                                                  "(STATUS_POLL_INTERVAL)")
+    parser.add_argument("--containers", type=int, default=0,
+                        help="Lambda containers serving the viewers, each with its own cache (default: one per viewer)")
+    args = parser.parse_args()
+
+    os.environ.setdefault("AWS_DEFAULT_REGION", REGION)
+
+    print(f"{'viewers':>7s} {'strategy':>10s} {'requests':>8s} {'scans':>6s} {'RCU':>9s} {'RCU/viewer':>10s} "
+          f"{'bodies':>7s} {'KB sent':>9s}")
+    for viewers in args.viewers:
+        for strategy in ("full", "projected", "cached", "long-poll"):
+            with mock_aws():
+                table, item_sizes = create_table(args.jobs, args.report_kb)
+                result = simulate(strategy, table, item_sizes, viewers, args)
+            print(f"{viewers:7d} {strategy:>10s} {result['requests']:8d} {result['scans']:6d} "
+                  f"{result['read_units']:9.1f} {result['read_units'] / viewers:10.1f} {result['bodies']:7d} "
+                  f"{result['bytes'] / 1024:9.1f}")
+
+
+if __name__ == "__main__":
+    main()
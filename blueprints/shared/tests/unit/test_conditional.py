@@ -0,0 +1,162 @@
+# MIT No Attribution
+#
+# Copyright 2025 Amazon Web Services
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this
+# software and associated documentation files (the "Software"), to deal in the Software
+# without restriction, including without limitation the rights to use, copy, modify,
+# merge, publish, distribute, sublicense, and/or sell copies of the Software, and to
+# permit persons to whom the Software is furnished to do so.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED,
+# INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A
+# PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT
+# HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE
+# SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+import os
+import sys
+import unittest
+
+from unittest import mock
+
+import boto3
+
+from moto import mock_aws
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "layer"))
+
+from job_status import LongPollSettings, StatusReader, TTLCache, body_etag, conditional_read, request_conditions
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+class TTLCacheTest(unittest.TestCase):
+    def test_entries_expire(self):
+        clock = FakeClock()
+        cache = TTLCache(ttl=2, clock=clock)
+        loads = []
+
+        def load():
+            loads.append(clock.now)
+            return len(loads)
+
+        self.assertEqual(cache.get("key", load), 1)
+        clock.now = 1.5
+        self.assertEqual(cache.get("key", load), 1)
+        clock.now = 2.5
+        self.assertEqual(cache.get("key", load), 2)
+
+    def test_disabled(self):
+        cache = TTLCache(ttl=0)
+        values = iter(range(3))
+        self.assertEqual([cache.get("key", lambda: next(values)) for _ in range(3)], [0, 1, 2])
+
+
+@mock_aws
+class StatusReaderTest(unittest.TestCase):
+    def setUp(self):
+        os.environ.setdefault("AWS_DEFAULT_REGION", "us-east-1")
+        self.table = boto3.resource("dynamodb").create_table(
+            TableName="jobs",
+            KeySchema=[{"AttributeName": "job_id", "KeyType": "HASH"}],
+            AttributeDefinitions=[{"AttributeName": "job_id", "AttributeType": "S"}],
+            BillingMode="PAY_PER_REQUEST",
+        )
+        for i in range(3):
+            self.table.put_item(Item={
+                "job_id": f"job-{i}", "status": "PROCESSING", "timestamp": i, "report_with_questions": "x" * 1000,
+            })
+
+    def test_projection_reads_only_the_requested_attributes(self):
+        reader = StatusReader(self.table, ["job_id", "status", "timestamp"])
+
+        item = reader.get_item({"job_id": "job-1"})
+        self.assertEqual(set(item), {"job_id", "status", "timestamp"})
+        self.assertIsNone(reader.get_item({"job_id": "missing"}))
+        self.assertEqual(
+            sorted(item["job_id"] for item in reader.scan()), ["job-0", "job-1", "job-2"]
+        )
+        self.assertTrue(all("report_with_questions" not in item for item in reader.scan()))
+
+    def test_cached_reads(self):
+        clock = FakeClock()
+        reader = StatusReader(self.table, ["job_id", "status"], ttl=2, clock=clock)
+
+        reader.scan()
+        reader.scan()
+        self.assertEqual(reader.reads, 1)
+
+        self.table.update_item(
+            Key={"job_id": "job-0"}, UpdateExpression="SET #s = :s",
+            ExpressionAttributeNames={"#s": "status"}, ExpressionAttributeValues={":s": "READY"},
+        )
+        clock.now = 3
+        self.assertIn("READY", [item["status"] for item in reader.scan()])
+        self.assertEqual(reader.reads, 2)
+
+
+class ConditionalReadTest(unittest.TestCase):
+    def test_not_modified(self):
+        body = {"items": [{"job_id": "job-0", "status": "PROCESSING"}]}
+        etag = body_etag(body)
+
+        self.assertFalse(conditional_read(lambda: body).not_modified)
+        self.assertEqual(conditional_read(lambda: body, if_none_match=etag).status_code, 304)
+        self.assertEqual(conditional_read(lambda: body, if_none_match=f'W/{etag}, "other"').status_code, 304)
+        self.assertEqual(conditional_read(lambda: body, if_none_match='"other"').status_code, 200)
+
+    def test_long_poll_returns_when_the_body_changes(self):
+        clock = FakeClock()
+        bodies = iter([{"status": "PROCESSING"}] * 3 + [{"status": "READY"}])
+
+        result = conditional_read(
+            lambda: next(bodies), if_none_match=body_etag({"status": "PROCESSING"}), wait=10,
+            settings=LongPollSettings(max_wait=20, interval=1), clock=clock, sleep=clock.sleep,
+        )
+
+        self.assertEqual(result.status_code, 200)
+        self.assertEqual(result.body, {"status": "READY"})
+        self.assertEqual(clock.now, 3)
+
+    def test_long_poll_times_out(self):
+        clock = FakeClock()
+        body = {"status": "PROCESSING"}
+
+        result = conditional_read(
+            lambda: body, if_none_match=body_etag(body), wait=60,
+            settings=LongPollSettings(max_wait=5, interval=2), clock=clock, sleep=clock.sleep,
+        )
+
+        self.assertEqual(result.status_code, 304)
+        self.assertEqual(clock.now, 5)
+
+    def test_poll_interval_is_at_least_the_cache_ttl(self):
+        with mock.patch.dict(os.environ, {"STATUS_POLL_INTERVAL": "1", "STATUS_CACHE_TTL": "2"}):
+            self.assertEqual(LongPollSettings.from_env().interval, 2)
+        with mock.patch.dict(os.environ, {"STATUS_POLL_INTERVAL": "5", "STATUS_CACHE_TTL": "2"}):
+            self.assertEqual(LongPollSettings.from_env().interval, 5)
+
+    def test_request_conditions(self):
+        conditions = request_conditions({
+            "headers": {"If-None-Match": '"abc"'}, "queryStringParameters": {"wait": "15"},
+        })
+        self.assertEqual(conditions, {"if_none_match": '"abc"', "wait": 15.0})
+        self.assertEqual(
+            request_conditions({"headers": None, "queryStringParameters": {"wait": "soon"}}),
+            {"if_none_match": None, "wait": 0.0},
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,194 @@
+# MIT No Attribution
+#
+# Copyright 2025 Amazon Web Services
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this
+# software and associated documentation files (the "Software"), to deal in the Software
+# without restriction, including without limitation the rights to use, copy, modify,
+# merge, publish, distribute, sublicense, and/or sell copies of the Software, and to
+# permit persons to whom the Software is furnished to do so.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED,
+# INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A
+# PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT
+# HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE
+# SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+
+import os
+import sys
+import unittest
+
+from botocore.exceptions import EndpointConnectionError, ReadTimeoutError
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "layer"))
+
+from bedrock_governor import (
+    AIMDLimiter,
+    BedrockGovernor,
+    CircuitBreaker,
+    CircuitOpenError,
+    RetryPolicy,
+    TokenBucket,
+    error_code,
+)
+
+
+class FakeClientError(Exception):
+    """Same shape as botocore ClientError"""
+
+    def __init__(self, code):
+        super().__init__(f"An error occurred ({code}) when calling the InvokeModel operation")
+        self.response = {"Error": {"Code": code, "Message": code}}
+
+
+class FakeBedrock:
+    """Fails with the given error codes, in order, then succeeds"""
+
+    def __init__(self, errors=()):
+        self.errors = list(errors)
+        self.calls = 0
+
+    def invoke_model(self, **kwargs):
+        self.calls += 1
+        if self.errors:
+            raise FakeClientError(self.errors.pop(0))
+        return {"body": "ok"}
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+def no_sleep(seconds):
+    pass
+
+
+class TestBedrockGovernor(unittest.TestCase):
+    def test_throttles_are_retried_and_shrink_concurrency(self):
+        limiter = AIMDLimiter(initial=8, maximum=8)
+        governor = BedrockGovernor(limiter=limiter, sleep=no_sleep)
+        bedrock = FakeBedrock(["ThrottlingException", "ThrottlingException"])
+
+        self.assertEqual(governor.invoke_model(bedrock, modelId="model"), {"body": "ok"})
+        self.assertEqual(bedrock.calls, 3)
+        self.assertEqual(governor.stats.throttles, 2)
+        self.assertEqual(governor.stats.retries, 2)
+        self.assertLess(limiter.limit, 8)
+
+    def test_non_retryable_errors_are_raised_at_once(self):
+        governor = BedrockGovernor(sleep=no_sleep)
+        bedrock = FakeBedrock(["ValidationException"])
+
+        with self.assertRaises(FakeClientError):
+            governor.invoke_model(bedrock, modelId="model")
+        self.assertEqual(bedrock.calls, 1)
+
+    def test_connection_errors_are_retried(self):
+        # The Lambda clients make a single attempt, so the governor retries what botocore would have
+        governor = BedrockGovernor(sleep=no_sleep)
+        errors = [
+            EndpointConnectionError(endpoint_url="https://bedrock-runtime"),
+            ReadTimeoutError(endpoint_url="https://bedrock-runtime"),
+        ]
+        calls = []
+
+        def invoke(state):
+            calls.append(state.attempt)
+            if errors:
+                raise errors.pop(0)
+            return "ok"
+
+        self.assertEqual(governor.run(invoke), "ok")
+        self.assertEqual(calls, [0, 1, 2])
+        self.assertEqual(error_code(ReadTimeoutError(endpoint_url="https://bedrock-runtime")), "ConnectionError")
+
+    def test_retries_are_bounded(self):
+        governor = BedrockGovernor(retry=RetryPolicy(max_attempts=3), sleep=no_sleep)
+        bedrock = FakeBedrock(["ModelTimeoutException"] * 5)
+
+        with self.assertRaises(FakeClientError):
+            governor.invoke_model(bedrock, modelId="model")
+        self.assertEqual(bedrock.calls, 3)
+
+    def test_circuit_breaker_fails_fast_then_probes(self):
+        clock = FakeClock()
+        breaker = CircuitBreaker(failure_threshold=3, reset_timeout=10, clock=clock)
+        governor = BedrockGovernor(breaker=breaker, retry=RetryPolicy(max_attempts=3), sleep=no_sleep)
+        bedrock = FakeBedrock(["ServiceUnavailableException"] * 3)
+
+        with self.assertRaises(FakeClientError):
+            governor.invoke_model(bedrock, modelId="model")
+        with self.assertRaises(CircuitOpenError):
+            governor.invoke_model(bedrock, modelId="model")
+        self.assertEqual(bedrock.calls, 3)
+
+        clock.sleep(10)
+        self.assertEqual(governor.invoke_model(bedrock, modelId="model"), {"body": "ok"})
+        self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
+
+    def test_token_bucket_paces_requests(self):
+        clock = FakeClock()
+        bucket = TokenBucket.per_minute(60, clock=clock)  # 1 request per second, burst of 60
+        for _ in range(60):
+            bucket.acquire(1, sleep=clock.sleep)
+        self.assertEqual(clock.now, 0)
+
+        bucket.acquire(1, sleep=clock.sleep)
+        self.assertAlmostEqual(clock.now, 1.0)
+
+    def test_per_call_state_raises_temperature_after_model_errors(self):
+        governor = BedrockGovernor(sleep=no_sleep)
+        bedrock = FakeBedrock(["ModelErrorException", "ModelErrorException"])
+        temperatures = []
+
+        def call(state):
+            temperatures.append(state.temperature(0.1))
+            return bedrock.invoke_model()
+
+        governor.run(call)
+        self.assertEqual([round(t, 2) for t in temperatures], [0.1, 0.2, 0.3])
+
+        # a new call starts again from the base temperature
+        governor.run(call)
+        self.assertEqual(round(temperatures[-1], 2), 0.1)
+
+    def test_wrapped_runnables_stay_governed(self):
+        class FakeChatModel:
+            def __init__(self, errors):
+                self.bedrock = FakeBedrock(errors)
+
+            def invoke(self, input, config=None, **kwargs):
+                return self.bedrock.invoke_model()
+
+            def with_structured_output(self, schema):
+                return self
+
+        governor = BedrockGovernor(sleep=no_sleep)
+        model = governor.wrap(FakeChatModel(["ThrottlingException"])).with_structured_output(dict)
+
+        self.assertEqual(model.invoke({"text": "hello"}), {"body": "ok"})
+        self.assertEqual(governor.stats.throttles, 1)
+
+    def test_error_code_of_wrapped_errors(self):
+        try:
+            try:
+                raise FakeClientError("ThrottlingException")
+            except FakeClientError as exc:
+                raise ValueError(f"Error raised by bedrock service: {exc}")
+        except ValueError as wrapped:
+            self.assertEqual(error_code(wrapped), "ThrottlingException")
+
+        self.assertIsNone(error_code(ValueError("something else")))
+
+
+if __name__ == "__main__":
+    unittest.main()
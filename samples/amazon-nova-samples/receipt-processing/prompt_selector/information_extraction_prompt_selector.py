@@ -87,8 +87,8 @@ def get_information_extraction_prompt_selector(lang: str, example_type: str=None
         # Prompt template for the examples
         examples_prompt_template = ChatPromptTemplate.from_messages(
             [
-                HumanMessagePromptTemplate.from_template("<text>{text}</text>", input_variables=["text"],
-                                                         validate_template=True),
+                HumanMessagePromptTemplate.from_template([{'image_url': {'url': '{image_url}'}}],
+                                                         input_variables=["image_url"], validate_template=True),
                 AIMessagePromptTemplate.from_template("<extracted_information>{extraction}<extracted_information>",
                                                       input_variables=["extraction"], validate_template=True)
             ]
@@ -15,6 +15,7 @@
 # OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE
 # SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
 
+import base64
 import json
 import os
 import re
@@ -30,14 +31,14 @@ class CharterReportsExampleSelector(BaseExampleSelector):
 
         all_files = os.listdir(examples_location)
 
-        txt_example_files = [file for file in all_files if re.match("^.*\.jpeg$", file)]
+        image_example_files = [file for file in all_files if re.match("^.*\.jpeg$", file)]
         json_example_files = [file for file in all_files if re.match("^.*\.json$", file)]
 
-        if len(txt_example_files) == len(json_example_files):
+        if len(image_example_files) == len(json_example_files):
             files_samples_dict = {i + 1: {
-                "exaple_receipt": f"{examples_location}/example_receipt_{i + 1}.jpeg",
+                "example_receipt_file": f"{examples_location}/example_receipt_{i + 1}.jpeg",
                 "extraction_example_file": f"{examples_location}/example_receipt_{i + 1}.json"
-            } for i in range(len(txt_example_files))
+            } for i in range(len(image_example_files))
             }
 
         else:
@@ -47,8 +48,9 @@ class CharterReportsExampleSelector(BaseExampleSelector):
         for i in files_samples_dict.keys():
             example = {}
 
-            with open(files_samples_dict[i]["text_chunk_file"], "r", encoding="utf-8") as file:
-                example["text"] = file.read()
+            # The receipt image is the human turn of the example, as a data URL like the receipt to process
+            with open(files_samples_dict[i]["example_receipt_file"], "rb") as file:
+                example["image_url"] = f"data:image/jpeg;base64,{base64.b64encode(file.read()).decode('utf-8')}"
 
             with open(files_samples_dict[i]["extraction_example_file"], "r", encoding="utf-8") as file:
                 example["extraction"] = json.load(file)
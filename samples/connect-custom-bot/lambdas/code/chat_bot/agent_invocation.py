@@ -0,0 +1,246 @@
+import json
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+PARTIAL_BOUNDARY = re.compile(r"\n\s*\n|[.!?:](?=\s)")
+
+
+class AgentTurn:
+    """
+    Result of a single user turn against a Bedrock agent.
+
+    Attributes:
+        text (str): The final completion text ("" if control was handed back to the caller)
+        return_control (dict): Pending return control information not handled by any action
+        metrics (dict): Latency and token metrics for the turn
+    """
+
+    def __init__(self) -> None:
+        self.text = ""
+        self.return_control = None
+        self.metrics = dict(
+            latency_ms=None,
+            time_to_first_chunk_ms=None,
+            invocations=0,
+            actions_executed=0,
+            input_tokens=0,
+            output_tokens=0,
+            partials_sent=0,
+        )
+
+
+class AgentInvocationEngine:
+    """
+    Reusable engine to run Bedrock agent turns over a shared bedrock-agent-runtime client.
+
+    Completion chunks are buffered in a list (linear time) and forwarded to an
+    optional `on_partial` callback at sentence or paragraph boundaries. When the
+    agent returns control, every invocation input that has a registered action is
+    executed concurrently and all results are returned in a single follow-up
+    invoke_agent call. Invocation inputs without an action are handed back to the
+    caller in `AgentTurn.return_control`, as `BedrockAgentService.invoke_agent` does.
+    """
+
+    def __init__(
+        self,
+        client,
+        agent_id: str,
+        alias_id: str = "TSTALIASID",
+        actions: dict = None,
+        max_workers: int = 4,
+        max_rounds: int = 5,
+        partial_min_chars: int = 120,
+        enable_trace: bool = True,
+        clock=time.perf_counter,
+    ) -> None:
+        """
+        Initialize the engine.
+
+        Args:
+            client: bedrock-agent-runtime client, created once per container by the caller
+            agent_id (str): The ID of the Bedrock agent
+            alias_id (str, optional): The alias ID for the agent. Defaults to "TSTALIASID"
+            actions (dict, optional): Maps "actionGroup/function" or "function" to a callable(parameters: dict) -> str
+            max_workers (int, optional): Maximum concurrent return control actions
+            max_rounds (int, optional): Maximum return control round trips per turn
+            partial_min_chars (int, optional): Minimum characters before a partial is emitted
+            enable_trace (bool, optional): Request traces to collect token usage
+        """
+        self.client = client
+        self.agent_id = agent_id
+        self.alias_id = alias_id
+        self.actions = actions or {}
+        self.max_workers = max_workers
+        self.max_rounds = max_rounds
+        self.partial_min_chars = partial_min_chars
+        self.enable_trace = enable_trace
+        self.clock = clock
+        self.executor = ThreadPoolExecutor(max_workers=max_workers) if max_workers > 1 else None
+
+    def register_action(self, function_name: str, handler, action_group: str = None) -> None:
+        """Register a callable(parameters: dict) -> str for a return control function"""
+        key = f"{action_group}/{function_name}" if action_group else function_name
+        self.actions[key] = handler
+
+    def run_turn(self, prompt: str, session_id: str, on_partial=None) -> AgentTurn:
+        """
+        Run one user turn, resolving registered return control actions until the agent answers.
+
+        Args:
+            prompt (str): The user input. A "/new " prefix ends the previous session
+            session_id (str): The agent session ID
+            on_partial (callable, optional): Called with each completed piece of text as it streams
+
+        Returns:
+            AgentTurn: text, pending return control and metrics for the turn
+        """
+        turn = AgentTurn()
+        start = self.clock()
+
+        kwargs = dict(
+            agentId=self.agent_id,
+            agentAliasId=self.alias_id,
+            sessionId=session_id,
+            inputText=prompt,
+            enableTrace=self.enable_trace,
+            streamingConfigurations={"streamFinalResponse": True},
+        )
+        if prompt.startswith("/new "):
+            kwargs["inputText"] = prompt.replace("/new ", "")
+            kwargs["endSession"] = True
+
+        text_parts = []
+        for _ in range(self.max_rounds):
+            response = self.client.invoke_agent(**kwargs)
+            turn.metrics["invocations"] += 1
+            return_control = self._consume(response, turn, text_parts, on_partial, start)
+
+            if not return_control:
+                break
+
+            inputs = return_control.get("invocationInputs", [])
+            if not all(self._find_action(i) for i in inputs):
+                turn.return_control = self._parse_return_control(return_control)
+                break
+
+            results = self._execute_actions(inputs)
+            turn.metrics["actions_executed"] += len(results)
+            kwargs = dict(
+                agentId=self.agent_id,
+                agentAliasId=self.alias_id,
+                sessionId=session_id,
+                enableTrace=self.enable_trace,
+                streamingConfigurations={"streamFinalResponse": True},
+                sessionState={
+                    "invocationId": return_control.get("invocationId"),
+                    "returnControlInvocationResults": results,
+                },
+            )
+
+        turn.text = "".join(text_parts)
+        turn.metrics["latency_ms"] = round((self.clock() - start) * 1000, 1)
+        print(json.dumps({"agent_turn_metrics": turn.metrics}))
+        return turn
+
+    def _consume(self, response: dict, turn: AgentTurn, text_parts: list, on_partial, start: float):
+        pending = []
+        pending_len = 0
+        return_control = None
+
+        for event in response.get("completion"):
+            if "chunk" in event:
+                text = event["chunk"]["bytes"].decode()
+                if turn.metrics["time_to_first_chunk_ms"] is None:
+                    turn.metrics["time_to_first_chunk_ms"] = round((self.clock() - start) * 1000, 1)
+                text_parts.append(text)
+                if on_partial:
+                    pending.append(text)
+                    pending_len += len(text)
+                    if pending_len >= self.partial_min_chars:
+                        pending, pending_len = self._emit_partial(pending, on_partial, turn)
+            elif "returnControl" in event:
+                return_control = event["returnControl"]
+            elif "trace" in event:
+                self._collect_usage(event["trace"], turn)
+
+        if on_partial and pending:
+            partial = "".join(pending).strip()
+            if partial:
+                on_partial(partial)
+                turn.metrics["partials_sent"] += 1
+        return return_control
+
+    def _emit_partial(self, pending: list, on_partial, turn: AgentTurn):
+        text = "".join(pending)
+        boundaries = list(PARTIAL_BOUNDARY.finditer(text))
+        if not boundaries:
+            return [text], len(text)
+        cut = boundaries[-1].end()
+        partial = text[:cut].strip()
+        if partial:
+            on_partial(partial)
+            turn.metrics["partials_sent"] += 1
+        rest = text[cut:]
+        return ([rest] if rest else []), len(rest)
+
+    def _collect_usage(self, trace_event: dict, turn: AgentTurn) -> None:
+        trace = trace_event.get("trace", {})
+        for step in trace.values():
+            if not isinstance(step, dict):
+                continue
+            output = step.get("modelInvocationOutput", {})
+            usage = output.get("metadata", {}).get("usage", {})
+            turn.metrics["input_tokens"] += usage.get("inputTokens", 0)
+            turn.metrics["output_tokens"] += usage.get("outputTokens", 0)
+
+    def _find_action(self, invocation_input: dict):
+        function_input = invocation_input.get("functionInvocationInput", {})
+        function_name = function_input.get("function", "")
+        action_group = function_input.get("actionGroup", "")
+        return self.actions.get(f"{action_group}/{function_name}") or self.actions.get(function_name)
+
+    def _execute_action(self, invocation_input: dict) -> dict:
+        function_input = invocation_input.get("functionInvocationInput", {})
+        handler = self._find_action(invocation_input)
+        parameters = {p["name"]: p["value"] for p in function_input.get("parameters", [])}
+        try:
+            body = handler(parameters)
+            state = None
+        except Exception as error:
+            print(f"Action {function_input.get('function')} failed: {error}")
+            body = f"Error: {error}"
+            state = "REPROMPT"
+
+        result = {
+            "actionGroup": function_input.get("actionGroup"),
+            "function": function_input.get("function"),
+            "responseBody": {"TEXT": {"body": str(body)}},
+        }
+        if function_input.get("agentId"):
+            result["agentId"] = function_input["agentId"]
+        if state:
+            result["responseState"] = state
+        return {"functionResult": result}
+
+    def _execute_actions(self, inputs: list) -> list:
+        if self.executor and len(inputs) > 1:
+            return list(self.executor.map(self._execute_action, inputs))
+        return [self._execute_action(i) for i in inputs]
+
+    def _parse_return_control(self, return_control: dict) -> dict:
+        # same shape as BedrockAgentService.return_control
+        return_dict = {"invocationId": return_control.get("invocationId", "")}
+        inputs = return_control.get("invocationInputs", [])
+        if len(inputs):
+            function_input = inputs[0].get("functionInvocationInput", {})
+            return_dict.update(
+                {
+                    "actionGroup": function_input.get("actionGroup", {}),
+                    "agentId": function_input.get("agentId", None),
+                    "functionName": function_input.get("function", ""),
+                    "parameters": {p["name"]: p["value"] for p in function_input.get("parameters", [])},
+                    "actionInvocationType": function_input.get("actionInvocationType", ""),
+                }
+            )
+        return return_dict
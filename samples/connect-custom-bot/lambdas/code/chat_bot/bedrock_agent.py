@@ -84,6 +84,28 @@ class BedrockAgentService:
             )
         return return_dict
 
+    def read_completion(self, response: dict):
+        """
+        Read the completion event stream of an invoke_agent response.
+
+        Chunks are collected in a list and joined once, so assembling the answer
+        is linear in its length.
+
+        Args:
+            response (dict): The invoke_agent response
+
+        Returns:
+            str | dict: The completion text, or the return control information if the agent returned control
+        """
+        parts = []
+        for event in response.get("completion"):
+            if event.get("returnControl"):
+                return self.return_control(event)
+            chunk = event.get("chunk")
+            if chunk:
+                parts.append(chunk["bytes"].decode())
+        return "".join(parts)
+
     def return_control_invocation_results(
         self, 
         invocation_id: str, 
@@ -126,18 +148,12 @@ class BedrockAgentService:
                 },
             )
 
-            completion = ""
-
-            for event in response.get("completion"):
-                if event.get("returnControl"):
-                    return self.return_control(event)
-                chunk = event["chunk"]
-                completion = completion + chunk["bytes"].decode()
+            return self.read_completion(response)
 
         except ClientError as e:
             print(f"Couldn't invoke agent. {e}")
 
-        return completion
+        return ""
 
     # from https://docs.aws.amazon.com/code-library/latest/ug/python_3_bedrock-agent-runtime_code_examples.html
     def invoke_agent(self, prompt: str, session_id: str = None) -> dict:
@@ -167,16 +183,9 @@ class BedrockAgentService:
         try:
             response = self.agents_runtime_client.invoke_agent(**kwargs, )
 
-            completion = ""
-
-            for event in response.get("completion"):
-                if event.get("returnControl"):
-                    return self.return_control(event)
-                chunk = event["chunk"]
-                completion = completion + chunk["bytes"].decode()
+            return self.read_completion(response)
 
         except ClientError as e:
             print(f"Couldn't invoke agent. {e}")
             return None
 
-        return completion
@@ -13,10 +13,13 @@ class ChatService:
         instance_id=os.environ.get("INSTANCE_ID"),
         contact_flow_id=os.environ.get("CONTACT_FLOW_ID"),
         chat_duration_minutes=60,
-        topic_arn = os.environ.get("TOPIC_ARN")
+        topic_arn = os.environ.get("TOPIC_ARN"),
+        participant=None,
+        connect=None,
     ) -> None:
-        self.participant = boto3.client("connectparticipant")
-        self.connect = boto3.client("connect")
+        # module level clients are reused across warm invocations
+        self.participant = participant or participant_client
+        self.connect = connect or connect_client
         self.contact_flow_id = contact_flow_id
         self.instance_id = instance_id
         self.chat_duration_minutes = chat_duration_minutes
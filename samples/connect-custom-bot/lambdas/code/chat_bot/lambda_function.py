@@ -1,11 +1,23 @@
 import json
 import os
 import time
+import boto3
 from connect_chat_service import ChatService
 from connections_service import ConnectionsService
 from bedrock_agent import BedrockAgentService
+from agent_invocation import AgentInvocationEngine
 
+STREAM_PARTIALS = os.environ.get("STREAM_PARTIALS", "true").lower() == "true"
+
+# clients and services are created once per container and reused by warm invocations
 connections_service = ConnectionsService(os.environ.get("TABLE_NAME"))
+agents_runtime_client = boto3.client("bedrock-agent-runtime")
+bedrock_agent = BedrockAgentService(
+    os.environ.get("AGENT_ID"), os.environ.get("AGENT_ALIAS_ID"), client=agents_runtime_client
+)
+agent_engine = AgentInvocationEngine(
+    agents_runtime_client, os.environ.get("AGENT_ID"), os.environ.get("AGENT_ALIAS_ID")
+)
 
 
 def handle_quit_command(chat_service):
@@ -42,19 +54,22 @@ def process_message(message_object):
     chat_service = ChatService(instance_id=os.environ.get("INSTANCE_ID"))
     update_chat_service(chat_service, contact_id, connection_token, chat_contact["streamingId"])
 
-    bedrock_agent = BedrockAgentService( os.environ.get("AGENT_ID"), os.environ.get("AGENT_ALIAS_ID"), contact_id)
-
-
-
     if content.lower() == "quit": return handle_quit_command(chat_service)
 
-    # Answer with Agent
+    # Answer with Agent, sending partial text to the chat as it streams
     chat_service.send_typing_event()
-    response = bedrock_agent.invoke_agent(content)
+    on_partial = chat_service.send_message if STREAM_PARTIALS else None
+    try:
+        turn = agent_engine.run_turn(content, session_id=contact_id, on_partial=on_partial)
+    except Exception as e:
+        print(f"Couldn't invoke agent. {e}")
+        return
+    response = turn.return_control or turn.text
     print (f"Response: {response}")
 
     if type(response) == str: 
-        chat_service.send_message(response or "error generating answer")
+        if not turn.metrics["partials_sent"]:
+            chat_service.send_message(response or "error generating answer")
 
     elif type(response) == dict:
         print("Updating Contact Attributes")
@@ -68,7 +83,8 @@ def process_message(message_object):
                 action_group=response.get("actionGroup"),
                 function_name=response.get("functionName"),
                 invocation_result="OK",
-                agent_id = response.get("agentId")
+                agent_id = response.get("agentId"),
+                session_id = contact_id,
             )
         chat_service.disconnect()
         print(f"return_control_response: {return_control_response}")
@@ -0,0 +1,116 @@
+import os
+import sys
+import threading
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "../../lambdas/code/chat_bot"))
+
+from agent_invocation import AgentInvocationEngine
+
+
+def chunk(text):
+    return {"chunk": {"bytes": text.encode()}}
+
+
+def usage_trace(input_tokens, output_tokens):
+    return {
+        "trace": {
+            "trace": {
+                "orchestrationTrace": {
+                    "modelInvocationOutput": {
+                        "metadata": {"usage": {"inputTokens": input_tokens, "outputTokens": output_tokens}}
+                    }
+                }
+            }
+        }
+    }
+
+
+def return_control(*functions):
+    return {
+        "returnControl": {
+            "invocationId": "inv-1",
+            "invocationInputs": [
+                {
+                    "functionInvocationInput": {
+                        "actionGroup": "orders",
+                        "function": name,
+                        "parameters": [{"name": "orderId", "value": str(i)}],
+                    }
+                }
+                for i, name in enumerate(functions)
+            ],
+        }
+    }
+
+
+class FakeAgentRuntime:
+    """Replays a scripted list of invoke_agent completion streams"""
+
+    def __init__(self, *streams):
+        self.streams = list(streams)
+        self.calls = []
+
+    def invoke_agent(self, **kwargs):
+        self.calls.append(kwargs)
+        return {"completion": iter(self.streams.pop(0))}
+
+
+def test_streams_partials_and_collects_usage():
+    client = FakeAgentRuntime(
+        [usage_trace(100, 20), chunk("Hola, tu pedido está en camino. "), chunk("Llegará mañana."), chunk(" Gracias!")]
+    )
+    engine = AgentInvocationEngine(client, "AGENT", partial_min_chars=10)
+    partials = []
+
+    turn = engine.run_turn("donde esta mi pedido?", session_id="s1", on_partial=partials.append)
+
+    assert turn.text == "Hola, tu pedido está en camino. Llegará mañana. Gracias!"
+    assert " ".join(partials) == turn.text
+    assert len(partials) > 1
+    assert turn.metrics["input_tokens"] == 100
+    assert turn.metrics["output_tokens"] == 20
+    assert client.calls[0]["streamingConfigurations"] == {"streamFinalResponse": True}
+
+
+def test_executes_return_control_actions_concurrently():
+    client = FakeAgentRuntime(
+        [return_control("getOrder", "getOrder", "getOrder")],
+        [chunk("Tus tres pedidos fueron enviados.")],
+    )
+    running = []
+    peak = []
+    lock = threading.Lock()
+
+    def get_order(parameters):
+        with lock:
+            running.append(1)
+            peak.append(len(running))
+        time.sleep(0.05)
+        with lock:
+            running.pop()
+        return f"order {parameters['orderId']} shipped"
+
+    engine = AgentInvocationEngine(client, "AGENT", actions={"orders/getOrder": get_order})
+
+    turn = engine.run_turn("estado de mis pedidos", session_id="s1")
+
+    assert turn.text == "Tus tres pedidos fueron enviados."
+    assert turn.metrics["actions_executed"] == 3
+    assert turn.metrics["invocations"] == 2
+    assert max(peak) > 1
+    results = client.calls[1]["sessionState"]["returnControlInvocationResults"]
+    assert [r["functionResult"]["responseBody"]["TEXT"]["body"] for r in results] == [
+        "order 0 shipped", "order 1 shipped", "order 2 shipped"
+    ]
+
+
+def test_unhandled_return_control_is_handed_back():
+    client = FakeAgentRuntime([return_control("transferToAgent")])
+    engine = AgentInvocationEngine(client, "AGENT")
+
+    turn = engine.run_turn("quiero hablar con una persona", session_id="s1")
+
+    assert turn.text == ""
+    assert turn.return_control["functionName"] == "transferToAgent"
+    assert turn.return_control["parameters"] == {"orderId": "0"}
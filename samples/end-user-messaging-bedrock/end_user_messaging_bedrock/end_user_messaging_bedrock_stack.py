@@ -41,6 +41,7 @@ class EndUserMessagingBedrockStack(Stack):
         Fn.whatsapp_event_handler.add_environment("AGENT_ALIAS_ID", AGENT_ALIAS_ID)
         Fn.whatsapp_event_handler.add_environment("BUCKET_NAME", B.bucket_name)
         Fn.whatsapp_event_handler.add_environment("VOICE_PREFIX", "voice_")
+        Fn.whatsapp_event_handler.add_environment("STREAM_REPLIES", "true")
 
         Tp.topic.add_to_resource_policy(
             iam.PolicyStatement(
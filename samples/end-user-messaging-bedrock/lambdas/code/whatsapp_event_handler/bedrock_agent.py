@@ -13,22 +13,27 @@ class BedrockAgentService:
         
     # from https://docs.aws.amazon.com/code-library/latest/ug/python_3_bedrock-agent-runtime_code_examples.html
     def invoke_agent(self, session_id, prompt):
-        try:
-            response = self.agents_runtime_client.invoke_agent(
-                agentId=self.agent_id,
-                agentAliasId=self.alias_id,
-                sessionId=session_id,
-                inputText=prompt,
-            )
+        return "".join(self.invoke_agent_stream(session_id, prompt, stream_final_response=False))
+
+    def invoke_agent_stream(self, session_id, prompt, stream_final_response=True):
+        # yields completion text as it arrives instead of buffering the whole answer
+        kwargs = dict(
+            agentId=self.agent_id,
+            agentAliasId=self.alias_id,
+            sessionId=session_id,
+            inputText=prompt,
+        )
+        if stream_final_response:
+            kwargs["streamingConfigurations"] = {"streamFinalResponse": True}
 
-            completion = ""
+        try:
+            response = self.agents_runtime_client.invoke_agent(**kwargs)
 
             for event in response.get("completion"):
-                chunk = event["chunk"]
-                completion = completion + chunk["bytes"].decode()
+                chunk = event.get("chunk")
+                if chunk:
+                    yield chunk["bytes"].decode()
 
         except ClientError as e:
             logger.error(f"Couldn't invoke agent. {e}")
             raise
-
-        return completion
\ No newline at end of file
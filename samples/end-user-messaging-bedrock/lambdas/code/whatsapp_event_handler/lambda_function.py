@@ -5,6 +5,7 @@ import os
 from whatsapp import WhatsappService
 from bedrock_agent import BedrockAgentService
 from transcribe import TranscribeService
+from streaming_reply import stream_agent_reply
 
 dynamodb = boto3.resource("dynamodb")
 TABLE_NAME = os.environ.get("TABLE_NAME")
@@ -13,6 +14,32 @@ table = dynamodb.Table(TABLE_NAME)
 
 AGENT_ID = os.environ.get("AGENT_ID")
 AGENT_ALIAS_ID = os.environ.get("AGENT_ALIAS_ID")
+STREAM_REPLIES = os.environ.get("STREAM_REPLIES", "true").lower() == "true"
+STREAM_MIN_CHARS = int(os.environ.get("STREAM_MIN_CHARS", "80"))
+STREAM_MIN_INTERVAL = float(os.environ.get("STREAM_MIN_INTERVAL", "1.0"))
+
+# created once per container and reused across records and warm invocations
+bedrock_agent = BedrockAgentService(AGENT_ID, AGENT_ALIAS_ID)
+transcribe_service = None
+
+
+def get_transcribe_service():
+    global transcribe_service
+    if transcribe_service is None:
+        transcribe_service = TranscribeService()
+    return transcribe_service
+
+
+def agent_reply(message, prompt):
+    if STREAM_REPLIES:
+        stream_agent_reply(
+            bedrock_agent, message, prompt,
+            min_chars=STREAM_MIN_CHARS, min_interval=STREAM_MIN_INTERVAL,
+        )
+        return
+    response = bedrock_agent.invoke_agent(message.phone_number, prompt)
+    print(f"agent response: {response}")
+    message.text_reply(response)
 
 
 def process_record(record):
@@ -20,8 +47,6 @@ def process_record(record):
     sns_message_str = sns.get("Message", "{}")
     sns_message = json.loads(sns_message_str, parse_float=decimal.Decimal)
     whatsapp = WhatsappService(sns_message)
-    bedrock_agent = BedrockAgentService(AGENT_ID, AGENT_ALIAS_ID)
-    transcribe_service = TranscribeService()
 
     for message in whatsapp.messages:
         audio = message.get_audio(download = True) # Check if there is audio
@@ -29,7 +54,7 @@ def process_record(record):
         
         if audio.get("location"): # it's been downloaded
             print ("TRANSCRIBE IT")
-            transcription = transcribe_service.transcribe(audio.get("location"))
+            transcription = get_transcribe_service().transcribe(audio.get("location"))
             message.add_transcription(transcription)
 
         message.save(table)
@@ -40,9 +65,7 @@ def process_record(record):
         
         if transcription:
             message.text_reply(f"🔊_{transcription}_")
-            response = bedrock_agent.invoke_agent(message.phone_number, transcription)
-            print(f"agent response: {response}")
-            message.text_reply(response)
+            agent_reply(message, transcription)
             continue
 
         text = message.get_text()
@@ -52,9 +75,7 @@ def process_record(record):
             continue
         
         print(f"query: {text}")
-        response = bedrock_agent.invoke_agent(message.phone_number, text)
-        print(f"agent response: {response}")
-        message.text_reply(response)
+        agent_reply(message, text)
 
 
 
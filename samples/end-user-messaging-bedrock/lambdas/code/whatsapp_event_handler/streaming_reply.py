@@ -0,0 +1,141 @@
+import re
+import time
+
+
+# WhatsApp text bodies are limited to 4096 characters
+MAX_MESSAGE_CHARS = 4096
+
+# a sentence ends with . ! ? or … followed by whitespace, a paragraph with a blank line
+PARAGRAPH_END = re.compile(r"\n\s*\n")
+SENTENCE_END = re.compile(r"[.!?…:](?=\s)")
+
+
+class StreamingReply:
+    """
+    Turns an agent completion stream into a few WhatsApp messages sent as soon as
+    each sentence or paragraph is complete.
+
+    Segments that complete while we are still inside the minimum send interval are
+    coalesced into the next message instead of waiting, so the Lambda never sleeps
+    and the user never gets more than one message per interval.
+    """
+
+    def __init__(
+        self,
+        send,
+        typing=None,
+        min_chars=80,
+        min_interval=1.0,
+        max_chars=MAX_MESSAGE_CHARS,
+        clock=time.monotonic,
+    ) -> None:
+        self.send = send
+        self.typing = typing
+        self.min_chars = min_chars
+        self.min_interval = min_interval
+        self.max_chars = max_chars
+        self.clock = clock
+
+        self.buffer = []
+        self.buffer_len = 0
+        self.pending = ""
+        self.last_send = None
+        self.started = None
+        self.metrics = dict(
+            time_to_first_token=None,
+            time_to_first_message=None,
+            messages_sent=0,
+            chars_sent=0,
+            total_time=None,
+        )
+
+    def start(self):
+        self.started = self.clock()
+
+    def feed(self, text):
+        if not text:
+            return
+        if self.started is None:
+            self.start()
+        if self.metrics["time_to_first_token"] is None:
+            self.metrics["time_to_first_token"] = self.clock() - self.started
+            if self.typing:
+                self.typing()
+
+        self.buffer.append(text)
+        self.buffer_len += len(text)
+
+        # only look for a boundary once there is enough text to be worth a message
+        if self.buffer_len + len(self.pending) < self.min_chars:
+            return
+
+        current = "".join(self.buffer)
+        cut = self._find_cut(current)
+        if cut:
+            self.pending += current[:cut]
+            rest = current[cut:]
+            self.buffer = [rest] if rest else []
+            self.buffer_len = len(rest)
+            self._maybe_send()
+
+    def close(self):
+        # flush whatever is left, ignoring the interval: the stream is over
+        if self.started is None:
+            self.start()
+        self.pending += "".join(self.buffer)
+        self.buffer = []
+        self.buffer_len = 0
+        self._send_pending()
+        self.metrics["total_time"] = self.clock() - self.started
+        return self.metrics
+
+    def consume(self, chunks):
+        self.start()
+        for text in chunks:
+            self.feed(text)
+        return self.close()
+
+    def _find_cut(self, text):
+        paragraphs = list(PARAGRAPH_END.finditer(text))
+        if paragraphs:
+            return paragraphs[-1].end()
+        sentences = list(SENTENCE_END.finditer(text))
+        if sentences:
+            return sentences[-1].end()
+        if len(text) >= self.max_chars:
+            return self.max_chars
+        return 0
+
+    def _maybe_send(self):
+        now = self.clock()
+        if self.last_send is not None and now - self.last_send < self.min_interval:
+            # coalesce with whatever completes next
+            if len(self.pending) < self.max_chars:
+                return
+        self._send_pending()
+
+    def _send_pending(self):
+        while self.pending.strip():
+            body, self.pending = self.pending[: self.max_chars], self.pending[self.max_chars :]
+            body = body.strip()
+            if not body:
+                continue
+            self.send(body)
+            self.last_send = self.clock()
+            if self.metrics["time_to_first_message"] is None:
+                self.metrics["time_to_first_message"] = self.last_send - self.started
+            self.metrics["messages_sent"] += 1
+            self.metrics["chars_sent"] += len(body)
+        self.pending = ""
+
+
+def stream_agent_reply(bedrock_agent, message, prompt, min_chars=80, min_interval=1.0):
+    reply = StreamingReply(
+        send=message.text_reply,
+        typing=message.typing_indicator,
+        min_chars=min_chars,
+        min_interval=min_interval,
+    )
+    metrics = reply.consume(bedrock_agent.invoke_agent_stream(message.phone_number, prompt))
+    print(f"streaming reply metrics: {metrics}")
+    return metrics
@@ -91,6 +91,23 @@ class WhatsappMessage:
         response = self.client.send_whatsapp_message(**kwargs)
         print("mark as read:", response)
 
+    def typing_indicator(self):
+        # marks the message as read and shows "typing..." until the next reply (or 25s)
+        message_object = {
+            "messaging_product": "whatsapp",
+            "message_id": self.message_id,
+            "status": "read",
+            "typing_indicator": {"type": "text"},
+        }
+
+        kwargs = dict(
+            originationPhoneNumberId=self.phone_number_arn,
+            metaApiVersion=self.meta_api_version,
+            message=bytes(json.dumps(message_object), "utf-8"),
+        )
+        response = self.client.send_whatsapp_message(**kwargs)
+        print("typing indicator:", response)
+
     def reaction(self, emoji):
         message_object = {
             "messaging_product": "whatsapp",
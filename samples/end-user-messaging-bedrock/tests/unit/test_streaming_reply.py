@@ -0,0 +1,76 @@
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "../../lambdas/code/whatsapp_event_handler"))
+
+from streaming_reply import StreamingReply
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def fake_agent_stream(text, clock, size=7, delay=0.1):
+    # emulates invoke_agent completion chunks arriving over time
+    for i in range(0, len(text), size):
+        clock.now += delay
+        yield text[i : i + size]
+
+
+class FakeMessage:
+    def __init__(self):
+        self.sent = []
+        self.typing_calls = 0
+
+    def text_reply(self, text):
+        self.sent.append(text)
+
+    def typing_indicator(self):
+        self.typing_calls += 1
+
+
+ANSWER = (
+    "Hay 59 clientes en la base de datos. La mayoría son de Estados Unidos.\n\n"
+    "Los tres países con más clientes son USA, Canadá y Brasil. "
+    "Si quieres puedo mostrarte el detalle por ciudad."
+)
+
+
+def test_sends_sentences_before_stream_ends():
+    clock = FakeClock()
+    message = FakeMessage()
+    reply = StreamingReply(message.text_reply, message.typing_indicator, min_chars=20, min_interval=0, clock=clock)
+
+    metrics = reply.consume(fake_agent_stream(ANSWER, clock))
+
+    assert message.typing_calls == 1
+    assert len(message.sent) > 1
+    assert " ".join(message.sent).split() == ANSWER.split()
+    assert metrics["time_to_first_message"] < metrics["total_time"]
+    assert metrics["messages_sent"] == len(message.sent)
+
+
+def test_coalesces_under_rate_limit():
+    clock = FakeClock()
+    message = FakeMessage()
+    reply = StreamingReply(message.text_reply, min_chars=20, min_interval=60, clock=clock)
+
+    reply.consume(fake_agent_stream(ANSWER, clock))
+
+    # first segment goes out right away, the rest is held and flushed once at the end
+    assert len(message.sent) == 2
+    assert " ".join(message.sent).split() == ANSWER.split()
+
+
+def test_splits_long_messages():
+    message = FakeMessage()
+    reply = StreamingReply(message.text_reply, max_chars=50, min_interval=0, clock=FakeClock())
+
+    reply.consume(["x" * 30] * 5)
+
+    assert all(len(m) <= 50 for m in message.sent)
+    assert "".join(message.sent) == "x" * 150
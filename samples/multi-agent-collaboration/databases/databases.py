@@ -1,6 +1,14 @@
-from aws_cdk import RemovalPolicy, custom_resources as cr, aws_dynamodb as ddb, CfnOutput
+from aws_cdk import (
+    RemovalPolicy,
+    CustomResource,
+    Duration,
+    custom_resources as cr,
+    aws_dynamodb as ddb,
+    aws_lambda,
+    aws_s3_assets as s3_assets,
+    CfnOutput,
+)
 from constructs import Construct
-import json
 
 
 
@@ -36,6 +44,17 @@ class Tables(Construct):
             **TABLE_CONFIG,
         )
 
+        # Tickets of a customer, newest first (ticket numbers are ULIDs, they sort by creation time)
+        self.tickets.add_global_secondary_index(
+            index_name="identity_document_number",
+            partition_key=ddb.Attribute(
+                name="identity_document_number", type=ddb.AttributeType.STRING
+            ),
+            sort_key=ddb.Attribute(
+                name="issue_number", type=ddb.AttributeType.STRING
+            ),
+        )
+
 
         self.orders = ddb.Table(
             self,
@@ -53,44 +72,44 @@ class Tables(Construct):
             ),
         )
 
-        #Load table with sample data
+        #Load table with sample data, in parallel batches (../shared/dynamodb_seeder)
+        self.seed_function = aws_lambda.Function(
+            self,
+            "Seeder",
+            handler="lambda_function.lambda_handler",
+            code=aws_lambda.Code.from_asset("../shared/dynamodb_seeder/seeder/"),
+            runtime=aws_lambda.Runtime.PYTHON_3_12,
+            architecture=aws_lambda.Architecture.ARM_64,
+            timeout=Duration.minutes(15),
+            memory_size=512,
+        )
+        self.seed_provider = cr.Provider(self, "SeederProvider", on_event_handler=self.seed_function)
 
-        with open("databases/orders.json") as f:
-            sample_data = json.load(f)
-            
+        self.seed(self.orders, "Orders", "databases/orders.json")
 
+    def seed(self, table: ddb.Table, name: str, dataset_path: str) -> CustomResource:
+        """
+        Seeds a table with a JSON or JSONL dataset of any size. The dataset is uploaded as an asset and written
+        by the seeder custom resource, again whenever the dataset changes.
 
-        parameters = {
-            "RequestItems": {
-                self.orders.table_name: [
-                    {"PutRequest": {"Item": item}}
-                    for item in sample_data.get("Items")
-                ]
-            }
-        }
+        Args:
+            table: The table to seed
+            name: Name of the dataset, used in the construct ids
+            dataset_path: Path of the JSON or JSONL dataset
+        """
+        dataset = s3_assets.Asset(self, f"{name}Dataset", path=dataset_path)
+        dataset.grant_read(self.seed_function)
+        table.grant_read_write_data(self.seed_function)
+        CfnOutput(self, f"Sample{name}Dataset", value=dataset.s3_object_url,
+            description=f"S3 location of the sample {name.lower()} data")
 
-        cr.AwsCustomResource(
+        return CustomResource(
             self,
-            "BatchWriteItem",
-            on_update=cr.AwsSdkCall( 
-                service="dynamodb",
-                action="BatchWriteItem",
-                parameters=parameters,
-                physical_resource_id=cr.PhysicalResourceId.of(f"BatchWriteItem-{self.orders.table_name}"),
-            ),
-            policy=cr.AwsCustomResourcePolicy.from_sdk_calls(
-                resources=cr.AwsCustomResourcePolicy.ANY_RESOURCE
-            ),
-        )
-
-        # Create  table from sample data
-        markdown_table = "\n\t Order Number  \t ID Number \t Status \t Delivery Date \t\n"        
-        for item in sample_data["Items"]:
-            markdown_table += f"\t {item['order_number']['S']} \t {item['identity_document_number']['S']} \t "
-            markdown_table += f"{item['status']['S']} \t {item['delivery_date']['S']} \t\n"
-        
-        # Output the table
-        CfnOutput(self, "SampleOrdersTable",
-            value=markdown_table,
-            description="Sample orders data in markdown table format"
+            f"Seed{name}",
+            service_token=self.seed_provider.service_token,
+            properties={
+                "TableName": table.table_name,
+                "Bucket": dataset.s3_bucket_name,
+                "Key": dataset.s3_object_key,
+            },
         )
@@ -2,6 +2,9 @@ import json
 from ticket_service import TicketService
 from agent_helpers import AgentHelper
 
+# Module level, so that warm invocations reuse the client
+ticket_service = TicketService()
+
 
 def lambda_handler(event, context):
     """
@@ -21,6 +24,7 @@ def lambda_handler(event, context):
     order_number = agent_helper.parameters.get("order_number")
     description = agent_helper.parameters.get("description")
     ticket_number = agent_helper.parameters.get("ticket_number")
+    next_token = agent_helper.parameters.get("next_token")
     sessionId = agent_helper.sessionId
 
     function_response = agent_helper.response("Unknown error")
@@ -36,8 +40,7 @@ def lambda_handler(event, context):
             function_response = agent_helper.response("description not provided")
 
         if (rut and order_number and description):
-            ticket_service = TicketService(order_number=order_number)
-            response = ticket_service.cut_ticket(sessionId, rut, description)
+            response = ticket_service.cut_ticket(sessionId, rut, description, order_number=order_number)
             function_response = agent_helper.response(response)
 
     elif agent_helper.function == "getTicket":
@@ -45,10 +48,17 @@ def lambda_handler(event, context):
             function_response = agent_helper.response("ticket number not provided")
 
         if ticket_number:
-            ticket_service = TicketService(order_number=order_number)
             response = ticket_service.get_ticket(ticket_number)
             function_response = agent_helper.response(json.dumps(response))
 
+    elif agent_helper.function == "getCustomerTickets":
+        if rut is None:
+            function_response = agent_helper.response("rut not provided")
+
+        if rut:
+            response = ticket_service.get_customer_tickets(rut, next_token=next_token)
+            function_response = agent_helper.response(json.dumps(response))
+
     else:
         function_response = agent_helper.response(f"Unknown function: {agent_helper.function}")
 
@@ -1,7 +1,74 @@
-import boto3
+import base64
+import json
 import os
+import secrets
+import threading
+import time
+import uuid
+
+import boto3
+from boto3.dynamodb.conditions import Key
+from botocore.exceptions import ClientError
+
+TABLE_NAME = os.environ['TICKET_TABLE_NAME']
+CUSTOMER_INDEX = "identity_document_number"
+TRANSACTION_LIMIT = 100
+PUT_ATTEMPTS = 3
+
+# Created once per container, not on every invocation
+dynamodb = boto3.resource('dynamodb')
+table = dynamodb.Table(TABLE_NAME)
+
+CROCKFORD = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+
+
+"""
+Generator of ULIDs: a 48 bit millisecond timestamp and 80 random bits, written as 26 characters that sort by
+creation time. Within the same millisecond the random part is incremented, so the ids of a container are
+strictly increasing; across containers, 80 random bits make a collision practically impossible, and the
+conditional put would catch it anyway.
+"""
+class ULIDGenerator:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._last_ms = -1
+        self._last_random = 0
+
+    def new(self):
+        """
+        Generate a new ULID.
+
+        Returns:
+            str: 26 character ULID, greater than every ULID generated before by this generator
+        """
+        with self._lock:
+            ms = time.time_ns() // 1_000_000
+            if ms > self._last_ms:
+                self._last_ms, self._last_random = ms, secrets.randbits(80)
+            elif self._last_random < (1 << 80) - 1:
+                self._last_random += 1
+            else:
+                # 2^80 ids in a millisecond, continue in the next one
+                self._last_ms, self._last_random = self._last_ms + 1, secrets.randbits(80)
+            value = (self._last_ms << 80) | self._last_random
+
+        chars = []
+        for _ in range(26):
+            chars.append(CROCKFORD[value & 31])
+            value >>= 5
+        return "".join(reversed(chars))
+
+
+new_ticket_number = ULIDGenerator().new
+
+
+def encode_token(last_evaluated_key):
+    return base64.urlsafe_b64encode(json.dumps(last_evaluated_key).encode()).decode() if last_evaluated_key else None
+
+
+def decode_token(token):
+    return json.loads(base64.urlsafe_b64decode(token.encode())) if token else None
 
-from datetime import datetime
 
 """
 Service class for managing support ticket operations.
@@ -10,63 +77,126 @@ class TicketService:
     def __init__(self, order_number = "1234567890") -> None:
         """
         Initialize the ticket service.
-        
+
         Args:
             order_number: Default order number to associate with tickets
         """
-        TABLE_NAME          = os.environ['TICKET_TABLE_NAME']
-        self.table = boto3.resource('dynamodb').Table(TABLE_NAME)
-        self.order_number = order_number 
+        self.table = table
+        self.order_number = order_number
 
-    def get_current_time(self):
-        """
-        Get the current timestamp in ISO format.
-        
-        Returns:
-            str: Current timestamp in ISO format
-        """
-        return datetime.now().strftime('%Y%m%d%H%M')
+    def _ticket(self, session_id, rut, description, order_number=None):
+        return {
+            "issue_number": new_ticket_number(),
+            "contact_id": session_id,
+            "order_number": order_number or self.order_number,
+            "identity_document_number": rut,
+            "issue_details": description,
+            "status": "open"
+        }
 
-    def cut_ticket(self, session_id, rut, description):
+    def cut_ticket(self, session_id, rut, description, order_number=None):
         """
         Create a new support ticket.
-        
+
         Args:
             session_id: The session ID for the ticket
             rut: The RUT (Chilean tax ID) of the customer
             description: Description of the ticket issue
-            
+            order_number: Order of the ticket, defaults to the order of the service
+
         Returns:
-            Dict containing the created ticket details
+            Message with the number of the created ticket
         """
+        for _ in range(PUT_ATTEMPTS):
+            item = self._ticket(session_id, rut, description, order_number)
+            try:
+                # Never overwrites an existing ticket
+                self.table.put_item(Item=item, ConditionExpression="attribute_not_exists(issue_number)")
+                return f"Ticket {item['issue_number']} created"
+            except ClientError as e:
+                if e.response["Error"]["Code"] != "ConditionalCheckFailedException":
+                    print(f"Error creating ticket: {e}")
+                    break
 
-        ticket_number = self.get_current_time()
+        return "Unable to create a ticket please try again later"
 
-        item = { 
-            "issue_number": ticket_number,
-            "contact_id": session_id,
-            "order_number": self.order_number,
-            "identity_document_number": rut,
-            "issue_details": description,
-            "status": "open"
-        }
+    def cut_tickets(self, session_id, rut, tickets):
+        """
+        Create several tickets, in transactions of up to 100 conditional puts.
+
+        Args:
+            session_id: The session ID for the tickets
+            rut: The RUT (Chilean tax ID) of the customer
+            tickets: List of dicts with the description and optionally the order_number of each ticket
+
+        Returns:
+            List of the created ticket numbers, in the order of the tickets
+        """
+        numbers = []
+        for start in range(0, len(tickets), TRANSACTION_LIMIT):
+            chunk = tickets[start:start + TRANSACTION_LIMIT]
+            for attempt in range(PUT_ATTEMPTS):
+                items = [
+                    self._ticket(session_id, rut, ticket["description"], ticket.get("order_number"))
+                    for ticket in chunk
+                ]
+                try:
+                    self.table.meta.client.transact_write_items(
+                        TransactItems=[
+                            {"Put": {
+                                "TableName": TABLE_NAME,
+                                "Item": item,
+                                "ConditionExpression": "attribute_not_exists(issue_number)",
+                            }}
+                            for item in items
+                        ],
+                        # SDK retries of the same call are not applied twice
+                        ClientRequestToken=str(uuid.uuid4()),
+                    )
+                    numbers += [item["issue_number"] for item in items]
+                    break
+                except ClientError as e:
+                    # A collision cancels the whole transaction: retried with new numbers
+                    if e.response["Error"]["Code"] != "TransactionCanceledException" or attempt == PUT_ATTEMPTS - 1:
+                        raise
+        return numbers
 
-        response  = self.table.put_item(Item=item, ReturnValues= "ALL_OLD")
-        if response.get("ResponseMetadata").get("HTTPStatusCode") == 200:
-            return f"Ticket {ticket_number} created" 
-        
-        return "Unable to create a ticket please try again later"
-    
     def get_ticket(self, ticket_number):
         """
         Retrieve a ticket by its number.
-        
+
         Args:
             ticket_number: The unique ticket number to retrieve
-            
+
         Returns:
             Dict containing ticket details if found
         """
         response = self.table.get_item(Key={"issue_number": ticket_number})
         return response.get("Item")
 
+    def get_customer_tickets(self, rut, page_size=10, next_token=None):
+        """
+        Retrieve the tickets of a customer, newest first, a page at a time.
+
+        Args:
+            rut: The RUT (Chilean tax ID) of the customer
+            page_size: Tickets per page
+            next_token: Token of the next page, from the previous page
+
+        Returns:
+            Dict with the tickets of the page and the next_token of the next page (None on the last page)
+        """
+        kwargs = dict(
+            IndexName=CUSTOMER_INDEX,
+            KeyConditionExpression=Key("identity_document_number").eq(rut),
+            # Ticket numbers sort by creation time
+            ScanIndexForward=False,
+            Limit=page_size,
+        )
+        if next_token:
+            kwargs["ExclusiveStartKey"] = decode_token(next_token)
+        response = self.table.query(**kwargs)
+        return {
+            "tickets": response.get("Items", []),
+            "next_token": encode_token(response.get("LastEvaluatedKey")),
+        }
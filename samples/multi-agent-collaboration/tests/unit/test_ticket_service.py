@@ -0,0 +1,131 @@
+import importlib
+import importlib.util
+import json
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+import boto3
+from moto import mock_aws
+
+# The Lambda code imports its modules by name, as in the Lambda runtime
+CODE = os.path.join(os.path.dirname(__file__), "..", "..", "lambdas", "code", "tickets")
+sys.path.insert(0, CODE)
+
+
+def setup_tickets():
+    """Creates the tickets table as in databases.py, then imports the Lambda code so its clients are mocked"""
+    os.environ.setdefault("AWS_DEFAULT_REGION", "us-east-1")
+    os.environ["TICKET_TABLE_NAME"] = "tickets"
+    boto3.client("dynamodb").create_table(
+        TableName="tickets",
+        KeySchema=[{"AttributeName": "issue_number", "KeyType": "HASH"}],
+        AttributeDefinitions=[
+            {"AttributeName": "issue_number", "AttributeType": "S"},
+            {"AttributeName": "identity_document_number", "AttributeType": "S"},
+        ],
+        GlobalSecondaryIndexes=[{
+            "IndexName": "identity_document_number",
+            "KeySchema": [
+                {"AttributeName": "identity_document_number", "KeyType": "HASH"},
+                {"AttributeName": "issue_number", "KeyType": "RANGE"},
+            ],
+            "Projection": {"ProjectionType": "ALL"},
+        }],
+        BillingMode="PAY_PER_REQUEST",
+    )
+    ticket_service = importlib.reload(importlib.import_module("ticket_service"))
+    # Other Lambda functions of the sample are also named lambda_function
+    spec = importlib.util.spec_from_file_location("tickets_lambda_function", os.path.join(CODE, "lambda_function.py"))
+    lambda_function = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(lambda_function)
+    return ticket_service, lambda_function
+
+
+def count_tickets(ticket_service):
+    kwargs, count = {"Select": "COUNT"}, 0
+    while True:
+        response = ticket_service.table.scan(**kwargs)
+        count += response["Count"]
+        if "LastEvaluatedKey" not in response:
+            return count
+        kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+
+
+@mock_aws
+def test_ticket_numbers_are_unique_and_sorted_across_threads():
+    ticket_service, _ = setup_tickets()
+    generator = ticket_service.ULIDGenerator()
+
+    def generate(_):
+        return [generator.new() for _ in range(25_000)]
+
+    with ThreadPoolExecutor(8) as pool:
+        batches = list(pool.map(generate, range(8)))
+
+    numbers = [n for batch in batches for n in batch]
+    # Hundreds of thousands of ids within a few milliseconds each, none repeated
+    assert len(set(numbers)) == len(numbers) == 200_000
+    assert all(len(n) == 26 for n in numbers)
+    for batch in batches:
+        assert batch == sorted(batch)
+
+
+@mock_aws
+def test_concurrent_creates_are_never_lost():
+    ticket_service, _ = setup_tickets()
+    service = ticket_service.TicketService()
+
+    def create(i):
+        return service.cut_ticket(f"session-{i % 50}", f"{i % 20:08d}-K", f"issue {i}", order_number=str(i))
+
+    # moto copies the tables on every transaction, the batches go first to keep the test fast
+    batch = service.cut_tickets("batch", "00000000-K", [{"description": f"batch issue {i}"} for i in range(150)])
+    with ThreadPoolExecutor(16) as pool:
+        messages = list(pool.map(create, range(2_000)))
+
+    numbers = batch + [m.split()[1] for m in messages]
+    assert all(m.endswith("created") for m in messages)
+    assert len(set(numbers)) == len(numbers) == 2_150
+    assert count_tickets(ticket_service) == 2_150
+    assert service.get_ticket(numbers[150])["issue_details"] == "issue 0"
+
+
+@mock_aws
+def test_a_collision_never_overwrites_a_ticket():
+    ticket_service, _ = setup_tickets()
+    service = ticket_service.TicketService()
+    numbers = iter(["01JEBZ7Q4M8X2N5V6T3R9K1P0D", "01JEBZ7Q4M8X2N5V6T3R9K1P0D", "01JEBZ7Q4M8X2N5V6T3R9K1P0E"])
+    ticket_service.new_ticket_number = lambda: next(numbers)
+
+    assert service.cut_ticket("s1", "11111111-1", "first") == "Ticket 01JEBZ7Q4M8X2N5V6T3R9K1P0D created"
+    assert service.cut_ticket("s2", "22222222-2", "second") == "Ticket 01JEBZ7Q4M8X2N5V6T3R9K1P0E created"
+    assert service.get_ticket("01JEBZ7Q4M8X2N5V6T3R9K1P0D")["issue_details"] == "first"
+
+
+@mock_aws
+def test_customer_tickets_are_paginated_newest_first():
+    ticket_service, lambda_function = setup_tickets()
+    service = ticket_service.TicketService()
+    numbers = service.cut_tickets("s1", "10192797-1", [{"description": f"issue {i}"} for i in range(25)])
+    service.cut_ticket("s2", "12345678-9", "other customer")
+
+    pages, token = [], None
+    while True:
+        event = {
+            "messageVersion": "1.0",
+            "actionGroup": "SupportActionGroup",
+            "function": "getCustomerTickets",
+            "sessionId": "s1",
+            "parameters": [{"name": "identity_document_number", "type": "string", "value": "10192797-1"}]
+            + ([{"name": "next_token", "type": "string", "value": token}] if token else []),
+        }
+        response = lambda_function.lambda_handler(event, None)
+        page = json.loads(response["response"]["functionResponse"]["responseBody"]["TEXT"]["body"])
+        pages.append([t["issue_number"] for t in page["tickets"]])
+        token = page["next_token"]
+        if not token:
+            break
+
+    assert [len(p) for p in pages[:3]] == [10, 10, 5]
+    assert [n for p in pages for n in p] == numbers[::-1]
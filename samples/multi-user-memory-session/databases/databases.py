@@ -1,6 +1,14 @@
-from aws_cdk import RemovalPolicy, custom_resources as cr, aws_dynamodb as ddb, CfnOutput
+from aws_cdk import (
+    RemovalPolicy,
+    CustomResource,
+    Duration,
+    custom_resources as cr,
+    aws_dynamodb as ddb,
+    aws_lambda,
+    aws_s3_assets as s3_assets,
+    CfnOutput,
+)
 from constructs import Construct
-import json
 
 
 
@@ -28,31 +36,39 @@ class Tables(Construct):
         )
 
 
-        with open("databases/orders.json") as f:
-            sample_data = json.load(f)
-
-        parameters = {
-            "RequestItems": {
-                self.orders.table_name: [
-                    {"PutRequest": {"Item": item}}
-                    for item in sample_data.get("Items")
-                ]
-            }
-        }
-
-        cr.AwsCustomResource(
+        # Load table with sample data, in parallel batches (../shared/dynamodb_seeder)
+        self.seed_function = aws_lambda.Function(
             self,
-            "BatchWriteItem",
-            on_update=cr.AwsSdkCall( 
-                service="dynamodb",
-                action="BatchWriteItem",
-                parameters=parameters,
-                physical_resource_id=cr.PhysicalResourceId.of(f"BatchWriteItem-{self.orders.table_name}"),
-            ),
-            policy=cr.AwsCustomResourcePolicy.from_sdk_calls(
-                resources=cr.AwsCustomResourcePolicy.ANY_RESOURCE
-            ),
+            "Seeder",
+            handler="lambda_function.lambda_handler",
+            code=aws_lambda.Code.from_asset("../shared/dynamodb_seeder/seeder/"),
+            runtime=aws_lambda.Runtime.PYTHON_3_12,
+            architecture=aws_lambda.Architecture.ARM_64,
+            timeout=Duration.minutes(15),
+            memory_size=512,
+        )
+        self.seed_provider = cr.Provider(self, "SeederProvider", on_event_handler=self.seed_function)
+
+        self.seed(self.orders, "Orders", "databases/orders.json")
+
+    def seed(self, table: ddb.Table, name: str, dataset_path: str) -> CustomResource:
+        """
+        Seeds a table with a JSON or JSONL dataset of any size. The dataset is uploaded as an asset and written
+        by the seeder custom resource, again whenever the dataset changes.
+        """
+        dataset = s3_assets.Asset(self, f"{name}Dataset", path=dataset_path)
+        dataset.grant_read(self.seed_function)
+        table.grant_read_write_data(self.seed_function)
+        CfnOutput(self, f"Sample{name}Dataset", value=dataset.s3_object_url,
+            description=f"S3 location of the sample {name.lower()} data")
+
+        return CustomResource(
+            self,
+            f"Seed{name}",
+            service_token=self.seed_provider.service_token,
+            properties={
+                "TableName": table.table_name,
+                "Bucket": dataset.s3_bucket_name,
+                "Key": dataset.s3_object_key,
+            },
         )
-
-
-        CfnOutput(self, "SampleData", value=json.dumps(sample_data))
\ No newline at end of file
@@ -1,8 +1,17 @@
 import json
+import re
 
 from order_service import OrderService
 from agent_helpers import AgentHelper
 
+# Module level, so that warm invocations reuse the client and the cached orders
+order_service = OrderService()
+
+
+def parse_order_numbers(value):
+    """The agent sends arrays as text, e.g. "[10026656, 10026657]" or "10026656, 10026657" """
+    return [n for n in re.split(r"[\s,;\[\]\"']+", value or "") if n]
+
 
 def lambda_handler(event, context):
     print("Received event: ")
@@ -21,9 +30,21 @@ def lambda_handler(event, context):
             function_response = agent_helper.response("rut not provided")
 
         if (rut and order_number ):
-            order_service = OrderService()
             response = order_service.get_order(order_number, rut)
             function_response = agent_helper.response(json.dumps(response))
+
+    elif agent_helper.function == "getOrdersStatus":
+        # Every order the customer asks about in one call and one read
+        order_numbers = parse_order_numbers(agent_helper.parameters.get("order_numbers"))
+        if not order_numbers:
+            function_response = agent_helper.response("order numbers not provided")
+
+        if rut is None:
+            function_response = agent_helper.response("rut not provided")
+
+        if (rut and order_numbers):
+            response = order_service.get_orders(order_numbers, rut)
+            function_response = agent_helper.response(json.dumps(response))
     else:
         function_response = agent_helper.response(f"Unknown function: {agent_helper.function}")
 
@@ -1,17 +1,98 @@
-import boto3
 import os
+import random
+import time
+
+import boto3
+
+TABLE_NAME = os.environ["ORDER_TABLE_NAME"]
+# Orders read by a warm container are reused for this many seconds: an agent looks up the same orders several
+# times in a conversation. A status change takes up to this long to be seen.
+CACHE_TTL = float(os.environ.get("ORDER_CACHE_TTL", "30"))
+
+# Only the attributes of the response are read ("status" is a reserved word)
+PROJECTION = "order_number, identity_document_number, #status, delivery_date, shipping_address"
+ATTRIBUTE_NAMES = {"#status": "status"}
+BATCH_GET_LIMIT = 100
+BATCH_GET_ATTEMPTS = 8
+CACHE_MAX_ITEMS = 10_000
+
+# Created once per container, not on every invocation
+dynamodb = boto3.resource("dynamodb")
+table = dynamodb.Table(TABLE_NAME)
 
+_cache = {}  # order_number -> (expires at, item or None when the order does not exist)
 
+
+"""
+Service class for managing order-related operations.
+"""
 class OrderService:
-    def __init__(self) -> None:
-        TABLE_NAME = os.environ["ORDER_TABLE_NAME"]
-        self.table = boto3.resource("dynamodb").Table(TABLE_NAME)
+    def __init__(self, cache_ttl=CACHE_TTL) -> None:
+        """Initialize the order service with the module DynamoDB table and cache."""
+        self.table = table
+        self.cache_ttl = cache_ttl
 
-    def get_order(self, order_number, rut):
-        response = self.table.get_item(Key={"order_number": order_number})
-        item = response.get("Item")
+    def _fetch(self, order_numbers):
+        """
+        Read orders from the table, one get_item for a single order, batch_get_item for several.
+
+        Returns:
+            Dict of order number to item, None for the orders that don't exist
+        """
+        if len(order_numbers) == 1:
+            item = self.table.get_item(
+                Key={"order_number": order_numbers[0]},
+                ProjectionExpression=PROJECTION,
+                ExpressionAttributeNames=ATTRIBUTE_NAMES,
+            ).get("Item")
+            return {order_numbers[0]: item}
+
+        items = {order_number: None for order_number in order_numbers}
+        for start in range(0, len(order_numbers), BATCH_GET_LIMIT):
+            request = {TABLE_NAME: {
+                "Keys": [{"order_number": n} for n in order_numbers[start:start + BATCH_GET_LIMIT]],
+                "ProjectionExpression": PROJECTION,
+                "ExpressionAttributeNames": ATTRIBUTE_NAMES,
+            }}
+            for attempt in range(BATCH_GET_ATTEMPTS):
+                response = dynamodb.batch_get_item(RequestItems=request)
+                for item in response["Responses"].get(TABLE_NAME, []):
+                    items[item["order_number"]] = item
+                request = response.get("UnprocessedKeys")
+                if not request:
+                    break
+                # Throttled keys, retried with backoff
+                time.sleep(min(1.0, 0.05 * 2 ** attempt) * random.uniform(0.5, 1.0))
+            else:
+                raise RuntimeError(f"Orders still unprocessed after {BATCH_GET_ATTEMPTS} attempts")
+        return items
+
+    def _items(self, order_numbers):
+        now = time.monotonic()
+        items, missing = {}, []
+        for order_number in order_numbers:
+            cached = _cache.get(order_number)
+            if cached and cached[0] > now:
+                items[order_number] = cached[1]
+            else:
+                missing.append(order_number)
+
+        if missing:
+            fetched = self._fetch(missing)
+            expires_at = time.monotonic() + self.cache_ttl
+            if len(_cache) + len(fetched) > CACHE_MAX_ITEMS:
+                for order_number in [n for n, (expires, _) in _cache.items() if expires <= now]:
+                    del _cache[order_number]
+                if len(_cache) + len(fetched) > CACHE_MAX_ITEMS:
+                    _cache.clear()
+            for order_number, item in fetched.items():
+                _cache[order_number] = (expires_at, item)
+            items.update(fetched)
+        return items
+
+    def _order_response(self, item, rut):
         if item:
-            print("Item:", response.get("Item"))
+            print("Item:", item)
             if item.get("identity_document_number") == rut:
                 data = dict(
                     status=item.get("status"),
@@ -23,3 +104,35 @@ class OrderService:
                 return dict(status="RUT no encontrado")
         else:
             return dict(status="Pedido no encontrado")
+
+    def get_order(self, order_number, rut):
+        """
+        Retrieve an order by its number and RUT.
+
+        Args:
+            order_number: The unique order number
+            rut: The RUT (Chilean tax ID) associated with the order
+
+        Returns:
+            Dict containing order details if found
+        """
+        return self.get_orders([order_number], rut)[order_number]
+
+    def get_orders(self, order_numbers, rut):
+        """
+        Retrieve several orders of a customer in one round trip.
+
+        Args:
+            order_numbers: The order numbers
+            rut: The RUT (Chilean tax ID) associated with the orders
+
+        Returns:
+            Dict of order number to the order details, as in get_order
+        """
+        order_numbers = list(dict.fromkeys(order_numbers))
+        items = self._items(order_numbers)
+        return {n: self._order_response(items[n], rut) for n in order_numbers}
+
+
+def clear_cache():
+    _cache.clear()
@@ -1,3 +1,7 @@
+import codecs
+import threading
+import time
+
 import boto3
 from botocore.exceptions import ClientError
 import logging
@@ -6,31 +10,91 @@ logger = logging.getLogger(__name__)
 
 
 class BedrockAgentService:
-    def __init__(self, agent_id, alias_id="TSTALIASID", client=None) -> None:
+    """
+    Sessions, memory and invocations of a Bedrock agent.
+
+    Completions are streamed chunk by chunk (invoke_agent_stream). Sessions and memories are paginated until the
+    end, a page is only requested when the previous one has been consumed. The session summaries of a memoryId
+    are cached for memory_ttl seconds (None: until the next invocation), and every invocation with that memoryId
+    invalidates them, so dashboards refreshing many users only call the service for memories that changed.
+    """
+
+    def __init__(self, agent_id, alias_id="TSTALIASID", client=None, memory_ttl=60) -> None:
         self.agents_runtime_client = (
             client if client else boto3.client("bedrock-agent-runtime")
         )
         self.agent_id = agent_id
         self.alias_id = alias_id
+        self.memory_ttl = memory_ttl
+        self._memory_cache = {}  # memory_id -> (fetched at, memory contents)
+        self._memory_versions = {}  # memory_id -> invalidations, a fetch older than the last one is not cached
+        self._memory_lock = threading.Lock()
 
     def get_session(self, session_id):
         return self.agents_runtime_client.get_session(sessionIdentifier=session_id)
 
-    def list_sessions(self):
-        return self.agents_runtime_client.list_sessions(maxResults=20).get(
-            "sessionSummaries"
-        )
+    def iter_sessions(self, page_size=20):
+        """Every session summary, one page requested at a time"""
+        kwargs = dict(maxResults=page_size)
+        while True:
+            response = self.agents_runtime_client.list_sessions(**kwargs)
+            yield from response.get("sessionSummaries", [])
+            if not response.get("nextToken"):
+                return
+            kwargs["nextToken"] = response["nextToken"]
 
-    def get_agent_memory(self, memory_id):
-        return self.agents_runtime_client.get_agent_memory(
+    def list_sessions(self, max_results=None):
+        sessions = []
+        for session in self.iter_sessions():
+            if max_results is not None and len(sessions) >= max_results:
+                break
+            sessions.append(session)
+        return sessions
+
+    def iter_agent_memory(self, memory_id, page_size=100):
+        """Every session summary of a memory, from the service, one page requested at a time"""
+        kwargs = dict(
             agentId=self.agent_id,
             agentAliasId=self.alias_id,
-            maxItems=100,
+            maxItems=page_size,
             memoryId=memory_id,
             memoryType="SESSION_SUMMARY",
-        ).get("memoryContents")
+        )
+        while True:
+            response = self.agents_runtime_client.get_agent_memory(**kwargs)
+            yield from response.get("memoryContents", [])
+            if not response.get("nextToken"):
+                return
+            kwargs["nextToken"] = response["nextToken"]
 
-    def invoke_agent(self, prompt, session_id, memory_id, session_attributes=None):
+    def get_agent_memory(self, memory_id, refresh=False):
+        """The session summaries of a memory, cached until the memory is invalidated or expires"""
+        with self._memory_lock:
+            cached = self._memory_cache.get(memory_id)
+            version = self._memory_versions.get(memory_id, 0)
+        if cached and not refresh:
+            fetched_at, contents = cached
+            if self.memory_ttl is None or time.monotonic() - fetched_at < self.memory_ttl:
+                return contents
+
+        fetched_at = time.monotonic()
+        contents = list(self.iter_agent_memory(memory_id))
+        with self._memory_lock:
+            # An invocation during the fetch invalidated the memory: return the contents but don't cache them
+            if self._memory_versions.get(memory_id, 0) == version:
+                self._memory_cache[memory_id] = (fetched_at, contents)
+        return contents
+
+    def invalidate_memory(self, memory_id=None):
+        """Forget the cached summaries of a memory, or of every memory"""
+        with self._memory_lock:
+            memory_ids = set(self._memory_versions) | set(self._memory_cache) if memory_id is None else [memory_id]
+            for memory_id in memory_ids:
+                self._memory_versions[memory_id] = self._memory_versions.get(memory_id, 0) + 1
+                self._memory_cache.pop(memory_id, None)
+
+    def invoke_agent_stream(self, prompt, session_id, memory_id, session_attributes=None):
+        """Yields the completion text as the agent streams it"""
         try:
             invocation_kwargs = dict(
                 agentId=self.agent_id,
@@ -52,14 +116,26 @@ class BedrockAgentService:
                 f"Response: memoryId = {response.get('memoryId')} / sessionId =  {response.get('sessionId')}"
             )
 
-            completion = ""
-
+            # A multi byte character can be split across chunks
+            decoder = codecs.getincrementaldecoder("utf-8")()
             for event in response.get("completion"):
-                chunk = event["chunk"]
-                completion = completion + chunk["bytes"].decode()
+                if "chunk" not in event:
+                    continue
+                text = decoder.decode(event["chunk"]["bytes"])
+                if text:
+                    yield text
+            text = decoder.decode(b"", final=True)
+            if text:
+                yield text
 
         except ClientError as e:
             logger.error(f"Couldn't invoke agent. {e}")
             raise
+        finally:
+            # The invocation changes the memory, even when the stream is not read until the end
+            self.invalidate_memory(memory_id)
 
-        return completion
+    def invoke_agent(self, prompt, session_id, memory_id, session_attributes=None):
+        return "".join(
+            self.invoke_agent_stream(prompt, session_id, memory_id, session_attributes)
+        )
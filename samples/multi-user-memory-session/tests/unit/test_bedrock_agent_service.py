@@ -0,0 +1,97 @@
+from test_agent.bedrock_agent import BedrockAgentService
+
+
+class StubAgentRuntime:
+    """bedrock-agent-runtime client answering from lists, a page of max items per call"""
+
+    def __init__(self, sessions=(), memories=None, chunks=()):
+        self.sessions = list(sessions)
+        self.memories = memories or {}
+        self.chunks = list(chunks)
+        self.calls = []
+
+    def _page(self, items, size, token):
+        start = int(token or 0)
+        page = {"items": items[start:start + size]}
+        if start + size < len(items):
+            page["nextToken"] = str(start + size)
+        return page
+
+    def list_sessions(self, maxResults, nextToken=None):
+        self.calls.append(("list_sessions", nextToken))
+        page = self._page(self.sessions, maxResults, nextToken)
+        return {"sessionSummaries": page.pop("items"), **page}
+
+    def get_agent_memory(self, agentId, agentAliasId, maxItems, memoryId, memoryType, nextToken=None):
+        self.calls.append(("get_agent_memory", memoryId, nextToken))
+        page = self._page(self.memories.get(memoryId, []), maxItems, nextToken)
+        return {"memoryContents": page.pop("items"), **page}
+
+    def invoke_agent(self, **kwargs):
+        self.calls.append(("invoke_agent", kwargs["memoryId"]))
+        return {
+            "sessionId": kwargs["sessionId"],
+            "memoryId": kwargs["memoryId"],
+            "completion": [{"chunk": {"bytes": chunk}} for chunk in self.chunks],
+        }
+
+
+def summary(i):
+    return {"sessionSummary": {"sessionId": f"S-{i}", "summaryText": f"summary {i}"}}
+
+
+def test_sessions_are_paginated_lazily():
+    client = StubAgentRuntime(sessions=[{"sessionId": f"S-{i}"} for i in range(45)])
+    agent = BedrockAgentService("AGENT", client=client)
+
+    assert len(agent.list_sessions()) == 45
+    assert [call[1] for call in client.calls] == [None, "20", "40"]
+
+    client.calls.clear()
+    assert len(agent.list_sessions(max_results=5)) == 5
+    assert len(client.calls) == 1
+
+
+def test_memory_is_paginated_and_cached_until_invoke():
+    client = StubAgentRuntime(memories={"M-1": [summary(i) for i in range(150)], "M-2": [summary(0)]})
+    agent = BedrockAgentService("AGENT", client=client, memory_ttl=None)
+
+    assert len(agent.get_agent_memory("M-1")) == 150
+    assert len(agent.get_agent_memory("M-2")) == 1
+    assert len(client.calls) == 3
+
+    # Refreshing the dashboard does not call the service
+    agent.get_agent_memory("M-1")
+    agent.get_agent_memory("M-2")
+    assert len(client.calls) == 3
+
+    client.memories["M-1"].append(summary(150))
+    agent.invoke_agent("Hola", "S-1", "M-1")
+    assert len(agent.get_agent_memory("M-1")) == 151
+    agent.get_agent_memory("M-2")
+    assert [call for call in client.calls if call[0] == "get_agent_memory"][-2:] == [
+        ("get_agent_memory", "M-1", None), ("get_agent_memory", "M-1", "100")
+    ]
+
+
+def test_memory_cache_expires():
+    client = StubAgentRuntime(memories={"M-1": [summary(0)]})
+    agent = BedrockAgentService("AGENT", client=client, memory_ttl=0)
+
+    agent.get_agent_memory("M-1")
+    agent.get_agent_memory("M-1")
+    assert len(client.calls) == 2
+
+
+def test_completion_is_streamed():
+    text = "Hola, tu pedido está en camino"
+    encoded = text.encode()
+    # Split inside the two bytes of "á"
+    split = encoded.index("á".encode()) + 1
+    client = StubAgentRuntime(chunks=[encoded[:split], encoded[split:]])
+    agent = BedrockAgentService("AGENT", client=client)
+
+    stream = agent.invoke_agent_stream("Hola", "S-1", "M-1", session_attributes={"name": "Enrique"})
+    assert next(stream) == "Hola, tu pedido est"
+    assert "".join(stream) == "á en camino"
+    assert agent.invoke_agent("Hola", "S-1", "M-1") == text
@@ -0,0 +1,85 @@
+import importlib
+import importlib.util
+import json
+import os
+import sys
+
+import boto3
+from moto import mock_aws
+
+# The Lambda code imports its modules by name, as in the Lambda runtime
+CODE = os.path.join(os.path.dirname(__file__), "..", "..", "lambdas", "code", "orders")
+sys.path.insert(0, CODE)
+
+ORDERS = os.path.join(os.path.dirname(__file__), "..", "..", "databases", "orders.json")
+
+
+def setup_orders():
+    """Creates and loads the orders table, then imports the Lambda code so its clients are mocked"""
+    os.environ.setdefault("AWS_DEFAULT_REGION", "us-east-1")
+    os.environ["ORDER_TABLE_NAME"] = "orders"
+    client = boto3.client("dynamodb")
+    client.create_table(
+        TableName="orders",
+        KeySchema=[{"AttributeName": "order_number", "KeyType": "HASH"}],
+        AttributeDefinitions=[{"AttributeName": "order_number", "AttributeType": "S"}],
+        BillingMode="PAY_PER_REQUEST",
+    )
+    with open(ORDERS) as f:
+        for item in json.load(f)["Items"]:
+            client.put_item(TableName="orders", Item=item)
+
+    order_service = importlib.reload(importlib.import_module("order_service"))
+    # Other Lambda functions of the sample are also named lambda_function
+    spec = importlib.util.spec_from_file_location("orders_lambda_function", os.path.join(CODE, "lambda_function.py"))
+    lambda_function = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(lambda_function)
+    calls = []
+    order_service.dynamodb.meta.client.meta.events.register(
+        "before-parameter-build.dynamodb", lambda model, params, **kwargs: calls.append((model.name, params))
+    )
+    return order_service, lambda_function, calls
+
+
+def agent_event(function, **parameters):
+    return {
+        "messageVersion": "1.0",
+        "actionGroup": "OrdersActionGroup",
+        "function": function,
+        "parameters": [{"name": k, "type": "string", "value": v} for k, v in parameters.items()],
+    }
+
+
+def response_body(response):
+    return json.loads(response["response"]["functionResponse"]["responseBody"]["TEXT"]["body"])
+
+
+@mock_aws
+def test_orders_are_read_in_one_batch_and_cached():
+    order_service, lambda_function, calls = setup_orders()
+
+    event = agent_event("getOrdersStatus", order_numbers="[10026656, 10026657, 99999999]",
+                        identity_document_number="10192797-1")
+    orders = response_body(lambda_function.lambda_handler(event, None))
+
+    assert orders["10026656"]["status"] == "Despacho Programado"
+    assert orders["10026657"] == {"status": "RUT no encontrado"}
+    assert orders["99999999"] == {"status": "Pedido no encontrado"}
+    assert [name for name, _ in calls] == ["BatchGetItem"]
+    assert calls[0][1]["RequestItems"]["orders"]["ProjectionExpression"] == order_service.PROJECTION
+
+    # The agent asks again about one of the orders: answered by the warm container
+    event = agent_event("getOrderStatus", order_number="10026656", identity_document_number="10192797-1")
+    assert response_body(lambda_function.lambda_handler(event, None)) == orders["10026656"]
+    assert len(calls) == 1
+
+
+@mock_aws
+def test_cache_expires():
+    order_service, _, calls = setup_orders()
+    service = order_service.OrderService(cache_ttl=0)
+
+    service.get_order("10026656", "10192797-1")
+    service.get_order("10026656", "10192797-1")
+    assert [name for name, _ in calls] == ["GetItem", "GetItem"]
+    assert calls[0][1]["ProjectionExpression"] == order_service.PROJECTION
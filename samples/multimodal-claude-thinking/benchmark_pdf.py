@@ -0,0 +1,141 @@
+"""
+Time and memory to build the content blocks of a PDF (the bundled paper by default), comparing the previous
+PDFDocument, which parsed every page and decoded every image when created, with the lazy, cached one:
+
+- eager:        the previous PDFDocument, the whole document
+- lazy cold:    the whole document, empty cache
+- lazy warm:    the whole document again, from the cache (a notebook run again)
+- range cold:   only --first-page to --last-page, empty cache
+- download:     a --download-mb file served over HTTP on localhost, read whole by requests vs streamed to disk
+
+Each scenario runs in its own process, memory is the peak resident size of that process.
+
+    python benchmark_pdf.py
+    python benchmark_pdf.py --pdf my.pdf --first-page 1 --last-page 3
+"""
+
+import argparse
+import functools
+import http.server
+import os
+import resource
+import shutil
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import requests
+from pypdf import PdfReader
+
+from document import Document
+from pdf_document import PDFDocument
+
+
+def eager_content_blocks(file_path):
+    """PDFDocument before the lazy reader: every page and image read up front, images sent as extracted"""
+    pages = []
+    for page in PdfReader(file_path).pages:
+        pages.append({"text": page.extract_text(), "images": page.images})
+
+    content = []
+    current_text = ""
+    for page_num, p in enumerate(pages):
+        current_text += f"PAGE {page_num+1}\n\n {p['text']}\n"
+        if len(p['images']) > 0:
+            content.append({"text": current_text})
+            current_text = ""
+            for image in p['images']:
+                extension = image.name.split('.')[-1]
+                content.append({"image": {"format": "jpeg" if extension == "jpg" else extension,
+                                          "source": {"bytes": image.data}}})
+    if current_text != "":
+        content.append({"text": current_text})
+    return content
+
+
+def peak_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def measure(scenario, pdf, cache_dir, first_page, last_page, url=None):
+    baseline = peak_mb()
+    start = time.perf_counter()
+    if scenario == "eager":
+        content = eager_content_blocks(pdf)
+    elif scenario == "range":
+        content = PDFDocument(pdf, cache_dir=cache_dir).get_content_blocks(first_page, last_page)
+    elif scenario == "download-whole":
+        response = requests.get(url, stream=True)
+        content = response.content
+        with open(os.path.join(cache_dir, "whole.pdf"), "wb") as f:
+            f.write(content)
+        content = []
+    elif scenario == "download-streamed":
+        Document.download_to_path(url, os.path.join(cache_dir, "streamed.pdf"))
+        content = []
+    else:
+        content = PDFDocument(pdf, cache_dir=cache_dir).get_content_blocks()
+    elapsed = time.perf_counter() - start
+
+    images = [block["image"] for block in content if "image" in block]
+    image_bytes = sum(len(image["source"]["bytes"]) for image in images)
+    return elapsed, peak_mb() - baseline, len(content), len(images), image_bytes
+
+
+def run(name, *args, **kwargs):
+    # A fresh process, so that the peak memory is the one of this scenario
+    with ProcessPoolExecutor(max_workers=1) as executor:
+        elapsed, memory, blocks, images, image_bytes = executor.submit(measure, *args, **kwargs).result()
+    print(f"{name:<18} {elapsed * 1000:8.0f} ms  +{memory:6.0f} MB peak  {blocks:3d} blocks  "
+          f"{images:2d} images {image_bytes / 1024:7.0f} KB")
+
+
+class QuietHandler(http.server.SimpleHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+
+def serve(directory):
+    handler = functools.partial(QuietHandler, directory=directory)
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pdf", default="2501.12948.pdf")
+    parser.add_argument("--first-page", type=int, default=1)
+    parser.add_argument("--last-page", type=int, default=6)
+    parser.add_argument("--download-mb", type=int, default=200)
+    args = parser.parse_args()
+
+    cache_dir = tempfile.mkdtemp()
+    try:
+        print(f"{args.pdf}: {len(PdfReader(args.pdf).pages)} pages, {os.path.getsize(args.pdf) / 1024:.0f} KB")
+        run("eager", "eager", args.pdf, cache_dir, 1, None)
+        run("lazy cold", "full", args.pdf, cache_dir, 1, None)
+        run("lazy warm", "full", args.pdf, cache_dir, 1, None)
+        shutil.rmtree(cache_dir)
+        run(f"range {args.first_page}-{args.last_page} cold", "range", args.pdf, cache_dir,
+            args.first_page, args.last_page)
+
+        served_dir = os.path.join(cache_dir, "served")
+        os.makedirs(served_dir)
+        with open(os.path.join(served_dir, "large.pdf"), "wb") as f:
+            block = os.urandom(1 << 20)
+            for _ in range(args.download_mb):
+                f.write(block)
+        server = serve(served_dir)
+        url = f"http://127.0.0.1:{server.server_address[1]}/large.pdf"
+        print(f"download of {args.download_mb} MB")
+        run("download whole", "download-whole", args.pdf, cache_dir, 1, None, url=url)
+        run("download streamed", "download-streamed", args.pdf, cache_dir, 1, None, url=url)
+        server.shutdown()
+    finally:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
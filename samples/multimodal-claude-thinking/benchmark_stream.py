@@ -0,0 +1,142 @@
+"""
+Replays a recorded (or synthetic) ~20k token Converse stream through ClaudeThink with a
+fake client and compares the previous full re-render per delta with the incremental renderer.
+
+    python benchmark_stream.py                      # synthetic 20k token stream
+    python benchmark_stream.py --record stream.jsonl  # save the synthetic stream
+    python benchmark_stream.py --stream stream.jsonl  # replay a recorded stream
+
+A recorded stream is one converse_stream event per line, e.g. captured with
+`for event in response["stream"]: f.write(json.dumps(event) + "\\n")`.
+"""
+
+import argparse
+import json
+import random
+import time
+
+from claude_think import ClaudeThink
+
+CHARS_PER_TOKEN = 4
+
+
+class CountingDisplay:
+    """Display backend that emulates Markdown rendering cost (proportional to input size)"""
+
+    def __init__(self):
+        self.renders = 0
+        self.chars = 0
+
+    def render(self, markdown):
+        self.renders += 1
+        self.chars += len(markdown)
+        # cheap stand-in for a Markdown -> HTML conversion
+        return markdown.replace("**", "<b>").replace("\n", "<br>")
+
+    def new(self, markdown):
+        self.render(markdown)
+        return object()
+
+    def update(self, handle, markdown):
+        self.render(markdown)
+
+
+class FakeBedrockRuntime:
+    def __init__(self, events):
+        self.events = events
+        self.requests = []
+
+    def converse_stream(self, **kwargs):
+        self.requests.append(kwargs)
+        return {"stream": iter(self.events)}
+
+
+def synthetic_stream(tokens=20_000, reasoning_share=0.6, seed=3):
+    random.seed(seed)
+    words = "the model compares benchmark results across tasks and reasons about each step carefully".split()
+
+    def text(n_tokens):
+        out = []
+        for i in range(n_tokens):
+            out.append(random.choice(words))
+            if i % 60 == 59:
+                out.append(".\n\n")
+            elif i % 17 == 16:
+                out.append(". ")
+        return " ".join(out)
+
+    def deltas(body, key):
+        size = 4 * CHARS_PER_TOKEN  # a few tokens per delta, like Bedrock
+        for i in range(0, len(body), size):
+            piece = body[i : i + size]
+            if key == "reasoning":
+                yield {"contentBlockDelta": {"delta": {"reasoningContent": {"text": piece}}, "contentBlockIndex": 0}}
+            else:
+                yield {"contentBlockDelta": {"delta": {"text": piece}, "contentBlockIndex": 1}}
+
+    reasoning_tokens = int(tokens * reasoning_share)
+    code = "\n\n```python\nimport numpy as np\n\n\nprint(np.arange(10))\n```\n\n"
+    events = [{"messageStart": {"role": "assistant"}}]
+    events += list(deltas(text(reasoning_tokens), "reasoning"))
+    events += list(deltas(text(tokens - reasoning_tokens) + code, "answer"))
+    events += [{"messageStop": {"stopReason": "end_turn"}}]
+    return events
+
+
+def full_rerender(events, display):
+    """Rendering strategy before the incremental renderer: join and render everything on every delta"""
+    reasoning, final_text = [], []
+    handle = None
+    for chunk in events:
+        if "contentBlockDelta" in chunk:
+            delta = chunk["contentBlockDelta"]["delta"]
+            if delta.get("reasoningContent", {}).get("text"):
+                reasoning.append(delta["reasoningContent"]["text"])
+            if delta.get("text"):
+                final_text.append(delta["text"])
+            cell_output = f"***Thinking...***\n\n <em>{''.join(reasoning)}</em>"
+            if final_text:
+                cell_output += f"\n\n***Final Answer:***\n\n {''.join(final_text)} "
+            if handle is None:
+                handle = display.new(cell_output)
+            else:
+                display.update(handle, cell_output)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--stream", help="recorded converse_stream events (jsonl)")
+    parser.add_argument("--record", help="write the synthetic stream to this file")
+    parser.add_argument("--tokens", type=int, default=20_000)
+    parser.add_argument("--refresh-interval", type=float, default=0.1)
+    args = parser.parse_args()
+
+    if args.stream:
+        with open(args.stream) as f:
+            events = [json.loads(line) for line in f if line.strip()]
+    else:
+        events = synthetic_stream(args.tokens)
+    if args.record:
+        with open(args.record, "w") as f:
+            for event in events:
+                f.write(json.dumps(event) + "\n")
+
+    deltas = sum(1 for e in events if "contentBlockDelta" in e)
+    print(f"replaying {deltas} deltas")
+
+    display = CountingDisplay()
+    start = time.perf_counter()
+    full_rerender(events, display)
+    elapsed = time.perf_counter() - start
+    print(f"full re-render   {elapsed:8.3f}s  renders {display.renders:6d}  rendered chars {display.chars:,}")
+
+    display = CountingDisplay()
+    ct = ClaudeThink(client=FakeBedrockRuntime(events), display=display, refresh_interval=args.refresh_interval)
+    start = time.perf_counter()
+    ct.converse_stream([{"text": "explain this paper"}])
+    elapsed = time.perf_counter() - start
+    print(f"incremental      {elapsed:8.3f}s  renders {display.renders:6d}  rendered chars {display.chars:,}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,11 @@
-from IPython.display import display, Markdown, clear_output
-# for nice outputs in jupyter notebooks
-
 import json
-from typing import List, Dict, Union, Optional
+from typing import List, Dict, Union, Optional, Callable
 from botocore.config import Config
 import boto3
 
+from conversation_manager import ConversationManager
+from markdown_stream import IncrementalMarkdownRenderer # for nice outputs in jupyter notebooks
+
 DEFAULT_MODEL_ID = "us.anthropic.claude-3-7-sonnet-20250219-v1:0"
 
 
@@ -22,6 +22,11 @@ class ClaudeThink:
         model_id: str = DEFAULT_MODEL_ID,
         budget_tokens: int = 2048,
         max_tokens: int = 4096,
+        max_context_tokens: Optional[int] = None,
+        summarizer: Optional[Callable[[List[Dict]], str]] = None,
+        refresh_interval: float = 0.1,
+        display=None,
+        client=None,
     ):
         """Initialize Claude conversation manager.
 
@@ -29,37 +34,51 @@ class ClaudeThink:
             model_id: The model identifier to use (defaults to Claude v2)
             budget_tokens: Maximum context tokens for input (defaults to 2048)
             max_tokens: Maximum tokens for completion (defaults to 4096)
+            max_context_tokens: Token budget for the conversation history sent on each request
+                (defaults to None, no trimming). See ConversationManager
+            summarizer: Optional callable that condenses dropped turns into a summary
+            refresh_interval: Minimum seconds between two Markdown renders while streaming
+            display: Markdown display backend (defaults to IPython display)
+            client: bedrock-runtime client (defaults to a new client)
         """
         self.model_id = model_id
         self.budget_tokens = budget_tokens
         self.max_tokens = max_tokens
         self.thinking_enabled = True if budget_tokens else False
-        self.conversation: List[Dict] = []
+        self.history = ConversationManager(max_tokens=max_context_tokens, summarizer=summarizer)
         self.reasoning_config = {"thinking": {"type": "enabled", "budget_tokens": self.budget_tokens}}
-
+        self.refresh_interval = refresh_interval
+        self.display = display
 
         # Initialize Bedrock client
-        self.client = boto3.client(service_name="bedrock-runtime", config=config)
+        self.client = client or boto3.client(service_name="bedrock-runtime", config=config)
+
+    @property
+    def conversation(self) -> List[Dict]:
+        return self.history.messages
 
     def converse_stream(self, content) -> str:
         """Get completion from Claude model based on conversation history.
 
+        Deltas are rendered incrementally: only the trailing Markdown block is re-rendered,
+        at most every `refresh_interval` seconds.
+
         Returns:
             str: Model completion text
         """
-        # Format conversation history for Claude
-        messages = [msg for msg in self.conversation]
+        # Conversation history for Claude, trimmed to max_context_tokens
+        messages = self.history.build(content)
 
         # Invoke model
         response = self.client.converse_stream(
             modelId=self.model_id,
             inferenceConfig=dict(maxTokens=self.max_tokens),
-            messages=[*messages, {"role": "user", "content": content}],
+            messages=messages,
             additionalModelRequestFields=self.reasoning_config,
         )
         reasoning = []
         final_text = []
-
+        renderer = IncrementalMarkdownRenderer(self.display, self.refresh_interval)
 
         for chunk in response["stream"]:
             if "contentBlockDelta" in chunk:
@@ -67,40 +86,22 @@ class ClaudeThink:
                 if delta.get("reasoningContent", {}).get("text"):
                     text = delta.get("reasoningContent").get("text")
                     reasoning.append(text)
+                    renderer.append("reasoning", text)
                 if delta.get("text"):
                     text = delta.get("text")
                     final_text.append(text)
+                    renderer.append("answer", text)
 
-                reasoning_md = "".join([f"{r}" for r in reasoning])
-                final_text_md = "".join([f"{t}" for t in final_text])
-                clear_output(wait=True)
-
-            
-                cell_output = f"***Thinking...***\n\n <em>{reasoning_md}</em>"
-                if len(final_text):
-                    cell_output += f"\n\n***Final Answer:***\n\n {final_text_md} "
-
-                display(Markdown(cell_output))
-
-
-
-        self.conversation.append({"role": "user", "content": content})
-
-        reasoning_text = "".join(reasoning)   
-        final_text_text  = "\n".join(final_text)   
-
-        self.conversation.append(
-            {"role": "assistant", "content": [
-               # {"reasoningContent": reasoning_text}, # not acceptable
-                {"text": final_text_text}]}
-        )
-
-
+        renderer.close()
 
+        reasoning_text = "".join(reasoning)
+        final_text_text  = "".join(final_text)
 
+        # {"reasoningContent": reasoning_text} is not acceptable in the history
+        self.history.add_turn(content, final_text_text)
 
         return reasoning_text, final_text_text
 
     def clear_conversation(self) -> None:
         """Clear the conversation history."""
-        self.conversation = []
+        self.history.clear()
@@ -0,0 +1,171 @@
+import hashlib
+import io
+from typing import Callable, Dict, List, Optional
+
+CHARS_PER_TOKEN = 4
+MAX_IMAGE_TOKENS = 1600
+DOCUMENT_PAGE_TOKENS = 1500
+
+
+def image_tokens(image_bytes: bytes) -> int:
+    """Claude image cost is about width * height / 750 tokens, capped by the model downscaling."""
+    try:
+        from PIL import Image
+
+        width, height = Image.open(io.BytesIO(image_bytes)).size
+        return min(MAX_IMAGE_TOKENS, max(1, width * height // 750))
+    except Exception:
+        return MAX_IMAGE_TOKENS
+
+
+# Page count of every document seen, by content hash, so a PDF is parsed once however many turns carry it
+_document_pages: Dict[str, Optional[int]] = {}
+
+
+def document_tokens(document_bytes: bytes) -> int:
+    # outside the try: a missing pypdf must fail, not fall back to the size estimate
+    from pypdf import PdfReader
+
+    digest = hashlib.sha256(document_bytes).hexdigest()
+    if digest not in _document_pages:
+        try:
+            _document_pages[digest] = len(PdfReader(io.BytesIO(document_bytes)).pages)
+        except Exception:
+            _document_pages[digest] = None
+    pages = _document_pages[digest]
+    if pages is None:
+        return max(1, len(document_bytes) // 100)
+    return pages * DOCUMENT_PAGE_TOKENS
+
+
+class ConversationManager:
+    """
+    Keeps the conversation history sent to Converse under a token budget.
+
+    When the history plus the new message exceeds `max_tokens`:
+    1. images and documents of older turns are replaced by a short text reference
+       (or dropped, with `media="drop"`), since the model already answered about them;
+    2. the oldest turns are removed, optionally condensed by `summarizer(messages) -> str`
+       into a summary that is prepended to the first remaining user message.
+
+    Media in the last `keep_media_turns` turns is always kept, so follow-up questions
+    about a document just shared still see it. With `max_tokens=None` nothing is trimmed.
+    """
+
+    def __init__(
+        self,
+        max_tokens: Optional[int] = None,
+        media: str = "reference",
+        keep_media_turns: int = 1,
+        summarizer: Optional[Callable[[List[Dict]], str]] = None,
+    ):
+        self.max_tokens = max_tokens
+        self.media = media
+        self.keep_media_turns = keep_media_turns
+        self.summarizer = summarizer
+        self.messages: List[Dict] = []
+        self.summary = ""
+        self._token_cache = {}
+
+    def clear(self) -> None:
+        self.messages = []
+        self.summary = ""
+        self._token_cache = {}
+
+    def block_tokens(self, block: Dict) -> int:
+        if "text" in block:
+            return len(block["text"]) // CHARS_PER_TOKEN + 1
+        # media blocks are decoded once; the cache keeps a reference so ids are not reused
+        cached = self._token_cache.get(id(block))
+        if cached and cached[0] is block:
+            return cached[1]
+        if "image" in block:
+            tokens = image_tokens(block["image"]["source"].get("bytes", b""))
+        elif "document" in block:
+            tokens = document_tokens(block["document"]["source"].get("bytes", b""))
+        else:
+            tokens = len(str(block)) // CHARS_PER_TOKEN
+        self._token_cache[id(block)] = (block, tokens)
+        return tokens
+
+    def message_tokens(self, message: Dict) -> int:
+        return sum(self.block_tokens(b) for b in message["content"])
+
+    def history_tokens(self) -> int:
+        return sum(self.message_tokens(m) for m in self.messages) + len(self.summary) // CHARS_PER_TOKEN
+
+    @staticmethod
+    def _starts_turn(message: Dict) -> bool:
+        # a user message with tool results continues the turn of the assistant tool use before it
+        return message["role"] == "user" and not any("toolResult" in block for block in message["content"])
+
+    def _turn_starts(self) -> List[int]:
+        return [i for i, message in enumerate(self.messages) if self._starts_turn(message)]
+
+    def add_turn(self, user_content: List[Dict], assistant_text: str) -> None:
+        self.messages.append({"role": "user", "content": list(user_content)})
+        self.messages.append({"role": "assistant", "content": [{"text": assistant_text}]})
+
+    def build(self, content: List[Dict]) -> List[Dict]:
+        """Messages to send: trimmed history followed by the new user message."""
+        new_message = {"role": "user", "content": list(content)}
+        if self.max_tokens is not None:
+            budget = self.max_tokens - self.message_tokens(new_message)
+            self._fit(budget)
+
+        messages = [dict(m) for m in self.messages]
+        if self.summary:
+            first = messages[0] if messages else new_message
+            summary_block = {"text": f"Summary of the earlier conversation:\n{self.summary}"}
+            first = dict(first, content=[summary_block, *first["content"]])
+            if messages:
+                messages[0] = first
+            else:
+                new_message = first
+        return [*messages, new_message]
+
+    def _fit(self, budget: int) -> None:
+        if self.history_tokens() <= budget:
+            return
+
+        # 1. reference or drop media of older turns, oldest first
+        starts = self._turn_starts()
+        turns = list(zip(starts, starts[1:] + [len(self.messages)]))
+        for start, end in turns[: max(0, len(turns) - self.keep_media_turns)]:
+            for i in range(start, end):
+                if self.messages[i]["role"] == "user":
+                    self.messages[i] = dict(self.messages[i], content=self._strip_media(self.messages[i]["content"]))
+            if self.history_tokens() <= budget:
+                return
+
+        # 2. remove oldest turns, whole, so the history never starts with an assistant or tool result message
+        dropped = []
+        omitted = 0
+        while self.messages and self.history_tokens() > budget:
+            next_starts = [i for i in self._turn_starts() if i > 0]
+            end = next_starts[0] if next_starts else len(self.messages)
+            dropped.extend(self.messages[:end])
+            self.messages = self.messages[end:]
+            omitted += 1
+        if dropped:
+            if self.summarizer:
+                self.summary = self.summarizer(
+                    ([{"role": "user", "content": [{"text": self.summary}]}] if self.summary else []) + dropped
+                )
+            else:
+                self.summary = (self.summary + "\n" if self.summary else "") + f"({omitted} earlier turns omitted)"
+
+    def _strip_media(self, content: List[Dict]) -> List[Dict]:
+        stripped = []
+        for block in content:
+            if "image" in block or "document" in block:
+                if self.media == "drop":
+                    continue
+                if "document" in block:
+                    name = block["document"].get("name", "document")
+                    stripped.append({"text": f"[document '{name}' was shared earlier and already analyzed]"})
+                else:
+                    stripped.append({"text": "[an image was shared earlier and already analyzed]"})
+            else:
+                stripped.append(block)
+        return stripped or [{"text": "(media shared earlier)"}]
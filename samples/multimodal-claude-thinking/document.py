@@ -1,3 +1,7 @@
+import os
+import tempfile
+from urllib.parse import urlparse
+
 import requests
 
 
@@ -6,6 +10,36 @@ class Document:
     A class for working with documents, including downloading and reading binary files.
     """
     
+    @staticmethod
+    def download_to_path(url: str, save_path: str = None, chunk_size: int = 1 << 20) -> str:
+        """
+        Stream a file from a URL to disk in chunks, without holding it in memory.
+        
+        Args:
+            url (str): The URL of the file to download
+            save_path (str, optional): Path where the file should be saved. Defaults to a temporary file.
+            chunk_size (int, optional): Bytes read from the response at a time. Defaults to 1 MB.
+            
+        Returns:
+            str: The path of the downloaded file
+            
+        Raises:
+            requests.exceptions.RequestException: If the download fails
+        """
+        if save_path is None:
+            fd, save_path = tempfile.mkstemp(suffix=os.path.splitext(urlparse(url).path)[1])
+            os.close(fd)
+
+        # Downloaded next to save_path and renamed, so a failed download never leaves a truncated file
+        partial_path = f"{save_path}.part"
+        with requests.get(url, stream=True, timeout=60) as response:
+            response.raise_for_status()  # Raise an exception for bad status codes
+            with open(partial_path, 'wb') as f:
+                for chunk in response.iter_content(chunk_size=chunk_size):
+                    f.write(chunk)
+        os.replace(partial_path, save_path)
+        return save_path
+
     @staticmethod
     def download_file(url: str, save_path: str = None) -> bytes:
         """
@@ -19,15 +53,13 @@ class Document:
             bytes: The content of the downloaded file
         """
         try:
-            response = requests.get(url, stream=True)
-            response.raise_for_status()  # Raise an exception for bad status codes
-            content = response.content
-            
             if save_path:
-                with open(save_path, 'wb') as f:
-                    f.write(content)
+                # Streamed to disk first, the response is not held in memory next to the file content
+                return Document.read_binary_file(Document.download_to_path(url, save_path))
 
-            return response.content        
+            response = requests.get(url, timeout=60)
+            response.raise_for_status()  # Raise an exception for bad status codes
+            return response.content
             
         except requests.exceptions.RequestException as e:
             print(f"Error downloading file: {e}")
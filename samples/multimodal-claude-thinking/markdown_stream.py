@@ -0,0 +1,126 @@
+import time
+
+
+class IPythonMarkdownDisplay:
+    """Display backend for Jupyter notebooks: one updatable output per markdown block."""
+
+    def __init__(self):
+        from IPython.display import display, Markdown
+
+        self._display = display
+        self._markdown = Markdown
+
+    def new(self, markdown: str):
+        return self._display(self._markdown(markdown), display_id=True)
+
+    def update(self, handle, markdown: str) -> None:
+        handle.update(self._markdown(markdown))
+
+
+class _Section:
+    def __init__(self, name: str, header: str, wrap: str):
+        self.name = name
+        self.header = header
+        self.wrap = wrap
+        self.open = ""  # trailing block, still receiving deltas
+        self.scan_from = 0  # where to look for the next block boundary
+        self.fence_pos = 0  # code fences counted up to this position
+        self.fences = 0
+        self.handle = None
+
+
+class IncrementalMarkdownRenderer:
+    """
+    Renders a streamed reasoning + answer response as Markdown without re-rendering
+    what is already on screen.
+
+    Deltas are appended to the trailing (open) block of the current section. When a
+    block is complete (blank line outside a code fence) it is rendered one last time
+    and frozen, and a new output is started for the next block. Only the open block
+    is re-rendered, at most once every `refresh_interval` seconds, so rendering cost
+    is linear in the response length instead of quadratic.
+
+    Args:
+        display: Backend with `new(markdown) -> handle` and `update(handle, markdown)`.
+            Defaults to IPython display.
+        refresh_interval: Minimum seconds between two renders of the open block
+    """
+
+    SECTIONS = {
+        "reasoning": ("***Thinking...***", "<em>{}</em>"),
+        "answer": ("***Final Answer:***", "{}"),
+    }
+
+    def __init__(self, display=None, refresh_interval: float = 0.1, clock=time.monotonic):
+        self.display = display or IPythonMarkdownDisplay()
+        self.refresh_interval = refresh_interval
+        self.clock = clock
+        self.sections = {}
+        self.current = None
+        self.last_render = 0.0
+        self.renders = 0
+        self.rendered_chars = 0
+
+    def append(self, section: str, text: str) -> None:
+        if not text:
+            return
+        s = self._section(section)
+        s.open += text
+        self._commit_complete_blocks(s)
+
+        now = self.clock()
+        if now - self.last_render >= self.refresh_interval:
+            self._render_open(s)
+            self.last_render = now
+
+    def close(self) -> None:
+        """Render whatever is still pending. Call once the stream is over."""
+        if self.current:
+            self._render_open(self.current)
+
+    def _section(self, name: str) -> _Section:
+        if self.current and self.current.name == name:
+            return self.current
+        if self.current:
+            self._render_open(self.current)
+
+        if name not in self.sections:
+            header, wrap = self.SECTIONS[name]
+            section = _Section(name, header, wrap)
+            self._render(None, header)
+            self.sections[name] = section
+        self.current = self.sections[name]
+        return self.current
+
+    def _commit_complete_blocks(self, s: _Section) -> None:
+        idx = s.open.find("\n\n", s.scan_from)
+        while idx >= 0:
+            s.fences += s.open.count("```", s.fence_pos, idx)
+            s.fence_pos = idx
+            if s.fences % 2:
+                # inside a code block, keep it as a single block
+                s.scan_from = idx + 2
+                idx = s.open.find("\n\n", s.scan_from)
+                continue
+
+            block, s.open = s.open[:idx], s.open[idx + 2 :]
+            if block.strip():
+                s.handle = self._render(s.handle, s.wrap.format(block))
+            s.handle = None
+            s.scan_from = s.fence_pos = s.fences = 0
+            idx = s.open.find("\n\n")
+
+        # a trailing "\n" may become a boundary with the next delta
+        s.scan_from = max(s.scan_from, len(s.open) - 1)
+
+    def _render_open(self, s: _Section) -> None:
+        if s.open.strip():
+            s.handle = self._render(s.handle, s.wrap.format(s.open))
+
+    def _render(self, handle, markdown: str):
+        self.renders += 1
+        self.rendered_chars += len(markdown)
+        if handle is None:
+            return self.display.new(markdown)
+        self.display.update(handle, markdown)
+        return handle
@@ -1,105 +1,255 @@
+import hashlib
 import io
-import requests
-from PyPDF2 import PdfReader
+import json
+import os
+import weakref
+
+from pypdf import PdfReader
+from pypdf.generic import IndirectObject
 from PIL import Image
-import io
+
+from document import Document
+
+# Claude on Bedrock: up to 3.75 MB per image, and images with a long side over 1568 px are scaled down by the
+# model anyway, so larger images only cost upload time
+MAX_IMAGE_SIDE = 1568
+MAX_IMAGE_BYTES = 3_750_000
+SUPPORTED_FORMATS = ("png", "jpeg", "gif", "webp")
+CACHE_VERSION = 1
+
+
+def file_hash(file_path: str, chunk_size: int = 1 << 20) -> str:
+    """sha256 of a file, read in chunks"""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def prepare_image(image: Image.Image, data: bytes, name: str, max_side: int = MAX_IMAGE_SIDE,
+                  max_bytes: int = MAX_IMAGE_BYTES):
+    """
+    Returns (format, bytes) of an image the model accepts: the original bytes when they already fit,
+    otherwise scaled down to max_side and re-encoded (PNG for diagrams and transparency, JPEG for photos).
+    """
+    extension = name.split('.')[-1].lower()
+    if extension == 'jpg':
+        extension = 'jpeg'
+    if extension in SUPPORTED_FORMATS and max(image.size) <= max_side and len(data) <= max_bytes:
+        return extension, data
+
+    if image.mode in ("LA", "RGBA") and image.getchannel("A").getextrema()[0] == 255:
+        image = image.convert(image.mode[:-1])  # Opaque, the alpha channel is only extra bytes
+    elif image.mode not in ("1", "L", "LA", "P", "RGB", "RGBA"):
+        image = image.convert("RGB")
+    fmt = "jpeg" if extension == "jpeg" and image.mode in ("L", "RGB") else "png"
+
+    side = min(max_side, max(image.size))
+    while True:
+        scale = side / max(image.size)
+        size = (max(1, round(image.width * scale)), max(1, round(image.height * scale)))
+        # reducing_gap shrinks by whole factors first, much faster than a full Lanczos pass on a large image
+        scaled = image if size == image.size else image.resize(size, Image.LANCZOS, reducing_gap=3.0)
+        buffer = io.BytesIO()
+        if fmt == "jpeg":
+            scaled.save(buffer, format="JPEG", quality=90)
+        else:
+            scaled.save(buffer, format="PNG")
+        if buffer.tell() <= max_bytes or side <= 256:
+            return fmt, buffer.getvalue()
+        side = int(side * 0.75)
+
+
+def _remove(path: str):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
 
 class PDFDocument:
     """
     A class for reading and extracting text from PDF documents.
+
+    Pages are read lazily, only when a range of them is requested, and each page is cached on disk under
+    cache_dir, keyed by the hash of the file, so running a notebook again does not parse the PDF again.
+    Images are scaled down to the model input limits and images repeated in the document are sent once.
     """
-    def __init__(self, file_path: str,  save_path: str = None):
-        
+    def __init__(self, file_path: str, save_path: str = None, cache_dir: str = ".pdf_cache",
+                 max_image_side: int = MAX_IMAGE_SIDE, max_image_bytes: int = MAX_IMAGE_BYTES):
+
         if file_path.startswith("https"):
-            file_path = self.download_file(file_path, save_path)
+            # Streamed to disk, the PDF is never held in memory
+            downloaded_path = Document.download_to_path(file_path, save_path)
+            if save_path is None:
+                # A temporary file, removed with the document or at exit
+                weakref.finalize(self, _remove, downloaded_path)
+            file_path = downloaded_path
 
-        pdf_reader = PdfReader(file_path)
-        pages = []
+        self.file_path = file_path
+        self.max_image_side = max_image_side
+        self.max_image_bytes = max_image_bytes
+        self.file_hash = file_hash(file_path)
+        self.cache_dir = None
+        if cache_dir:
+            self.cache_dir = os.path.join(
+                cache_dir, f"{self.file_hash[:16]}-v{CACHE_VERSION}-{max_image_side}-{max_image_bytes}"
+            )
+            os.makedirs(os.path.join(self.cache_dir, "images"), exist_ok=True)
+
+        self._reader = None
+        self._pages = {}
+        self._images = {}       # image hash -> (format, bytes)
+        self._references = {}   # PDF object of an image -> image hash, to skip decoding repeated images
         print(f"Reading {file_path}...")
-        for page in pdf_reader.pages:
-            pages.append({"text": page.extract_text(), "images": page.images})
-        self.pages = pages
-
-    def image_content_block(self, pdf_image):
-        image_bytes = pdf_image.data
-        image_name = pdf_image.name
-        extension = image_name.split('.')[-1]
-        if extension == 'jpg':
-            extension = 'jpeg'
-        
-        block = { "image": { "format": extension, "source": { "bytes": image_bytes}}}
+
+    @property
+    def reader(self) -> PdfReader:
+        if self._reader is None:
+            self._reader = PdfReader(self.file_path)
+        return self._reader
+
+    def __len__(self):
+        return len(self.reader.pages)
+
+    def _page_range(self, first_page, last_page):
+        last_page = len(self) if last_page is None else min(last_page, len(self))
+        return range(max(first_page, 1), last_page + 1)
+
+    # Cache
+
+    def _page_path(self, page_number):
+        return os.path.join(self.cache_dir, f"page-{page_number}.json")
+
+    def _image_path(self, image_hash, fmt):
+        return os.path.join(self.cache_dir, "images", f"{image_hash}.{fmt}")
+
+    def _write(self, path, data: bytes):
+        # Written next to the final path and renamed, so an interrupted run never leaves a partial entry
+        with open(f"{path}.tmp", "wb") as f:
+            f.write(data)
+        os.replace(f"{path}.tmp", path)
+
+    def _load_page(self, page_number):
+        if not self.cache_dir or not os.path.exists(self._page_path(page_number)):
+            return None
+        with open(self._page_path(page_number)) as f:
+            page = json.load(f)
+        for image in page["images"]:
+            if image["hash"] not in self._images and not os.path.exists(self._image_path(image["hash"], image["format"])):
+                return None
+            self._images.setdefault(image["hash"], (image["format"], None))
+        return page
+
+    # Extraction
+
+    def _extract_image_hashes(self, pdf_page):
+        hashes = []
+        for key in pdf_page.images.keys():
+            reference = None
+            if isinstance(key, str):
+                raw = pdf_page["/Resources"]["/XObject"].raw_get(key)
+                if isinstance(raw, IndirectObject):
+                    reference = (raw.idnum, raw.generation)
+            if reference in self._references:
+                hashes.append(self._references[reference])
+                continue
+
+            pdf_image = pdf_page.images[key]
+            image_hash = hashlib.sha256(pdf_image.data).hexdigest()
+            if image_hash not in self._images:
+                fmt, data = prepare_image(pdf_image.image, pdf_image.data, pdf_image.name,
+                                          self.max_image_side, self.max_image_bytes)
+                self._images[image_hash] = (fmt, data)
+                if self.cache_dir:
+                    self._write(self._image_path(image_hash, fmt), data)
+            if reference is not None:
+                self._references[reference] = image_hash
+            hashes.append(image_hash)
+        return hashes
+
+    def page(self, page_number: int) -> dict:
+        """
+        Text and images of a page (1 based): {"text": str, "images": [{"hash": str, "format": str}]}
+        """
+        if page_number in self._pages:
+            return self._pages[page_number]
+
+        page = self._load_page(page_number)
+        if page is None:
+            pdf_page = self.reader.pages[page_number - 1]
+            hashes = self._extract_image_hashes(pdf_page)
+            page = {
+                "text": pdf_page.extract_text(),
+                "images": [{"hash": h, "format": self._images[h][0]} for h in hashes],
+            }
+            if self.cache_dir:
+                self._write(self._page_path(page_number), json.dumps(page).encode("utf-8"))
+
+        self._pages[page_number] = page
+        return page
+
+    def image_bytes(self, image_hash):
+        fmt, data = self._images[image_hash]
+        if data is None:
+            data = Document.read_binary_file(self._image_path(image_hash, fmt))
+            self._images[image_hash] = (fmt, data)
+        return fmt, data
+
+    def _unique_images(self, first_page, last_page):
+        """(page number, image hash) of the images in the range, each image only where it first appears"""
+        seen = set()
+        for page_number in self._page_range(first_page, last_page):
+            for image in self.page(page_number)["images"]:
+                if image["hash"] not in seen:
+                    seen.add(image["hash"])
+                    yield page_number, image["hash"]
+
+    # Content blocks
+
+    def image_content_block(self, image_hash):
+        fmt, data = self.image_bytes(image_hash)
+        block = { "image": { "format": fmt, "source": { "bytes": data}}}
         return block
 
     def text_content_block(self, text):
         return { "text": text }
 
-    def get_content_blocks(self):
+    def get_content_blocks(self, first_page: int = 1, last_page: int = None):
         content = []
         current_text = ""
+        images_by_page = {}
+        for page_number, image_hash in self._unique_images(first_page, last_page):
+            images_by_page.setdefault(page_number, []).append(image_hash)
 
-        for page_num,p in enumerate(self.pages):
-            page_images = p['images']
-            page_text   = p['text']
-            if len(page_images) == 0: # Pagina no contiene imagenes.
-                current_text += f"PAGE {page_num+1}\n\n {page_text}\n"
-            else: # hay imagenes
-                current_text += f"PAGE {page_num+1}\n\n {page_text}\n"
+        for page_num in self._page_range(first_page, last_page):
+            page_images = images_by_page.get(page_num, [])
+            page_text   = self.page(page_num)['text']
+            current_text += f"PAGE {page_num}\n\n {page_text}\n"
+            if len(page_images) > 0: # hay imagenes que no se enviaron antes
                 content.append(self.text_content_block(current_text))
                 current_text = ""
-                for image in page_images:
-                    content.append(self.image_content_block(image))
-                    #content.append(text_content_block("IMAGE"))
+                for image_hash in page_images:
+                    content.append(self.image_content_block(image_hash))
 
         if current_text != "":
             content.append(self.text_content_block(current_text))
 
         return content
 
-    def show_images(self):
-
-        for page_number, page in enumerate(self.pages):
-            for image in page['images']:
-                image_bytes = image.data
-                image_name = image.name
-                image = Image.open(io.BytesIO(image_bytes))
-                print(f"Page {page_number +1}: {image_name}")
-                display(image)
-    
-    def get_images(self):
-        
+    def show_images(self, first_page: int = 1, last_page: int = None):
+
+        for page_number, image_hash in self._unique_images(first_page, last_page):
+            fmt, image_bytes = self.image_bytes(image_hash)
+            image = Image.open(io.BytesIO(image_bytes))
+            print(f"Page {page_number}: {image_hash[:12]}.{fmt}")
+            display(image)
+
+    def get_images(self, first_page: int = 1, last_page: int = None):
+
         images = []
-        for page_number, page in enumerate(self.pages):
-            for image in page['images']:
-                image_bytes = image.data
-                image_name = image.name
-                image = Image.open(io.BytesIO(image_bytes))
-                images.append(image)
+        for _, image_hash in self._unique_images(first_page, last_page):
+            _, image_bytes = self.image_bytes(image_hash)
+            images.append(Image.open(io.BytesIO(image_bytes)))
         return images
-    
-
-    def download_file(self, url: str, save_path: str = None) -> bytes:
-        """
-        Download a file from a URL and optionally save it to a specified path.
-        
-        Args:
-            url (str): The URL of the file to download
-            save_path (str, optional): Path where the file should be saved. Defaults to None.
-            
-        Returns:
-            bytes: The content of the downloaded file
-        """
-        try:
-            response = requests.get(url, stream=True)
-            response.raise_for_status()  # Raise an exception for bad status codes
-            content = response.content
-            
-            if save_path:
-                with open(save_path, 'wb') as f:
-                    f.write(content)
-
-            return response.content        
-            
-        except requests.exceptions.RequestException as e:
-            print(f"Error downloading file: {e}")
-            return b''
-    
\ No newline at end of file
@@ -0,0 +1,114 @@
+from conversation_manager import CHARS_PER_TOKEN, ConversationManager
+
+TURN_TEXT = "x" * (100 * CHARS_PER_TOKEN)  # about 100 tokens
+
+
+def text(value):
+    return [{"text": value}]
+
+
+def image():
+    return {"image": {"format": "png", "source": {"bytes": b"not an image"}}}
+
+
+def tool_exchange(manager, question):
+    """A turn in which the assistant calls a tool before answering"""
+    manager.messages.extend([
+        {"role": "user", "content": text(question)},
+        {"role": "assistant", "content": [{"toolUse": {"toolUseId": question, "name": "search", "input": {}}}]},
+        {"role": "user", "content": [{"toolResult": {"toolUseId": question, "content": text(TURN_TEXT)}}]},
+        {"role": "assistant", "content": text(TURN_TEXT)},
+    ])
+
+
+def assert_well_formed(messages):
+    assert messages[0]["role"] == "user"
+    assert not any("toolResult" in block for block in messages[0]["content"])
+    for previous, message in zip(messages, messages[1:]):
+        assert previous["role"] != message["role"]
+    for i, message in enumerate(messages):
+        for block in message["content"]:
+            if "toolResult" in block:
+                tool_use = messages[i - 1]["content"]
+                assert any(b.get("toolUse", {}).get("toolUseId") == block["toolResult"]["toolUseId"] for b in tool_use)
+    assert messages[-1]["role"] == "user"
+
+
+def test_no_trimming_without_budget():
+    manager = ConversationManager()
+    for i in range(20):
+        manager.add_turn(text(f"{i} {TURN_TEXT}"), TURN_TEXT)
+
+    messages = manager.build(text("next"))
+    assert len(messages) == 41
+    assert_well_formed(messages)
+
+
+def test_oldest_turns_are_dropped_whole():
+    manager = ConversationManager(max_tokens=1000)
+    for i in range(20):
+        manager.add_turn(text(f"{i} {TURN_TEXT}"), TURN_TEXT)
+
+    messages = manager.build(text("next"))
+
+    assert_well_formed(messages)
+    assert sum(manager.message_tokens(m) for m in messages) <= 1000
+    # the most recent turns are kept, the summary notes the others
+    assert messages[-3]["content"][-1]["text"].startswith("19 ")
+    assert "earlier turns omitted" in messages[0]["content"][0]["text"]
+
+
+def test_tool_exchanges_are_never_split():
+    for budget in range(100, 2000, 50):
+        manager = ConversationManager(max_tokens=budget)
+        for i in range(6):
+            tool_exchange(manager, f"q{i}")
+            manager.add_turn(text(f"plain {i}"), TURN_TEXT)
+
+        messages = manager.build(text("next"))
+
+        assert_well_formed(messages)
+        assert manager.messages == [] or manager._starts_turn(manager.messages[0])
+
+
+def test_summarizer_receives_whole_turns():
+    received = []
+
+    def summarizer(messages):
+        received.append(messages)
+        return "they talked about tools"
+
+    manager = ConversationManager(max_tokens=600, summarizer=summarizer)
+    for i in range(4):
+        tool_exchange(manager, f"q{i}")
+
+    messages = manager.build(text("next"))
+
+    assert_well_formed(messages)
+    assert len(received[0]) % 4 == 0
+    assert messages[0]["content"][0]["text"].endswith("they talked about tools")
+
+
+def test_media_of_older_turns_is_referenced_first():
+    # an image that can not be decoded counts as the largest one, 1600 tokens
+    manager = ConversationManager(max_tokens=2000, keep_media_turns=1)
+    manager.add_turn([image(), *text("what is this?")], "a chart")
+    manager.add_turn([image(), *text("and this one?")], "a table")
+
+    messages = manager.build(text("compare them"))
+
+    assert len(messages) == 5
+    assert messages[0]["content"][0] == {"text": "[an image was shared earlier and already analyzed]"}
+    assert "image" in messages[2]["content"][0]
+    assert_well_formed(messages)
+
+
+def test_a_turn_larger_than_the_budget_leaves_only_the_new_message():
+    manager = ConversationManager(max_tokens=50)
+    manager.add_turn(text(TURN_TEXT), TURN_TEXT)
+
+    messages = manager.build(text("next"))
+
+    assert len(messages) == 1
+    assert messages[0]["content"][-1] == {"text": "next"}
+    assert_well_formed(messages)
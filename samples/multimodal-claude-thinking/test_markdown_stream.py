@@ -0,0 +1,126 @@
+from itertools import combinations
+
+from markdown_stream import IncrementalMarkdownRenderer
+
+ANSWER = """The results by model:
+
+| model | score |
+|-------|-------|
+| small | 0.71 |
+| large | 0.84 |
+
+```python
+def score(model):
+
+    return evaluate(model)
+```
+
+The large model is better."""
+
+
+class FakeDisplay:
+    """Keeps the last markdown of every output, in display order"""
+
+    def __init__(self):
+        self.outputs = []
+
+    def new(self, markdown):
+        self.outputs.append(markdown)
+        return len(self.outputs) - 1
+
+    def update(self, handle, markdown):
+        self.outputs[handle] = markdown
+
+
+def render(deltas, section="answer"):
+    display = FakeDisplay()
+    renderer = IncrementalMarkdownRenderer(display, refresh_interval=0)
+    for delta in deltas:
+        renderer.append(section, delta)
+    renderer.close()
+    return display.outputs
+
+
+def split(text, points):
+    bounds = [0, *points, len(text)]
+    return [text[start:end] for start, end in zip(bounds, bounds[1:])]
+
+
+def test_blocks():
+    outputs = render([ANSWER])
+
+    assert outputs[0] == "***Final Answer:***"
+    assert outputs[1] == "The results by model:"
+    # the table has no blank line, it stays one block
+    assert outputs[2].startswith("| model | score |") and outputs[2].endswith("| large | 0.84 |")
+    # the blank line inside the code fence does not split it
+    assert outputs[3].startswith("```python") and outputs[3].endswith("```")
+    assert outputs[4] == "The large model is better."
+    assert len(outputs) == 5
+
+
+def test_every_split_point_renders_the_same():
+    expected = render([ANSWER])
+
+    # every split in two, e.g. inside a fence "``" + "`python", a table row or a "\n" + "\n" boundary
+    for point in range(1, len(ANSWER)):
+        assert render(split(ANSWER, [point])) == expected, point
+
+
+def test_split_around_the_fences_and_the_table():
+    expected = render([ANSWER])
+    fence = ANSWER.index("```python")
+    closing = ANSWER.rindex("```")
+    row = ANSWER.index("| small")
+    points = range(min(fence, row) - 2, closing + 4)
+
+    for first, second in combinations(points, 2):
+        assert render(split(ANSWER, [first, second])) == expected, (first, second)
+
+
+def test_character_deltas():
+    assert render(list(ANSWER)) == render([ANSWER])
+
+
+def test_open_fence_is_rendered_while_streaming():
+    display = FakeDisplay()
+    renderer = IncrementalMarkdownRenderer(display, refresh_interval=0)
+    renderer.append("answer", "```python\ndef score(model):\n\n")
+
+    # still inside the fence: the blank line is not a block boundary
+    assert display.outputs[-1] == "```python\ndef score(model):\n\n"
+
+    renderer.append("answer", "    return 1\n```\n\nDone")
+    renderer.close()
+    assert display.outputs[1:] == ["```python\ndef score(model):\n\n    return 1\n```", "Done"]
+
+
+def test_sections():
+    display = FakeDisplay()
+    renderer = IncrementalMarkdownRenderer(display, refresh_interval=0)
+    renderer.append("reasoning", "Compare the two\n")
+    renderer.append("reasoning", "\nscores")
+    renderer.append("answer", "Large")
+    renderer.close()
+
+    assert display.outputs == [
+        "***Thinking...***",
+        "<em>Compare the two</em>",
+        "<em>scores</em>",
+        "***Final Answer:***",
+        "Large",
+    ]
+
+
+def test_refresh_interval_limits_renders():
+    now = [0.0]
+    display = FakeDisplay()
+    renderer = IncrementalMarkdownRenderer(display, refresh_interval=1, clock=lambda: now[0])
+    renderer.append("answer", "x")  # header and first render
+    for _ in range(100):
+        now[0] += 0.01
+        renderer.append("answer", "x")
+    renderer.close()
+
+    assert display.outputs[-1] == "x" * 101
+    assert renderer.renders <= 4
@@ -0,0 +1,362 @@
+"""
+Audio capture and playback for Nova Sonic without blocking the asyncio loop.
+
+The audio devices run in their own threads (PyAudio callbacks, or the threads of a file backend) and exchange
+audio with the loop through bounded ring buffers:
+
+- Capture: the device thread writes every block it records into a ring buffer and wakes the loop, which reads
+  chunks to send. If the loop falls behind, the oldest audio is dropped instead of growing a queue.
+- Playback: the model audio is written into a jitter buffer that the device thread pulls from. Playback starts
+  once `prefill_ms` of audio are buffered, underruns are filled with silence, and a barge-in flushes the audio
+  still queued so the assistant stops talking as soon as the user interrupts it.
+
+Backends implement open_input / open_output / close. PyAudioBackend uses the microphone and speakers;
+ThreadedBackend subclasses such as WavBackend replace them with any audio source and sink for headless runs.
+"""
+
+import asyncio
+import threading
+import time
+import wave
+
+
+SAMPLE_WIDTH = 2  # 16 bit PCM
+
+
+class RingBuffer:
+    """Thread safe byte ring buffer of a fixed capacity; writing to a full buffer drops the oldest bytes"""
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.dropped = 0
+        self._buffer = bytearray(capacity)
+        self._start = 0
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return self._size
+
+    def free(self):
+        return self.capacity - self._size
+
+    def write(self, data):
+        data = memoryview(data)
+        with self._lock:
+            if len(data) > self.capacity:
+                self.dropped += len(data) - self.capacity
+                data = data[-self.capacity:]
+
+            overflow = self._size + len(data) - self.capacity
+            if overflow > 0:
+                self.dropped += overflow
+                self._start = (self._start + overflow) % self.capacity
+                self._size -= overflow
+
+            end = (self._start + self._size) % self.capacity
+            first = min(len(data), self.capacity - end)
+            self._buffer[end:end + first] = data[:first]
+            self._buffer[:len(data) - first] = data[first:]
+            self._size += len(data)
+
+    def read(self, n):
+        """Up to n bytes, the oldest first"""
+        with self._lock:
+            n = min(n, self._size)
+            first = min(n, self.capacity - self._start)
+            data = bytes(self._buffer[self._start:self._start + first]) + bytes(self._buffer[:n - first])
+            self._start = (self._start + n) % self.capacity
+            self._size -= n
+            return data
+
+    def clear(self):
+        """Discard the buffered bytes, returns how many there were"""
+        with self._lock:
+            size, self._size, self._start = self._size, 0, 0
+            return size
+
+
+class JitterBuffer:
+    """
+    Playback buffer: holds back the audio until `prefill` bytes are buffered, so that the network jitter of the
+    model responses does not turn into gaps, and pads underruns with silence.
+    """
+
+    def __init__(self, capacity, prefill):
+        self.ring = RingBuffer(capacity)
+        self.prefill = prefill
+        self.underruns = 0
+        self.flushed = 0
+        self._playing = False
+
+    def __len__(self):
+        return len(self.ring)
+
+    def free(self):
+        return self.ring.free()
+
+    def write(self, data):
+        self.ring.write(data)
+
+    def pull(self, n):
+        """Exactly n bytes for the device, silence while prefilling or on underrun"""
+        if not self._playing:
+            if len(self.ring) < self.prefill:
+                return bytes(n)
+            self._playing = True
+
+        data = self.ring.read(n)
+        if len(data) < n:
+            self.underruns += 1
+            self._playing = False
+            data += bytes(n - len(data))
+        return data
+
+    def flush(self):
+        self._playing = False
+        flushed = self.ring.clear()
+        self.flushed += flushed
+        return flushed
+
+
+class AudioBackend:
+    """
+    Audio devices. Both directions are driven by the backend threads:
+    - open_input calls on_audio(bytes) with every block recorded
+    - open_output calls pull(n_bytes) for every block to play, which returns exactly n_bytes
+    """
+
+    def open_input(self, rate, frames_per_buffer, on_audio):
+        raise NotImplementedError
+
+    def open_output(self, rate, frames_per_buffer, pull):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class PyAudioBackend(AudioBackend):
+    """Microphone and speakers through PyAudio streams in callback mode (PortAudio threads)"""
+
+    def __init__(self):
+        import pyaudio  # have brew install portaudio
+
+        self._pyaudio = pyaudio
+        self._audio = pyaudio.PyAudio()
+        self._streams = []
+
+    def _open(self, rate, frames_per_buffer, callback, **kwargs):
+        stream = self._audio.open(
+            format=self._pyaudio.paInt16,
+            channels=1,
+            rate=rate,
+            frames_per_buffer=frames_per_buffer,
+            stream_callback=callback,
+            **kwargs
+        )
+        self._streams.append(stream)
+        stream.start_stream()
+
+    def open_input(self, rate, frames_per_buffer, on_audio):
+        def callback(in_data, frame_count, time_info, status):
+            on_audio(in_data)
+            return None, self._pyaudio.paContinue
+
+        self._open(rate, frames_per_buffer, callback, input=True)
+
+    def open_output(self, rate, frames_per_buffer, pull):
+        def callback(in_data, frame_count, time_info, status):
+            return pull(frame_count * SAMPLE_WIDTH), self._pyaudio.paContinue
+
+        self._open(rate, frames_per_buffer, callback, output=True)
+
+    def close(self):
+        for stream in self._streams:
+            stream.stop_stream()
+            stream.close()
+        self._streams = []
+        self._audio.terminate()
+
+
+class ThreadedBackend(AudioBackend):
+    """
+    A backend whose devices are threads paced at the sample rate (or as fast as possible with realtime=False).
+    Subclasses provide the recorded audio (read_input) and receive the audio played (write_output).
+    """
+
+    def __init__(self, realtime=True):
+        self.realtime = realtime
+        self._stop = threading.Event()
+        self._threads = []
+
+    def read_input(self, n_bytes):
+        """The next block recorded, None when there is no more audio"""
+        raise NotImplementedError
+
+    def write_output(self, data):
+        pass
+
+    def _start(self, target, *args):
+        thread = threading.Thread(target=target, args=args, daemon=True)
+        self._threads.append(thread)
+        thread.start()
+
+    def _paced(self, rate, frames_per_buffer, step):
+        period = frames_per_buffer / rate
+        deadline = time.monotonic()
+        while not self._stop.is_set():
+            if self.realtime:
+                deadline += period
+                delay = deadline - time.monotonic()
+                if delay > 0:
+                    self._stop.wait(delay)
+            if step() is False:
+                return
+
+    def open_input(self, rate, frames_per_buffer, on_audio):
+        def step():
+            data = self.read_input(frames_per_buffer * SAMPLE_WIDTH)
+            if data is None:
+                return False
+            on_audio(data)
+
+        self._start(self._paced, rate, frames_per_buffer, step)
+
+    def open_output(self, rate, frames_per_buffer, pull):
+        self._start(self._paced, rate, frames_per_buffer,
+                    lambda: self.write_output(pull(frames_per_buffer * SAMPLE_WIDTH)))
+
+    def close(self):
+        self._stop.set()
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+
+
+class WavBackend(ThreadedBackend):
+    """
+    Headless audio: the microphone plays a 16 bit mono WAV file (followed by `trailing_silence` seconds of
+    silence, so the model detects the end of the turn) and the speakers are recorded into another WAV file.
+    """
+
+    def __init__(self, input_path=None, output_path=None, realtime=True, trailing_silence=3.0):
+        super().__init__(realtime)
+        self.input_path = input_path
+        self.output_path = output_path
+        self.trailing_silence = trailing_silence
+        self._input = None
+        self._output = None
+        self._silence_left = 0
+
+    def open_input(self, rate, frames_per_buffer, on_audio):
+        self._input = wave.open(self.input_path, "rb")
+        if self._input.getsampwidth() != SAMPLE_WIDTH or self._input.getnchannels() != 1 \
+                or self._input.getframerate() != rate:
+            raise ValueError(f"{self.input_path} must be 16 bit mono PCM at {rate} Hz")
+        self._silence_left = int(self.trailing_silence * rate) * SAMPLE_WIDTH
+        super().open_input(rate, frames_per_buffer, on_audio)
+
+    def read_input(self, n_bytes):
+        data = self._input.readframes(n_bytes // SAMPLE_WIDTH)
+        if len(data) < n_bytes and self._silence_left > 0:
+            padding = min(n_bytes - len(data), self._silence_left)
+            self._silence_left -= padding
+            data += bytes(padding)
+        return data or None
+
+    def open_output(self, rate, frames_per_buffer, pull):
+        if self.output_path:
+            self._output = wave.open(self.output_path, "wb")
+            self._output.setnchannels(1)
+            self._output.setsampwidth(SAMPLE_WIDTH)
+            self._output.setframerate(rate)
+        super().open_output(rate, frames_per_buffer, pull)
+
+    def write_output(self, data):
+        if self._output:
+            self._output.writeframes(data)
+
+    def close(self):
+        super().close()
+        for file in (self._input, self._output):
+            if file:
+                file.close()
+
+
+class AudioEngine:
+    """
+    Bridges an AudioBackend and the asyncio loop.
+
+    @param capture_seconds: audio kept while the loop does not read it, older audio is dropped
+    @param playback_seconds: model audio buffered ahead of the speakers, play() waits when it is full
+    @param prefill_ms: audio buffered before playback starts (jitter buffer)
+    """
+
+    def __init__(self, backend, input_rate=16000, output_rate=24000, frames_per_buffer=1024,
+                 capture_seconds=2.0, playback_seconds=30.0, prefill_ms=100):
+        self.backend = backend
+        self.input_rate = input_rate
+        self.output_rate = output_rate
+        self.frames_per_buffer = frames_per_buffer
+        self.chunk_bytes = frames_per_buffer * SAMPLE_WIDTH
+
+        self.capture = RingBuffer(int(capture_seconds * input_rate) * SAMPLE_WIDTH)
+        self.playback = JitterBuffer(
+            int(playback_seconds * output_rate) * SAMPLE_WIDTH,
+            int(prefill_ms / 1000 * output_rate) * SAMPLE_WIDTH,
+        )
+
+        self._loop = None
+        self._input_ready = asyncio.Event()
+        self._space_ready = asyncio.Event()
+
+    def _notify(self, event):
+        try:
+            self._loop.call_soon_threadsafe(event.set)
+        except RuntimeError:  # The loop is closed
+            pass
+
+    # Capture
+
+    def _on_input(self, data):
+        self.capture.write(data)
+        self._notify(self._input_ready)
+
+    def start_input(self):
+        self._loop = asyncio.get_running_loop()
+        self.backend.open_input(self.input_rate, self.frames_per_buffer, self._on_input)
+
+    async def read_input(self):
+        """The next chunk recorded, without blocking the loop"""
+        while len(self.capture) < self.chunk_bytes:
+            self._input_ready.clear()
+            if len(self.capture) >= self.chunk_bytes:
+                break
+            await self._input_ready.wait()
+        return self.capture.read(self.chunk_bytes)
+
+    # Playback
+
+    def _pull_output(self, n):
+        data = self.playback.pull(n)
+        self._notify(self._space_ready)
+        return data
+
+    def start_output(self):
+        self._loop = asyncio.get_running_loop()
+        self.backend.open_output(self.output_rate, self.frames_per_buffer, self._pull_output)
+
+    async def play(self, data):
+        """Queue model audio; waits while the playback buffer is full instead of growing without limit"""
+        while self.playback.free() < min(len(data), self.playback.ring.capacity):
+            self._space_ready.clear()
+            await self._space_ready.wait()
+        self.playback.write(data)
+
+    def barge_in(self):
+        """The user interrupted the assistant: drop the audio not played yet"""
+        return self.playback.flush()
+
+    def close(self):
+        self.backend.close()
@@ -0,0 +1,50 @@
+from aws_sdk_bedrock_runtime.client import BedrockRuntimeClient, InvokeModelWithBidirectionalStreamOperationInput
+from aws_sdk_bedrock_runtime.models import InvokeModelWithBidirectionalStreamInputChunk, BidirectionalInputPayloadPart
+from aws_sdk_bedrock_runtime.config import Config, HTTPAuthSchemeResolver, SigV4AuthScheme
+from smithy_aws_core.credentials_resolvers.environment import EnvironmentCredentialsResolver
+
+
+class BedrockStreamTransport:
+    """
+    The bidirectional stream of InvokeModelWithBidirectionalStream. SimpleNovaSonic only sends and receives
+    serialized events through it, any object with the same methods (e.g. a fake stream) can replace it.
+    """
+
+    def __init__(self, model_id, region):
+        self.model_id = model_id
+        self.region = region
+        self.client = None
+        self.stream = None
+
+    def _initialize_client(self):
+        """Initialize the Bedrock client."""
+        config = Config(
+            endpoint_uri=f"https://bedrock-runtime.{self.region}.amazonaws.com",
+            region=self.region,
+            aws_credentials_identity_resolver=EnvironmentCredentialsResolver(),
+            http_auth_scheme_resolver=HTTPAuthSchemeResolver(),
+            http_auth_schemes={"aws.auth#sigv4": SigV4AuthScheme()}
+        )
+        self.client = BedrockRuntimeClient(config=config)
+
+    async def open(self):
+        if not self.client:
+            self._initialize_client()
+        self.stream = await self.client.invoke_model_with_bidirectional_stream(
+            InvokeModelWithBidirectionalStreamOperationInput(model_id=self.model_id)
+        )
+
+    async def send(self, event_bytes):
+        event = InvokeModelWithBidirectionalStreamInputChunk(value=BidirectionalInputPayloadPart(bytes_=event_bytes))
+        await self.stream.input_stream.send(event)
+
+    async def receive(self):
+        """The bytes of the next output event, None for an empty one"""
+        output = await self.stream.await_output()
+        result = await output[1].receive()
+        if result.value and result.value.bytes_:
+            return result.value.bytes_
+        return None
+
+    async def close(self):
+        await self.stream.input_stream.close()
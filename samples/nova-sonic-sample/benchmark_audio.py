@@ -0,0 +1,305 @@
+"""
+Round-trip audio latency of SimpleNovaSonic against a fake bidirectional stream, headless.
+
+Every recorded chunk carries a sequence number. The fake model answers each chunk with an audio chunk that
+carries the same number, after a model latency with some jitter, and the round trip is measured from the moment
+the chunk was recorded to the moment its answer reaches the speakers. Two scenarios, for the audio engine and for
+the original loops (blocking PyAudio reads and writes inside the asyncio loop, unbounded queue, f-string events):
+
+- echo: the user talks for `--seconds`, every chunk is answered
+- barge-in: the model answers with a long response sent as a burst, the user interrupts it and the model sends
+  { "interrupted" : true }; it reports for how long the assistant kept talking once the user started to speak
+
+    python benchmark_audio.py --seconds 8 --model-latency 0.15 --jitter 0.05
+"""
+
+import argparse
+import asyncio
+import base64
+import json
+import random
+import statistics
+import struct
+import threading
+import time
+
+from audio_io import SAMPLE_WIDTH, ThreadedBackend
+from nova_sonic_class import CHUNK_SIZE, INPUT_SAMPLE_RATE, OUTPUT_SAMPLE_RATE, SimpleNovaSonic
+from sonic_events import EventTemplates
+
+MAGIC = b"\xa5SEQ"
+ANSWER_BASE = 1_000_000
+INTERRUPT_BASE = 2_000_000
+ECHO_BYTES = CHUNK_SIZE * OUTPUT_SAMPLE_RATE // INPUT_SAMPLE_RATE * SAMPLE_WIDTH
+
+
+def tagged_chunk(seq, n_bytes):
+    return MAGIC + struct.pack("<I", seq) + bytes(n_bytes - 8)
+
+
+class Probe:
+    """Recording and playback times of the tagged chunks"""
+
+    def __init__(self):
+        self.recorded = {}
+        self.played = {}
+        self._tail = b""
+        self._lock = threading.Lock()
+
+    def record(self, seq, at):
+        self.recorded[seq] = at
+
+    def play(self, data, at):
+        with self._lock:
+            buffer = self._tail + data
+            index = buffer.find(MAGIC)
+            while index != -1 and index + 8 <= len(buffer):
+                seq = struct.unpack("<I", buffer[index + 4:index + 8])[0]
+                self.played.setdefault(seq, at)
+                index = buffer.find(MAGIC, index + 8)
+            self._tail = buffer[-7:]
+
+
+class Script:
+    """What the user says: speech chunks, then silence, then (barge-in) an interruption at `interrupt_at`"""
+
+    def __init__(self, speech_seconds, interrupt_at=None):
+        self.speech_chunks = int(speech_seconds * INPUT_SAMPLE_RATE / CHUNK_SIZE)
+        self.interrupt_at = interrupt_at
+        self.start = time.perf_counter()
+        self.count = 0
+
+    def next_chunk(self, n_bytes, probe, recorded_at):
+        if self.count < self.speech_chunks:
+            seq = self.count
+        elif self.interrupt_at is not None and recorded_at - self.start >= self.interrupt_at:
+            seq = INTERRUPT_BASE + self.count
+        else:
+            self.count += 1
+            return bytes(n_bytes)
+        self.count += 1
+        probe.record(seq, recorded_at)
+        return tagged_chunk(seq, n_bytes)
+
+
+class ProbeBackend(ThreadedBackend):
+    """Microphone playing the script and speakers feeding the probe, in real time"""
+
+    def __init__(self, script, probe):
+        super().__init__(realtime=True)
+        self.script = script
+        self.probe = probe
+
+    def read_input(self, n_bytes):
+        return self.script.next_chunk(n_bytes, self.probe, time.perf_counter())
+
+    def write_output(self, data):
+        self.probe.play(data, time.perf_counter())
+
+
+class FakeSonicStream:
+    """
+    Bidirectional stream of a fake model. echo: every tagged input chunk is answered with a chunk with the same
+    number. answer: once the speech ended, a long answer is sent at once; an interruption chunk stops it.
+    """
+
+    def __init__(self, mode, model_latency, jitter, answer_seconds=6.0):
+        self.mode = mode
+        self.model_latency = model_latency
+        self.jitter = jitter
+        self.answer_chunks = int(answer_seconds * OUTPUT_SAMPLE_RATE / CHUNK_SIZE)
+        self.output = asyncio.Queue()
+        self.interrupt_sent_at = None
+        self.recorded_speech = []
+        self._due = 0.0
+        self._answered = False
+        self._interrupted = False
+        self._random = random.Random(0)
+
+    async def open(self):
+        self._loop = asyncio.get_running_loop()
+
+    def _emit(self, event, delay):
+        data = json.dumps({"event": event}).encode()
+        # Answers keep their order, as on a real stream
+        self._due = max(self._due, self._loop.time() + delay)
+        self._loop.call_at(self._due, self.output.put_nowait, data)
+
+    def _audio(self, seq, n_bytes=CHUNK_SIZE * SAMPLE_WIDTH):
+        return {"audioOutput": {"content": base64.b64encode(tagged_chunk(seq, n_bytes)).decode()}}
+
+    def _latency(self):
+        return max(0.0, self.model_latency + self._random.uniform(-self.jitter, self.jitter))
+
+    async def send(self, event_bytes):
+        if b'"audioInput"' not in event_bytes:
+            return
+        content = json.loads(event_bytes)["event"]["audioInput"]["content"]
+        chunk = base64.b64decode(content)
+        if not chunk.startswith(MAGIC):
+            if self.mode == "answer" and not self._answered and len(self.recorded_speech) > 0:
+                self._answered = True
+                self._emit({"contentStart": {"role": "ASSISTANT"}}, self._latency())
+                for i in range(self.answer_chunks):
+                    self._emit(self._audio(ANSWER_BASE + i), 0.002)
+            return
+
+        seq = struct.unpack("<I", chunk[4:8])[0]
+        if self.mode == "echo":
+            # As long as the chunk recorded, so the answers are a continuous stream
+            self._emit(self._audio(seq, ECHO_BYTES), self._latency())
+        elif seq >= INTERRUPT_BASE and not self._interrupted:
+            self._interrupted = True
+            self.interrupt_sent_at = time.perf_counter()
+            self.output.put_nowait(json.dumps({"event": {"textOutput": {"content": '{ "interrupted" : true }'}}})
+                                   .encode())
+        else:
+            self.recorded_speech.append(seq)
+
+    async def receive(self):
+        return await self.output.get()
+
+    async def close(self):
+        pass
+
+
+def legacy_audio_event(prompt_name, audio_content_name, audio_bytes):
+    blob = base64.b64encode(audio_bytes)
+    return f'''
+        {{
+            "event": {{
+                "audioInput": {{
+                    "promptName": "{prompt_name}",
+                    "contentName": "{audio_content_name}",
+                    "content": "{blob.decode('utf-8')}"
+                }}
+            }}
+        }}
+        '''
+
+
+class LegacyNovaSonic(SimpleNovaSonic):
+    """The original loops: blocking device calls inside the loop, unbounded queue, f-string audio events"""
+
+    def __init__(self, script, probe, transport):
+        super().__init__(audio_backend=ProbeBackend(script, probe), transport=transport)
+        self.script = script
+        self.probe = probe
+        self.audio_queue = asyncio.Queue()
+        self.max_queued = 0
+        self.gaps = 0
+        self._record_deadline = time.perf_counter()
+        self._play_end = time.perf_counter()
+
+    def _blocking_read(self):
+        """stream.read: blocks until the next block is recorded, returns at once if it already was"""
+        self._record_deadline += CHUNK_SIZE / INPUT_SAMPLE_RATE
+        delay = self._record_deadline - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        # A late read returns audio recorded earlier
+        return self.script.next_chunk(CHUNK_SIZE * SAMPLE_WIDTH, self.probe, self._record_deadline)
+
+    def _blocking_write(self, data):
+        """stream.write: blocks while the previous block is playing"""
+        delay = self._play_end - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        elif delay < -0.005:
+            self.gaps += 1  # The speakers ran out of audio
+        start = time.perf_counter()
+        self.probe.play(data, start)
+        self._play_end = start + len(data) / SAMPLE_WIDTH / OUTPUT_SAMPLE_RATE
+
+    async def capture_audio(self):
+        await self.start_audio_input()
+        while self.is_active:
+            audio_data = self._blocking_read()
+            await self.send_audio_chunk(audio_data)
+            await asyncio.sleep(0.01)
+
+    async def play_audio(self):
+        while self.is_active:
+            audio_data = await self.audio_queue.get()
+            self._blocking_write(audio_data)
+
+    async def send_audio_chunk(self, audio_bytes):
+        await self.send_event(legacy_audio_event(self.prompt_name, self.audio_content_name, audio_bytes))
+
+    async def _process_responses(self):
+        while self.is_active:
+            event = json.loads(await self.transport.receive())["event"]
+            if "audioOutput" in event:
+                await self.audio_queue.put(base64.b64decode(event["audioOutput"]["content"]))
+                self.max_queued = max(self.max_queued, sum(len(item) for item in self.audio_queue._queue))
+
+
+async def run(engine, mode, args):
+    probe = Probe()
+    interrupt_at = args.seconds + 2.0 if mode == "answer" else None
+    script = Script(args.seconds, interrupt_at)
+    stream = FakeSonicStream(mode, args.model_latency, args.jitter, args.answer_seconds)
+
+    if engine == "legacy":
+        client = LegacyNovaSonic(script, probe, stream)
+    else:
+        client = SimpleNovaSonic(audio_backend=ProbeBackend(script, probe), transport=stream)
+
+    await client.start_session()
+    tasks = [asyncio.create_task(client.play_audio()), asyncio.create_task(client.capture_audio())]
+    await asyncio.sleep(args.seconds + (5.0 if mode == "answer" else 1.0))
+
+    client.is_active = False
+    for task in tasks + [client.response]:
+        task.cancel()
+    await asyncio.gather(*tasks, client.response, return_exceptions=True)
+    if engine != "legacy":
+        client.audio.close()
+
+    if mode == "echo":
+        latencies = [probe.played[seq] - probe.recorded[seq] for seq in probe.recorded if seq in probe.played]
+        latencies.sort()
+        gaps = client.gaps - 1 if engine == "legacy" else client.audio.playback.underruns
+        print(
+            f"{engine:<8} echo     answered {len(latencies)}/{len(probe.recorded)} chunks, round trip "
+            f"p50 {statistics.median(latencies) * 1000:.0f} ms, p95 {latencies[int(len(latencies) * 0.95)] * 1000:.0f} ms, "
+            f"{max(gaps, 0)} playback gaps"
+        )
+    else:
+        chunk_seconds = CHUNK_SIZE / OUTPUT_SAMPLE_RATE
+        interrupted_at = script.start + interrupt_at
+        answer = [at for seq, at in probe.played.items() if ANSWER_BASE <= seq < INTERRUPT_BASE]
+        talking_over = max(0.0, max(answer) + chunk_seconds - interrupted_at)
+        reached = f"{stream.interrupt_sent_at - interrupted_at:.2f} s" if stream.interrupt_sent_at else "never"
+        queued = client.max_queued if engine == "legacy" else client.audio.playback.ring.capacity
+        print(
+            f"{engine:<8} barge-in assistant kept talking {talking_over:.2f} s over the user, the interruption "
+            f"reached the model after {reached}, playback queue "
+            f"{'grew to' if engine == 'legacy' else 'bounded at'} {queued / 1024:.0f} KB"
+        )
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--seconds", type=float, default=8.0)
+    parser.add_argument("--model-latency", type=float, default=0.15)
+    parser.add_argument("--jitter", type=float, default=0.05)
+    parser.add_argument("--answer-seconds", type=float, default=6.0)
+    args = parser.parse_args()
+
+    chunk = bytes(CHUNK_SIZE * SAMPLE_WIDTH)
+    events = EventTemplates("prompt", "content", "audio", "matthew")
+    for name, build in (("f-string", lambda: legacy_audio_event("prompt", "audio", chunk).encode("utf-8")),
+                        ("template", lambda: events.audio_input(chunk))):
+        start = time.perf_counter()
+        for _ in range(5000):
+            build()
+        print(f"{name:<8} audio event built in {(time.perf_counter() - start) / 5000 * 1e6:.1f} us")
+
+    for mode in ("echo", "answer"):
+        for engine in ("legacy", "engine"):
+            await run(engine, mode, args)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,10 +1,12 @@
 import asyncio
 import argparse
+from audio_io import WavBackend
 from nova_sonic_class import SimpleNovaSonic
 
-async def main(voice_id):
-    # Create Nova Sonic client
-    nova_client = SimpleNovaSonic(voice_id=voice_id)
+async def main(voice_id, input_wav=None, output_wav=None):
+    # Create Nova Sonic client, with the microphone and speakers or, headless, with WAV files
+    audio_backend = WavBackend(input_wav, output_wav) if input_wav else None
+    nova_client = SimpleNovaSonic(voice_id=voice_id, audio_backend=audio_backend)
     
     # Start session
     await nova_client.start_session()
@@ -47,6 +49,8 @@ if __name__ == "__main__":
 
     parser = argparse.ArgumentParser()
     parser.add_argument('--voice-id', type=str, default='matthew', help='Voice ID to use for speech')
+    parser.add_argument('--input-wav', type=str, help='16 kHz mono WAV file to use instead of the microphone')
+    parser.add_argument('--output-wav', type=str, help='WAV file where the responses are written')
     args = parser.parse_args()
 
-    asyncio.run(main(args.voice_id))
+    asyncio.run(main(args.voice_id, args.input_wav, args.output_wav))
@@ -1,332 +1,180 @@
-import os
 import asyncio
 import base64
 import json
 import uuid
-import pyaudio # have brew install portaudio
-from aws_sdk_bedrock_runtime.client import BedrockRuntimeClient, InvokeModelWithBidirectionalStreamOperationInput
-from aws_sdk_bedrock_runtime.models import InvokeModelWithBidirectionalStreamInputChunk, BidirectionalInputPayloadPart
-from aws_sdk_bedrock_runtime.config import Config, HTTPAuthSchemeResolver, SigV4AuthScheme
-from smithy_aws_core.credentials_resolvers.environment import EnvironmentCredentialsResolver
+
+from audio_io import AudioEngine
+from sonic_events import EventTemplates
 
 # Audio configuration
 INPUT_SAMPLE_RATE = 16000
 OUTPUT_SAMPLE_RATE = 24000
 CHANNELS = 1
-FORMAT = pyaudio.paInt16
 CHUNK_SIZE = 1024
 
+SYSTEM_PROMPT = "You are a friendly assistant. The user and you will engage in a spoken dialog " \
+    "exchanging the transcripts of a natural real-time conversation. Keep your responses short, " \
+    "generally two or three sentences for chatty scenarios."
 
 
 class SimpleNovaSonic:
-    def __init__(self, model_id='amazon.nova-sonic-v1:0', region='us-east-1', voice_id='matthew'):
+    """
+    A Nova Sonic conversation. The microphone and speakers are handled by an AudioEngine in their own threads
+    (PyAudio by default, see audio_io for other backends), so capturing and playing audio never blocks the
+    sending of audio or the processing of the responses. `transport` replaces the Bedrock stream, e.g. by a fake.
+    """
+
+    def __init__(self, model_id='amazon.nova-sonic-v1:0', region='us-east-1', voice_id='matthew',
+                 audio_backend=None, transport=None, system_prompt=SYSTEM_PROMPT):
         self.model_id = model_id
         self.region = region
-        self.client = None
-        self.stream = None
+        self.transport = transport
         self.response = None
         self.is_active = False
         self.voice_id = voice_id
+        self.system_prompt = system_prompt
         self.prompt_name = str(uuid.uuid4())
         self.content_name = str(uuid.uuid4())
         self.audio_content_name = str(uuid.uuid4())
-        self.audio_queue = asyncio.Queue()
         self.display_assistant_text = False
+        self.role = None
+        self.events = EventTemplates(
+            self.prompt_name, self.content_name, self.audio_content_name, voice_id,
+            input_sample_rate=INPUT_SAMPLE_RATE, output_sample_rate=OUTPUT_SAMPLE_RATE,
+        )
 
-    def _initialize_client(self):
-        """Initialize the Bedrock client."""
-        config = Config(
-            endpoint_uri=f"https://bedrock-runtime.{self.region}.amazonaws.com",
-            region=self.region,
-            aws_credentials_identity_resolver=EnvironmentCredentialsResolver(),
-            http_auth_scheme_resolver=HTTPAuthSchemeResolver(),
-            http_auth_schemes={"aws.auth#sigv4": SigV4AuthScheme()}
+        if audio_backend is None:
+            from audio_io import PyAudioBackend
+            audio_backend = PyAudioBackend()
+        self.audio = AudioEngine(
+            audio_backend, input_rate=INPUT_SAMPLE_RATE, output_rate=OUTPUT_SAMPLE_RATE, frames_per_buffer=CHUNK_SIZE
         )
-        self.client = BedrockRuntimeClient(config=config)
+
+    def _initialize_transport(self):
+        """Initialize the Bedrock stream."""
+        from bedrock_transport import BedrockStreamTransport
+        self.transport = BedrockStreamTransport(self.model_id, self.region)
 
     async def capture_audio(self):
         """Capture audio from microphone and send to Nova Sonic."""
-        p = pyaudio.PyAudio()
-        stream = p.open(
-            format=FORMAT,
-            channels=CHANNELS,
-            rate=INPUT_SAMPLE_RATE,
-            input=True,
-            frames_per_buffer=CHUNK_SIZE
-        )
-        
         print("Starting audio capture. Speak into your microphone...")
         print("Press Enter to stop...")
-        
+
         await self.start_audio_input()
-        
+        self.audio.start_input()
+
         try:
             while self.is_active:
-                audio_data = stream.read(CHUNK_SIZE, exception_on_overflow=False)
+                # Waits for the capture thread without blocking the loop
+                audio_data = await self.audio.read_input()
                 await self.send_audio_chunk(audio_data)
-                await asyncio.sleep(0.01)
         except Exception as e:
             print(f"Error capturing audio: {e}")
         finally:
-            stream.stop_stream()
-            stream.close()
-            p.terminate()
             print("Audio capture stopped.")
             await self.end_audio_input()
 
     async def play_audio(self):
         """Play audio responses."""
-        p = pyaudio.PyAudio()
-        stream = p.open(
-            format=FORMAT,
-            channels=CHANNELS,
-            rate=OUTPUT_SAMPLE_RATE,
-            output=True
-        )
-        
+        # The speakers pull the audio queued by _process_responses from their own thread
+        self.audio.start_output()
         try:
             while self.is_active:
-                audio_data = await self.audio_queue.get()
-                stream.write(audio_data)
-        except Exception as e:
-            print(f"Error playing audio: {e}")
+                await asyncio.sleep(0.1)
         finally:
-            stream.stop_stream()
-            stream.close()
-            p.terminate()
+            self.audio.close()
+
+    async def send_event(self, event):
+        """Send an event (JSON string or serialized bytes) to the stream."""
+        await self.transport.send(event.encode('utf-8') if isinstance(event, str) else event)
+
+    def _handle_text(self, text):
+        if self.role == "ASSISTANT" and text.lstrip().startswith("{"):
+            # The model signals that the user interrupted it with { "interrupted" : true }
+            try:
+                if json.loads(text).get("interrupted"):
+                    self.audio.barge_in()
+                    return
+            except ValueError:
+                pass
 
-    async def send_event(self, event_json):
-        """Send an event to the stream."""
-        event = InvokeModelWithBidirectionalStreamInputChunk( value=BidirectionalInputPayloadPart(bytes_=event_json.encode('utf-8')))
-        await self.stream.input_stream.send(event)
+        if self.role == "ASSISTANT" and self.display_assistant_text:
+            print(f"Assistant: {text}")
+        elif self.role == "USER":
+            print(f"User: {text}")
 
     async def _process_responses(self):
         """Process responses from the stream."""
         try:
             while self.is_active:
-                output = await self.stream.await_output()
-                result = await output[1].receive()
-                
-                if result.value and result.value.bytes_:
-                    response_data = result.value.bytes_.decode('utf-8')
-                    json_data = json.loads(response_data)
-                    
-                    if 'event' in json_data:
-                        # Handle content start event
-                        if 'contentStart' in json_data['event']:
-                            content_start = json_data['event']['contentStart'] 
-                            # set role
-                            self.role = content_start['role']
-                            # Check for speculative content
-                            if 'additionalModelFields' in content_start:
-                                additional_fields = json.loads(content_start['additionalModelFields'])
-                                if additional_fields.get('generationStage') == 'SPECULATIVE':
-                                    self.display_assistant_text = True
-                                else:
-                                    self.display_assistant_text = False
-                                
-                        # Handle text output event
-                        elif 'textOutput' in json_data['event']:
-                            text = json_data['event']['textOutput']['content']    
-                           
-                            if (self.role == "ASSISTANT" and self.display_assistant_text):
-                                print(f"Assistant: {text}")
-                            elif self.role == "USER":
-                                print(f"User: {text}")
-                        
-                        # Handle audio output
-                        elif 'audioOutput' in json_data['event']:
-                            audio_content = json_data['event']['audioOutput']['content']
-                            audio_bytes = base64.b64decode(audio_content)
-                            await self.audio_queue.put(audio_bytes)
+                response_data = await self.transport.receive()
+                if not response_data:
+                    continue
+
+                json_data = json.loads(response_data)
+                if 'event' not in json_data:
+                    continue
+                event = json_data['event']
+
+                # Handle content start event
+                if 'contentStart' in event:
+                    content_start = event['contentStart']
+                    # set role
+                    self.role = content_start['role']
+                    # Check for speculative content
+                    if 'additionalModelFields' in content_start:
+                        additional_fields = json.loads(content_start['additionalModelFields'])
+                        self.display_assistant_text = additional_fields.get('generationStage') == 'SPECULATIVE'
+
+                # Handle text output event
+                elif 'textOutput' in event:
+                    self._handle_text(event['textOutput']['content'])
+
+                # Handle audio output, bounded: waits only if the playback buffer is full
+                elif 'audioOutput' in event:
+                    await self.audio.play(base64.b64decode(event['audioOutput']['content']))
         except Exception as e:
             print(f"Error processing responses: {e}")
 
     async def start_session(self):
         """Start a new session with Nova Sonic."""
-        if not self.client:
-            self._initialize_client()
-            
+        if not self.transport:
+            self._initialize_transport()
+
         # Initialize the stream
-        self.stream = await self.client.invoke_model_with_bidirectional_stream(
-            InvokeModelWithBidirectionalStreamOperationInput(model_id=self.model_id)
-        )
+        await self.transport.open()
         self.is_active = True
-        
-        # Send session start event
-        session_start = '''
-        {
-          "event": {
-            "sessionStart": {
-              "inferenceConfiguration": {
-                "maxTokens": 1024,
-                "topP": 0.9,
-                "temperature": 0.7
-              }
-            }
-          }
-        }
-        '''
-        await self.send_event(session_start)
-        
-        # Send prompt start event
-        prompt_start = f'''
-        {{
-          "event": {{
-            "promptStart": {{
-              "promptName": "{self.prompt_name}",
-              "textOutputConfiguration": {{
-                "mediaType": "text/plain"
-              }},
-              "audioOutputConfiguration": {{
-                "mediaType": "audio/lpcm",
-                "sampleRateHertz": 24000,
-                "sampleSizeBits": 16,
-                "channelCount": 1,
-                "voiceId": "{self.voice_id}",
-                "encoding": "base64",
-                "audioType": "SPEECH"
-              }}
-            }}
-          }}
-        }}
-        '''
-        await self.send_event(prompt_start)
-        
-        # Send system prompt
-        text_content_start = f'''
-        {{
-            "event": {{
-                "contentStart": {{
-                    "promptName": "{self.prompt_name}",
-                    "contentName": "{self.content_name}",
-                    "type": "TEXT",
-                    "interactive": true,
-                    "role": "SYSTEM",
-                    "textInputConfiguration": {{
-                        "mediaType": "text/plain"
-                    }}
-                }}
-            }}
-        }}
-        '''
-        await self.send_event(text_content_start)
-        
-        system_prompt = "You are a friendly assistant. The user and you will engage in a spoken dialog " \
-            "exchanging the transcripts of a natural real-time conversation. Keep your responses short, " \
-            "generally two or three sentences for chatty scenarios."
-        
 
+        # Send session start, prompt start and the system prompt
+        await self.send_event(self.events.session_start)
+        await self.send_event(self.events.prompt_start)
+        await self.send_event(self.events.text_content_start)
+        await self.send_event(self.events.text_input(self.system_prompt))
+        await self.send_event(self.events.text_content_end)
 
-        text_input = f'''
-        {{
-            "event": {{
-                "textInput": {{
-                    "promptName": "{self.prompt_name}",
-                    "contentName": "{self.content_name}",
-                    "content": "{system_prompt}"
-                }}
-            }}
-        }}
-        '''
-        await self.send_event(text_input)
-        
-        text_content_end = f'''
-        {{
-            "event": {{
-                "contentEnd": {{
-                    "promptName": "{self.prompt_name}",
-                    "contentName": "{self.content_name}"
-                }}
-            }}
-        }}
-        '''
-        await self.send_event(text_content_end)
-        
         # Start processing responses
         self.response = asyncio.create_task(self._process_responses())
 
     async def end_session(self):
         """End the session."""
-        if not self.is_active:
+        if not self.transport:
             return
-            
-        prompt_end = f'''
-        {{
-            "event": {{
-                "promptEnd": {{
-                    "promptName": "{self.prompt_name}"
-                }}
-            }}
-        }}
-        '''
-        await self.send_event(prompt_end)
-        
-        session_end = '''
-        {
-            "event": {
-                "sessionEnd": {}
-            }
-        }
-        '''
-        await self.send_event(session_end)
+
+        await self.send_event(self.events.prompt_end)
+        await self.send_event(self.events.session_end)
         # close the stream
-        await self.stream.input_stream.close()
+        await self.transport.close()
 
     async def start_audio_input(self):
         """Start audio input stream."""
-        audio_content_start = f'''
-        {{
-            "event": {{
-                "contentStart": {{
-                    "promptName": "{self.prompt_name}",
-                    "contentName": "{self.audio_content_name}",
-                    "type": "AUDIO",
-                    "interactive": true,
-                    "role": "USER",
-                    "audioInputConfiguration": {{
-                        "mediaType": "audio/lpcm",
-                        "sampleRateHertz": 16000,
-                        "sampleSizeBits": 16,
-                        "channelCount": 1,
-                        "audioType": "SPEECH",
-                        "encoding": "base64"
-                    }}
-                }}
-            }}
-        }}
-        '''
-        await self.send_event(audio_content_start)
-    
+        await self.send_event(self.events.audio_content_start)
+
     async def send_audio_chunk(self, audio_bytes):
         """Send an audio chunk to the stream."""
         if not self.is_active:
             return
-            
-        blob = base64.b64encode(audio_bytes)
-        audio_event = f'''
-        {{
-            "event": {{
-                "audioInput": {{
-                    "promptName": "{self.prompt_name}",
-                    "contentName": "{self.audio_content_name}",
-                    "content": "{blob.decode('utf-8')}"
-                }}
-            }}
-        }}
-        '''
-        await self.send_event(audio_event)
-    
+        await self.send_event(self.events.audio_input(audio_bytes))
+
     async def end_audio_input(self):
         """End audio input stream."""
-        audio_content_end = f'''
-        {{
-            "event": {{
-                "contentEnd": {{
-                    "promptName": "{self.prompt_name}",
-                    "contentName": "{self.audio_content_name}"
-                }}
-            }}
-        }}
-        '''
-        await self.send_event(audio_content_end)
\ No newline at end of file
+        await self.send_event(self.events.audio_content_end)
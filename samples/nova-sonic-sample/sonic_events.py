@@ -0,0 +1,95 @@
+import base64
+import json
+
+
+class EventTemplates:
+    """
+    Nova Sonic input events, serialized once per session.
+
+    The events of a session only change in their content, so they are serialized with json.dumps when the session
+    starts. An audio chunk is sent as the bytes before its content, the base64 of the chunk and the bytes after
+    it, without building and encoding a JSON string for every chunk.
+    """
+
+    def __init__(self, prompt_name, content_name, audio_content_name, voice_id,
+                 input_sample_rate=16000, output_sample_rate=24000, max_tokens=1024, top_p=0.9, temperature=0.7):
+        self.prompt_name = prompt_name
+        self.content_name = content_name
+        self.audio_content_name = audio_content_name
+
+        self.session_start = self._serialize({
+            "sessionStart": {
+                "inferenceConfiguration": {"maxTokens": max_tokens, "topP": top_p, "temperature": temperature}
+            }
+        })
+        self.prompt_start = self._serialize({
+            "promptStart": {
+                "promptName": prompt_name,
+                "textOutputConfiguration": {"mediaType": "text/plain"},
+                "audioOutputConfiguration": {
+                    "mediaType": "audio/lpcm",
+                    "sampleRateHertz": output_sample_rate,
+                    "sampleSizeBits": 16,
+                    "channelCount": 1,
+                    "voiceId": voice_id,
+                    "encoding": "base64",
+                    "audioType": "SPEECH",
+                },
+            }
+        })
+        self.text_content_start = self._serialize({
+            "contentStart": {
+                "promptName": prompt_name,
+                "contentName": content_name,
+                "type": "TEXT",
+                "interactive": True,
+                "role": "SYSTEM",
+                "textInputConfiguration": {"mediaType": "text/plain"},
+            }
+        })
+        self.text_content_end = self._content_end(content_name)
+        self.audio_content_start = self._serialize({
+            "contentStart": {
+                "promptName": prompt_name,
+                "contentName": audio_content_name,
+                "type": "AUDIO",
+                "interactive": True,
+                "role": "USER",
+                "audioInputConfiguration": {
+                    "mediaType": "audio/lpcm",
+                    "sampleRateHertz": input_sample_rate,
+                    "sampleSizeBits": 16,
+                    "channelCount": 1,
+                    "audioType": "SPEECH",
+                    "encoding": "base64",
+                },
+            }
+        })
+        self.audio_content_end = self._content_end(audio_content_name)
+        self.prompt_end = self._serialize({"promptEnd": {"promptName": prompt_name}})
+        self.session_end = self._serialize({"sessionEnd": {}})
+
+        # The audio content is the only value that changes, and base64 needs no JSON escaping
+        placeholder = "\x00content\x00"
+        audio_input = self._serialize({
+            "audioInput": {"promptName": prompt_name, "contentName": audio_content_name, "content": placeholder}
+        })
+        self._audio_prefix, self._audio_suffix = audio_input.split(json.dumps(placeholder).encode("utf-8"))
+        self._audio_prefix += b'"'
+        self._audio_suffix = b'"' + self._audio_suffix
+
+    @staticmethod
+    def _serialize(event):
+        return json.dumps({"event": event}, separators=(",", ":")).encode("utf-8")
+
+    def _content_end(self, content_name):
+        return self._serialize({"contentEnd": {"promptName": self.prompt_name, "contentName": content_name}})
+
+    def text_input(self, content):
+        """Text is escaped by json.dumps, a system prompt may have quotes or new lines"""
+        return self._serialize({
+            "textInput": {"promptName": self.prompt_name, "contentName": self.content_name, "content": content}
+        })
+
+    def audio_input(self, audio_bytes):
+        return b"".join((self._audio_prefix, base64.b64encode(audio_bytes), self._audio_suffix))
@@ -0,0 +1,121 @@
+"""
+Seeds a table with --items generated orders against moto (no AWS calls), comparing:
+
+- one BatchWriteItem call with every item (the previous AwsCustomResource)
+- boto3 batch_writer, one batch at a time
+- TableSeeder with 1 and --workers segments
+- TableSeeder again with the same dataset, where every item is unchanged
+
+moto answers in microseconds, --rtt-ms adds the round trip of a real DynamoDB endpoint to every call.
+The dataset is written as JSONL and streamed from disk like in the custom resource.
+
+    python benchmark_seeder.py --items 100000 --workers 8 --rtt-ms 20
+"""
+
+import argparse
+import json
+import os
+import resource
+import sys
+import tempfile
+import time
+
+import boto3
+from botocore.exceptions import ClientError
+from moto import mock_aws
+
+# The Lambda asset of the seeder custom resource
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "seeder"))
+
+from seeder import TableSeeder, iter_dataset, iter_file
+
+STATUSES = ["Despacho Programado", "En Preparacion", "En Transito", "Entregado"]
+
+
+def write_dataset(path, n_items):
+    with open(path, "w") as f:
+        for i in range(n_items):
+            f.write(json.dumps({
+                "order_number": str(10_000_000 + i),
+                "identity_document_number": f"{i % 99_999_999:08d}-{i % 10}",
+                "first_name": "Enrique",
+                "last_name": "Gonzalez",
+                "phone_number": f"569{i:08d}",
+                "delivery_date": f"2024-08-{i % 28 + 1:02d}",
+                "status": STATUSES[i % len(STATUSES)],
+                "shipping_address": f"Calle las acacias {i}, Providencia. Region Metropolitana",
+            }) + "\n")
+
+
+def client_with_rtt(rtt_ms):
+    client = boto3.client("dynamodb", region_name="us-east-1")
+    if rtt_ms:
+        # Before moto answers the request
+        client.meta.events.register_first("before-send.dynamodb", lambda **kwargs: time.sleep(rtt_ms / 1000))
+    return client
+
+
+def create_table(client, name):
+    client.create_table(
+        TableName=name,
+        KeySchema=[{"AttributeName": "order_number", "KeyType": "HASH"}],
+        AttributeDefinitions=[{"AttributeName": "order_number", "AttributeType": "S"}],
+        BillingMode="PAY_PER_REQUEST",
+    )
+
+
+def report(name, elapsed, n_items, detail=""):
+    print(f"{name:<28} {elapsed:7.1f} s  {n_items / elapsed:8.0f} items/s  {detail}")
+
+
+@mock_aws
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--items", type=int, default=100_000)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--rtt-ms", type=float, default=20.0)
+    args = parser.parse_args()
+
+    path = os.path.join(tempfile.mkdtemp(), "orders.jsonl")
+    write_dataset(path, args.items)
+    print(f"{args.items} items, {os.path.getsize(path) / 2**20:.0f} MB of JSONL, {args.rtt_ms:.0f} ms round trip")
+
+    client = client_with_rtt(args.rtt_ms)
+    create_table(client, "single")
+    items = [{"PutRequest": {"Item": {"order_number": {"S": str(i)}}}} for i in range(min(args.items, 1000))]
+    try:
+        client.batch_write_item(RequestItems={"single": items})
+        print("single BatchWriteItem       accepted by moto, DynamoDB rejects more than 25 items")
+    except ClientError as e:
+        print(f"single BatchWriteItem       fails: {e.response['Error']['Message'][:70]}")
+
+    create_table(client, "batch_writer")
+    table = boto3.resource("dynamodb", region_name="us-east-1").Table("batch_writer")
+    table.meta.client.meta.events.register_first(
+        "before-send.dynamodb", lambda **kwargs: time.sleep(args.rtt_ms / 1000) if args.rtt_ms else None
+    )
+    start = time.perf_counter()
+    with table.batch_writer() as writer:
+        for item in iter_dataset(iter_file(path), path):
+            writer.put_item(Item=item)
+    report("batch_writer", time.perf_counter() - start, args.items)
+
+    for workers in (1, args.workers):
+        name = f"seeder_{workers}"
+        client = client_with_rtt(args.rtt_ms)
+        create_table(client, name)
+        seeder = TableSeeder(name, client=client, workers=workers)
+        start = time.perf_counter()
+        stats = seeder.seed(iter_dataset(iter_file(path), path))
+        report(f"TableSeeder {workers} segments", time.perf_counter() - start, args.items,
+               f"written {stats['written']}, {stats['batches']} batches")
+
+    start = time.perf_counter()
+    stats = seeder.seed(iter_dataset(iter_file(path), path))
+    report(f"again, {args.workers} segments", time.perf_counter() - start, args.items,
+           f"written {stats['written']}, unchanged {stats['unchanged']}")
+    print(f"peak memory {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.0f} MB (moto keeps the tables in memory)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+import os
+
+import boto3
+
+from seeder import TableSeeder, iter_dataset
+
+s3 = boto3.client("s3")
+WORKERS = int(os.environ.get("SEED_WORKERS", "8"))
+
+
+def lambda_handler(event, context):
+    """
+    on_event handler of the custom resource that seeds a table: TableName, and the Bucket and Key of the dataset.
+    A new dataset has a new asset key, so the table is seeded again when the sample data changes; unchanged items
+    are skipped.
+    """
+    print("Received event: ")
+    print({k: v for k, v in event.items() if k != "ResponseURL"})
+    properties = event["ResourceProperties"]
+    physical_resource_id = event.get("PhysicalResourceId", f"Seed-{properties['TableName']}")
+
+    if event["RequestType"] == "Delete":
+        # The table is deleted with the stack
+        return {"PhysicalResourceId": physical_resource_id}
+
+    old_properties = event.get("OldResourceProperties", {})
+    if all(old_properties.get(name) == properties[name] for name in ("TableName", "Bucket", "Key")):
+        print("Dataset already seeded")
+        return {"PhysicalResourceId": physical_resource_id}
+
+    body = s3.get_object(Bucket=properties["Bucket"], Key=properties["Key"])["Body"]
+    seeder = TableSeeder(properties["TableName"], workers=WORKERS)
+    stats = seeder.seed(iter_dataset(body.iter_chunks(1 << 20), properties["Key"]))
+    print(f"Seeded {properties['TableName']}: {stats}")
+
+    return {"PhysicalResourceId": physical_resource_id, "Data": stats}
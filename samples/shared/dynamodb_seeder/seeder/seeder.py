@@ -0,0 +1,290 @@
+"""
+Seeds a DynamoDB table with a JSON or JSONL dataset of any size.
+
+- The dataset is streamed: items are parsed one at a time from chunks of the file (or of an S3 object), the
+  whole dataset is never in memory. JSON datasets are an array of items or an object with an "Items" array (the
+  format of orders.json and of a Scan response), JSONL datasets have one item per line. Items are in DynamoDB
+  JSON ({"S": "..."}) or plain JSON.
+- Items are written by `workers` parallel segments, in BatchWriteItem calls of 25 items. An item always goes to
+  the same segment (by its key), so the last of several items with the same key wins, as with sequential puts.
+  UnprocessedItems are retried with exponential backoff and jitter.
+- Before writing a batch into a table that has items, the stored items with the same keys are read and the
+  items equal to them are skipped, so seeding again (a stack update, running the CLI again) only writes what
+  changed. Nothing is added to the items, the agents read them as they are in the dataset.
+
+It runs as the handler of a CloudFormation custom resource (lambda_function.py) or locally:
+
+    python seeder.py --table <table name> --dataset ../orders.json --workers 8
+"""
+
+import argparse
+import codecs
+import hashlib
+import json
+import queue
+import random
+import threading
+import time
+from decimal import Decimal
+
+import boto3
+from boto3.dynamodb.types import TypeDeserializer, TypeSerializer
+from botocore.config import Config
+
+BATCH_SIZE = 25  # BatchWriteItem limit
+ATTRIBUTE_TYPES = {"S", "N", "B", "BOOL", "NULL", "M", "L", "SS", "NS", "BS"}
+SKIP = " \t\r\n,"
+
+serializer = TypeSerializer()
+deserializer = TypeDeserializer()
+
+
+def iter_dataset(chunks, name="", items_key="Items"):
+    """
+    Items of a dataset read as chunks (str or bytes). JSONL when the name ends with .jsonl, otherwise a JSON
+    array or an object with an `items_key` array.
+    """
+    decoder = json.JSONDecoder(parse_float=Decimal)
+    text = codecs.getincrementaldecoder("utf-8")()
+    chunks = iter(chunks)
+    buffer, pos, eof = "", 0, False
+
+    def more():
+        nonlocal buffer, pos, eof
+        chunk = next(chunks, None)
+        if chunk is None:
+            eof = True
+            buffer, pos = buffer[pos:] + text.decode(b"", final=True), 0
+            return False
+        buffer, pos = buffer[pos:] + (text.decode(chunk) if isinstance(chunk, bytes) else chunk), 0
+        return True
+
+    def peek(skip=SKIP):
+        """The next character that is not a separator, None at the end of the dataset"""
+        nonlocal pos
+        while True:
+            while pos < len(buffer) and buffer[pos] in skip:
+                pos += 1
+            if pos < len(buffer):
+                return buffer[pos]
+            if not more():
+                return None
+
+    def value():
+        nonlocal pos
+        while True:
+            try:
+                obj, end = decoder.raw_decode(buffer, pos)
+                # A number at the end of the buffer may continue in the next chunk
+                if end < len(buffer) or eof:
+                    pos = end
+                    return obj
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+            more()
+
+    def array():
+        nonlocal pos
+        while peek() not in ("]", None):
+            yield value()
+        pos += 1
+
+    first = peek()
+    if name.endswith(".jsonl"):
+        while peek() is not None:
+            yield value()
+    elif first == "[":
+        pos += 1
+        yield from array()
+    elif first == "{":
+        pos += 1
+        while peek() not in ("}", None):
+            key = value()
+            if peek(SKIP + ":") == "[" and key == items_key:
+                pos += 1
+                yield from array()
+            else:
+                value()
+    elif first is not None:
+        raise ValueError(f"{name or 'dataset'} is not a JSON array, an object with {items_key} or JSONL")
+
+
+def iter_file(path, chunk_size=1 << 20):
+    with open(path, "rb") as f:
+        yield from iter(lambda: f.read(chunk_size), b"")
+
+
+def to_attribute_values(item):
+    """DynamoDB JSON items are kept as they are, plain JSON items are serialized"""
+    if all(isinstance(v, dict) and len(v) == 1 and next(iter(v)) in ATTRIBUTE_TYPES for v in item.values()):
+        return item
+    # Most attributes are strings, serialized without going through TypeSerializer
+    return {k: {"S": v} if type(v) is str else serializer.serialize(v) for k, v in item.items()}
+
+
+def to_python(item):
+    """Item as Python values, where numbers are equal however they are written ("1.0" and "1")"""
+    return {k: deserializer.deserialize(v) for k, v in item.items()}
+
+
+class UnprocessedItemsError(Exception):
+    pass
+
+
+class TableSeeder:
+    """
+    Writes the items of a dataset into a table, see the module docstring.
+
+    @param workers: parallel segments, each one writing its batches in order
+    @param skip_unchanged: skip the items equal to the stored ones, False to write every item every time
+    @param max_attempts: BatchWriteItem / BatchGetItem calls for a batch before giving up on unprocessed items
+    """
+
+    def __init__(self, table_name, client=None, workers=8, skip_unchanged=True, max_attempts=8,
+                 base_delay=0.05, max_delay=5.0):
+        self.table_name = table_name
+        self.client = client or boto3.client(
+            "dynamodb", config=Config(retries={"mode": "adaptive", "max_attempts": 10}, max_pool_connections=workers + 2)
+        )
+        self.workers = workers
+        self.skip_unchanged = skip_unchanged
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+        key_schema = self.client.describe_table(TableName=table_name)["Table"]["KeySchema"]
+        self.key_attributes = [key["AttributeName"] for key in key_schema]
+        self.stats = {}
+        self._compare = False
+        self._lock = threading.Lock()
+
+    def _count(self, **counts):
+        with self._lock:
+            for name, n in counts.items():
+                self.stats[name] = self.stats.get(name, 0) + n
+
+    def _key(self, item):
+        return tuple(json.dumps(item[name], sort_keys=True, default=str) for name in self.key_attributes)
+
+    def _backoff(self, attempt):
+        delay = min(self.max_delay, self.base_delay * 2 ** attempt)
+        time.sleep(delay * random.uniform(0.5, 1.0))
+
+    def _unchanged(self, batch):
+        """Keys of the items of a batch that are already in the table as they are"""
+        request = {self.table_name: {
+            "Keys": [{name: item[name] for name in self.key_attributes} for item in batch.values()],
+        }}
+        stored = {}
+        for attempt in range(self.max_attempts):
+            response = self.client.batch_get_item(RequestItems=request)
+            for item in response.get("Responses", {}).get(self.table_name, []):
+                stored[self._key(item)] = to_python(item)
+            request = response.get("UnprocessedKeys")
+            if not request:
+                break
+            self._count(retries=1)
+            self._backoff(attempt)
+        else:
+            raise UnprocessedItemsError(f"Keys still unprocessed after {self.max_attempts} attempts")
+
+        return {key for key, item in batch.items() if stored.get(key) == to_python(item)}
+
+    def _write(self, items):
+        request = {self.table_name: [{"PutRequest": {"Item": item}} for item in items]}
+        for attempt in range(self.max_attempts):
+            response = self.client.batch_write_item(RequestItems=request)
+            request = response.get("UnprocessedItems")
+            if not request:
+                return
+            self._count(retries=1)
+            self._backoff(attempt)
+        raise UnprocessedItemsError(
+            f"{len(request[self.table_name])} items still unprocessed after {self.max_attempts} attempts"
+        )
+
+    def _write_batch(self, batch):
+        items = list(batch.values())
+        if self._compare:
+            unchanged = self._unchanged(batch)
+            items = [item for key, item in batch.items() if key not in unchanged]
+            self._count(unchanged=len(unchanged))
+        if items:
+            self._write(items)
+        self._count(written=len(items), batches=1)
+
+    def _segment(self, batches, errors):
+        while True:
+            batch = batches.get()
+            if batch is None:
+                return
+            if errors:
+                continue  # Another segment failed, drain the queue so the producer does not block
+            try:
+                self._write_batch(batch)
+            except Exception as e:
+                errors.append(e)
+
+    def seed(self, items):
+        """Writes the items (an iterable, e.g. iter_dataset) and returns the counts of items read, written and unchanged"""
+        self.stats = {"items": 0, "written": 0, "unchanged": 0, "batches": 0, "retries": 0}
+        # Nothing to compare with in an empty table, the first seeding only writes
+        self._compare = self.skip_unchanged and self.client.scan(
+            TableName=self.table_name, Limit=1, Select="COUNT"
+        )["Count"] > 0
+        errors = []
+        # A couple of batches queued per segment: enough to keep it busy, and reading the dataset waits for it
+        queues = [queue.Queue(maxsize=2) for _ in range(self.workers)]
+        threads = [threading.Thread(target=self._segment, args=(q, errors), daemon=True) for q in queues]
+        for thread in threads:
+            thread.start()
+
+        buffers = [{} for _ in range(self.workers)]
+        try:
+            for item in items:
+                if errors:
+                    break
+                item = to_attribute_values(item)
+                key = self._key(item)
+                segment = int(hashlib.md5(repr(key).encode()).hexdigest(), 16) % self.workers
+                buffer = buffers[segment]
+                buffer.pop(key, None)  # The last item with a key wins
+                buffer[key] = item
+                self.stats["items"] += 1
+                if len(buffer) == BATCH_SIZE:
+                    queues[segment].put(buffer)
+                    buffers[segment] = {}
+        finally:
+            for segment, buffer in enumerate(buffers):
+                if buffer and not errors:
+                    queues[segment].put(buffer)
+                queues[segment].put(None)
+            for thread in threads:
+                thread.join()
+
+        if errors:
+            raise errors[0]
+        return dict(self.stats)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Seed a DynamoDB table with a JSON or JSONL dataset")
+    parser.add_argument("--table", required=True)
+    parser.add_argument("--dataset", required=True)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--write-all", action="store_true", help="write every item, also the unchanged ones")
+    parser.add_argument("--endpoint-url", help="e.g. DynamoDB local")
+    args = parser.parse_args()
+
+    client = None
+    if args.endpoint_url:
+        client = boto3.client("dynamodb", endpoint_url=args.endpoint_url)
+    seeder = TableSeeder(args.table, client=client, workers=args.workers, skip_unchanged=not args.write_all)
+    start = time.perf_counter()
+    stats = seeder.seed(iter_dataset(iter_file(args.dataset), args.dataset))
+    print(f"{args.table}: {stats} in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
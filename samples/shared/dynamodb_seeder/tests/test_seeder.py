@@ -0,0 +1,106 @@
+import json
+import os
+import sys
+
+import boto3
+from moto import mock_aws
+
+# The seeder is deployed as a Lambda asset and imported by its module name, as in lambda_function.py
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "seeder"))
+
+from seeder import TableSeeder, iter_dataset, iter_file  # noqa: E402
+
+# The datasets of the samples that use the seeder
+ORDERS = [
+    os.path.join(os.path.dirname(__file__), "..", "..", "..", sample, "databases", "orders.json")
+    for sample in ("multi-user-memory-session", "multi-agent-collaboration")
+]
+
+
+def create_table(client):
+    client.create_table(
+        TableName="orders",
+        KeySchema=[{"AttributeName": "order_number", "KeyType": "HASH"}],
+        AttributeDefinitions=[{"AttributeName": "order_number", "AttributeType": "S"}],
+        BillingMode="PAY_PER_REQUEST",
+    )
+
+
+def chunks(text, size=7):
+    data = text.encode()
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+def test_datasets_are_streamed_in_any_format():
+    items = [{"order_number": str(i), "name": "Ñuñoa ü", "total": 12.5, "lines": [1, 2]} for i in range(5)]
+    as_object = json.dumps({"Count": 5, "Items": items, "ScannedCount": 5})
+    as_jsonl = "\n".join(json.dumps(item) for item in items)
+
+    for text, name in ((as_object, "data.json"), (json.dumps(items), "data.json"), (as_jsonl, "data.jsonl")):
+        parsed = list(iter_dataset(chunks(text), name))
+        assert [item["order_number"] for item in parsed] == [str(i) for i in range(5)]
+        assert parsed[0]["name"] == "Ñuñoa ü"
+        assert str(parsed[0]["total"]) == "12.5"
+
+    for path in ORDERS:
+        orders = list(iter_dataset(iter_file(path, chunk_size=64), path))
+        with open(path) as f:
+            assert orders == json.load(f)["Items"]
+
+
+@mock_aws
+def test_seeding_more_than_a_batch_is_idempotent():
+    client = boto3.client("dynamodb", region_name="us-east-1")
+    create_table(client)
+    items = [{"order_number": str(i), "status": "Despacho Programado"} for i in range(260)]
+    # The last item with a key wins
+    items.append({"order_number": "7", "status": "Entregado"})
+
+    seeder = TableSeeder("orders", client=client, workers=4)
+    stats = seeder.seed(items)
+    assert (stats["items"], stats["written"], stats["unchanged"]) == (261, 261, 0)
+    assert client.scan(TableName="orders", Select="COUNT")["Count"] == 260
+    item = client.get_item(TableName="orders", Key={"order_number": {"S": "7"}})["Item"]
+    # Stored as in the dataset, nothing added
+    assert item == {"order_number": {"S": "7"}, "status": {"S": "Entregado"}}
+
+    items = items[:-1]
+    items[7]["status"] = items[3]["status"] = "Entregado"
+    stats = seeder.seed(items)
+    assert (stats["written"], stats["unchanged"]) == (1, 259)
+
+
+@mock_aws
+def test_numbers_compare_by_value():
+    client = boto3.client("dynamodb", region_name="us-east-1")
+    create_table(client)
+    seeder = TableSeeder("orders", client=client, workers=2)
+    seeder.seed(iter_dataset(chunks('[{"order_number": "1", "total": 10.0, "lines": [1, 2]}]'), "data.json"))
+
+    stats = seeder.seed(iter_dataset(chunks('[{"order_number": "1", "total": 10, "lines": [1, 2.0]}]'), "data.json"))
+    assert (stats["written"], stats["unchanged"]) == (0, 1)
+
+
+@mock_aws
+def test_unprocessed_items_are_retried():
+    client = boto3.client("dynamodb", region_name="us-east-1")
+    create_table(client)
+    batch_write_item = client.batch_write_item
+    throttled = []
+
+    def throttling_batch_write_item(RequestItems):
+        # The first call of every batch only writes its first item
+        requests = RequestItems["orders"]
+        if len(requests) > 1 and requests not in throttled:
+            batch_write_item(RequestItems={"orders": requests[:1]})
+            throttled.append(requests[1:])
+            return {"UnprocessedItems": {"orders": requests[1:]}}
+        return batch_write_item(RequestItems=RequestItems)
+
+    client.batch_write_item = throttling_batch_write_item
+    seeder = TableSeeder("orders", client=client, workers=2, skip_unchanged=False, base_delay=0.001)
+    stats = seeder.seed({"order_number": str(i)} for i in range(100))
+
+    assert throttled
+    assert stats["retries"] == len(throttled)
+    assert client.scan(TableName="orders", Select="COUNT")["Count"] == 100
@@ -0,0 +1,117 @@
+"""
+Local benchmark of the SQL agent caching layer against Chinook.db with a fake LLM.
+
+The fake agent behaves like the langchain SQL agent loop: list tables, read the schema,
+generate SQL (simulated LLM latency per step) and execute it. No AWS access needed.
+
+    python benchmark_cache.py --questions 300 --llm-latency 0.05
+"""
+
+import argparse
+import random
+import sqlite3
+import time
+
+from query_cache import CachedQueryEngine, SchemaCache
+
+QUESTIONS = {
+    "How many customers are there?": "SELECT COUNT(*) FROM Customer",
+    "Top 5 artists by number of albums": (
+        "SELECT ar.Name, COUNT(*) c FROM Album al JOIN Artist ar ON ar.ArtistId = al.ArtistId "
+        "GROUP BY ar.Name ORDER BY c DESC LIMIT 5"
+    ),
+    "Total sales by country": "SELECT BillingCountry, SUM(Total) FROM Invoice GROUP BY BillingCountry ORDER BY 2 DESC",
+    "¿Cuántas canciones hay por género?": (
+        "SELECT g.Name, COUNT(*) FROM Track t JOIN Genre g ON g.GenreId = t.GenreId GROUP BY g.Name"
+    ),
+    "Which employee has the most customers?": (
+        "SELECT e.FirstName, e.LastName, COUNT(*) c FROM Customer cu JOIN Employee e "
+        "ON e.EmployeeId = cu.SupportRepId GROUP BY e.EmployeeId ORDER BY c DESC LIMIT 1"
+    ),
+    "Sales in 2011": "SELECT SUM(Total) FROM Invoice WHERE strftime('%Y', InvoiceDate) = '2011'",
+    "Sales in 2012": "SELECT SUM(Total) FROM Invoice WHERE strftime('%Y', InvoiceDate) = '2012'",
+}
+
+REPHRASINGS = {
+    "How many customers are there?": ["how many customers are there", "How many customers are there ?"],
+    "Total sales by country": ["total sales by country please", "Show me total sales by country"],
+    "¿Cuántas canciones hay por género?": ["cuantas canciones hay por genero"],
+    "Top 5 artists by number of albums": ["Top 5 artists by number of album"],
+}
+
+
+class FakeSQLAgent:
+    """Emulates the multi step langchain SQL agent with a fixed question -> SQL map"""
+
+    def __init__(self, db_path, llm_latency, steps=4):
+        self.db_path = db_path
+        self.llm_latency = llm_latency
+        self.steps = steps
+        self.llm_calls = 0
+
+    def lookup_sql(self, question):
+        for canonical, sql in QUESTIONS.items():
+            if question == canonical or question in REPHRASINGS.get(canonical, []):
+                return sql
+        raise KeyError(question)
+
+    def __call__(self, question):
+        # list tables + schema introspection on every call, like the uncached agent
+        schema = SchemaCache(self.db_path)
+        schema.get_table_info(schema.tables)
+        for _ in range(self.steps):
+            self.llm_calls += 1
+            time.sleep(self.llm_latency)
+        sql = self.lookup_sql(question)
+        conn = sqlite3.connect(f"file:{self.db_path}?mode=ro", uri=True)
+        rows = conn.execute(sql).fetchall()
+        conn.close()
+        return f"The answer is {rows}", sql
+
+
+def workload(n, seed=7):
+    random.seed(seed)
+    variants = [q for q in QUESTIONS] + [r for rs in REPHRASINGS.values() for r in rs]
+    return [random.choice(variants) for _ in range(n)]
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p))]
+
+
+def run(label, answer, questions):
+    latencies = []
+    start = time.perf_counter()
+    for q in questions:
+        t = time.perf_counter()
+        answer(q)
+        latencies.append((time.perf_counter() - t) * 1000)
+    total = time.perf_counter() - start
+    print(
+        f"{label:<10} total {total:7.2f}s  p50 {percentile(latencies, 0.5):8.2f}ms  "
+        f"p99 {percentile(latencies, 0.99):8.2f}ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--db", default="Chinook.db")
+    parser.add_argument("--questions", type=int, default=300)
+    parser.add_argument("--llm-latency", type=float, default=0.05, help="seconds per fake LLM step")
+    args = parser.parse_args()
+
+    questions = workload(args.questions)
+
+    baseline = FakeSQLAgent(args.db, args.llm_latency)
+    run("uncached", lambda q: baseline(q)[0], questions)
+    print(f"{'':<10} llm calls {baseline.llm_calls}")
+
+    cached_agent = FakeSQLAgent(args.db, args.llm_latency)
+    engine = CachedQueryEngine(args.db, cached_agent)
+    run("cached", engine.answer, questions)
+    print(f"{'':<10} llm calls {cached_agent.llm_calls}  stats {engine.stats}")
+
+
+if __name__ == "__main__":
+    main()
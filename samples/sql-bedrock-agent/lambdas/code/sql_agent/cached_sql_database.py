@@ -0,0 +1,70 @@
+from langchain_community.utilities.sql_database import SQLDatabase, truncate_word
+
+from query_cache import SchemaCache, ResultCache, db_version
+from sql_executor import GuardedSQLExecutor
+
+
+class CachedSQLDatabase(SQLDatabase):
+    """
+    SQLDatabase that serves table names and table info (schema + sample rows) from a
+    SchemaCache, runs statements through a GuardedSQLExecutor (read only pool, plan
+    check, timeout, row limit) and caches SELECT results in a ResultCache, so the
+    langchain SQL tools don't re-introspect the database on every agent step.
+    """
+
+    @classmethod
+    def from_sqlite(
+        cls,
+        db_path: str,
+        schema_cache: SchemaCache = None,
+        result_cache: ResultCache = None,
+        executor: GuardedSQLExecutor = None,
+        **kwargs,
+    ):
+        # the schema cache replaces the metadata reflection of SQLDatabase
+        kwargs.setdefault("lazy_table_reflection", True)
+        db = cls.from_uri(f"sqlite:///{db_path}", **kwargs)
+        db._db_path = db_path
+        db._schema_cache = schema_cache or SchemaCache(db_path)
+        db._result_cache = result_cache or ResultCache()
+        db._executor = executor or GuardedSQLExecutor(db_path)
+        return db
+
+    def get_usable_table_names(self):
+        # SQLDatabase.__init__ calls it before from_sqlite sets the schema cache
+        if not hasattr(self, "_schema_cache"):
+            return super().get_usable_table_names()
+        return list(self._schema_cache.tables)
+
+    def get_table_info(self, table_names=None) -> str:
+        return self._schema_cache.get_table_info(table_names)
+
+    def run(self, command, fetch="all", include_columns=False, *, parameters=None, execution_options=None):
+        # run_no_throw (the sql_db_query tool) always passes parameters and execution_options, None when unused
+        if not (isinstance(command, str) and fetch == "all" and not parameters and not execution_options):
+            return super().run(
+                command, fetch, include_columns, parameters=parameters, execution_options=execution_options
+            )
+
+        version = db_version(self._db_path)
+        cache_key = f"{include_columns}:{command}"
+        result = self._result_cache.get(cache_key, version)
+        if result is None:
+            result = self._format(self._executor.execute(command), include_columns)
+            self._result_cache.put(cache_key, version, result)
+        return result
+
+    def _format(self, execution: dict, include_columns: bool) -> str:
+        # same output format as SQLDatabase.run
+        rows = [
+            tuple(truncate_word(value, length=self._max_string_length) for value in row)
+            for row in execution["rows"]
+        ]
+        if include_columns:
+            rows = [dict(zip(execution["columns"], row)) for row in rows]
+        if not rows:
+            return ""
+        result = str(rows)
+        if execution["truncated"]:
+            result += f"\n(only the first {len(rows)} rows are shown, aggregate or add a LIMIT)"
+        return result
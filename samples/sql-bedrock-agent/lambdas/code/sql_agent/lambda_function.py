@@ -1,17 +1,58 @@
 import json
 import os
-from langchain_community.utilities.sql_database import SQLDatabase
 from langchain_community.agent_toolkits import create_sql_agent
 from langchain_aws import  ChatBedrock
 
+from cached_sql_database import CachedSQLDatabase
+from query_cache import CachedQueryEngine, QuestionCache
+from sql_executor import GuardedSQLExecutor
+
 model_id = os.environ.get("MODEL_ID", "us.anthropic.claude-3-5-haiku-20241022-v1:0")
+DB_PATH = os.environ.get("DB_PATH", "Chinook.db")
+SIMILARITY_THRESHOLD = float(os.environ.get("SIMILARITY_THRESHOLD", "0.85"))
+
+# guardrails for LLM generated SQL (see sql_executor.py)
+executor = GuardedSQLExecutor(
+    DB_PATH,
+    pool_size=int(os.environ.get("SQL_POOL_SIZE", "4")),
+    timeout=float(os.environ.get("SQL_TIMEOUT_SECONDS", "5")),
+    max_rows=int(os.environ.get("SQL_MAX_ROWS", "1000")),
+    max_scan_rows=int(os.environ.get("SQL_MAX_SCAN_ROWS", "1000000")),
+    max_full_scans=int(os.environ.get("SQL_MAX_FULL_SCANS", "4")),
+)
 
-db = SQLDatabase.from_uri("sqlite:///Chinook.db")
+# schema, sample rows and query results are cached per container (see query_cache.py)
+db = CachedSQLDatabase.from_sqlite(DB_PATH, executor=executor)
 print("dialect:",db.dialect)
 print ("tables:")
 print(db.get_usable_table_names())
 llm =ChatBedrock(model = model_id,  beta_use_converse_api=True, model_kwargs={"temperature": 0})
-agent_executor = create_sql_agent(llm, db=db, verbose=True)
+agent_executor = create_sql_agent(
+    llm, db=db, verbose=True, agent_executor_kwargs={"return_intermediate_steps": True}
+)
+
+
+def last_successful_sql(intermediate_steps):
+    sql = None
+    for action, observation in intermediate_steps:
+        if action.tool != "sql_db_query":
+            continue
+        tool_input = action.tool_input
+        query = tool_input.get("query") if isinstance(tool_input, dict) else tool_input
+        if query and not str(observation).startswith("Error"):
+            sql = query
+    return sql
+
+
+def run_agent(question):
+    response = agent_executor.invoke(question)
+    return response.get("output"), last_successful_sql(response.get("intermediate_steps", []))
+
+
+query_engine = CachedQueryEngine(
+    DB_PATH, run_agent, question_cache=QuestionCache(threshold=SIMILARITY_THRESHOLD), executor=executor
+)
+
 
 def lambda_handler(event, context):
     print("Received event: ")
@@ -44,12 +85,12 @@ def lambda_handler(event, context):
     }
     function_response = {'response': action_response, 'messageVersion': event['messageVersion']}
 
-    print(f"Response: {function_response}")    
+    print(f"Response: {function_response}")
 
     return function_response
 
 
 def query_db(consulta):
-    response = agent_executor.invoke(consulta)
-    return response.get("output")
-
+    response = query_engine.answer(consulta)
+    print(f"cache stats: {query_engine.stats}")
+    return response
@@ -0,0 +1,276 @@
+import hashlib
+import math
+import os
+import re
+import sqlite3
+import unicodedata
+from collections import OrderedDict
+
+from sqlalchemy.exc import SQLAlchemyError
+
+# Caching layer for the SQL agent:
+# - SchemaCache:   table names, CREATE statements and sample rows, computed once per container
+# - QuestionCache: normalized question -> validated SQL (+ answer), exact or semantic match
+# - ResultCache:   SQL -> result, keyed by database file version
+# - CachedQueryEngine: ties them together so repeated questions skip the LLM
+
+SAMPLE_ROWS = 3
+
+STOPWORDS = {
+    # es
+    "el", "la", "los", "las", "un", "una", "unos", "unas", "de", "del", "al", "a", "en", "y", "o",
+    "que", "qué", "por", "para", "con", "me", "mi", "mis", "se", "es", "son", "hay", "cual", "cuales",
+    "dame", "muestrame", "dime", "favor", "podrias", "puedes",
+    # en
+    "the", "a", "an", "of", "in", "on", "and", "or", "to", "for", "with", "me", "my", "is", "are",
+    "what", "which", "please", "show", "tell", "give", "can", "you", "could", "there",
+}
+
+
+def db_version(db_path: str) -> str:
+    """Cheap version of the database file: changes whenever the file is rewritten"""
+    stat = os.stat(db_path)
+    return f"{stat.st_mtime_ns}-{stat.st_size}"
+
+
+def strip_accents(text: str) -> str:
+    return "".join(c for c in unicodedata.normalize("NFD", text) if unicodedata.category(c) != "Mn")
+
+
+def normalize_question(question: str) -> str:
+    text = strip_accents(question.lower())
+    tokens = re.findall(r"[a-z0-9_]+", text)
+    return " ".join(t for t in tokens if t not in STOPWORDS)
+
+
+def question_entities(question: str) -> set:
+    """Numbers, quoted strings and capitalized words (after the first) must match exactly on a semantic hit"""
+    entities = set(re.findall(r"\d+(?:[.,]\d+)?", question))
+    entities.update(q.lower() for q in re.findall(r"[\"']([^\"']+)[\"']", question))
+    words = re.findall(r"\w+", question)
+    entities.update(strip_accents(w.lower()) for w in words[1:] if w[:1].isupper())
+    return entities
+
+
+def trigrams(word: str) -> set:
+    padded = f" {word} "
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+def words_aligned(a: str, b: str, min_similarity: float = 0.5) -> bool:
+    """Same content words in the same order, allowing plurals, accents and typos in each word"""
+    a_words, b_words = a.split(), b.split()
+    if len(a_words) != len(b_words):
+        return False
+    for x, y in zip(a_words, b_words):
+        if x == y:
+            continue
+        if x.isdigit() or y.isdigit():
+            return False
+        tx, ty = trigrams(x), trigrams(y)
+        if len(tx & ty) / len(tx | ty) < min_similarity:
+            return False
+    return True
+
+
+class HashingEmbedder:
+    """
+    Local, dependency free embedding: hashed character trigram counts, L2 normalized.
+    Good enough to rank rephrasings and typos of the same question, no model call needed.
+    """
+
+    def __init__(self, dim: int = 1024) -> None:
+        self.dim = dim
+
+    def embed(self, text: str) -> list:
+        vector = [0.0] * self.dim
+        for word in text.split():
+            for feature in trigrams(word):
+                h = int.from_bytes(hashlib.blake2b(feature.encode(), digest_size=4).digest(), "little")
+                vector[h % self.dim] += 1.0
+        norm = math.sqrt(sum(v * v for v in vector)) or 1.0
+        return [v / norm for v in vector]
+
+
+def cosine(a: list, b: list) -> float:
+    return sum(x * y for x, y in zip(a, b))
+
+
+class SchemaCache:
+    """Precomputed table list and table info (schema + sample rows) in langchain SQLDatabase format"""
+
+    def __init__(self, db_path: str, sample_rows: int = SAMPLE_ROWS) -> None:
+        self.db_path = db_path
+        self.sample_rows = sample_rows
+        self.version = None
+        self.tables = []
+        self.table_info = {}
+        self.refresh()
+
+    def refresh(self) -> None:
+        version = db_version(self.db_path)
+        if version == self.version:
+            return
+        conn = sqlite3.connect(f"file:{self.db_path}?mode=ro", uri=True)
+        try:
+            rows = conn.execute(
+                "SELECT name, sql FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%' ORDER BY name"
+            ).fetchall()
+            table_info = {}
+            for name, create_sql in rows:
+                cursor = conn.execute(f'SELECT * FROM "{name}" LIMIT {self.sample_rows}')
+                columns = [c[0] for c in cursor.description]
+                sample = "\n".join("\t".join(str(v)[:100] for v in row) for row in cursor.fetchall())
+                table_info[name] = (
+                    f"{create_sql.strip()}\n\n/*\n{self.sample_rows} rows from {name} table:\n"
+                    f"{chr(9).join(columns)}\n{sample}\n*/"
+                )
+        finally:
+            conn.close()
+        self.tables = [name for name, _ in rows]
+        self.table_info = table_info
+        self.version = version
+
+    def get_table_info(self, table_names=None) -> str:
+        self.refresh()
+        names = table_names or self.tables
+        missing = set(names) - set(self.table_info)
+        if missing:
+            raise ValueError(f"table_names {missing} not found in database")
+        return "\n\n".join(self.table_info[name] for name in names)
+
+
+class QuestionCache:
+    """Normalized question -> validated SQL and answer, with semantic fallback"""
+
+    def __init__(self, embedder=None, threshold: float = 0.85, max_entries: int = 1000) -> None:
+        self.embedder = embedder or HashingEmbedder()
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.exact = OrderedDict()
+
+    def add(self, question: str, sql: str, answer: str, version: str) -> None:
+        key = normalize_question(question)
+        self.exact[key] = dict(
+            question=question,
+            sql=sql,
+            answer=answer,
+            version=version,
+            vector=self.embedder.embed(key),
+            entities=question_entities(question),
+        )
+        self.exact.move_to_end(key)
+        while len(self.exact) > self.max_entries:
+            self.exact.popitem(last=False)
+
+    def lookup(self, question: str):
+        key = normalize_question(question)
+        if key in self.exact:
+            return self.exact[key], 1.0
+
+        vector = self.embedder.embed(key)
+        entities = question_entities(question)
+        best, best_score = None, 0.0
+        for entry_key, entry in self.exact.items():
+            if entry["entities"] != entities or not words_aligned(key, entry_key):
+                continue
+            score = cosine(vector, entry["vector"])
+            if score > best_score:
+                best, best_score = entry, score
+        if best and best_score >= self.threshold:
+            return best, best_score
+        return None, best_score
+
+
+class ResultCache:
+    """SQL -> result LRU, entries are only valid for the database version they were computed on"""
+
+    def __init__(self, max_entries: int = 256) -> None:
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+
+    @staticmethod
+    def key(sql: str, version: str):
+        return version, re.sub(r"\s+", " ", sql.strip().rstrip(";"))
+
+    def get(self, sql: str, version: str):
+        key = self.key(sql, version)
+        if key in self.entries:
+            self.entries.move_to_end(key)
+            return self.entries[key]
+        return None
+
+    def put(self, sql: str, version: str, result) -> None:
+        key = self.key(sql, version)
+        self.entries[key] = result
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+
+def is_read_only(sql: str) -> bool:
+    return re.match(r"^\s*(select|with)\b", sql, re.IGNORECASE) is not None
+
+
+class CachedQueryEngine:
+    """
+    Answers questions from the caches when possible and falls back to the agent.
+
+    `run_agent(question)` must return `(answer, sql)` where sql is the last SQL statement
+    the agent executed successfully (or None). Answers are reused as-is while the database
+    file has not changed; after a change the cached SQL is re-executed without the LLM.
+    """
+
+    def __init__(self, db_path: str, run_agent, question_cache=None, result_cache=None, executor=None) -> None:
+        self.db_path = db_path
+        self.run_agent = run_agent
+        self.question_cache = question_cache or QuestionCache()
+        self.result_cache = result_cache or ResultCache()
+        self.executor = executor
+        self.stats = dict(questions=0, answer_hits=0, sql_hits=0, agent_calls=0, result_hits=0)
+
+    def run_sql(self, sql: str):
+        version = db_version(self.db_path)
+        cached = self.result_cache.get(sql, version)
+        if cached is not None:
+            self.stats["result_hits"] += 1
+            return cached
+        if self.executor:
+            result = self.executor.execute(sql)["rows"]
+        else:
+            conn = sqlite3.connect(f"file:{self.db_path}?mode=ro", uri=True)
+            try:
+                result = conn.execute(sql).fetchall()
+            finally:
+                conn.close()
+        if is_read_only(sql):
+            self.result_cache.put(sql, version, result)
+        return result
+
+    def answer(self, question: str) -> str:
+        self.stats["questions"] += 1
+        version = db_version(self.db_path)
+        entry, score = self.question_cache.lookup(question)
+        self.stats["last_similarity"] = round(score, 3)
+
+        if entry and entry["version"] == version:
+            self.stats["answer_hits"] += 1
+            return entry["answer"]
+
+        if entry:
+            try:
+                rows = self.run_sql(entry["sql"])
+            except (SQLAlchemyError, sqlite3.Error) as e:
+                # rejected, timed out or no longer valid on the new data: the agent writes a new query
+                print(f"cached sql failed, asking the agent: {e}")
+            else:
+                self.stats["sql_hits"] += 1
+                answer = f"Result of `{entry['sql']}`: {rows}"
+                self.question_cache.add(question, entry["sql"], answer, version)
+                return answer
+
+        self.stats["agent_calls"] += 1
+        answer, sql = self.run_agent(question)
+        if sql and is_read_only(sql):
+            self.question_cache.add(question, sql, answer, version)
+        return answer
@@ -0,0 +1,205 @@
+import queue
+import re
+import sqlite3
+import time
+from contextlib import contextmanager
+
+from sqlalchemy.exc import SQLAlchemyError
+
+from query_cache import db_version, is_read_only
+
+# Guarded execution of LLM generated SQL against SQLite:
+# - read only (mode=ro) connections from a fixed size pool, so concurrency is bounded
+# - EXPLAIN QUERY PLAN check that rejects plans with too many / too large full scans
+# - progress handler timeout, the hard bound when the plan estimate is wrong
+# - streaming fetch capped at max_rows
+# - execution time reported for every query
+#
+# Rejections, timeouts and SQLite errors (unknown table or column, several statements) are SQLAlchemyErrors, so
+# SQLDatabase.run_no_throw returns them to the agent as an "Error: ..." observation it can recover from
+
+TABLE_REF = re.compile(r'(?:\bfrom|\bjoin|,)\s+"?(\w+)"?(?:\s+(?:as\s+)?"?(\w+)"?)?', re.IGNORECASE)
+SQL_KEYWORDS = {
+    "where", "join", "left", "right", "inner", "outer", "cross", "natural", "on", "using", "group",
+    "order", "limit", "union", "intersect", "except", "having", "window", "from", "select", "as",
+}
+
+
+class QueryRejected(SQLAlchemyError):
+    pass
+
+
+class QueryTimeout(SQLAlchemyError):
+    pass
+
+
+class QueryFailed(SQLAlchemyError):
+    pass
+
+
+class ReadOnlyConnectionPool:
+    """Fixed size pool of read only SQLite connections"""
+
+    def __init__(self, db_path: str, size: int = 4, acquire_timeout: float = 10.0) -> None:
+        self.db_path = db_path
+        self.size = size
+        self.acquire_timeout = acquire_timeout
+        self.connections = queue.Queue(maxsize=size)
+        for _ in range(size):
+            self.connections.put(self._connect())
+
+    def _connect(self):
+        return sqlite3.connect(f"file:{self.db_path}?mode=ro", uri=True, check_same_thread=False)
+
+    @contextmanager
+    def connection(self):
+        try:
+            conn = self.connections.get(timeout=self.acquire_timeout)
+        except queue.Empty:
+            raise QueryTimeout(f"no database connection available after {self.acquire_timeout}s")
+        try:
+            yield conn
+        finally:
+            conn.set_progress_handler(None, 0)
+            self.connections.put(conn)
+
+    def close(self) -> None:
+        while not self.connections.empty():
+            self.connections.get_nowait().close()
+
+
+class GuardedSQLExecutor:
+    """
+    Runs read only SQL with bounded latency.
+
+    Args:
+        db_path (str): SQLite database file
+        pool_size (int): Maximum concurrent queries
+        timeout (float): Seconds before a running query is interrupted
+        max_rows (int): Rows fetched before the result is truncated
+        max_scan_rows (int): Maximum estimated rows examined by full scans (nested scans multiply)
+        max_full_scans (int): Maximum full table scans in a plan
+    """
+
+    def __init__(
+        self,
+        db_path: str,
+        pool_size: int = 4,
+        timeout: float = 5.0,
+        max_rows: int = 1000,
+        max_scan_rows: int = 1_000_000,
+        max_full_scans: int = 4,
+        progress_steps: int = 10_000,
+    ) -> None:
+        self.db_path = db_path
+        self.pool = ReadOnlyConnectionPool(db_path, pool_size)
+        self.timeout = timeout
+        self.max_rows = max_rows
+        self.max_scan_rows = max_scan_rows
+        self.max_full_scans = max_full_scans
+        self.progress_steps = progress_steps
+        self._row_counts = None
+        self._row_counts_version = None
+
+    def table_row_counts(self, conn) -> dict:
+        # counted once per database version
+        version = db_version(self.db_path)
+        if self._row_counts_version != version:
+            tables = [
+                name for (name,) in conn.execute(
+                    "SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%'"
+                )
+            ]
+            self._row_counts = {
+                t.lower(): conn.execute(f'SELECT COUNT(*) FROM "{t}"').fetchone()[0] for t in tables
+            }
+            self._row_counts_version = version
+        return self._row_counts
+
+    def resolve_names(self, sql: str) -> dict:
+        # alias (or table name) -> table name
+        names = {}
+        for table, alias in TABLE_REF.findall(sql):
+            names[table.lower()] = table.lower()
+            if alias and alias.lower() not in SQL_KEYWORDS:
+                names[alias.lower()] = table.lower()
+        return names
+
+    def check_plan(self, conn, sql: str) -> dict:
+        """EXPLAIN QUERY PLAN the statement and reject it when full scans exceed the thresholds"""
+        plan = conn.execute(f"EXPLAIN QUERY PLAN {sql}").fetchall()
+        row_counts = self.table_row_counts(conn)
+        names = self.resolve_names(sql)
+
+        scans = []
+        nested_rows = {}
+        for _, parent, _, detail in plan:
+            match = re.match(r"SCAN (?:TABLE )?\"?(\w+)\"?", detail)
+            if not match:
+                continue
+            table = names.get(match.group(1).lower(), match.group(1).lower())
+            # unknown names are CTEs or materialized subqueries, already bounded by their own scans
+            rows = row_counts.get(table, 1)
+            scans.append((table, rows))
+            # scans under the same parent are nested loops: rows multiply
+            nested_rows[parent] = nested_rows.get(parent, 1) * max(rows, 1)
+
+        estimated_rows = sum(nested_rows.values())
+        summary = dict(full_scans=len(scans), estimated_rows=estimated_rows, plan=[p[3] for p in plan])
+
+        if len(scans) > self.max_full_scans:
+            raise QueryRejected(
+                f"Query rejected: {len(scans)} full table scans ({', '.join(t for t, _ in scans)}), "
+                f"the limit is {self.max_full_scans}. Filter with indexed columns or join on keys."
+            )
+        if estimated_rows > self.max_scan_rows:
+            raise QueryRejected(
+                f"Query rejected: full scans would examine about {estimated_rows:,} rows "
+                f"({', '.join(f'{t}={r:,}' for t, r in scans)}), the limit is {self.max_scan_rows:,}. "
+                "Add join conditions or filters."
+            )
+        return summary
+
+    def execute(self, sql: str, check_plan: bool = True) -> dict:
+        """
+        Execute a read only statement.
+
+        Returns:
+            dict: columns, rows, truncated flag, plan summary and elapsed_ms
+        Raises:
+            QueryRejected: not a SELECT, or the plan exceeds the scan thresholds
+            QueryTimeout: the query ran longer than the timeout
+            QueryFailed: SQLite could not run the statement
+        """
+        sql = sql.strip().rstrip(";")
+        if not is_read_only(sql):
+            raise QueryRejected("Query rejected: only a single SELECT statement is allowed")
+
+        start = time.perf_counter()
+        with self.pool.connection() as conn:
+            rows = []
+            truncated = False
+            try:
+                plan = self.check_plan(conn, sql) if check_plan else None
+
+                deadline = time.monotonic() + self.timeout
+                conn.set_progress_handler(lambda: 1 if time.monotonic() > deadline else 0, self.progress_steps)
+
+                cursor = conn.execute(sql)
+                columns = [c[0] for c in cursor.description or []]
+                while len(rows) < self.max_rows:
+                    batch = cursor.fetchmany(min(500, self.max_rows - len(rows)))
+                    if not batch:
+                        break
+                    rows.extend(batch)
+                else:
+                    truncated = cursor.fetchone() is not None
+                cursor.close()
+            except sqlite3.Error as e:
+                if isinstance(e, sqlite3.OperationalError) and "interrupted" in str(e):
+                    raise QueryTimeout(f"Query interrupted after {self.timeout}s, simplify it or add filters")
+                raise QueryFailed(f"({type(e).__name__}) {e}") from e
+
+        elapsed_ms = round((time.perf_counter() - start) * 1000, 2)
+        print(f"sql executed in {elapsed_ms} ms, {len(rows)} rows{' (truncated)' if truncated else ''}")
+        return dict(columns=columns, rows=rows, truncated=truncated, plan=plan, elapsed_ms=elapsed_ms)
@@ -0,0 +1,120 @@
+import os
+import shutil
+import sys
+
+import pytest
+
+SQL_AGENT_DIR = os.path.join(os.path.dirname(__file__), "../../lambdas/code/sql_agent")
+sys.path.append(SQL_AGENT_DIR)
+
+from query_cache import CachedQueryEngine, QuestionCache, ResultCache, db_version, normalize_question, words_aligned
+from sql_executor import GuardedSQLExecutor
+
+CHINOOK = os.path.join(SQL_AGENT_DIR, "Chinook.db")
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    # a copy, the tests change its version
+    path = str(tmp_path / "Chinook.db")
+    shutil.copy(CHINOOK, path)
+    return path
+
+
+def touch(path):
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+def test_words_aligned():
+    assert words_aligned("how many customers", "how many customer")
+    assert words_aligned("cuantas canciones rock", "cuantas cancion rock")
+    assert words_aligned("how many customers", "how many custmers")
+    assert not words_aligned("how many customers", "how many invoices")
+    assert not words_aligned("top 5 artists", "top 10 artists")
+    assert not words_aligned("customers canada", "customers from canada")
+
+
+def test_semantic_match_of_rephrasings():
+    cache = QuestionCache()
+    cache.add("How many customers are there?", "SELECT COUNT(*) FROM Customer", "59", "v1")
+
+    for question in ["how many customers are there", "How many customer are there?", "how many customers??"]:
+        entry, score = cache.lookup(question)
+        assert entry and entry["sql"] == "SELECT COUNT(*) FROM Customer", (question, score)
+
+    assert cache.lookup("How many invoices are there?")[0] is None
+
+    cache.add("¿Cuántas canciones hay?", "SELECT COUNT(*) FROM Track", "3503", "v1")
+    assert cache.lookup("cuantas cancion hay")[0]["sql"] == "SELECT COUNT(*) FROM Track"
+
+
+def test_different_entities_never_match():
+    cache = QuestionCache(threshold=0.1)
+    cache.add("Total sales in 2010", "SELECT SUM(Total) FROM Invoice WHERE InvoiceDate LIKE '2010%'", "1", "v1")
+    cache.add("Customers from Canada", "SELECT * FROM Customer WHERE Country = 'Canada'", "2", "v1")
+
+    assert cache.lookup("Total sales in 2011")[0] is None
+    assert cache.lookup("Customers from Brazil")[0] is None
+
+
+def test_question_cache_evicts_the_oldest():
+    cache = QuestionCache(max_entries=2)
+    for n in ["one", "two", "three"]:
+        cache.add(f"question {n}", f"SELECT '{n}'", n, "v1")
+    assert list(cache.exact) == [normalize_question("question two"), normalize_question("question three")]
+
+
+def test_result_cache_is_keyed_by_version():
+    cache = ResultCache(max_entries=2)
+    cache.put("SELECT 1;", "v1", [(1,)])
+
+    assert cache.get("  SELECT   1 ", "v1") == [(1,)]
+    assert cache.get("SELECT 1", "v2") is None
+
+    cache.put("SELECT 2", "v1", [(2,)])
+    cache.put("SELECT 3", "v1", [(3,)])
+    assert cache.get("SELECT 1", "v1") is None
+
+
+def test_new_database_version_reruns_the_cached_sql(db_path):
+    calls = []
+
+    def fake_agent(question):
+        calls.append(question)
+        return "There are 59 customers", "SELECT COUNT(*) FROM Customer"
+
+    engine = CachedQueryEngine(db_path, fake_agent)
+    engine.answer("How many customers are there?")
+    version = db_version(db_path)
+    touch(db_path)
+    assert db_version(db_path) != version
+
+    assert engine.answer("How many customers are there?") == "Result of `SELECT COUNT(*) FROM Customer`: [(59,)]"
+    assert engine.answer("How many customers are there?") == "Result of `SELECT COUNT(*) FROM Customer`: [(59,)]"
+    assert len(calls) == 1
+    assert (engine.stats["sql_hits"], engine.stats["answer_hits"]) == (1, 1)
+
+
+def test_agent_tool_results_are_cached_per_version(db_path):
+    pytest.importorskip("langchain_community")
+    from langchain_community.tools.sql_database.tool import QuerySQLDatabaseTool
+    from cached_sql_database import CachedSQLDatabase
+
+    executor = GuardedSQLExecutor(db_path, pool_size=1)
+    executed = []
+    execute = executor.execute
+    executor.execute = lambda sql, **kwargs: executed.append(sql) or execute(sql, **kwargs)
+    tool = QuerySQLDatabaseTool(db=CachedSQLDatabase.from_sqlite(db_path, executor=executor))
+
+    try:
+        sql = "SELECT COUNT(*) FROM Customer"
+        assert tool.invoke({"query": sql}) == "[(59,)]"
+        assert tool.invoke({"query": sql}) == "[(59,)]"
+        assert len(executed) == 1
+
+        touch(db_path)
+        assert tool.invoke({"query": sql}) == "[(59,)]"
+        assert len(executed) == 2
+    finally:
+        executor.pool.close()
@@ -0,0 +1,133 @@
+import os
+import sys
+import threading
+
+import pytest
+
+SQL_AGENT_DIR = os.path.join(os.path.dirname(__file__), "../../lambdas/code/sql_agent")
+sys.path.append(SQL_AGENT_DIR)
+
+from sql_executor import GuardedSQLExecutor, QueryFailed, QueryRejected, QueryTimeout
+from query_cache import CachedQueryEngine, QuestionCache
+
+CHINOOK = os.path.join(SQL_AGENT_DIR, "Chinook.db")
+
+
+@pytest.fixture
+def executor():
+    executor = GuardedSQLExecutor(CHINOOK, pool_size=2, timeout=0.5, max_rows=100)
+    yield executor
+    executor.pool.close()
+
+
+def test_indexed_join_is_allowed(executor):
+    result = executor.execute("SELECT t.Name, g.Name FROM Track t JOIN Genre g ON g.GenreId = t.GenreId LIMIT 5")
+    assert len(result["rows"]) == 5
+    assert result["columns"] == ["Name", "Name"]
+    assert result["plan"]["full_scans"] == 1
+    assert result["elapsed_ms"] >= 0
+
+
+def test_cross_join_is_rejected_by_plan(executor):
+    with pytest.raises(QueryRejected):
+        executor.execute("SELECT * FROM Track a, Track b")
+
+
+def test_runaway_query_times_out(executor):
+    with pytest.raises(QueryTimeout):
+        executor.execute("SELECT COUNT(*) FROM Track a, Track b, Genre c", check_plan=False)
+
+
+def test_rows_are_capped(executor):
+    result = executor.execute("SELECT * FROM Track")
+    assert len(result["rows"]) == 100
+    assert result["truncated"]
+
+
+def test_writes_are_rejected(executor):
+    with pytest.raises(QueryRejected):
+        executor.execute("DELETE FROM Track")
+
+
+def test_pool_bounds_concurrency(executor):
+    errors = []
+
+    def worker():
+        try:
+            executor.execute("SELECT COUNT(*) FROM Invoice")
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert not errors
+    assert executor.pool.connections.qsize() == 2
+
+
+def test_repeated_questions_skip_the_agent(executor):
+    calls = []
+
+    def fake_agent(question):
+        calls.append(question)
+        return "There are 59 customers", "SELECT COUNT(*) FROM Customer"
+
+    engine = CachedQueryEngine(CHINOOK, fake_agent, question_cache=QuestionCache(), executor=executor)
+
+    for question in ["How many customers are there?", "how many customers are there", "How many customer are there"]:
+        assert engine.answer(question) == "There are 59 customers"
+    assert len(calls) == 1
+    assert engine.stats["answer_hits"] == 2
+
+
+def test_agent_queries_go_through_the_guarded_executor(executor):
+    pytest.importorskip("langchain_community")
+    from langchain_community.tools.sql_database.tool import QuerySQLDatabaseTool
+    from cached_sql_database import CachedSQLDatabase
+
+    db = CachedSQLDatabase.from_sqlite(CHINOOK, executor=executor)
+    tool = QuerySQLDatabaseTool(db=db)
+
+    result = tool.invoke({"query": "SELECT Name FROM Track"})
+    assert "only the first 100 rows are shown" in result
+
+    # rejections are returned to the agent as an observation instead of raising
+    assert tool.invoke({"query": "SELECT * FROM Track a, Track b"}).startswith("Error: ")
+    assert db.run_no_throw("DELETE FROM Track").startswith("Error: Query rejected")
+
+
+@pytest.mark.parametrize("sql, message", [
+    ("SELECT Nope FROM Track", "no such column"),
+    ("SELECT * FROM Nope", "no such table"),
+    ("SELECT 1; SELECT 2", "one statement at a time"),
+])
+def test_sqlite_errors_are_returned_to_the_agent(executor, sql, message):
+    for check_plan in (True, False):
+        with pytest.raises(QueryFailed, match=message):
+            executor.execute(sql, check_plan=check_plan)
+
+    pytest.importorskip("langchain_community")
+    from cached_sql_database import CachedSQLDatabase
+
+    db = CachedSQLDatabase.from_sqlite(CHINOOK, executor=executor)
+    result = db.run_no_throw(sql)
+    assert result.startswith("Error: ") and message in result
+
+
+def test_failing_cached_sql_falls_back_to_the_agent(executor):
+    calls = []
+
+    def fake_agent(question):
+        calls.append(question)
+        return f"answer {len(calls)}", "SELECT * FROM Track a, Track b" if len(calls) == 1 else None
+
+    engine = CachedQueryEngine(CHINOOK, fake_agent, question_cache=QuestionCache(), executor=executor)
+    engine.answer("Pairs of tracks")
+    # a new database version makes the engine re-run the cached SQL, which the plan check rejects
+    engine.question_cache.exact["pairs tracks"]["version"] = "old"
+
+    assert engine.answer("Pairs of tracks") == "answer 2"
+    assert engine.stats["sql_hits"] == 0